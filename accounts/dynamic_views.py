@@ -10,6 +10,10 @@ import json
 from accounts.models import User
 from playgrounds.models import Playground, SportType
 from bookings.models import Booking
+from bookings.rollups import daily_stats
+from bookings.occupancy import occupancy_matrix
+from bookings.owner_metrics import owner_metrics
+from bookings.revenue import converted_sum, in_currency, target_currency
 from notifications.models import Notification
 
 
@@ -39,7 +43,7 @@ class DashboardDataAPIView(View):
         booking_data = self.get_booking_analytics(user_playgrounds, today, week_start, month_start)
         
         # Get playground performance
-        playground_data = self.get_playground_performance(user_playgrounds)
+        playground_data = self.get_playground_performance(user)
         
         # Get recent activities
         activities = self.get_recent_activities(user, user_playgrounds)
@@ -70,25 +74,34 @@ class DashboardDataAPIView(View):
         })
     
     def get_financial_metrics(self, playgrounds, today, week_start, month_start):
-        """Calculate real-time financial metrics"""
-        
-        # Current month revenue
-        current_month_revenue = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date__gte=month_start,
-            booking_date__lte=today,
-            payment_status='paid'
-        ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-        
-        # Previous month for comparison
+        """Calculate real-time financial metrics, in the owner's currency (one query over the bookings)"""
+        currency = target_currency(playgrounds.values_list('currency', flat=True))
         prev_month_start = (month_start - timedelta(days=1)).replace(day=1)
         prev_month_end = month_start - timedelta(days=1)
-        prev_month_revenue = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date__gte=prev_month_start,
-            booking_date__lte=prev_month_end,
-            payment_status='paid'
-        ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
+        paid = Q(payment_status='paid')
+        
+        revenue = Booking.objects.filter(playground__in=playgrounds).aggregate(
+            # Current month revenue
+            current_month_revenue=converted_sum(
+                currency=currency, filter=paid & Q(booking_date__gte=month_start, booking_date__lte=today)
+            ),
+            # Previous month for comparison
+            prev_month_revenue=converted_sum(
+                currency=currency, filter=paid & Q(booking_date__gte=prev_month_start, booking_date__lte=prev_month_end)
+            ),
+            # Today's revenue
+            today_revenue=converted_sum(currency=currency, filter=paid & Q(booking_date=today)),
+            # This week's revenue
+            week_revenue=converted_sum(
+                currency=currency, filter=paid & Q(booking_date__gte=week_start, booking_date__lte=today)
+            ),
+            # Average revenue per booking
+            avg_booking_value=Avg(in_currency(currency=currency), filter=paid),
+            # Pending payments
+            pending_payments=converted_sum(currency=currency, filter=Q(payment_status='pending')),
+        )
+        current_month_revenue = revenue['current_month_revenue']
+        prev_month_revenue = revenue['prev_month_revenue']
         
         # Calculate growth percentage
         if prev_month_revenue > 0:
@@ -96,42 +109,15 @@ class DashboardDataAPIView(View):
         else:
             growth_percentage = 100 if current_month_revenue > 0 else 0
         
-        # Today's revenue
-        today_revenue = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date=today,
-            payment_status='paid'
-        ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-        
-        # This week's revenue
-        week_revenue = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date__gte=week_start,
-            booking_date__lte=today,
-            payment_status='paid'
-        ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-        
-        # Average revenue per booking
-        avg_booking_value = Booking.objects.filter(
-            playground__in=playgrounds,
-            payment_status='paid'
-        ).aggregate(avg=Avg('final_amount'))['avg'] or Decimal('0')
-        
-        # Pending payments
-        pending_payments = Booking.objects.filter(
-            playground__in=playgrounds,
-            payment_status='pending'
-        ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-        
         return {
             'current_month_revenue': float(current_month_revenue),
             'previous_month_revenue': float(prev_month_revenue),
             'growth_percentage': round(float(growth_percentage), 2),
-            'today_revenue': float(today_revenue),
-            'week_revenue': float(week_revenue),
-            'average_booking_value': float(avg_booking_value),
-            'pending_payments': float(pending_payments),
-            'currency': 'USD'
+            'today_revenue': float(revenue['today_revenue']),
+            'week_revenue': float(revenue['week_revenue']),
+            'average_booking_value': float(revenue['avg_booking_value'] or 0),
+            'pending_payments': float(revenue['pending_payments']),
+            'currency': currency
         }
     
     def get_booking_analytics(self, playgrounds, today, week_start, month_start):
@@ -176,10 +162,8 @@ class DashboardDataAPIView(View):
         cancelled_bookings = Booking.objects.filter(playground__in=playgrounds, status='cancelled').count()
         cancellation_rate = (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
         
-        # Average occupancy rate
-        total_slots = playgrounds.count() * 24 * 30  # Simplified calculation
-        booked_slots = month_bookings
-        occupancy_rate = (booked_slots / total_slots * 100) if total_slots > 0 else 0
+        # Occupancy of the bookable hours this month so far
+        occupancy_rate = occupancy_matrix(playgrounds, month_start, today).rate()
         
         return {
             'month_bookings': month_bookings,
@@ -191,48 +175,26 @@ class DashboardDataAPIView(View):
             'occupancy_rate': round(occupancy_rate, 2)
         }
     
-    def get_playground_performance(self, playgrounds):
+    def get_playground_performance(self, user):
         """Get individual playground performance metrics"""
-        
-        playground_stats = []
-        
-        for playground in playgrounds:
-            # Get bookings for this playground
-            total_bookings = playground.bookings.count()
-            confirmed_bookings = playground.bookings.filter(status='confirmed').count()
-            
-            # Revenue from this playground
-            total_revenue = playground.bookings.filter(
-                payment_status='paid'
-            ).aggregate(total=Sum('final_amount'))['total'] or Decimal('0')
-            
-            # Average rating
-            avg_rating = playground.bookings.filter(
-                user_rating__isnull=False
-            ).aggregate(avg=Avg('user_rating'))['avg'] or 0
-            
-            # Recent booking count (last 7 days)
-            recent_bookings = playground.bookings.filter(
-                booking_date__gte=timezone.now().date() - timedelta(days=7)
-            ).count()
-            
-            playground_stats.append({
-                'id': playground.id,
-                'name': playground.name,
-                'sport_types': [sport.name for sport in playground.sport_types.all()],
-                'status': playground.status,
-                'total_bookings': total_bookings,
-                'confirmed_bookings': confirmed_bookings,
-                'total_revenue': float(total_revenue),
-                'average_rating': round(float(avg_rating), 1) if avg_rating else 0,
-                'recent_bookings': recent_bookings,
-                'price_per_hour': float(playground.price_per_hour),
-                'city': playground.city.name if playground.city else '',
-                'is_featured': playground.is_featured,
-                'created_at': playground.created_at.isoformat()
-            })
-        
-        return playground_stats
+        return [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'sport_types': row['sport_types'],
+                'status': row['status'],
+                'total_bookings': row['bookings_total'],
+                'confirmed_bookings': row['bookings_confirmed'],
+                'total_revenue': row['gross_revenue'],
+                'average_rating': row['user_rating'],
+                'recent_bookings': row['recent_bookings'],
+                'price_per_hour': row['price_per_hour'],
+                'city': row['city'],
+                'is_featured': row['is_featured'],
+                'created_at': row['created_at']
+            }
+            for row in owner_metrics(user)['playgrounds']
+        ]
     
     def get_recent_activities(self, user, playgrounds):
         """Get recent activities and notifications"""
@@ -279,27 +241,10 @@ class DashboardDataAPIView(View):
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get daily revenue data
-        daily_revenue = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date__gte=start_date,
-            booking_date__lte=end_date,
-            payment_status='paid'
-        ).values('booking_date').annotate(
-            revenue=Sum('final_amount')
-        ).order_by('booking_date')
-        
-        # Create a complete date range
-        date_range = []
-        revenue_data = []
-        
-        current_date = start_date
-        revenue_dict = {item['booking_date']: float(item['revenue']) for item in daily_revenue}
+        stats = daily_stats(playgrounds, start_date, end_date)
         
-        while current_date <= end_date:
-            date_range.append(current_date.strftime('%Y-%m-%d'))
-            revenue_data.append(revenue_dict.get(current_date, 0))
-            current_date += timedelta(days=1)
+        date_range = [day.strftime('%Y-%m-%d') for day in stats]
+        revenue_data = [float(row['gross_revenue']) for row in stats.values()]
         
         return {
             'labels': date_range,
@@ -314,26 +259,10 @@ class DashboardDataAPIView(View):
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get daily booking counts
-        daily_bookings = Booking.objects.filter(
-            playground__in=playgrounds,
-            booking_date__gte=start_date,
-            booking_date__lte=end_date
-        ).values('booking_date').annotate(
-            count=Count('id')
-        ).order_by('booking_date')
-        
-        # Create complete date range
-        date_range = []
-        booking_data = []
-        
-        current_date = start_date
-        booking_dict = {item['booking_date']: item['count'] for item in daily_bookings}
+        stats = daily_stats(playgrounds, start_date, end_date)
         
-        while current_date <= end_date:
-            date_range.append(current_date.strftime('%Y-%m-%d'))
-            booking_data.append(booking_dict.get(current_date, 0))
-            current_date += timedelta(days=1)
+        date_range = [day.strftime('%Y-%m-%d') for day in stats]
+        booking_data = [row['bookings_total'] for row in stats.values()]
         
         return {
             'labels': date_range,
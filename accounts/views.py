@@ -23,6 +23,8 @@ from .models import User, UserProfile, PartnerApplication
 # Import additional models for enhanced home page
 from playgrounds.models import Playground, SportType, Country, State, City
 from bookings.models import Booking
+from bookings.occupancy import occupancy_matrix
+from adminpanel.metrics import get_admin_metrics
 
 # Try to import notifications model, handle if it doesn't exist
 try:
@@ -130,6 +132,7 @@ from .models import User, UserProfile, PartnerApplication
 from .forms import CustomUserCreationForm, EmailAuthenticationForm, UserUpdateForm, PartnerApplicationForm
 from playgrounds.models import Playground, City, Country, State
 from bookings.models import Booking
+from bookings.rollups import daily_stats, monthly_stats
 from notifications.models import Notification
 
 
@@ -541,24 +544,8 @@ class OwnerDashboardView(LoginRequiredMixin, TemplateView):
         return context
     
     def calculate_occupancy_rate(self, playgrounds, today):
-        """Calculate average occupancy rate across all playgrounds"""
-        total_slots = 0
-        booked_slots = 0
-        
-        for playground in playgrounds:
-            # Assuming 12 hours operation (8 AM to 8 PM)
-            daily_slots = 12
-            total_slots += daily_slots
-            
-            # Count today's bookings for this playground
-            todays_bookings = playground.bookings.filter(
-                booking_date=today,
-                status__in=['confirmed', 'completed']
-            ).count()
-            
-            booked_slots += todays_bookings
-        
-        return (booked_slots / total_slots * 100) if total_slots > 0 else 0
+        """Calculate occupancy rate across all playgrounds for the day"""
+        return occupancy_matrix(playgrounds, today, today).rate()
     
     def calculate_revenue_growth(self, user, current_month, current_year):
         """Calculate revenue growth compared to last month"""
@@ -598,44 +585,29 @@ class OwnerDashboardView(LoginRequiredMixin, TemplateView):
     
     def get_weekly_booking_data(self, user, week_start, week_end):
         """Get daily booking data for the current week"""
-        daily_data = []
-        current_date = week_start
-        
-        while current_date <= week_end:
-            bookings_count = Booking.objects.filter(
-                playground__owner=user,
-                booking_date=current_date
-            ).count()
-            
-            daily_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'day': current_date.strftime('%a'),
-                'bookings': bookings_count
-            })
-            current_date += timedelta(days=1)
+        days = daily_stats(Playground.objects.filter(owner=user), week_start, week_end)
         
-        return daily_data
+        return [
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'day': day.strftime('%a'),
+                'bookings': row['bookings_total']
+            }
+            for day, row in days.items()
+        ]
     
     def get_monthly_revenue_data(self, user, current_year):
         """Get monthly revenue data for the current year"""
-        monthly_data = []
+        months = monthly_stats(Playground.objects.filter(owner=user), current_year)
         
-        for month in range(1, 13):
-            revenue = Booking.objects.filter(
-                playground__owner=user,
-                created_at__month=month,
-                created_at__year=current_year,
-                status__in=['confirmed', 'completed'],
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            monthly_data.append({
+        return [
+            {
                 'month': month,
                 'month_name': datetime(current_year, month, 1).strftime('%b'),
-                'revenue': float(revenue)
-            })
-        
-        return monthly_data
+                'revenue': float(row['net_revenue'])
+            }
+            for month, row in months.items()
+        ]
 
 
 class AdminDashboardView(LoginRequiredMixin, TemplateView):
@@ -653,18 +625,16 @@ class AdminDashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Platform overview stats
+        metrics = get_admin_metrics()
         context['platform_stats'] = {
-            'total_users': User.objects.filter(user_type='user').count(),
-            'total_owners': User.objects.filter(user_type='owner').count(),
-            'total_playgrounds': Playground.objects.count(),
-            'active_playgrounds': Playground.objects.filter(status='active').count(),
-            'pending_playgrounds': Playground.objects.filter(status='pending').count(),
-            'total_bookings': Booking.objects.count(),
-            'today_bookings': Booking.objects.filter(created_at__date=timezone.now().date()).count(),
-            'total_revenue': Booking.objects.filter(
-                status='completed', 
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0,
+            'total_users': metrics['users']['players'],
+            'total_owners': metrics['users']['owners'],
+            'total_playgrounds': metrics['playgrounds']['total'],
+            'active_playgrounds': metrics['playgrounds']['active'],
+            'pending_playgrounds': metrics['playgrounds']['pending'],
+            'total_bookings': metrics['bookings']['total'],
+            'today_bookings': metrics['bookings']['today'],
+            'total_revenue': metrics['payments']['completed_revenue'],
         }
         
         # Recent activities
@@ -339,6 +339,13 @@ from django.shortcuts import get_object_or_404
 
 from playgrounds.models import Playground
 from bookings.models import Booking
+from bookings.receipts import suspected_duplicates, thumbnail_url as receipt_thumbnail_url
+from bookings.verification import (
+    bulk_decide, queue_item, verification_queue,
+    MAX_BULK as VERIFICATION_MAX_BULK, MAX_PAGE_SIZE as VERIFICATION_MAX_PAGE_SIZE,
+    PAGE_SIZE as VERIFICATION_PAGE_SIZE,
+)
+from .metrics import get_admin_metrics
 
 
 def admin_required(view_func):
@@ -354,73 +361,49 @@ def admin_required(view_func):
 @admin_required
 def admin_stats_api(request):
     """Get comprehensive admin dashboard statistics"""
-    today = timezone.now().date()
-    this_month_start = timezone.now().replace(day=1).date()
-    
-    total_users = User.objects.count()
-    new_users_this_month = User.objects.filter(date_joined__gte=this_month_start).count()
-    total_owners = User.objects.filter(user_type='owner').count()
-    total_customers = User.objects.filter(user_type='customer').count()
-    
-    total_playgrounds = Playground.objects.count()
-    active_playgrounds = Playground.objects.filter(status='active').count()
-    
-    all_bookings = Booking.objects.all()
-    total_bookings = all_bookings.count()
-    today_bookings = all_bookings.filter(created_at__date=today).count()
-    confirmed_bookings = all_bookings.filter(status='confirmed').count()
-    pending_bookings = all_bookings.filter(status='pending').count()
-    
-    paid_bookings = all_bookings.filter(payment_status='paid')
-    pending_payments = all_bookings.filter(
-        payment_receipt__isnull=False,
-        receipt_verified=False
-    ).count()
-    
-    total_revenue = paid_bookings.aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-    this_month_revenue = paid_bookings.filter(
-        created_at__gte=this_month_start
-    ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-    
-    last_month_start = (timezone.now().replace(day=1) - timedelta(days=1)).replace(day=1).date()
-    last_month_revenue = paid_bookings.filter(
-        created_at__gte=last_month_start,
-        created_at__lt=this_month_start
-    ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-    
-    revenue_growth = 0
-    if last_month_revenue > 0:
-        revenue_growth = ((this_month_revenue - last_month_revenue) / last_month_revenue) * 100
-    
-    pending_applications = PartnerApplication.objects.filter(status='pending').count()
+    metrics = get_admin_metrics()
+    users = metrics['users']
+    playgrounds = metrics['playgrounds']
+    bookings = metrics['bookings']
+    payments = metrics['payments']
     
     return JsonResponse({
         'users': {
-            'total': total_users,
-            'new_this_month': new_users_this_month,
-            'owners': total_owners,
-            'customers': total_customers
+            'total': users['total'],
+            'new_this_month': users['new_this_month'],
+            'owners': users['owners'],
+            'customers': users['customers']
         },
         'playgrounds': {
-            'total': total_playgrounds,
-            'active': active_playgrounds,
-            'pending': total_playgrounds - active_playgrounds
+            'total': playgrounds['total'],
+            'active': playgrounds['active'],
+            'pending': playgrounds['total'] - playgrounds['active']
         },
         'bookings': {
-            'total': total_bookings,
-            'today': today_bookings,
-            'confirmed': confirmed_bookings,
-            'pending': pending_bookings
+            'total': bookings['total'],
+            'today': bookings['today'],
+            'confirmed': bookings['confirmed'],
+            'pending': bookings['pending']
         },
         'payments': {
-            'pending_verification': pending_payments,
-            'total_revenue': float(total_revenue),
-            'this_month_revenue': float(this_month_revenue),
-            'revenue_growth': round(revenue_growth, 2)
+            'pending_verification': payments['pending_verification'],
+            'total_revenue': float(payments['total_revenue']),
+            'this_month_revenue': float(payments['this_month_revenue']),
+            'revenue_growth': payments['revenue_growth'],
+            'currency': payments['currency'],
+            'by_currency': {
+                code: {
+                    'bookings': row['bookings'],
+                    'amount': float(row['amount'] or 0),
+                    'converted': float(row['converted']) if row['converted'] is not None else None,
+                }
+                for code, row in payments['by_currency'].items()
+            }
         },
         'applications': {
-            'pending': pending_applications
-        }
+            'pending': metrics['applications']['pending']
+        },
+        'meta': metrics['meta']
     })
 
 
@@ -555,10 +538,11 @@ def admin_verify_payment_api(request):
 @admin_required
 def admin_pending_payments_api(request):
     """Get all pending payment verifications"""
-    pending = Booking.objects.filter(
+    pending = list(Booking.objects.filter(
         payment_receipt__isnull=False,
         receipt_verified=False
-    ).select_related('user', 'playground').order_by('-created_at')
+    ).select_related('user', 'playground', 'receipt_fingerprint').order_by('-created_at'))
+    duplicates = suspected_duplicates(pending)
     
     payments_data = [{
         'id': booking.id,
@@ -567,16 +551,72 @@ def admin_pending_payments_api(request):
         'playground': booking.playground.name,
         'date': booking.booking_date.strftime('%Y-%m-%d'),
         'amount': float(booking.final_amount),
-        'receipt_url': booking.payment_receipt.url if booking.payment_receipt else None
+        'receipt_url': booking.payment_receipt.url if booking.payment_receipt else None,
+        'thumbnail_url': receipt_thumbnail_url(booking),
+        'suspected_duplicate': bool(duplicates[booking.id]),
+        'duplicate_booking_ids': duplicates[booking.id],
     } for booking in pending]
     
     return JsonResponse({
         'payments': payments_data,
         'count': len(payments_data),
+        'suspected_duplicates': sum(1 for p in payments_data if p['suspected_duplicate']),
         'total_amount': sum(p['amount'] for p in payments_data)
     })
 
 
+@login_required
+@admin_required
+@require_http_methods(["GET"])
+def admin_payment_queue_api(request):
+    """Page through receipts awaiting verification, oldest first"""
+    try:
+        limit = min(max(int(request.GET.get('limit', VERIFICATION_PAGE_SIZE)), 1), VERIFICATION_MAX_PAGE_SIZE)
+        bookings, next_cursor = verification_queue(
+            cursor=request.GET.get('cursor'), limit=limit, playground_id=request.GET.get('playground')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    duplicates = suspected_duplicates(bookings)
+    return JsonResponse({
+        'payments': [queue_item(booking, duplicates[booking.id]) for booking in bookings],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@admin_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def admin_bulk_verify_payments_api(request):
+    """Verify or reject many payment receipts at once"""
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    action = data.get('action')
+    booking_ids = data.get('booking_ids')
+    if action not in ('verify', 'reject'):
+        return JsonResponse({'error': 'Invalid action'}, status=400)
+    if not isinstance(booking_ids, list) or not booking_ids or len(booking_ids) > VERIFICATION_MAX_BULK:
+        return JsonResponse({'error': f'booking_ids must be a list of 1 to {VERIFICATION_MAX_BULK} ids'}, status=400)
+    try:
+        booking_ids = [int(booking_id) for booking_id in booking_ids]
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'booking_ids must be integers'}, status=400)
+    
+    updated = bulk_decide(booking_ids, action, request.user, notes=data.get('notes', ''))
+    updated_ids = set(updated)
+    return JsonResponse({
+        'success': True,
+        'updated': updated,
+        'skipped': [booking_id for booking_id in booking_ids if booking_id not in updated_ids],
+        'message': f'{len(updated)} payment(s) {"verified" if action == "verify" else "rejected"}',
+    })
+
+
 @login_required
 @admin_required
 @csrf_exempt
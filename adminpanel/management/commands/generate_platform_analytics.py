@@ -0,0 +1,46 @@
+"""
+Management command to generate PlatformAnalytics rows for a date range
+"""
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from adminpanel.models import PlatformAnalytics
+
+
+class Command(BaseCommand):
+    help = 'Generate (or regenerate) daily platform analytics for a range of dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to generate (YYYY-MM-DD, default: --end)')
+        parser.add_argument('--end', help='Last date to generate (YYYY-MM-DD, default: today)')
+        parser.add_argument('--days', type=int,
+                            help='Generate this many days ending at --end instead of passing --start')
+
+    def _parse_date(self, value, name):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'--{name} must be a date in YYYY-MM-DD format')
+
+    def handle(self, *args, **options):
+        end_date = self._parse_date(options['end'], 'end') or timezone.localdate()
+        start_date = self._parse_date(options['start'], 'start')
+        if options['days'] is not None:
+            if start_date:
+                raise CommandError('Pass either --start or --days, not both')
+            if options['days'] < 1:
+                raise CommandError('--days must be at least 1')
+            start_date = end_date - timedelta(days=options['days'] - 1)
+        start_date = start_date or end_date
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        rows = PlatformAnalytics.generate_range_analytics(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated platform analytics for {len(rows)} days ({start_date} to {end_date})'
+        ))
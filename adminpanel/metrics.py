@@ -0,0 +1,182 @@
+"""
+Platform-wide metrics for the admin dashboards.
+
+Every table is read once: the counts and sums the dashboards show are
+conditional aggregates (``Count(filter=Q(...))`` / ``Sum(filter=...)``) over a
+single scan of ``User``, ``Playground``, ``Booking``, ``PartnerApplication``
+and ``Country``. Revenue is in the reporting currency, converted per booking
+by ``bookings.revenue``, plus one grouped query for the totals per currency. The resulting snapshot is cached for ``FRESH_SECONDS``; after
+that it is still served (up to ``MAX_AGE_SECONDS``) while one background
+thread rebuilds it, so admins never wait on the aggregation unless the cache
+is cold.
+
+Each snapshot carries ``meta`` with the number of queries it took, the build
+time and when it was built.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import PartnerApplication, User
+from bookings.models import Booking
+from bookings.revenue import by_currency, converted_sum
+from playgrounds.exchange_rates import reporting_currency
+from playgrounds.models import Country, Playground
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'adminpanel:metrics'
+LOCK_KEY = 'adminpanel:metrics:refreshing'
+
+FRESH_SECONDS = 60
+MAX_AGE_SECONDS = 600
+LOCK_SECONDS = 30
+
+
+def _user_metrics(month_start):
+    return User.objects.aggregate(
+        total=Count('id'),
+        new_this_month=Count('id', filter=Q(date_joined__gte=month_start)),
+        owners=Count('id', filter=Q(user_type='owner')),
+        customers=Count('id', filter=Q(user_type='customer')),
+        players=Count('id', filter=Q(user_type='user')),
+    )
+
+
+def _playground_metrics(now):
+    return Playground.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+        pending=Count('id', filter=Q(status='pending')),
+        new_week=Count('id', filter=Q(created_at__gte=now - timedelta(days=7))),
+        new_month=Count('id', filter=Q(created_at__gte=now - timedelta(days=30))),
+    )
+
+
+def _booking_metrics(today, month_start, last_month_start):
+    paid = Q(payment_status='paid')
+    return Booking.objects.aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(created_at__date=today)),
+        confirmed=Count('id', filter=Q(status='confirmed')),
+        pending=Count('id', filter=Q(status='pending')),
+        pending_verification=Count('id', filter=Q(payment_receipt__isnull=False, receipt_verified=False)),
+        total_revenue=converted_sum(filter=paid),
+        completed_revenue=converted_sum(filter=paid & Q(status='completed')),
+        this_month_revenue=converted_sum(filter=paid & Q(created_at__gte=month_start)),
+        last_month_revenue=converted_sum(filter=paid & Q(
+            created_at__gte=last_month_start, created_at__lt=month_start
+        )),
+    )
+
+
+def _revenue_by_currency():
+    return {
+        code: {'bookings': row['bookings'], 'amount': row['amount'], 'converted': row['converted']}
+        for code, row in by_currency(Booking.objects.filter(payment_status='paid')).items()
+    }
+
+
+def build_admin_metrics():
+    """Aggregate the platform metrics from the database (one query per table)"""
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    now = timezone.localtime()
+    today = now.date()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+
+    with connection.execute_wrapper(count_queries):
+        users = _user_metrics(month_start)
+        playgrounds = _playground_metrics(now)
+        bookings = _booking_metrics(today, month_start, last_month_start)
+        revenue_by_currency = _revenue_by_currency()
+        applications = PartnerApplication.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+        )
+        countries = Country.objects.aggregate(active=Count('id', filter=Q(is_active=True)))
+
+    last_month_revenue = bookings['last_month_revenue']
+    revenue_growth = 0
+    if last_month_revenue > 0:
+        revenue_growth = float((bookings['this_month_revenue'] - last_month_revenue) / last_month_revenue * 100)
+
+    return {
+        'users': users,
+        'playgrounds': playgrounds,
+        'bookings': {
+            key: bookings[key] for key in ('total', 'today', 'confirmed', 'pending')
+        },
+        'payments': {
+            'pending_verification': bookings['pending_verification'],
+            'total_revenue': bookings['total_revenue'],
+            'completed_revenue': bookings['completed_revenue'],
+            'this_month_revenue': bookings['this_month_revenue'],
+            'last_month_revenue': last_month_revenue,
+            'revenue_growth': round(revenue_growth, 2),
+            'currency': reporting_currency(),
+            'by_currency': revenue_by_currency,
+        },
+        'applications': applications,
+        'countries': countries,
+        'meta': {
+            'built_at': now.isoformat(),
+            'build_ms': round((time.perf_counter() - started) * 1000, 2),
+            'query_count': len(queries),
+        },
+    }
+
+
+def refresh_admin_metrics():
+    """Rebuild the snapshot and store it in the cache"""
+    metrics = build_admin_metrics()
+    cache.set(CACHE_KEY, (time.time(), metrics), MAX_AGE_SECONDS)
+    return metrics
+
+
+def _refresh_in_background():
+    # cache.add is atomic, so only one worker rebuilds a stale snapshot
+    if not cache.add(LOCK_KEY, True, LOCK_SECONDS):
+        return
+
+    def run():
+        try:
+            refresh_admin_metrics()
+        except Exception:
+            logger.exception("Admin metrics refresh failed")
+        finally:
+            cache.delete(LOCK_KEY)
+            connection.close()
+
+    threading.Thread(target=run, name='admin-metrics-refresh', daemon=True).start()
+
+
+def get_admin_metrics():
+    """
+    Return the cached metrics snapshot.
+
+    A missing snapshot is built inline; one older than ``FRESH_SECONDS`` is
+    returned as is and rebuilt in the background.
+    """
+    cached = cache.get(CACHE_KEY)
+    if cached is None:
+        return refresh_admin_metrics()
+
+    stored_at, metrics = cached
+    if time.time() - stored_at > FRESH_SECONDS:
+        _refresh_in_background()
+    return metrics
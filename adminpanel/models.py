@@ -1,9 +1,14 @@
-from django.db import models
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.utils import timezone
 from django.db.models import Q, Count, Sum, Avg
+from django.db.models.functions import TruncDate
 from accounts.models import User
 from playgrounds.models import Playground, City, State, Country
 from bookings.models import Booking
+from bookings.revenue import in_currency
 from earnings.models import OwnerEarnings
 
 
@@ -105,58 +110,126 @@ class PlatformAnalytics(models.Model):
     def __str__(self):
         return f"Analytics for {self.date}"
     
+    METRIC_FIELDS = (
+        'total_users', 'new_users', 'active_users', 'total_owners', 'new_owners',
+        'total_playgrounds', 'new_playgrounds', 'active_playgrounds',
+        'total_bookings', 'new_bookings', 'confirmed_bookings', 'cancelled_bookings',
+        'completed_bookings', 'total_revenue', 'platform_revenue', 'owner_revenue',
+        'average_booking_value', 'average_rating',
+    )
+    PLATFORM_FEE = Decimal('0.10')
+    
     @classmethod
     def generate_daily_analytics(cls, date=None):
         """Generate analytics data for a specific date"""
         if date is None:
             date = timezone.now().date()
+        return cls.generate_range_analytics(date, date)[0]
+    
+    @classmethod
+    def generate_range_analytics(cls, start_date, end_date, batch_size=500):
+        """
+        Generate analytics for every day in [start_date, end_date].
         
-        # Get or create analytics record
-        analytics, created = cls.objects.get_or_create(date=date)
-        
-        # Calculate user metrics
-        analytics.total_users = User.objects.count()
-        analytics.new_users = User.objects.filter(date_joined__date=date).count()
-        analytics.active_users = User.objects.filter(last_login__date=date).count()
-        analytics.total_owners = User.objects.filter(user_type='owner').count()
-        analytics.new_owners = User.objects.filter(user_type='owner', date_joined__date=date).count()
+        Each metric family is one query grouped by day for the whole range, so
+        the cost does not grow with the number of days. Running totals are
+        as of the end of each day; booking counts and revenue cover bookings
+        created that day. Active playgrounds and the average rating have no
+        history and reflect the current state. Revenue is in the reporting
+        currency, each booking converted at its snapshot rate (``bookings.revenue``).
+        Returns the rows in date order.
+        """
+        days = []
+        current = start_date
+        while current <= end_date:
+            days.append(current)
+            current += timedelta(days=1)
         
-        # Calculate playground metrics
-        analytics.total_playgrounds = Playground.objects.count()
-        analytics.new_playgrounds = Playground.objects.filter(created_at__date=date).count()
-        analytics.active_playgrounds = Playground.objects.filter(status='active').count()
+        def by_day(queryset, field, **aggregates):
+            rows = queryset.filter(**{f"{field}__date__gte": start_date, f"{field}__date__lte": end_date}) \
+                .annotate(day=TruncDate(field)).values('day').annotate(**aggregates).order_by()
+            return {row.pop('day'): row for row in rows}
         
-        # Calculate booking metrics
-        bookings_on_date = Booking.objects.filter(created_at__date=date)
-        analytics.total_bookings = Booking.objects.count()
-        analytics.new_bookings = bookings_on_date.count()
-        analytics.confirmed_bookings = bookings_on_date.filter(status='confirmed').count()
-        analytics.cancelled_bookings = bookings_on_date.filter(status='cancelled').count()
-        analytics.completed_bookings = bookings_on_date.filter(status='completed').count()
+        # User metrics
+        users_before = User.objects.filter(date_joined__date__lt=start_date).aggregate(
+            users=Count('id'), owners=Count('id', filter=Q(user_type='owner'))
+        )
+        joined = by_day(User.objects.all(), 'date_joined',
+                        users=Count('id'), owners=Count('id', filter=Q(user_type='owner')))
+        logins = by_day(User.objects.all(), 'last_login', users=Count('id'))
         
-        # Calculate revenue metrics
-        completed_bookings = Booking.objects.filter(
-            status='completed',
-            payment_status='paid'
+        # Playground metrics
+        playgrounds_before = Playground.objects.filter(created_at__date__lt=start_date).aggregate(
+            playgrounds=Count('id'), active=Count('id', filter=Q(status='active'))
         )
+        created = by_day(Playground.objects.all(), 'created_at',
+                         playgrounds=Count('id'), active=Count('id', filter=Q(status='active')))
+        average_rating = Playground.objects.aggregate(Avg('rating'))['rating__avg'] or 0
         
-        total_revenue = completed_bookings.aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-        analytics.total_revenue = total_revenue
-        analytics.platform_revenue = total_revenue * 0.1  # 10% platform fee
-        analytics.owner_revenue = total_revenue * 0.9
+        # Booking and revenue metrics
+        revenue = Q(status='completed', payment_status='paid')
+        bookings_before = Booking.objects.filter(created_at__date__lt=start_date).count()
+        booked = by_day(
+            Booking.objects.all(), 'created_at',
+            bookings=Count('id'),
+            confirmed=Count('id', filter=Q(status='confirmed')),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            completed=Count('id', filter=Q(status='completed')),
+            revenue=Sum(in_currency(), filter=revenue),
+            average=Avg(in_currency(), filter=revenue),
+        )
         
-        # Calculate performance metrics
-        if completed_bookings.exists():
-            analytics.average_booking_value = completed_bookings.aggregate(
-                Avg('final_amount')
-            )['final_amount__avg'] or 0
+        existing = {row.date: row for row in cls.objects.filter(date__gte=start_date, date__lte=end_date)}
+        total_users = users_before['users']
+        total_owners = users_before['owners']
+        total_playgrounds = playgrounds_before['playgrounds']
+        active_playgrounds = playgrounds_before['active']
+        total_bookings = bookings_before
         
-        # Average rating across all playgrounds
-        avg_rating = Playground.objects.aggregate(Avg('rating'))['rating__avg']
-        analytics.average_rating = avg_rating or 0
+        results, to_create, to_update = [], [], []
+        for day in days:
+            joined_day = joined.get(day, {})
+            created_day = created.get(day, {})
+            booked_day = booked.get(day, {})
+            
+            total_users += joined_day.get('users', 0)
+            total_owners += joined_day.get('owners', 0)
+            total_playgrounds += created_day.get('playgrounds', 0)
+            active_playgrounds += created_day.get('active', 0)
+            total_bookings += booked_day.get('bookings', 0)
+            day_revenue = booked_day.get('revenue') or Decimal('0')
+            
+            analytics = existing.get(day)
+            if analytics is None:
+                analytics = cls(date=day)
+                to_create.append(analytics)
+            else:
+                to_update.append(analytics)
+            
+            analytics.total_users = total_users
+            analytics.new_users = joined_day.get('users', 0)
+            analytics.active_users = logins.get(day, {}).get('users', 0)
+            analytics.total_owners = total_owners
+            analytics.new_owners = joined_day.get('owners', 0)
+            analytics.total_playgrounds = total_playgrounds
+            analytics.new_playgrounds = created_day.get('playgrounds', 0)
+            analytics.active_playgrounds = active_playgrounds
+            analytics.total_bookings = total_bookings
+            analytics.new_bookings = booked_day.get('bookings', 0)
+            analytics.confirmed_bookings = booked_day.get('confirmed', 0)
+            analytics.cancelled_bookings = booked_day.get('cancelled', 0)
+            analytics.completed_bookings = booked_day.get('completed', 0)
+            analytics.total_revenue = day_revenue
+            analytics.platform_revenue = day_revenue * cls.PLATFORM_FEE
+            analytics.owner_revenue = day_revenue - analytics.platform_revenue
+            analytics.average_booking_value = booked_day.get('average') or 0
+            analytics.average_rating = average_rating
+            results.append(analytics)
         
-        analytics.save()
-        return analytics
+        with transaction.atomic():
+            cls.objects.bulk_create(to_create, batch_size=batch_size)
+            cls.objects.bulk_update(to_update, cls.METRIC_FIELDS, batch_size=batch_size)
+        return results
 
 
 class AdminActivity(models.Model):
@@ -0,0 +1,23 @@
+"""
+Scheduled admin panel tasks (see CELERY_BEAT_SCHEDULE in settings)
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from .models import PlatformAnalytics
+
+
+@shared_task
+def generate_platform_analytics(days=2):
+    """
+    Regenerate the analytics rows for the last ``days`` days, today included.
+
+    Yesterday is recomputed as well so bookings that changed after the last run
+    of the previous day are reflected.
+    """
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
+    return len(PlatformAnalytics.generate_range_analytics(start_date, end_date))
@@ -16,6 +16,8 @@ urlpatterns = [
     path('api/playgrounds/', api_views.admin_playgrounds_list_api, name='admin_playgrounds'),
     path('api/payments/pending/', api_views.admin_pending_payments_api, name='admin_pending_payments'),
     path('api/payments/verify/', api_views.admin_verify_payment_api, name='admin_verify_payment'),
+    path('api/payments/queue/', api_views.admin_payment_queue_api, name='admin_payment_queue'),
+    path('api/payments/bulk-verify/', api_views.admin_bulk_verify_payments_api, name='admin_bulk_verify_payments'),
     path('api/users/manage/', api_views.admin_manage_user_api, name='admin_manage_user'),
     path('api/playgrounds/manage/', api_views.admin_manage_playground_api, name='admin_manage_playground'),
     path('api/partner-applications/', api_views.PartnerApplicationAPIView.as_view(), name='partner_applications_api'),
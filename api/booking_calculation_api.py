@@ -3,14 +3,18 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 import json
+from datetime import date
 from decimal import Decimal
-from playgrounds.models import Playground, Amenity
+from bookings.pricing import parse_time, rules_for
+from playgrounds.models import Playground
+from playgrounds.snapshot import get_playground_snapshot
 
 @method_decorator(csrf_exempt, name='dispatch')
 class BookingCalculationAPI(View):
     """
     Dynamic booking calculation API
-    Calculates subtotal, amenity fees, and total based on real-time selections
+    Calculates subtotal, amenity fees, and total based on real-time selections,
+    using the playground's pricing rules
     """
     
     def post(self, request):
@@ -27,9 +31,13 @@ class BookingCalculationAPI(View):
             
             # Get playground
             try:
-                playground = Playground.objects.get(id=playground_id)
-            except Playground.DoesNotExist:
+                rules = rules_for(playground_id)
+            except (Playground.DoesNotExist, TypeError, ValueError):
                 return JsonResponse({'error': 'Playground not found'}, status=404)
+            try:
+                booking_date = date.fromisoformat(data['date']) if data.get('date') else date.today()
+            except (TypeError, ValueError):
+                return JsonResponse({'error': 'Invalid date'}, status=400)
             
             # Initialize calculations
             subtotal = Decimal('0.00')
@@ -38,32 +46,39 @@ class BookingCalculationAPI(View):
             
             # Calculate subtotal based on slot type
             if slot_type == 'regular':
-                # Regular slots calculation
+                # Regular slots are priced by the pricing engine; slots sent without times at the base rate
+                timed = [
+                    (parse_time(slot['start_time']), parse_time(slot['end_time']))
+                    for slot in selected_slots
+                    if isinstance(slot, dict) and slot.get('start_time') and slot.get('end_time')
+                ]
                 slot_count = len(selected_slots)
-                slot_price = Decimal(str(playground.price_per_hour))
-                subtotal = slot_price * slot_count
+                subtotal = sum(rules.price_slots(booking_date, timed), Decimal('0.00'))
+                subtotal += rules.base_rate * (slot_count - len(timed))
                 
                 breakdown['slot_type'] = 'Regular'
                 breakdown['slot_count'] = slot_count
-                breakdown['price_per_hour'] = float(slot_price)
+                breakdown['price_per_hour'] = float(rules.base_rate)
                 breakdown['slots_total'] = float(subtotal)
                 
             elif slot_type == 'custom':
                 # Custom slot calculation
                 if custom_slot:
-                    duration = Decimal(str(custom_slot.get('duration', 2)))
-                    slot_price = Decimal(str(playground.price_per_hour))
-                    subtotal = slot_price * duration
+                    subtotal = rules.custom_slot(custom_slot.get('id'))
+                    if subtotal is None:
+                        return JsonResponse({'error': 'Custom slot not found'}, status=400)
                     
                     breakdown['slot_type'] = 'Custom'
-                    breakdown['duration'] = float(duration)
-                    breakdown['price_per_hour'] = float(slot_price)
+                    breakdown['duration'] = float(Decimal(str(custom_slot.get('duration', 2))))
+                    breakdown['price_per_hour'] = float(rules.base_rate)
                     breakdown['slots_total'] = float(subtotal)
                 
             elif slot_type == 'membership':
                 # Membership pass calculation
                 if membership_pass:
-                    subtotal = Decimal(str(membership_pass.get('price', 0)))
+                    subtotal = rules.pass_price(membership_pass.get('id'))
+                    if subtotal is None:
+                        return JsonResponse({'error': 'Membership pass not found'}, status=400)
                     
                     breakdown['slot_type'] = 'Membership'
                     breakdown['membership_name'] = membership_pass.get('name', '')
@@ -71,24 +86,13 @@ class BookingCalculationAPI(View):
             
             # Calculate amenity fees
             if selected_amenities:
-                amenity_ids = [amenity.get('id') for amenity in selected_amenities if amenity.get('id')]
-                amenity_breakdown = []
-                
-                for amenity_data in selected_amenities:
-                    amenity_id = amenity_data.get('id')
-                    if amenity_id:
-                        try:
-                            amenity = Amenity.objects.get(id=amenity_id)
-                            amenity_price = Decimal(str(amenity.price))
-                            amenity_fees += amenity_price
-                            
-                            amenity_breakdown.append({
-                                'id': amenity.id,
-                                'name': amenity.name,
-                                'price': float(amenity_price)
-                            })
-                        except Amenity.DoesNotExist:
-                            continue
+                amenity_breakdown = [
+                    {'id': amenity_id, 'name': name, 'price': float(price)}
+                    for amenity_id, name, price in rules.amenity_lines(
+                        amenity.get('id') for amenity in selected_amenities if amenity.get('id')
+                    )
+                ]
+                amenity_fees = sum((Decimal(str(line['price'])) for line in amenity_breakdown), Decimal('0.00'))
                 
                 breakdown['amenities'] = amenity_breakdown
                 breakdown['amenity_fees'] = float(amenity_fees)
@@ -100,16 +104,16 @@ class BookingCalculationAPI(View):
             response_data = {
                 'success': True,
                 'playground': {
-                    'id': playground.id,
-                    'name': playground.name,
-                    'currency': playground.currency,
-                    'price_per_hour': float(playground.price_per_hour)
+                    'id': rules.playground_id,
+                    'name': get_playground_snapshot(rules.playground_id).name,
+                    'currency': rules.currency,
+                    'price_per_hour': float(rules.base_rate)
                 },
                 'calculation': {
                     'subtotal': float(subtotal),
                     'amenity_fees': float(amenity_fees),
                     'total': float(total),
-                    'currency': playground.currency
+                    'currency': rules.currency
                 },
                 'breakdown': breakdown
             }
@@ -13,6 +13,10 @@ import requests
 from datetime import timedelta
 import logging
 
+from playgrounds.currency import CURRENCIES, get_currency, format_price, currency_for_country
+from playgrounds.models import Playground
+from bookings.projection import SlotGrid, DEFAULT_OCCUPANCY, MIN_PRICE_MULTIPLIER, parse_scenario_values, project
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,39 +25,6 @@ class DynamicCurrencyAPI(View):
     Comprehensive Currency API providing real-time exchange rates and currency data
     """
     
-    # Comprehensive currency database with country mappings
-    CURRENCY_DATABASE = {
-        'USD': {'symbol': '$', 'name': 'US Dollar', 'flag': '🇺🇸', 'decimal_places': 2, 'countries': ['US']},
-        'EUR': {'symbol': '€', 'name': 'Euro', 'flag': '🇪🇺', 'decimal_places': 2, 'countries': ['DE', 'FR', 'IT', 'ES', 'NL', 'BE', 'AT', 'PT', 'IE', 'FI', 'EE', 'LV', 'LT', 'LU', 'SK', 'SI', 'MT', 'CY', 'GR']},
-        'GBP': {'symbol': '£', 'name': 'British Pound', 'flag': '🇬🇧', 'decimal_places': 2, 'countries': ['GB']},
-        'CAD': {'symbol': 'C$', 'name': 'Canadian Dollar', 'flag': '🇨🇦', 'decimal_places': 2, 'countries': ['CA']},
-        'AUD': {'symbol': 'A$', 'name': 'Australian Dollar', 'flag': '🇦🇺', 'decimal_places': 2, 'countries': ['AU']},
-        'JPY': {'symbol': '¥', 'name': 'Japanese Yen', 'flag': '🇯🇵', 'decimal_places': 0, 'countries': ['JP']},
-        'INR': {'symbol': '₹', 'name': 'Indian Rupee', 'flag': '🇮🇳', 'decimal_places': 2, 'countries': ['IN']},
-        'BDT': {'symbol': '৳', 'name': 'Bangladeshi Taka', 'flag': '🇧🇩', 'decimal_places': 2, 'countries': ['BD']},
-        'CNY': {'symbol': '¥', 'name': 'Chinese Yuan', 'flag': '🇨🇳', 'decimal_places': 2, 'countries': ['CN']},
-        'CHF': {'symbol': 'Fr', 'name': 'Swiss Franc', 'flag': '🇨🇭', 'decimal_places': 2, 'countries': ['CH']},
-        'SEK': {'symbol': 'kr', 'name': 'Swedish Krona', 'flag': '🇸🇪', 'decimal_places': 2, 'countries': ['SE']},
-        'NOK': {'symbol': 'kr', 'name': 'Norwegian Krone', 'flag': '🇳🇴', 'decimal_places': 2, 'countries': ['NO']},
-        'SGD': {'symbol': 'S$', 'name': 'Singapore Dollar', 'flag': '🇸🇬', 'decimal_places': 2, 'countries': ['SG']},
-        'HKD': {'symbol': 'HK$', 'name': 'Hong Kong Dollar', 'flag': '🇭🇰', 'decimal_places': 2, 'countries': ['HK']},
-        'AED': {'symbol': 'د.إ', 'name': 'UAE Dirham', 'flag': '🇦🇪', 'decimal_places': 2, 'countries': ['AE']},
-        'SAR': {'symbol': '﷼', 'name': 'Saudi Riyal', 'flag': '🇸🇦', 'decimal_places': 2, 'countries': ['SA']},
-        'THB': {'symbol': '฿', 'name': 'Thai Baht', 'flag': '🇹🇭', 'decimal_places': 2, 'countries': ['TH']},
-        'MYR': {'symbol': 'RM', 'name': 'Malaysian Ringgit', 'flag': '🇲🇾', 'decimal_places': 2, 'countries': ['MY']},
-        'KRW': {'symbol': '₩', 'name': 'South Korean Won', 'flag': '🇰🇷', 'decimal_places': 0, 'countries': ['KR']},
-        'ZAR': {'symbol': 'R', 'name': 'South African Rand', 'flag': '🇿🇦', 'decimal_places': 2, 'countries': ['ZA']},
-        'BRL': {'symbol': 'R$', 'name': 'Brazilian Real', 'flag': '🇧🇷', 'decimal_places': 2, 'countries': ['BR']},
-        'MXN': {'symbol': '$', 'name': 'Mexican Peso', 'flag': '🇲🇽', 'decimal_places': 2, 'countries': ['MX']},
-        'RUB': {'symbol': '₽', 'name': 'Russian Ruble', 'flag': '🇷🇺', 'decimal_places': 2, 'countries': ['RU']},
-        'TRY': {'symbol': '₺', 'name': 'Turkish Lira', 'flag': '🇹🇷', 'decimal_places': 2, 'countries': ['TR']},
-        'EGP': {'symbol': '£', 'name': 'Egyptian Pound', 'flag': '🇪🇬', 'decimal_places': 2, 'countries': ['EG']},
-        'PKR': {'symbol': '₨', 'name': 'Pakistani Rupee', 'flag': '🇵🇰', 'decimal_places': 2, 'countries': ['PK']},
-        'IDR': {'symbol': 'Rp', 'name': 'Indonesian Rupiah', 'flag': '🇮🇩', 'decimal_places': 0, 'countries': ['ID']},
-        'PHP': {'symbol': '₱', 'name': 'Philippine Peso', 'flag': '🇵🇭', 'decimal_places': 2, 'countries': ['PH']},
-        'VND': {'symbol': '₫', 'name': 'Vietnamese Dong', 'flag': '🇻🇳', 'decimal_places': 0, 'countries': ['VN']},
-    }
-    
     def get(self, request):
         """Handle GET requests with different actions"""
         try:
@@ -94,13 +65,14 @@ class DynamicCurrencyAPI(View):
             country = Country.objects.get(id=country_id)
             currency_code = country.get_currency()
             
-            # Get symbol from our database
-            currency_info = self.CURRENCY_DATABASE.get(currency_code, {
+            # Get symbol from the currency registry
+            currency = CURRENCIES.get(currency_code)
+            currency_info = currency.as_dict() if currency else {
                 'symbol': currency_code + ' ',
                 'name': currency_code,
                 'flag': '🌍',
                 'decimal_places': 2
-            })
+            }
             
             return JsonResponse({
                 'success': True,
@@ -124,14 +96,10 @@ class DynamicCurrencyAPI(View):
     def _get_currency_list(self):
         """Get complete list of supported currencies"""
         currencies = []
-        for code, data in self.CURRENCY_DATABASE.items():
+        for currency in CURRENCIES.values():
             currencies.append({
-                'code': code,
-                'symbol': data['symbol'],
-                'name': data['name'],
-                'flag': data['flag'],
-                'decimal_places': data['decimal_places'],
-                'display_name': f"{data['flag']} {code} - {data['name']}"
+                **currency.as_dict(),
+                'display_name': f"{currency.flag} {currency.code} - {currency.name}"
             })
         
         # Sort by name for better UX
@@ -155,28 +123,8 @@ class DynamicCurrencyAPI(View):
                 'error': 'Country code is required'
             }, status=400)
         
-        # Find currency by country code
-        detected_currency = None
-        for code, data in self.CURRENCY_DATABASE.items():
-            if country_code in data['countries']:
-                detected_currency = {
-                    'code': code,
-                    'symbol': data['symbol'],
-                    'name': data['name'],
-                    'flag': data['flag'],
-                    'decimal_places': data['decimal_places']
-                }
-                break
-        
-        if not detected_currency:
-            # Default to USD if country not found
-            detected_currency = {
-                'code': 'USD',
-                'symbol': '$',
-                'name': 'US Dollar',
-                'flag': '🇺🇸',
-                'decimal_places': 2
-            }
+        # Find currency by country code, defaulting to USD if country not found
+        detected_currency = get_currency(currency_for_country(country_code)).as_dict()
         
         return JsonResponse({
             'success': True,
@@ -292,22 +240,23 @@ class DynamicCurrencyAPI(View):
                 rate = rates.get(to_currency, 1)
                 converted_amount = amount * rate
             
-            # Get currency symbols
-            from_data = self.CURRENCY_DATABASE.get(from_currency, {'symbol': from_currency})
-            to_data = self.CURRENCY_DATABASE.get(to_currency, {'symbol': to_currency})
+            # Get currency metadata
+            from_data = CURRENCIES.get(from_currency)
+            to_data = CURRENCIES.get(to_currency)
+            to_decimal_places = to_data.decimal_places if to_data else 2
             
             return JsonResponse({
                 'success': True,
                 'conversion': {
                     'original_amount': amount,
-                    'converted_amount': round(converted_amount, to_data.get('decimal_places', 2)),
+                    'converted_amount': round(converted_amount, to_decimal_places),
                     'from_currency': from_currency,
                     'to_currency': to_currency,
-                    'from_symbol': from_data['symbol'],
-                    'to_symbol': to_data['symbol'],
+                    'from_symbol': from_data.symbol if from_data else from_currency,
+                    'to_symbol': to_data.symbol if to_data else to_currency,
                     'exchange_rate': round(rate, 6),
-                    'formatted_original': f"{from_data['symbol']}{amount:,.{from_data.get('decimal_places', 2)}f}",
-                    'formatted_converted': f"{to_data['symbol']}{converted_amount:,.{to_data.get('decimal_places', 2)}f}"
+                    'formatted_original': format_price(amount, from_currency),
+                    'formatted_converted': format_price(converted_amount, to_currency)
                 }
             })
             
@@ -322,54 +271,77 @@ class DynamicCurrencyAPI(View):
         try:
             hourly_rate = float(request.GET.get('amount', 25.00))
             currency = request.GET.get('currency', 'USD')
+            daily_hours = float(request.GET.get('daily_hours', 8))  # Average daily operating hours
+            occupancy_rate = float(request.GET.get('occupancy', DEFAULT_OCCUPANCY))
+            price_multipliers = parse_scenario_values(
+                request.GET.get('price_multipliers'), [1.0], minimum=MIN_PRICE_MULTIPLIER
+            )
+            occupancy_rates = parse_scenario_values(request.GET.get('occupancy_rates'), [occupancy_rate])
             
             # Get currency data
-            currency_data = self.CURRENCY_DATABASE.get(currency, {
-                'symbol': '$', 'name': 'US Dollar', 'flag': '🇺🇸', 'decimal_places': 2
-            })
+            currency_data = get_currency(currency)
             
-            # Revenue calculation parameters
-            daily_hours = 8  # Average daily operating hours
-            monthly_days = 25  # Average bookable days per month
-            occupancy_rate = 0.6  # 60% occupancy rate
+            # Use the playground's real slot grid when one is given
+            grid = None
+            playground_id = request.GET.get('playground_id')
+            if playground_id:
+                playground = Playground.objects.filter(id=playground_id).first()
+                if playground is not None:
+                    grid = SlotGrid.for_playground(playground)
+                    if grid.weekly_hours:
+                        hourly_rate = grid.weekly_capacity_value / grid.weekly_hours
+                        daily_hours = grid.weekly_hours / 7
+                    else:
+                        grid = None
+            if grid is None:
+                grid = SlotGrid.uniform(hourly_rate, daily_hours)
             
-            # Calculate projections
-            daily_revenue = hourly_rate * daily_hours * occupancy_rate
-            monthly_revenue = daily_revenue * monthly_days
-            yearly_revenue = monthly_revenue * 12
+            # Occupancy is passed as the factor on a fully booked grid
+            monthly_revenue = project(grid, 1.0, occupancy_factors=[occupancy_rate], horizon_days=30)[0]['revenue']
+            yearly_revenue = project(grid, 1.0, occupancy_factors=[occupancy_rate], horizon_days=365)[0]['revenue']
+            daily_revenue = monthly_revenue / 30
+            scenarios = project(
+                grid, 1.0, price_multipliers=price_multipliers,
+                occupancy_factors=occupancy_rates, horizon_days=30
+            )
             
-            decimal_places = currency_data.get('decimal_places', 2)
+            decimal_places = currency_data.decimal_places
             
             return JsonResponse({
                 'success': True,
                 'currency': {
+                    **currency_data.as_dict(),
                     'code': currency,
-                    'symbol': currency_data['symbol'],
-                    'name': currency_data['name'],
-                    'flag': currency_data['flag'],
-                    'decimal_places': decimal_places
                 },
                 'pricing': {
                     'hourly_rate': hourly_rate,
-                    'formatted_hourly': f"{currency_data['symbol']}{hourly_rate:,.{decimal_places}f}"
+                    'formatted_hourly': currency_data.format(hourly_rate)
                 },
                 'revenue_projection': {
                     'daily': {
                         'amount': round(daily_revenue, decimal_places),
-                        'formatted': f"{currency_data['symbol']}{daily_revenue:,.{decimal_places}f}"
+                        'formatted': currency_data.format(daily_revenue)
                     },
                     'monthly': {
                         'amount': round(monthly_revenue, decimal_places),
-                        'formatted': f"{currency_data['symbol']}{monthly_revenue:,.{decimal_places}f}"
+                        'formatted': currency_data.format(monthly_revenue)
                     },
                     'yearly': {
                         'amount': round(yearly_revenue, decimal_places),
-                        'formatted': f"{currency_data['symbol']}{yearly_revenue:,.{decimal_places}f}"
+                        'formatted': currency_data.format(yearly_revenue)
                     },
+                    'scenarios': [
+                        {
+                            'price_multiplier': scenario['price_multiplier'],
+                            'occupancy_rate': scenario['occupancy_factor'],
+                            'monthly': round(scenario['revenue'], decimal_places),
+                            'formatted_monthly': currency_data.format(scenario['revenue'])
+                        }
+                        for scenario in scenarios
+                    ],
                     'assumptions': {
-                        'daily_hours': daily_hours,
-                        'monthly_days': monthly_days,
-                        'occupancy_rate': f"{occupancy_rate * 100}%",
+                        'daily_hours': round(daily_hours, 2),
+                        'occupancy_rate': f"{occupancy_rate * 100:g}%",
                         'currency': currency
                     }
                 },
@@ -377,10 +349,10 @@ class DynamicCurrencyAPI(View):
                 'timestamp': cache.get('currency_timestamp') or 'live'
             })
             
-        except ValueError:
+        except ValueError as e:
             return JsonResponse({
                 'success': False,
-                'error': 'Invalid amount provided'
+                'error': str(e) or 'Invalid amount provided'
             }, status=400)
 
 
@@ -403,46 +375,14 @@ def detect_user_currency(request):
                     if playground.city and playground.city.state and playground.city.state.country:
                         country_name = playground.city.state.country.name.lower()
                         
-                        # Map country names to currency codes
-                        country_currency_map = {
-                            'malaysia': 'MYR',
-                            'singapore': 'SGD', 
-                            'indonesia': 'IDR',
-                            'thailand': 'THB',
-                            'united states': 'USD',
-                            'usa': 'USD',
-                            'united kingdom': 'GBP',
-                            'uk': 'GBP',
-                            'britain': 'GBP',
-                            'england': 'GBP',
-                            'canada': 'CAD',
-                            'australia': 'AUD',
-                            'india': 'INR',
-                            'bangladesh': 'BDT',
-                            'china': 'CNY',
-                            'japan': 'JPY',
-                            'south korea': 'KRW',
-                            'korea': 'KRW',
-                            'pakistan': 'PKR',
-                            'philippines': 'PHP',
-                            'vietnam': 'VND'
-                        }
-                        
-                        currency_code = country_currency_map.get(country_name, 'USD')
-                        
-                        # Get currency data from our database
-                        api = DynamicCurrencyAPI()
-                        currency_data = api.CURRENCY_DATABASE.get(currency_code)
+                        currency_code = currency_for_country(country_name=country_name)
+                        currency_data = get_currency(currency_code)
                         
                         if currency_data:
                             return JsonResponse({
                                 'success': True,
                                 'currency': {
-                                    'code': currency_code,
-                                    'symbol': currency_data['symbol'],
-                                    'name': currency_data['name'],
-                                    'flag': currency_data['flag'],
-                                    'decimal_places': currency_data['decimal_places'],
+                                    **currency_data.as_dict(),
                                     'rate': 1
                                 },
                                 'auto_detected': True,
@@ -471,40 +411,14 @@ def detect_user_currency(request):
                             if playground.city and playground.city.state and playground.city.state.country:
                                 country_name = playground.city.state.country.name.lower()
                                 
-                                country_currency_map = {
-                                    'malaysia': 'MYR',
-                                    'singapore': 'SGD', 
-                                    'indonesia': 'IDR',
-                                    'thailand': 'THB',
-                                    'united states': 'USD',
-                                    'united kingdom': 'GBP',
-                                    'canada': 'CAD',
-                                    'australia': 'AUD',
-                                    'india': 'INR',
-                                    'bangladesh': 'BDT',
-                                    'china': 'CNY',
-                                    'japan': 'JPY',
-                                    'south korea': 'KRW',
-                                    'pakistan': 'PKR',
-                                    'philippines': 'PHP',
-                                    'vietnam': 'VND'
-                                }
-                                
-                                currency_code = country_currency_map.get(country_name, 'USD')
-                                
-                                # Get currency data from our database
-                                api = DynamicCurrencyAPI()
-                                currency_data = api.CURRENCY_DATABASE.get(currency_code)
+                                currency_code = currency_for_country(country_name=country_name)
+                                currency_data = get_currency(currency_code)
                                 
                                 if currency_data:
                                     return JsonResponse({
                                         'success': True,
                                         'currency': {
-                                            'code': currency_code,
-                                            'symbol': currency_data['symbol'],
-                                            'name': currency_data['name'],
-                                            'flag': currency_data['flag'],
-                                            'decimal_places': currency_data['decimal_places'],
+                                            **currency_data.as_dict(),
                                             'rate': 1
                                         },
                                         'auto_detected': True,
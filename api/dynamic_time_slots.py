@@ -5,8 +5,20 @@ import json
 from datetime import datetime, timedelta
 import logging
 
+from bookings.projection import SlotGrid, project
+
 logger = logging.getLogger(__name__)
 
+
+def _potential_revenue(slots, days_count):
+    """Fully booked (average day, week, next 30 days) revenue of generated slots"""
+    grid = SlotGrid.from_generated_slots(slots)
+    weekly_revenue = grid.weekly_capacity_value
+    daily_revenue = weekly_revenue / days_count if days_count else 0
+    monthly_revenue = project(grid, 1.0, horizon_days=30)[0]['revenue']
+    return daily_revenue, weekly_revenue, monthly_revenue
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def generate_dynamic_time_slots(request):
@@ -111,9 +123,7 @@ def generate_dynamic_time_slots(request):
         
         # Calculate summary statistics
         total_slots = len(all_slots)
-        daily_revenue = sum(slot['price'] for slot in all_slots if slot['day_key'] == selected_days[0]) if selected_days else 0
-        weekly_revenue = daily_revenue * len(selected_days)
-        monthly_revenue = weekly_revenue * 4.33  # Average weeks per month
+        daily_revenue, weekly_revenue, monthly_revenue = _potential_revenue(all_slots, len(selected_days))
         
         # Group slots by day for organized display
         slots_by_day = {}
@@ -490,9 +500,7 @@ def generate_daywise_time_slots(request):
         
         # Calculate summary statistics
         total_slots = len(all_slots)
-        daily_avg_revenue = sum(slot['price'] for slot in all_slots) / len(day_wise_hours) if day_wise_hours else 0
-        weekly_revenue = daily_avg_revenue * len(day_wise_hours)
-        monthly_revenue = weekly_revenue * 4.33  # Average weeks per month
+        daily_avg_revenue, weekly_revenue, monthly_revenue = _potential_revenue(all_slots, len(day_wise_hours))
         
         # Group slots by day for organized display
         slots_by_day = {}
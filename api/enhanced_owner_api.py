@@ -19,9 +19,19 @@ import uuid
 from accounts.models import User
 from playgrounds.models import (
     Playground, PlaygroundImage, PlaygroundVideo, TimeSlot, 
-    SportType, City, State, Country, PlaygroundAvailability
+    SportType, City, State, Country, PlaygroundAvailability, PlaygroundAnalytics
 )
 from bookings.models import Booking
+from bookings.rollups import daily_stats, monthly_stats, sum_stats
+from bookings.occupancy import occupancy_matrix
+from bookings.cohorts import owner_cohort_analytics, DEFAULT_MONTHS as DEFAULT_COHORT_MONTHS
+from bookings.projection import (
+    MAX_ELASTICITY, MIN_PRICE_MULTIPLIER, SlotGrid, historical_occupancy, parse_number, parse_scenario_values, project
+)
+from bookings.owner_metrics import owner_metrics
+from bookings.forecasting import stored_forecast, FORECAST_WEEKS
+from bookings.price_advisor import accept_suggestions, suggested_windows, TARGETS as SUGGESTION_TARGETS
+from bookings.refunds import cancel_bookings
 from notifications.models import Notification
 
 
@@ -467,47 +477,36 @@ def analytics_data(request):
         else:
             playgrounds = Playground.objects.filter(owner=request.user)
         
-        # Get bookings in period
-        bookings = Booking.objects.filter(
-            playground__in=playgrounds,
-            created_at__date__gte=start_date
-        )
+        # Daily rollup rows for the period in one range query
+        days = daily_stats(playgrounds, start_date, now.date())
         
         # Revenue analytics
-        revenue_data = []
-        booking_data = []
-        
-        # Generate daily data
-        current_date = start_date
-        while current_date <= now.date():
-            day_bookings = bookings.filter(booking_date=current_date)
-            day_revenue = day_bookings.filter(
-                status__in=['confirmed', 'completed'],
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            revenue_data.append({
-                'date': current_date.isoformat(),
-                'revenue': float(day_revenue),
-                'bookings': day_bookings.count()
-            })
-            
-            current_date += timedelta(days=1)
+        revenue_data = [
+            {
+                'date': day.isoformat(),
+                'revenue': float(row['net_revenue']),
+                'bookings': row['bookings_total']
+            }
+            for day, row in days.items()
+        ]
         
         # Performance metrics
-        total_revenue = bookings.filter(
-            status__in=['confirmed', 'completed'],
-            payment_status='paid'
-        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
+        totals = sum_stats(days.values())
+        total_revenue = totals['net_revenue']
+        total_bookings = totals['bookings_total']
         
-        avg_booking_value = bookings.filter(
-            status__in=['confirmed', 'completed']
-        ).aggregate(Avg('final_amount'))['final_amount__avg'] or 0
+        kept_bookings = totals['bookings_confirmed'] + totals['bookings_completed']
+        avg_booking_value = totals['booked_value'] / kept_bookings if kept_bookings else 0
         
         completion_rate = 0
-        if bookings.count() > 0:
-            completed = bookings.filter(status='completed').count()
-            completion_rate = (completed / bookings.count()) * 100
+        if total_bookings > 0:
+            completion_rate = (totals['bookings_completed'] / total_bookings) * 100
+        
+        bookings = Booking.objects.filter(
+            playground__in=playgrounds,
+            booking_date__gte=start_date,
+            booking_date__lte=now.date()
+        )
         
         # Popular time slots
         popular_slots = bookings.values(
@@ -516,20 +515,42 @@ def analytics_data(request):
             booking_count=Count('id')
         ).order_by('-booking_count')[:5]
         
+        # Precomputed by the refresh_playground_analytics job
+        views = stored_bookings = repeat_weighted = 0
+        hours_by_weekday = [[0] * 24 for _ in range(7)]
+        popular_days = {}
+        for row in PlaygroundAnalytics.objects.filter(playground__in=playgrounds).values(
+            'total_views', 'total_bookings', 'repeat_customer_rate', 'peak_hours', 'popular_days'
+        ):
+            views += row['total_views']
+            stored_bookings += row['total_bookings']
+            repeat_weighted += float(row['repeat_customer_rate']) * row['total_bookings']
+            for day, hours in enumerate((row['peak_hours'] or {}).get('by_weekday_hour', [])):
+                hours_by_weekday[day] = [a + b for a, b in zip(hours_by_weekday[day], hours)]
+            for day, hours in (row['popular_days'] or {}).items():
+                popular_days[day] = popular_days.get(day, 0) + hours
+        conversion_rate = (stored_bookings / views * 100) if views else 0
+        repeat_customer_rate = repeat_weighted / stored_bookings if stored_bookings else 0
+        customer_satisfaction = playgrounds.filter(review_count__gt=0).aggregate(
+            rating=Avg('rating')
+        )['rating'] or 0
+        
         return JsonResponse({
             'success': True,
             'analytics': {
                 'period': period,
                 'total_revenue': float(total_revenue),
-                'total_bookings': bookings.count(),
+                'total_bookings': total_bookings,
                 'avg_booking_value': float(avg_booking_value),
                 'completion_rate': round(completion_rate, 2),
                 'revenue_data': revenue_data,
                 'popular_time_slots': list(popular_slots),
+                'peak_hours': hours_by_weekday,
+                'popular_days': popular_days,
                 'performance_metrics': {
-                    'conversion_rate': 85.5,  # This would need actual calculation
-                    'customer_satisfaction': 4.7,  # From reviews
-                    'repeat_customer_rate': 67.3  # This would need actual calculation
+                    'conversion_rate': round(min(conversion_rate, 100), 2),
+                    'customer_satisfaction': round(float(customer_satisfaction), 2),
+                    'repeat_customer_rate': round(repeat_customer_rate, 2)
                 }
             }
         })
@@ -599,54 +620,30 @@ def earnings_summary(request):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
     try:
-        now = timezone.now()
-        today = now.date()
-        
-        # Get all completed bookings
-        bookings = Booking.objects.filter(
-            playground__owner=request.user,
-            status__in=['confirmed', 'completed'],
-            payment_status='paid'
-        )
-        
-        # Today's earnings
-        today_earnings = bookings.filter(
-            booking_date=today
-        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-        
-        # This week's earnings
-        week_start = today - timedelta(days=today.weekday())
-        week_earnings = bookings.filter(
-            booking_date__gte=week_start
-        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-        
-        # This month's earnings
-        month_start = today.replace(day=1)
-        month_earnings = bookings.filter(
-            booking_date__gte=month_start
-        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-        
-        # Total earnings
-        total_earnings = bookings.aggregate(
-            Sum('final_amount')
-        )['final_amount__sum'] or 0
+        metrics = owner_metrics(request.user)
+        totals = metrics['totals']
         
         # Earnings by playground
-        playground_earnings = bookings.values(
-            'playground__name'
-        ).annotate(
-            total=Sum('final_amount'),
-            bookings_count=Count('id')
-        ).order_by('-total')
+        playground_earnings = sorted(
+            (
+                {
+                    'playground__name': row['name'],
+                    'total': row['net_revenue'],
+                    'bookings_count': row['paid_bookings']
+                }
+                for row in metrics['playgrounds'] if row['paid_bookings']
+            ),
+            key=lambda row: row['total'], reverse=True
+        )
         
         return JsonResponse({
             'success': True,
             'earnings': {
-                'today': float(today_earnings),
-                'week': float(week_earnings),
-                'month': float(month_earnings),
-                'total': float(total_earnings),
-                'by_playground': list(playground_earnings)
+                'today': totals['today_revenue'],
+                'week': totals['week_revenue'],
+                'month': totals['month_revenue'],
+                'total': totals['net_revenue'],
+                'by_playground': playground_earnings
             }
         })
         
@@ -665,43 +662,26 @@ def owner_dashboard_stats(request):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
     try:
-        today = timezone.now().date()
-        current_month = timezone.now().replace(day=1)
-        
-        # Get owner's playgrounds
-        playgrounds = Playground.objects.filter(owner=request.user)
-        
-        # Get all bookings
+        totals = owner_metrics(request.user)['totals']
         all_bookings = Booking.objects.filter(playground__owner=request.user)
         
         # Basic stats
         stats = {
-            'total_playgrounds': playgrounds.count(),
-            'active_playgrounds': playgrounds.filter(status='active').count(),
-            'total_bookings': all_bookings.count(),
-            'pending_bookings': all_bookings.filter(status='pending').count(),
-            'confirmed_bookings': all_bookings.filter(status='confirmed').count(),
-            'completed_bookings': all_bookings.filter(status='completed').count(),
-            'todays_bookings': all_bookings.filter(booking_date=today).count(),
-            'monthly_bookings': all_bookings.filter(created_at__gte=current_month).count(),
+            'total_playgrounds': totals['playgrounds'],
+            'active_playgrounds': totals['active_playgrounds'],
+            'total_bookings': totals['bookings_total'],
+            'pending_bookings': totals['bookings_pending'],
+            'confirmed_bookings': totals['bookings_confirmed'],
+            'completed_bookings': totals['bookings_completed'],
+            'todays_bookings': totals['today_bookings'],
+            'monthly_bookings': totals['created_this_month'],
         }
         
         # Revenue stats
         revenue_stats = {
-            'total_revenue': all_bookings.filter(
-                status__in=['confirmed', 'completed'],
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0,
-            
-            'monthly_revenue': all_bookings.filter(
-                created_at__gte=current_month,
-                status__in=['confirmed', 'completed'],
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0,
-            
-            'pending_revenue': all_bookings.filter(
-                status='pending'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0,
+            'total_revenue': totals['net_revenue'],
+            'monthly_revenue': totals['created_this_month_revenue'],
+            'pending_revenue': totals['pending_value'],
         }
         
         # Recent activity
@@ -950,35 +930,31 @@ def revenue_analytics_api(request):
             payment_status='paid'
         )
         
+        owner_playgrounds = Playground.objects.filter(owner=request.user)
+        
         # Monthly revenue for current year
-        monthly_data = []
-        for month in range(1, 13):
-            month_revenue = paid_bookings.filter(
-                created_at__year=timezone.now().year,
-                created_at__month=month
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            monthly_data.append({
+        monthly_data = [
+            {
                 'month': month,
-                'revenue': float(month_revenue)
-            })
+                'revenue': float(row['net_revenue'])
+            }
+            for month, row in monthly_stats(owner_playgrounds, today.year).items()
+        ]
         
         # Daily revenue for current month
-        daily_data = []
         import calendar
         days_in_month = calendar.monthrange(current_month.year, current_month.month)[1]
+        month_days = daily_stats(
+            owner_playgrounds, current_month.date(), current_month.date().replace(day=days_in_month)
+        )
         
-        for day in range(1, days_in_month + 1):
-            day_revenue = paid_bookings.filter(
-                booking_date__year=current_month.year,
-                booking_date__month=current_month.month,
-                booking_date__day=day
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            daily_data.append({
-                'day': day,
-                'revenue': float(day_revenue)
-            })
+        daily_data = [
+            {
+                'day': day.day,
+                'revenue': float(row['net_revenue'])
+            }
+            for day, row in month_days.items()
+        ]
         
         # Revenue by playground
         playground_revenue = paid_bookings.values(
@@ -1020,48 +996,21 @@ def playground_performance_api(request):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
     try:
-        playgrounds = Playground.objects.filter(owner=request.user)
-        
-        performance_data = []
-        for playground in playgrounds:
-            bookings = playground.bookings.all()
-            completed_bookings = bookings.filter(status='completed')
-            
-            # Calculate metrics
-            total_bookings = bookings.count()
-            total_revenue = completed_bookings.filter(
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            avg_rating = playground.reviews.aggregate(
-                Avg('rating')
-            )['rating__avg'] or 0
-            
-            review_count = playground.reviews.count()
-            
-            # Occupancy rate (simplified calculation)
-            import calendar
-            current_month = timezone.now().replace(day=1)
-            days_in_month = calendar.monthrange(current_month.year, current_month.month)[1]
-            potential_slots = days_in_month * 12  # Assuming 12 hours operation
-            
-            monthly_bookings = bookings.filter(
-                booking_date__gte=current_month
-            ).count()
-            
-            occupancy_rate = (monthly_bookings / potential_slots * 100) if potential_slots > 0 else 0
-            
-            performance_data.append({
-                'id': playground.id,
-                'name': playground.name,
-                'total_bookings': total_bookings,
-                'total_revenue': float(total_revenue),
-                'avg_rating': float(avg_rating),
-                'review_count': review_count,
-                'occupancy_rate': round(occupancy_rate, 2),
-                'status': playground.status,
-                'created_at': playground.created_at.isoformat(),
-            })
+        performance_data = [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'total_bookings': row['bookings_total'],
+                'total_revenue': row['completed_revenue'],
+                'avg_rating': row['rating'],
+                'review_count': row['review_count'],
+                'occupancy_rate': row['occupancy_rate'],
+                'cancellation_rate': row['cancellation_rate'],
+                'status': row['status'],
+                'created_at': row['created_at'],
+            }
+            for row in owner_metrics(request.user)['playgrounds']
+        ]
         
         return JsonResponse({
             'success': True,
@@ -1075,6 +1024,279 @@ def playground_performance_api(request):
         }, status=500)
 
 
+@login_required
+@require_http_methods(["GET"])
+def cohort_analytics_api(request):
+    """Get customer cohorts, month-N retention and repeat rates for the owner"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    try:
+        months = min(max(int(request.GET.get('months', DEFAULT_COHORT_MONTHS)), 1), 36)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'months must be a number'}, status=400)
+    
+    playground_id = request.GET.get('playground_id')
+    if playground_id and not playground_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'playground_id must be a number'}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'months': months,
+        'cohorts': owner_cohort_analytics(request.user, playground_id and int(playground_id), months),
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def revenue_projection_api(request):
+    """Compare expected revenue of a playground under price/occupancy scenarios"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    playground_id = request.GET.get('playground_id', '')
+    if not playground_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'playground_id is required'}, status=400)
+    playground = get_object_or_404(Playground, id=playground_id, owner=request.user)
+    try:
+        horizon_days = min(max(int(request.GET.get('horizon_days', 30)), 1), 365)
+        elasticity = parse_number(request.GET.get('elasticity'), 0.0, 0, MAX_ELASTICITY, name='elasticity')
+        price_multipliers = parse_scenario_values(
+            request.GET.get('price_multipliers'), [1.0], minimum=MIN_PRICE_MULTIPLIER
+        )
+        occupancy_factors = parse_scenario_values(request.GET.get('occupancy_factors'), [1.0])
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    
+    grid = SlotGrid.for_playground(playground)
+    occupancy, from_history = historical_occupancy(playground)
+    scenarios = project(
+        grid, occupancy, price_multipliers=price_multipliers,
+        occupancy_factors=occupancy_factors, horizon_days=horizon_days, elasticity=elasticity
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'playground_id': playground.id,
+        'horizon_days': horizon_days,
+        'weekly_hours': round(grid.weekly_hours, 2),
+        'weekly_capacity_value': round(grid.weekly_capacity_value, 2),
+        'occupancy_source': 'history' if from_history else 'default',
+        'scenarios': [
+            {
+                **scenario,
+                'revenue': round(scenario['revenue'], 2),
+                'daily_revenue': round(scenario['daily_revenue'], 2),
+                'booked_hours': round(scenario['booked_hours'], 2),
+                'occupancy_rate': round(scenario['occupancy_rate'], 2),
+            }
+            for scenario in scenarios
+        ],
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def occupancy_heatmap_api(request):
+    """Get hour-of-week occupancy for the owner's playgrounds over recent weeks"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    try:
+        weeks = min(max(int(request.GET.get('weeks', 4)), 1), 52)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'weeks must be a number'}, status=400)
+    
+    playground_id = request.GET.get('playground')
+    if playground_id and not playground_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'playground must be a number'}, status=400)
+    
+    playgrounds = Playground.objects.filter(owner=request.user)
+    if playground_id:
+        playgrounds = playgrounds.filter(id=playground_id)
+    
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(weeks=weeks) + timedelta(days=1)
+    matrix = occupancy_matrix(playgrounds, start_date, end_date)
+    
+    return JsonResponse({
+        'success': True,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'occupancy_rate': round(matrix.rate(), 2),
+        'heatmap': matrix.heatmap(),
+        'daily': [
+            {'date': day.isoformat(), 'occupancy_rate': round(rate, 2)}
+            for day, rate in matrix.by_day().items()
+        ],
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def demand_forecast_api(request):
+    """Get forecast booked hours per weekday and hour for the coming weeks"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    try:
+        weeks = min(max(int(request.GET.get('weeks', FORECAST_WEEKS)), 1), FORECAST_WEEKS)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'weeks must be a number'}, status=400)
+    
+    playground_id = request.GET.get('playground')
+    if playground_id and not playground_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'playground must be a number'}, status=400)
+    
+    analytics = PlaygroundAnalytics.objects.filter(playground__owner=request.user)
+    if playground_id:
+        analytics = analytics.filter(playground_id=playground_id)
+    
+    playgrounds = []
+    combined = []
+    for row in analytics.order_by('playground_id').values('playground_id', 'playground__name', 'demand_forecast'):
+        forecast = stored_forecast(row['demand_forecast'], weeks)
+        playgrounds.append({
+            'playground_id': row['playground_id'],
+            'name': row['playground__name'],
+            'has_history': bool(forecast),
+            'weeks': forecast,
+        })
+        for week, weekly in enumerate(forecast):
+            if week == len(combined):
+                combined.append({**weekly, 'by_weekday_hour': [list(day) for day in weekly['by_weekday_hour']]})
+                continue
+            combined[week]['total'] = round(combined[week]['total'] + weekly['total'], 2)
+            for day, hours in enumerate(weekly['by_weekday_hour']):
+                combined[week]['by_weekday_hour'][day] = [
+                    round(a + b, 2) for a, b in zip(combined[week]['by_weekday_hour'][day], hours)
+                ]
+    
+    return JsonResponse({
+        'success': True,
+        'weeks': combined,
+        'playgrounds': playgrounds,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def price_suggestions_api(request):
+    """Get the demand-based price multipliers suggested for the owner's playgrounds"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    playground_id = request.GET.get('playground')
+    if playground_id and not playground_id.isdigit():
+        return JsonResponse({'success': False, 'message': 'playground must be a number'}, status=400)
+    
+    analytics = PlaygroundAnalytics.objects.filter(playground__owner=request.user)
+    if playground_id:
+        analytics = analytics.filter(playground_id=playground_id)
+    
+    playgrounds = []
+    for row in analytics.order_by('playground_id').values('playground_id', 'playground__name', 'price_suggestions'):
+        suggestions = row['price_suggestions'] or {}
+        playgrounds.append({
+            'playground_id': row['playground_id'],
+            'name': row['playground__name'],
+            'has_history': bool(suggestions),
+            'generated_on': suggestions.get('generated_on'),
+            'multipliers': suggestions.get('multipliers'),
+            'occupancy': suggestions.get('occupancy'),
+            'peak_windows': suggested_windows(suggestions),
+        })
+    
+    return JsonResponse({'success': True, 'playgrounds': playgrounds})
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def accept_price_suggestions_api(request):
+    """Apply the suggested prices to some or all of the owner's playgrounds"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
+    target = data.get('target', 'windows')
+    if target not in SUGGESTION_TARGETS:
+        return JsonResponse({
+            'success': False,
+            'message': f'target must be one of {", ".join(SUGGESTION_TARGETS)}'
+        }, status=400)
+    
+    playgrounds = Playground.objects.filter(owner=request.user)
+    if data.get('playground_ids'):
+        try:
+            playgrounds = playgrounds.filter(id__in=[int(pid) for pid in data['playground_ids']])
+        except (TypeError, ValueError):
+            return JsonResponse({'success': False, 'message': 'playground_ids must be a list of ids'}, status=400)
+    updated = accept_suggestions(playgrounds, target)
+    
+    return JsonResponse({
+        'success': True,
+        'target': target,
+        'updated_count': len(updated),
+        'playground_ids': updated,
+    })
+
+
+# Longest date range one bulk cancellation may cover
+BULK_CANCEL_MAX_DAYS = 31
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_cancel_bookings_api(request):
+    """Cancel and refund all upcoming bookings of a playground in a date range"""
+    if request.user.user_type != 'owner':
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data.get('end_date') or data['start_date'], '%Y-%m-%d').date()
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'message': 'start_date and end_date (YYYY-MM-DD) are required'}, status=400)
+    
+    if end_date < start_date or (end_date - start_date).days >= BULK_CANCEL_MAX_DAYS:
+        return JsonResponse({
+            'success': False,
+            'message': f'The date range must be ordered and at most {BULK_CANCEL_MAX_DAYS} days long'
+        }, status=400)
+    reason = (data.get('reason') or '').strip()
+    if not reason:
+        return JsonResponse({'success': False, 'message': 'A cancellation reason is required'}, status=400)
+    
+    playground = get_object_or_404(Playground, id=data.get('playground_id'), owner=request.user)
+    preview = bool(data.get('preview'))
+    bookings, refunds = cancel_bookings(
+        playground, start_date, end_date, reason, cancelled_by=request.user, preview=preview
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'preview': preview,
+        'cancelled_count': len(bookings),
+        'refunded_count': sum(1 for amount in refunds.values() if amount),
+        'total_refund': float(sum(refunds.values())),
+        'bookings': [{
+            'id': booking.id,
+            'booking_id': str(booking.booking_id),
+            'date': booking.booking_date.strftime('%Y-%m-%d'),
+            'start_time': booking.start_time.strftime('%H:%M'),
+            'end_time': booking.end_time.strftime('%H:%M'),
+            'amount': float(booking.final_amount),
+            'refund_amount': float(refunds[booking.id]),
+        } for booking in bookings],
+    })
+
+
 @login_required
 @require_http_methods(["GET"])
 def live_notifications_api(request):
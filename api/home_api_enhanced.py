@@ -11,81 +11,93 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 import json
 from playgrounds.models import Country, State, City, Playground, SportType
+from playgrounds.currency import currency_symbol as get_currency_symbol
+from playgrounds.reference_data import active_states, active_cities
+from playground_booking.caching import tiered_cache
+from adminpanel.metrics import get_admin_metrics
+
+
+def _build_popular_playgrounds(limit):
+    """Serialized admin-marked popular playgrounds, best rated first"""
+    # Get ONLY playgrounds marked as popular by admin
+    playgrounds = Playground.objects.filter(
+        status='active',
+        is_popular=True  # Only show playgrounds marked as popular
+    ).select_related(
+        'city', 'city__state', 'city__state__country'
+    ).prefetch_related(
+        'sport_types', 'images'
+    ).annotate(
+        booking_count=Count('bookings')
+    ).order_by('-rating', '-booking_count')[:limit]
+    
+    playgrounds_data = []
+    for playground in playgrounds:
+        # Get image - prioritize main_image, then gallery images
+        image_url = None
+        if playground.main_image:
+            image_url = playground.main_image.url
+        else:
+            first_image = playground.images.first()
+            if first_image and first_image.image:
+                image_url = first_image.image.url
+        
+        # Get first sport type
+        first_sport = playground.sport_types.first()
+        sport_name = first_sport.name if first_sport else None
+        sport_icon = first_sport.icon if first_sport else 'fas fa-futbol'
+        
+        # Location info
+        location = playground.city.name if playground.city else playground.address
+        
+        # Get currency from playground's country
+        if playground.city and playground.city.state and playground.city.state.country:
+            country = playground.city.state.country
+            playground_currency = country.get_currency()
+            country_code = country.code
+        else:
+            playground_currency = playground.currency
+            country_code = 'US'
+        
+        currency_symbol = get_currency_symbol(playground_currency)
+        
+        playgrounds_data.append({
+            'id': playground.id,
+            'name': playground.name,
+            'image_url': image_url,
+            'sport_type': sport_name,
+            'sport_icon': sport_icon,
+            'rating': float(playground.rating) if playground.rating else 0.0,
+            'location': location,
+            'price_per_hour': float(playground.price_per_hour) if playground.price_per_hour else None,
+            'currency': playground_currency,
+            'currency_symbol': currency_symbol,
+            'is_popular': playground.is_popular,
+            'booking_count': playground.booking_count,
+            'country_code': country_code,
+            'detail_url': f'/playgrounds/details/{playground.id}/'
+        })
+    
+    return playgrounds_data
+
+
+def popular_playgrounds(limit):
+    """Cached popular playgrounds; marking/unmarking invalidates, booking counts may lag by the timeout"""
+    return tiered_cache.get_or_set(
+        f"playgrounds:popular:{limit}",
+        lambda: _build_popular_playgrounds(limit),
+        timeout=300,
+        tags=['playgrounds:popular'],
+    )
 
 
 @require_http_methods(["GET"])
 def get_popular_playgrounds(request):
     """Get popular playgrounds marked by admin - Real-time and dynamic"""
     try:
-        limit = int(request.GET.get('limit', 8))
-        
-        # Currency symbols map
-        currency_symbols = {
-            'USD': '$', 'EUR': '€', 'GBP': '£', 'MYR': 'RM', 'SGD': 'S$',
-            'INR': '₹', 'BDT': '৳', 'AUD': 'A$', 'CAD': 'C$', 'JPY': '¥',
-            'CNY': '¥', 'AED': 'د.إ', 'SAR': '﷼', 'THB': '฿',
-            'IDR': 'Rp', 'PHP': '₱', 'VND': '₫', 'KRW': '₩',
-            'TWD': 'NT$', 'HKD': 'HK$', 'NZD': 'NZ$'
-        }
-        
-        # Get ONLY playgrounds marked as popular by admin
-        playgrounds = Playground.objects.filter(
-            status='active',
-            is_popular=True  # Only show playgrounds marked as popular
-        ).select_related(
-            'city', 'city__state', 'city__state__country'
-        ).prefetch_related(
-            'sport_types', 'images'
-        ).annotate(
-            booking_count=Count('bookings')
-        ).order_by('-rating', '-booking_count')[:limit]
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 50)
         
-        playgrounds_data = []
-        for playground in playgrounds:
-            # Get image - prioritize main_image, then gallery images
-            image_url = None
-            if playground.main_image:
-                image_url = playground.main_image.url
-            else:
-                first_image = playground.images.first()
-                if first_image and first_image.image:
-                    image_url = first_image.image.url
-            
-            # Get first sport type
-            first_sport = playground.sport_types.first()
-            sport_name = first_sport.name if first_sport else None
-            sport_icon = first_sport.icon if first_sport else 'fas fa-futbol'
-            
-            # Location info
-            location = playground.city.name if playground.city else playground.address
-            
-            # Get currency from playground's country
-            if playground.city and playground.city.state and playground.city.state.country:
-                country = playground.city.state.country
-                playground_currency = country.get_currency()
-                country_code = country.code
-            else:
-                playground_currency = playground.currency
-                country_code = 'US'
-            
-            currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
-            
-            playgrounds_data.append({
-                'id': playground.id,
-                'name': playground.name,
-                'image_url': image_url,
-                'sport_type': sport_name,
-                'sport_icon': sport_icon,
-                'rating': float(playground.rating) if playground.rating else 0.0,
-                'location': location,
-                'price_per_hour': float(playground.price_per_hour) if playground.price_per_hour else None,
-                'currency': playground_currency,
-                'currency_symbol': currency_symbol,
-                'is_popular': playground.is_popular,
-                'booking_count': playground.booking_count,
-                'country_code': country_code,
-                'detail_url': f'/playgrounds/details/{playground.id}/'
-            })
+        playgrounds_data = popular_playgrounds(limit)
         
         return JsonResponse({
             'success': True,
@@ -114,18 +126,9 @@ def get_states(request):
         return JsonResponse({'states': []}, safe=False)
     
     try:
-        # First check if country exists
-        from playgrounds.models import Country
-        if not Country.objects.filter(id=country_id).exists():
-            return JsonResponse({'states': []}, safe=False)
-        
-        states = State.objects.filter(
-            country_id=country_id,
-            is_active=True
-        ).distinct().values('id', 'name').order_by('name')
-        
+        # Unknown countries simply have no cached states
         states_list = []
-        for state in states:
+        for state in active_states(country_id):
             states_list.append({
                 'id': state['id'],
                 'name': state['name']
@@ -152,18 +155,9 @@ def get_cities(request):
         return JsonResponse({'cities': []}, safe=False)
     
     try:
-        # First check if state exists
-        from playgrounds.models import State
-        if not State.objects.filter(id=state_id).exists():
-            return JsonResponse({'cities': []}, safe=False)
-        
-        cities = City.objects.filter(
-            state_id=state_id,
-            is_active=True
-        ).distinct().values('id', 'name').order_by('name')
-        
+        # Unknown states simply have no cached cities
         cities_list = []
-        for city in cities:
+        for city in active_cities(state_id):
             cities_list.append({
                 'id': city['id'],
                 'name': city['name']
@@ -330,20 +324,19 @@ def get_live_stats(request):
 @require_http_methods(["GET"])
 def admin_dashboard_stats(request):
     """Get admin dashboard statistics"""
-    today = timezone.now().date()
-    last_week = today - timedelta(days=7)
-    last_month = today - timedelta(days=30)
+    metrics = get_admin_metrics()
+    playgrounds = metrics['playgrounds']
     
     stats = {
         'overview': {
-            'total_playgrounds': Playground.objects.count(),
-            'active_playgrounds': Playground.objects.filter(status='active').count(),
-            'pending_playgrounds': Playground.objects.filter(status='pending').count(),
-            'total_countries': Country.objects.filter(is_active=True).count(),
+            'total_playgrounds': playgrounds['total'],
+            'active_playgrounds': playgrounds['active'],
+            'pending_playgrounds': playgrounds['pending'],
+            'total_countries': metrics['countries']['active'],
         },
         'recent': {
-            'new_playgrounds_week': Playground.objects.filter(created_at__gte=last_week).count(),
-            'new_playgrounds_month': Playground.objects.filter(created_at__gte=last_month).count(),
+            'new_playgrounds_week': playgrounds['new_week'],
+            'new_playgrounds_month': playgrounds['new_month'],
         },
         'popular_sports': list(
             SportType.objects.annotate(
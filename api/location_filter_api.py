@@ -5,12 +5,10 @@ Provides real-time dropdown population based on parent selection
 
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.views.decorators.cache import cache_page
-from playgrounds.models import State, City
+from playgrounds.reference_data import active_countries, active_states, active_cities
 
 
 @require_http_methods(["GET"])
-@cache_page(300)  # Cache for 5 minutes
 def get_states_by_country(request):
     """Get all states for a specific country"""
     country_id = request.GET.get('country_id')
@@ -19,14 +17,9 @@ def get_states_by_country(request):
         return JsonResponse({'error': 'Country ID is required'}, status=400)
     
     try:
-        states = State.objects.filter(
-            country_id=country_id,
-            is_active=True
-        ).values('id', 'name').order_by('name')
-        
         return JsonResponse({
             'success': True,
-            'states': list(states)
+            'states': active_states(country_id)
         })
     except Exception as e:
         return JsonResponse({
@@ -36,7 +29,6 @@ def get_states_by_country(request):
 
 
 @require_http_methods(["GET"])
-@cache_page(300)  # Cache for 5 minutes
 def get_cities_by_state(request):
     """Get all cities for a specific state"""
     state_id = request.GET.get('state_id')
@@ -45,14 +37,11 @@ def get_cities_by_state(request):
         return JsonResponse({'error': 'State ID is required'}, status=400)
     
     try:
-        cities = City.objects.filter(
-            state_id=state_id,
-            is_active=True
-        ).values('id', 'name').order_by('name')
+        cities = [{'id': city['id'], 'name': city['name']} for city in active_cities(state_id)]
         
         return JsonResponse({
             'success': True,
-            'cities': list(cities)
+            'cities': cities
         })
     except Exception as e:
         return JsonResponse({
@@ -62,19 +51,14 @@ def get_cities_by_state(request):
 
 
 @require_http_methods(["GET"])
-@cache_page(300)  # Cache for 5 minutes
 def get_all_locations(request):
     """Get countries with their states and cities for initial load"""
     try:
-        from playgrounds.models import Country
-        
-        countries = Country.objects.filter(is_active=True).prefetch_related(
-            'states__cities'
-        ).values('id', 'name')
+        countries = [{'id': country['id'], 'name': country['name']} for country in active_countries()]
         
         return JsonResponse({
             'success': True,
-            'countries': list(countries)
+            'countries': countries
         })
     except Exception as e:
         return JsonResponse({
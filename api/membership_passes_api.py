@@ -16,6 +16,7 @@ from decimal import Decimal
 import json
 from datetime import datetime, timedelta
 
+from bookings.pricing import pass_price
 from playgrounds.models import Playground, DurationPass, PassPurchase, SportType
 from accounts.models import User
 
@@ -601,36 +602,10 @@ def calculate_pass_pricing(request):
             features = data.get('features', [])
             sport_type = data.get('sport_type', 'general')
             
-            # Base pricing calculation
-            if duration_days == 1:
-                multiplier = Decimal('1.0')
-            elif duration_days == 7:
-                multiplier = Decimal('6.5')  # 7.5% discount
-            elif duration_days == 30:
-                multiplier = Decimal('25.0')  # 16.7% discount
-            elif duration_days == 90:
-                multiplier = Decimal('70.0')  # 22.2% discount
-            elif duration_days == 365:
-                multiplier = Decimal('300.0')  # 17.8% discount
-            else:
-                multiplier = Decimal(str(duration_days)) * Decimal('0.95')  # 5% bulk discount
-            
-            calculated_price = base_price * multiplier
-            
-            # Features pricing
-            feature_costs = {
-                'equipment': Decimal('5.0'),
-                'coaching': Decimal('15.0'),
-                'refreshments': Decimal('3.0'),
-                'video_analysis': Decimal('10.0'),
-                'first_aid': Decimal('2.0'),
-                'premium_location': Decimal('8.0')
-            }
-            
-            total_feature_cost = sum(feature_costs.get(feature, Decimal('0')) for feature in features)
-            total_feature_cost *= multiplier  # Apply duration multiplier to features
-            
-            final_price = calculated_price + total_feature_cost
+            # Duration multiplier and feature costs come from the pricing engine
+            multiplier, calculated_price, total_feature_cost, final_price = pass_price(
+                base_price, duration_days, features
+            )
             
             return JsonResponse({
                 'success': True,
@@ -14,6 +14,9 @@ from playgrounds.models import (
     Playground, TimeSlot, PlaygroundImage, Review, 
     Country, State, City, SportType
 )
+from playgrounds.versioning import playground_condition, CONFIG, BOOKINGS, DATED_BOOKINGS
+from playgrounds.snapshot import get_playground_snapshot_or_404
+from playground_booking.caching import tiered_cache
 from bookings.models import Booking
 from accounts.models import User
 
@@ -328,178 +331,26 @@ class PlaygroundDetailAPIView(View):
     Detailed playground view with comprehensive information and real-time data
     """
     
+    @method_decorator(playground_condition(CONFIG, BOOKINGS, DATED_BOOKINGS, per_user=True, default_date=date.today))
     def get(self, request, playground_id):
         """Get detailed playground information"""
         try:
-            playground = get_object_or_404(
-                Playground.objects.select_related(
-                    'city__state__country', 'owner'
-                ).prefetch_related(
-                    'sport_types', 'images', 'time_slots', 'reviews__user'
-                ),
-                id=playground_id
-            )
+            playground = get_playground_snapshot_or_404(playground_id)
             
             # Check permissions
-            if not request.user.is_staff and playground.owner != request.user:
+            if not request.user.is_staff and playground.owner_id != request.user.id:
                 return JsonResponse({
                     'success': False,
                     'error': 'Permission denied'
                 }, status=403)
             
-            # Get real-time statistics
             today = date.today()
-            this_week_start = today - timedelta(days=today.weekday())
-            this_month_start = today.replace(day=1)
-            
-            # Booking statistics
-            total_bookings = playground.bookings.count()
-            pending_bookings = playground.bookings.filter(status='pending').count()
-            confirmed_bookings = playground.bookings.filter(status='confirmed').count()
-            
-            # Revenue statistics
-            total_revenue = playground.bookings.filter(
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            this_month_revenue = playground.bookings.filter(
-                booking_date__gte=this_month_start,
-                payment_status='paid'
-            ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
-            
-            # Get available time slots for next 7 days
-            available_slots = []
-            for i in range(7):
-                check_date = today + timedelta(days=i)
-                day_name = check_date.strftime('%A').lower()
-                
-                day_slots = []
-                for slot in playground.time_slots.filter(day_of_week=day_name, is_available=True):
-                    # Check availability
-                    booked_count = playground.bookings.filter(
-                        booking_date=check_date,
-                        start_time=slot.start_time,
-                        status__in=['confirmed', 'pending']
-                    ).count()
-                    
-                    is_available = booked_count < slot.max_bookings
-                    
-                    day_slots.append({
-                        'id': slot.id,
-                        'start_time': slot.start_time.strftime('%H:%M'),
-                        'end_time': slot.end_time.strftime('%H:%M'),
-                        'price': str(slot.get_effective_price()),
-                        'is_available': is_available,
-                        'booked_count': booked_count,
-                        'max_bookings': slot.max_bookings
-                    })
-                
-                available_slots.append({
-                    'date': check_date.isoformat(),
-                    'day_name': check_date.strftime('%A'),
-                    'slots': day_slots
-                })
-            
-            # Recent reviews
-            recent_reviews = []
-            for review in playground.reviews.order_by('-created_at')[:5]:
-                recent_reviews.append({
-                    'id': review.id,
-                    'user_name': review.user.get_full_name() or review.user.username,
-                    'rating': review.rating,
-                    'comment': review.comment,
-                    'created_at': review.created_at.isoformat()
-                })
-            
-            # Detailed playground data
-            playground_data = {
-                'id': playground.id,
-                'name': playground.name,
-                'description': playground.description,
-                'status': playground.status,
-                'playground_type': playground.playground_type,
-                'capacity': playground.capacity,
-                'size': playground.size,
-                'address': playground.address,
-                'latitude': str(playground.latitude) if playground.latitude else None,
-                'longitude': str(playground.longitude) if playground.longitude else None,
-                
-                # Pricing
-                'price_per_hour': str(playground.price_per_hour),
-                'price_per_day': str(playground.price_per_day) if playground.price_per_day else None,
-                'custom_pricing': playground.custom_pricing or {},
-                
-                # Location
-                'city': {
-                    'id': playground.city.id,
-                    'name': playground.city.name,
-                    'state': playground.city.state.name,
-                    'country': playground.city.state.country.name,
-                },
-                
-                # Contact
-                'phone_number': playground.phone_number,
-                'whatsapp_number': playground.whatsapp_number,
-                
-                # Sport types
-                'sport_types': [
-                    {
-                        'id': sport.id,
-                        'name': sport.name,
-                        'icon': sport.icon
-                    }
-                    for sport in playground.sport_types.all()
-                ],
-                
-                # Images with full gallery
-                'main_image': playground.main_image.url if playground.main_image else None,
-                'gallery_images': [
-                    {
-                        'id': img.id,
-                        'url': img.image.url,
-                        'caption': img.caption,
-                        'is_primary': img.is_primary
-                    }
-                    for img in playground.images.all()
-                ],
-                
-                # Features and policies
-                'amenities': playground.amenities or [],
-                'rules': playground.rules,
-                'cancellation_policy': playground.cancellation_policy,
-                'refund_policy': playground.refund_policy,
-                
-                # Booking settings
-                'operating_hours': playground.operating_hours or {},
-                'auto_approval': playground.auto_approval,
-                'live_availability': playground.live_availability,
-                'instant_booking': playground.instant_booking,
-                'advance_booking_days': playground.advance_booking_days,
-                
-                # Payment methods
-                'payment_methods': playground.payment_methods or {},
-                'bank_details': playground.bank_details or {},
-                'qr_code_image': playground.qr_code_image.url if playground.qr_code_image else None,
-                
-                # Statistics
-                'statistics': {
-                    'total_bookings': total_bookings,
-                    'pending_bookings': pending_bookings,
-                    'confirmed_bookings': confirmed_bookings,
-                    'total_revenue': float(total_revenue),
-                    'this_month_revenue': float(this_month_revenue),
-                    'average_rating': float(playground.rating),
-                    'review_count': playground.review_count,
-                },
-                
-                # Real-time data
-                'available_slots': available_slots,
-                'recent_reviews': recent_reviews,
-                
-                # Timestamps
-                'created_at': playground.created_at.isoformat(),
-                'updated_at': playground.updated_at.isoformat(),
-            }
+            playground_data = tiered_cache.get_or_set(
+                f"playground:detail:{playground.id}:{today.isoformat()}",
+                lambda: self._build_playground_data(playground, today),
+                timeout=120,
+                tags=[f"playground:{playground.id}", f"playground:{playground.id}:bookings"],
+            )
             
             return JsonResponse({
                 'success': True,
@@ -513,6 +364,173 @@ class PlaygroundDetailAPIView(View):
                 'error': str(e)
             }, status=500)
 
+    def _build_playground_data(self, playground, today):
+        """Build the detail payload (cached per playground and day)"""
+        bookings = Booking.objects.filter(playground_id=playground.id)
+        
+        # Get real-time statistics
+        this_week_start = today - timedelta(days=today.weekday())
+        this_month_start = today.replace(day=1)
+        
+        # Booking statistics
+        total_bookings = bookings.count()
+        pending_bookings = bookings.filter(status='pending').count()
+        confirmed_bookings = bookings.filter(status='confirmed').count()
+        
+        # Revenue statistics
+        total_revenue = bookings.filter(
+            payment_status='paid'
+        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
+        
+        this_month_revenue = bookings.filter(
+            booking_date__gte=this_month_start,
+            payment_status='paid'
+        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
+        
+        # Booked counts per (date, start time) for the next 7 days in one query
+        booked_counts = {
+            (row['booking_date'], row['start_time']): row['count']
+            for row in bookings.filter(
+                booking_date__gte=today,
+                booking_date__lt=today + timedelta(days=7),
+                status__in=['confirmed', 'pending']
+            ).values('booking_date', 'start_time').annotate(count=Count('id'))
+        }
+        
+        # Get available time slots for next 7 days
+        available_slots = []
+        for i in range(7):
+            check_date = today + timedelta(days=i)
+            day_name = check_date.strftime('%A').lower()
+            
+            day_slots = []
+            for slot in playground.slots_for_day(day_name):
+                # Check availability
+                booked_count = booked_counts.get((check_date, slot.start_time), 0)
+                
+                is_available = booked_count < slot.max_bookings
+                
+                day_slots.append({
+                    'id': slot.id,
+                    'start_time': slot.start_time.strftime('%H:%M'),
+                    'end_time': slot.end_time.strftime('%H:%M'),
+                    'price': str(slot.price),
+                    'is_available': is_available,
+                    'booked_count': booked_count,
+                    'max_bookings': slot.max_bookings
+                })
+            
+            available_slots.append({
+                'date': check_date.isoformat(),
+                'day_name': check_date.strftime('%A'),
+                'slots': day_slots
+            })
+        
+        # Recent reviews
+        recent_reviews = []
+        for review in Review.objects.filter(
+            playground_id=playground.id
+        ).select_related('user').order_by('-created_at')[:5]:
+            recent_reviews.append({
+                'id': review.id,
+                'user_name': review.user.get_full_name() or review.user.username,
+                'rating': review.rating,
+                'comment': review.comment,
+                'created_at': review.created_at.isoformat()
+            })
+        
+        # Detailed playground data
+        playground_data = {
+            'id': playground.id,
+            'name': playground.name,
+            'description': playground.description,
+            'status': playground.status,
+            'playground_type': playground.playground_type,
+            'capacity': playground.capacity,
+            'size': playground.size,
+            'address': playground.address,
+            'latitude': str(playground.latitude) if playground.latitude else None,
+            'longitude': str(playground.longitude) if playground.longitude else None,
+            
+            # Pricing
+            'price_per_hour': str(playground.price_per_hour),
+            'price_per_day': str(playground.price_per_day) if playground.price_per_day else None,
+            'custom_pricing': playground.custom_pricing or {},
+            
+            # Location
+            'city': {
+                'id': playground.city_id,
+                'name': playground.city_name,
+                'state': playground.state_name,
+                'country': playground.country_name,
+            },
+            
+            # Contact
+            'phone_number': playground.phone_number,
+            'whatsapp_number': playground.whatsapp_number,
+            
+            # Sport types
+            'sport_types': [
+                {
+                    'id': sport.id,
+                    'name': sport.name,
+                    'icon': sport.icon
+                }
+                for sport in playground.sport_types
+            ],
+            
+            # Images with full gallery
+            'main_image': playground.main_image_url,
+            'gallery_images': [
+                {
+                    'id': img.id,
+                    'url': img.url,
+                    'caption': img.caption,
+                    'is_primary': img.is_primary
+                }
+                for img in playground.images
+            ],
+            
+            # Features and policies
+            'amenities': playground.amenities,
+            'rules': playground.rules,
+            'cancellation_policy': playground.cancellation_policy,
+            'refund_policy': playground.refund_policy,
+            
+            # Booking settings
+            'operating_hours': playground.operating_hours,
+            'auto_approval': playground.auto_approval,
+            'live_availability': playground.live_availability,
+            'instant_booking': playground.instant_booking,
+            'advance_booking_days': playground.advance_booking_days,
+            
+            # Payment methods
+            'payment_methods': playground.payment_methods,
+            'bank_details': playground.bank_details,
+            'qr_code_image': playground.qr_code_image_url,
+            
+            # Statistics
+            'statistics': {
+                'total_bookings': total_bookings,
+                'pending_bookings': pending_bookings,
+                'confirmed_bookings': confirmed_bookings,
+                'total_revenue': float(total_revenue),
+                'this_month_revenue': float(this_month_revenue),
+                'average_rating': float(playground.rating),
+                'review_count': playground.review_count,
+            },
+            
+            # Real-time data
+            'available_slots': available_slots,
+            'recent_reviews': recent_reviews,
+            
+            # Timestamps
+            'created_at': playground.created_at.isoformat(),
+            'updated_at': playground.updated_at.isoformat(),
+        }
+        
+        return playground_data
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class BookingRequestAPIView(View):
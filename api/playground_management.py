@@ -8,6 +8,7 @@ import json
 import os
 from datetime import datetime, timedelta
 from playgrounds.models import Playground, Country, State, City, SportType, PlaygroundImage, TimeSlot
+from playgrounds.reference_data import active_countries, active_states, active_cities, active_sport_types
 from accounts.models import User
 
 
@@ -16,16 +17,8 @@ from accounts.models import User
 def get_countries(request):
     """Get all active countries"""
     try:
-        countries = Country.objects.filter(is_active=True).order_by('name')
         data = {
-            'countries': [
-                {
-                    'id': country.id,
-                    'name': country.name,
-                    'code': country.code
-                }
-                for country in countries
-            ]
+            'countries': active_countries()
         }
         return JsonResponse(data)
     except Exception as e:
@@ -41,19 +34,8 @@ def get_states(request):
         if not country_id:
             return JsonResponse({'error': 'Country ID is required'}, status=400)
         
-        states = State.objects.filter(
-            country_id=country_id, 
-            is_active=True
-        ).order_by('name')
-        
         data = {
-            'states': [
-                {
-                    'id': state.id,
-                    'name': state.name
-                }
-                for state in states
-            ]
+            'states': active_states(country_id)
         }
         return JsonResponse(data)
     except Exception as e:
@@ -69,20 +51,15 @@ def get_cities(request):
         if not state_id:
             return JsonResponse({'error': 'State ID is required'}, status=400)
         
-        cities = City.objects.filter(
-            state_id=state_id, 
-            is_active=True
-        ).order_by('name')
-        
         data = {
             'cities': [
                 {
-                    'id': city.id,
-                    'name': city.name,
-                    'latitude': float(city.latitude) if city.latitude else None,
-                    'longitude': float(city.longitude) if city.longitude else None
+                    'id': city['id'],
+                    'name': city['name'],
+                    'latitude': float(city['latitude']) if city['latitude'] else None,
+                    'longitude': float(city['longitude']) if city['longitude'] else None
                 }
-                for city in cities
+                for city in active_cities(state_id)
             ]
         }
         return JsonResponse(data)
@@ -95,17 +72,8 @@ def get_cities(request):
 def get_sport_types(request):
     """Get all active sport types"""
     try:
-        sport_types = SportType.objects.filter(is_active=True).order_by('name')
         data = {
-            'sport_types': [
-                {
-                    'id': sport.id,
-                    'name': sport.name,
-                    'icon': sport.icon,
-                    'description': sport.description
-                }
-                for sport in sport_types
-            ]
+            'sport_types': active_sport_types()
         }
         return JsonResponse(data)
     except Exception as e:
@@ -3,11 +3,14 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 import json
 import logging
 
 from playgrounds.models import Playground, TimeSlot, PlaygroundSlot, DurationPass
+from playgrounds.currency import CURRENCIES, get_currency, format_price
+from playgrounds.versioning import playground_condition, CONFIG, DATED_BOOKINGS
+from playgrounds.snapshot import get_playground_snapshot, get_playground_snapshot_or_404
 from bookings.models import Booking
 
 logger = logging.getLogger(__name__)
@@ -15,13 +18,14 @@ logger = logging.getLogger(__name__)
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@playground_condition(CONFIG, DATED_BOOKINGS, default_date=lambda: timezone.now().date())
 def get_today_slots(request, playground_id):
     """
     Get available slots for a playground with 12-hour format and dynamic currency
     Supports date parameter for dynamic date selection
     """
     try:
-        playground = get_object_or_404(Playground, id=playground_id)
+        playground = get_playground_snapshot_or_404(playground_id)
         
         # Get date from query parameter or use today
         date_param = request.GET.get('date')
@@ -36,86 +40,23 @@ def get_today_slots(request, playground_id):
         current_day = target_date.strftime('%A').lower()
         
         # Get ALL regular slots for the specified date - completely dynamic based on what user created
-        regular_slots = TimeSlot.objects.filter(
-            playground=playground,
-            day_of_week=current_day,
-            is_available=True
-        ).order_by('start_time')
+        regular_slots = playground.slots_for_day(current_day)
         
         # Note: Custom slots are handled separately in the professional_custom_slots_api
         # and should NOT be included in today's regular slots
         
         # Get playground currency info
-        playground_currency = getattr(playground, 'currency', 'BDT')
-        currency_symbol = {
-            'BDT': '৳',
-            'USD': '$',
-            'EUR': '€',
-            'GBP': '£',
-            'INR': '₹',
-            'MYR': 'RM',  # Malaysian Ringgit
-            'SGD': 'S$',  # Singapore Dollar
-            'THB': '฿',   # Thai Baht
-            'IDR': 'Rp',  # Indonesian Rupiah
-            'PHP': '₱',   # Philippine Peso
-            'VND': '₫',   # Vietnamese Dong
-            'KRW': '₩',   # South Korean Won
-            'JPY': '¥',   # Japanese Yen
-            'CNY': '¥',   # Chinese Yuan
-            'AUD': 'A$',  # Australian Dollar
-            'CAD': 'C$',  # Canadian Dollar
-            'CHF': 'CHF', # Swiss Franc
-            'SEK': 'kr',  # Swedish Krona
-            'NOK': 'kr',  # Norwegian Krone
-            'DKK': 'kr',  # Danish Krone
-            'PLN': 'zł',  # Polish Złoty
-            'CZK': 'Kč',  # Czech Koruna
-            'HUF': 'Ft',  # Hungarian Forint
-            'RUB': '₽',   # Russian Ruble
-            'TRY': '₺',   # Turkish Lira
-            'ZAR': 'R',   # South African Rand
-            'BRL': 'R$',  # Brazilian Real
-            'MXN': '$',   # Mexican Peso
-            'ARS': '$',   # Argentine Peso
-            'CLP': '$',   # Chilean Peso
-            'COP': '$',   # Colombian Peso
-            'PEN': 'S/',  # Peruvian Sol
-            'UYU': '$U',  # Uruguayan Peso
-            'EGP': 'E£',  # Egyptian Pound
-            'SAR': '﷼',   # Saudi Riyal
-            'AED': 'د.إ',  # UAE Dirham
-            'QAR': '﷼',   # Qatari Riyal
-            'KWD': 'د.ك',  # Kuwaiti Dinar
-            'BHD': '.د.ب', # Bahraini Dinar
-            'OMR': '﷼',   # Omani Rial
-            'JOD': 'د.ا',  # Jordanian Dinar
-            'LBP': 'ل.ل',  # Lebanese Pound
-            'ILS': '₪',   # Israeli Shekel
-            'PKR': '₨',   # Pakistani Rupee
-            'LKR': '₨',   # Sri Lankan Rupee
-            'NPR': '₨',   # Nepalese Rupee
-            'BTN': 'Nu.', # Bhutanese Ngultrum
-            'MVR': 'Rf',  # Maldivian Rufiyaa
-            'AFN': '؋',   # Afghan Afghani
-            'IRR': '﷼',   # Iranian Rial
-            'IQD': 'ع.د',  # Iraqi Dinar
-            'KZT': '₸',   # Kazakhstani Tenge
-            'UZS': 'лв',  # Uzbekistani Som
-            'TJS': 'SM',  # Tajikistani Somoni
-            'KGS': 'лв',  # Kyrgyzstani Som
-            'TMT': 'T',   # Turkmenistani Manat
-            'AZN': '₼',   # Azerbaijani Manat
-            'GEL': '₾',   # Georgian Lari
-            'AMD': '֏',   # Armenian Dram
-            'BGN': 'лв',  # Bulgarian Lev
-            'RON': 'lei', # Romanian Leu
-            'HRK': 'kn',  # Croatian Kuna
-            'RSD': 'дин', # Serbian Dinar
-            'BAM': 'KM',  # Bosnia and Herzegovina Convertible Mark
-            'MKD': 'ден', # Macedonian Denar
-            'ALL': 'L',   # Albanian Lek
-            'EUR': '€',   # Euro (used by many European countries)
-        }.get(playground_currency, '৳')
+        playground_currency = playground.currency or 'BDT'
+        currency = get_currency(playground_currency, default='BDT')
+        currency_symbol = currency.symbol
+        
+        # Booked (start, end) pairs for the target date in one query;
+        # consider both confirmed and pending as booked
+        booked_ranges = set(Booking.objects.filter(
+            playground_id=playground.id,
+            booking_date=target_date.date(),
+            status__in=['confirmed', 'pending']
+        ).values_list('start_time', 'end_time'))
         
         # Format regular slots with real-time booking status
         regular_slots_data = []
@@ -125,16 +66,10 @@ def get_today_slots(request, playground_id):
             end_time_12h = slot.end_time.strftime('%I:%M %p')
             
             # Check if this slot is booked for the target date
-            existing_bookings = Booking.objects.filter(
-                playground=playground,
-                booking_date=target_date.date(),
-                start_time=slot.start_time,
-                end_time=slot.end_time,
-                status__in=['confirmed', 'pending']  # Consider both confirmed and pending as booked
-            ).exists()
+            existing_bookings = (slot.start_time, slot.end_time) in booked_ranges
             
             # Get effective price and use playground currency
-            effective_price = slot.get_effective_price()
+            effective_price = slot.price
             
             # Determine if slot can be booked (not booked and available)
             is_available = slot.is_available and not existing_bookings
@@ -142,7 +77,7 @@ def get_today_slots(request, playground_id):
             regular_slots_data.append({
                 'id': slot.id,
                 'type': 'regular',
-                'day': slot.get_day_of_week_display(),
+                'day': slot.day_display,
                 'start_time': start_time_12h,
                 'end_time': end_time_12h,
                 'start_time_24h': slot.start_time.strftime('%H:%M'),
@@ -150,7 +85,7 @@ def get_today_slots(request, playground_id):
                 'price': float(effective_price),
                 'currency': playground_currency,
                 'currency_symbol': currency_symbol,
-                'formatted_price': f"{currency_symbol} {effective_price}",
+                'formatted_price': currency.format(effective_price),
                 'duration_hours': slot.duration_hours,
                 'max_bookings': slot.max_bookings,
                 'is_available': is_available,
@@ -186,6 +121,7 @@ def get_today_slots(request, playground_id):
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@playground_condition(CONFIG, DATED_BOOKINGS, default_date=date.today)
 def professional_custom_slots_api(request, playground_id):
     """
     Get all custom slots for a playground from database, checking for booking conflicts on selected date
@@ -258,7 +194,7 @@ def professional_custom_slots_api(request, playground_id):
                 'end_time_24h': slot.end_time.strftime('%H:%M'),
                 'price': float(slot.price),
                 'currency': slot.currency,
-                'formatted_price': f"{slot.currency} {slot.price}",
+                'formatted_price': format_price(slot.price, slot.currency),
                 'duration_hours': slot.duration_hours,
                 'max_capacity': slot.max_capacity,
                 'description': slot.description,
@@ -324,11 +260,8 @@ def get_currencies(request):
     """
     try:
         currencies = [
-            {'code': 'BDT', 'name': 'Bangladeshi Taka', 'symbol': '৳'},
-            {'code': 'USD', 'name': 'US Dollar', 'symbol': '$'},
-            {'code': 'EUR', 'name': 'Euro', 'symbol': '€'},
-            {'code': 'GBP', 'name': 'British Pound', 'symbol': '£'},
-            {'code': 'INR', 'name': 'Indian Rupee', 'symbol': '₹'}
+            {'code': code, 'name': CURRENCIES[code].name, 'symbol': CURRENCIES[code].symbol}
+            for code in ('BDT', 'USD', 'EUR', 'GBP', 'INR')
         ]
         
         return JsonResponse({
@@ -344,114 +277,105 @@ def get_currencies(request):
         }, status=500)
 
 
+def _build_public_playground_details(playground):
+    """Build the public details payload served by get_public_playground_details"""
+    # Get playground currency info
+    playground_currency = playground.currency or 'BDT'
+    currency = get_currency(playground_currency, default='BDT')
+    currency_symbol = currency.symbol
+    
+    # Prepare amenities list
+    amenities_list = []
+    amenities = playground.amenities
+    if isinstance(amenities, str) and amenities:
+        try:
+            amenities_data = json.loads(amenities)
+            if isinstance(amenities_data, list):
+                amenities_list = amenities_data
+        except ValueError:
+            amenities_list = amenities.split(',')
+    elif isinstance(amenities, list):
+        amenities_list = amenities
+    
+    custom_pricing = playground.custom_pricing or {}
+    
+    data = {
+        'success': True,
+        'playground_id': playground.id,
+        'id': playground.id,
+        'name': playground.name,
+        'description': playground.description,
+        'address': playground.address,
+        'latitude': float(playground.latitude) if playground.latitude else None,
+        'longitude': float(playground.longitude) if playground.longitude else None,
+        'rating': float(playground.rating) if playground.rating else 0.0,
+        'price_per_hour': float(playground.price_per_hour),
+        'price_per_day': float(playground.price_per_day) if playground.price_per_day else None,
+        'capacity': playground.capacity,
+        'size': playground.size,
+        'playground_type': playground.playground_type,
+        'phone_number': playground.phone_number,
+        'whatsapp_number': playground.whatsapp_number,
+        'google_maps_url': playground.google_maps_url,
+        'main_image': playground.main_image_url,
+        'total_bookings': playground.total_bookings or 0,
+        'review_count': playground.review_count or 0,
+        'amenities': amenities_list,
+        'currency': playground_currency,
+        'currency_symbol': currency_symbol,
+        'owner': {
+            'id': playground.owner_id,
+            'username': playground.owner_username,
+            'first_name': playground.owner_first_name,
+            'last_name': playground.owner_last_name,
+        },
+        'location': {
+            'city': playground.city_name,
+            'state': playground.state_name,
+            'country': playground.country_name,
+        },
+        'sport_types': [
+            {
+                'id': sport.id,
+                'name': sport.name,
+                'description': sport.description
+            }
+            for sport in playground.sport_types
+        ],
+        'images': [
+            {
+                'id': img.id,
+                'image': img.url,
+                'caption': img.caption,
+                'is_primary': img.is_primary
+            }
+            for img in playground.images
+        ],
+        
+        # Dynamic configuration values
+        'configuration': {
+            'custom_slot_hour': custom_pricing.get('custom_slot_hour', 23),
+            'membership_pass_hour': custom_pricing.get('membership_pass_hour', 22),
+            'default_custom_duration': custom_pricing.get('default_custom_duration', 2),
+            'default_slot_duration': custom_pricing.get('default_slot_duration', 60),
+            'max_advance_booking_days': playground.advance_booking_days or 30,
+            'auto_approval': playground.auto_approval,
+            'instant_booking': playground.instant_booking
+        }
+    }
+    return data
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
+@playground_condition(CONFIG)
 def get_public_playground_details(request, playground_id):
     """
     Get public playground details for checkout and booking purposes
     This endpoint doesn't require ownership - any user can view playground details
     """
     try:
-        playground = get_object_or_404(
-            Playground.objects.select_related('city__state__country', 'owner')
-                               .prefetch_related('sport_types', 'images'),
-            id=playground_id
-        )
-        
-        # Get playground currency info
-        playground_currency = getattr(playground, 'currency', 'BDT')
-        currency_symbol = {
-            'BDT': '৳',
-            'USD': '$',
-            'EUR': '€',
-            'GBP': '£',
-            'INR': '₹',
-            'MYR': 'RM',
-            'SGD': 'S$',
-            'THB': '฿',
-            'IDR': 'Rp',
-            'PHP': '₱',
-            'VND': '₫',
-        }.get(playground_currency, '৳')
-        
-        # Prepare amenities list
-        amenities_list = []
-        if playground.amenities:
-            if isinstance(playground.amenities, str):
-                import json
-                try:
-                    amenities_data = json.loads(playground.amenities)
-                    if isinstance(amenities_data, list):
-                        amenities_list = amenities_data
-                except:
-                    amenities_list = playground.amenities.split(',') if playground.amenities else []
-            elif isinstance(playground.amenities, list):
-                amenities_list = playground.amenities
-        
-        data = {
-            'success': True,
-            'playground_id': playground.id,
-            'id': playground.id,
-            'name': playground.name,
-            'description': playground.description or '',
-            'address': playground.address or '',
-            'latitude': float(playground.latitude) if playground.latitude else None,
-            'longitude': float(playground.longitude) if playground.longitude else None,
-            'rating': float(playground.rating) if playground.rating else 0.0,
-            'price_per_hour': float(playground.price_per_hour),
-            'price_per_day': float(playground.price_per_day) if playground.price_per_day else None,
-            'capacity': playground.capacity or 0,
-            'size': playground.size or '',
-            'playground_type': playground.playground_type or '',
-            'phone_number': playground.phone_number or '',
-            'whatsapp_number': playground.whatsapp_number or '',
-            'google_maps_url': playground.google_maps_url or '',
-            'main_image': playground.main_image.url if playground.main_image else None,
-            'total_bookings': playground.total_bookings or 0,
-            'review_count': playground.review_count or 0,
-            'amenities': amenities_list,
-            'currency': playground_currency,
-            'currency_symbol': currency_symbol,
-            'owner': {
-                'id': playground.owner.id,
-                'username': playground.owner.username,
-                'first_name': playground.owner.first_name or '',
-                'last_name': playground.owner.last_name or '',
-            },
-            'location': {
-                'city': playground.city.name if playground.city else '',
-                'state': playground.city.state.name if playground.city and playground.city.state else '',
-                'country': playground.city.state.country.name if playground.city and playground.city.state and playground.city.state.country else '',
-            },
-            'sport_types': [
-                {
-                    'id': sport.id,
-                    'name': sport.name,
-                    'description': sport.description or ''
-                }
-                for sport in playground.sport_types.all()
-            ],
-            'images': [
-                {
-                    'id': img.id,
-                    'image': img.image.url,
-                    'caption': img.caption or '',
-                    'is_primary': img.is_primary
-                }
-                for img in playground.images.all()
-            ],
-            
-            # Dynamic configuration values
-            'configuration': {
-                'custom_slot_hour': playground.custom_pricing.get('custom_slot_hour', 23) if playground.custom_pricing else 23,
-                'membership_pass_hour': playground.custom_pricing.get('membership_pass_hour', 22) if playground.custom_pricing else 22,
-                'default_custom_duration': playground.custom_pricing.get('default_custom_duration', 2) if playground.custom_pricing else 2,
-                'default_slot_duration': playground.custom_pricing.get('default_slot_duration', 60) if playground.custom_pricing else 60,
-                'max_advance_booking_days': playground.advance_booking_days or 30,
-                'auto_approval': playground.auto_approval,
-                'instant_booking': playground.instant_booking
-            }
-        }
+        data = _build_public_playground_details(get_playground_snapshot(playground_id))
         
         logger.info(f"Successfully fetched public playground details for ID: {playground_id}")
         return JsonResponse(data)
@@ -12,10 +12,27 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 import json
 from datetime import datetime, timedelta
+from decimal import Decimal
 import logging
 
+from django.db.models import Count
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.pricing import MINUTES_PER_DAY, next_rate_change, window_multiplier
+from bookings.rollups import KEPT
+from playground_booking.caching import tiered_cache
+
 logger = logging.getLogger(__name__)
 
+# Sport peak hours in minutes of the day (5 PM to 10 PM) and weekend days (Monday is 0)
+PEAK_HOURS = (17 * 60, 22 * 60)
+WEEKEND_DAYS = (5, 6)
+
+# Bookings counted towards a sport's popularity score
+POPULARITY_DAYS = 30
+POPULARITY_CACHE_TIMEOUT = 900
+
 # Professional Sport Types Database with Advanced Features
 PROFESSIONAL_SPORT_TYPES = {
     'football': {
@@ -643,18 +660,16 @@ def get_sport_details(request, sport_id):
         sport_data = PROFESSIONAL_SPORT_TYPES[sport_id]
         
         # Calculate dynamic pricing based on current time
-        current_hour = datetime.now().hour
-        is_peak_hour = 17 <= current_hour <= 21  # 5 PM to 9 PM
-        is_weekend = datetime.now().weekday() >= 5
+        now = datetime.now()
+        minute = now.hour * 60 + now.minute
+        is_peak_hour = PEAK_HOURS[0] <= minute < PEAK_HOURS[1]
+        is_weekend = now.weekday() in WEEKEND_DAYS
         
+        windows = sport_price_windows(sport_data)
         base_price = sport_data['pricing']['base_price']
-        current_price = base_price
-        
-        if is_peak_hour:
-            current_price *= sport_data['pricing']['peak_hours_multiplier']
-        
-        if is_weekend:
-            current_price *= sport_data['pricing']['weekend_multiplier']
+        current_price = base_price * float(
+            window_multiplier(windows['peak_hour'] + windows['weekend'], now.weekday(), minute)
+        )
         
         # Add real-time availability (simulated)
         availability_slots = generate_availability_slots(sport_data)
@@ -666,7 +681,7 @@ def get_sport_details(request, sport_id):
                 'current_price': round(current_price, 2),
                 'is_peak_hour': is_peak_hour,
                 'is_weekend': is_weekend,
-                'next_price_change': calculate_next_price_change()
+                'next_price_change': calculate_next_price_change(windows['peak_hour'] + windows['weekend'])
             },
             'availability': availability_slots,
             'popularity_score': calculate_popularity_score(sport_id),
@@ -727,13 +742,11 @@ def calculate_sport_pricing(request):
             'seasonal': 1.0
         }
         
-        # Peak hour multiplier
-        if 17 <= booking_dt.hour <= 21:
-            multipliers['peak_hour'] = sport_data['pricing'].get('peak_hours_multiplier', 1.0)
-        
-        # Weekend multiplier
-        if booking_dt.weekday() >= 5:
-            multipliers['weekend'] = sport_data['pricing'].get('weekend_multiplier', 1.0)
+        # Peak hour and weekend multipliers
+        windows = sport_price_windows(sport_data)
+        minute = booking_dt.hour * 60 + booking_dt.minute
+        for name in ('peak_hour', 'weekend'):
+            multipliers[name] = float(window_multiplier(windows[name], booking_dt.weekday(), minute))
         
         # Duration multiplier (longer sessions get slight discount)
         if duration > sport_data['time_constraints']['preferred_duration']:
@@ -886,35 +899,37 @@ def generate_daily_availability(sport_data, date):
     
     return slots
 
-def calculate_popularity_score(sport_id):
-    """Calculate popularity score for a sport (simulated)"""
-    import random
-    base_scores = {
-        'football': 95,
-        'basketball': 88,
-        'tennis': 82,
-        'badminton': 75,
-        'swimming': 70,
-        'gym_fitness': 90,
-        'volleyball': 68,
-        'cricket': 85
+def sport_price_windows(sport_data):
+    """The sport's peak hour and weekend multipliers as ``bookings.pricing`` windows"""
+    pricing = sport_data['pricing']
+    peak = Decimal(str(pricing.get('peak_hours_multiplier', 1.0)))
+    weekend = Decimal(str(pricing.get('weekend_multiplier', 1.0)))
+    return {
+        'peak_hour': [(None, PEAK_HOURS[0], PEAK_HOURS[1], peak)],
+        'weekend': [(day, 0, MINUTES_PER_DAY, weekend) for day in WEEKEND_DAYS],
     }
-    
-    base = base_scores.get(sport_id, 70)
-    # Add some randomness to simulate real-time changes
-    return min(100, max(50, base + random.randint(-5, 5)))
 
-def calculate_next_price_change():
-    """Calculate when the next price change will occur"""
-    now = datetime.now()
-    
-    # Price changes at 5 PM (peak start) and 9 PM (peak end)
-    if now.hour < 17:
-        next_change = now.replace(hour=17, minute=0, second=0, microsecond=0)
-    elif now.hour < 21:
-        next_change = now.replace(hour=21, minute=0, second=0, microsecond=0)
-    else:
-        # Next day 5 PM
-        next_change = (now + timedelta(days=1)).replace(hour=17, minute=0, second=0, microsecond=0)
-    
-    return next_change.isoformat()
+def _recent_sport_bookings():
+    """Kept bookings of the last ``POPULARITY_DAYS`` days per sport type name (lowercased)"""
+    since = timezone.localdate() - timedelta(days=POPULARITY_DAYS)
+    rows = Booking.objects.filter(KEPT, booking_date__gte=since).exclude(
+        playground__sport_types__name=None
+    ).values('playground__sport_types__name').annotate(bookings=Count('id'))
+    return {row['playground__sport_types__name'].lower(): row['bookings'] for row in rows}
+
+
+def calculate_popularity_score(sport_id):
+    """Popularity score (50-100) of a sport from its recent bookings, relative to the most booked sport"""
+    counts = tiered_cache.get_or_set(
+        'sports:recent_bookings', _recent_sport_bookings, timeout=POPULARITY_CACHE_TIMEOUT
+    )
+    busiest = max(counts.values(), default=0)
+    if not busiest:
+        return 50
+    name = PROFESSIONAL_SPORT_TYPES.get(sport_id, {}).get('name', sport_id).lower()
+    return round(50 + 50 * counts.get(name, 0) / busiest)
+
+def calculate_next_price_change(windows):
+    """Calculate when the price set by the sport's price windows will next change"""
+    next_change = next_rate_change(windows, datetime.now())
+    return next_change.isoformat() if next_change else None
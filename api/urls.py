@@ -12,7 +12,9 @@ from .enhanced_owner_api import (
     real_time_availability, manage_booking_action, analytics_data,
     get_cities_by_state, get_states_by_country, earnings_summary,
     owner_dashboard_stats, pending_bookings_api, approve_booking, reject_booking,
-    todays_schedule_api, revenue_analytics_api, playground_performance_api,
+    todays_schedule_api, revenue_analytics_api, playground_performance_api, occupancy_heatmap_api,
+    cohort_analytics_api, revenue_projection_api, demand_forecast_api, bulk_cancel_bookings_api,
+    price_suggestions_api, accept_price_suggestions_api,
     live_notifications_api, get_playgrounds_api
 )
 from .playground_management import (
@@ -114,6 +116,13 @@ urlpatterns = [
     path('owner/todays-schedule/', todays_schedule_api, name='todays_schedule_api'),
     path('owner/revenue-analytics/', revenue_analytics_api, name='revenue_analytics_api'),
     path('owner/playground-performance/', playground_performance_api, name='playground_performance_api'),
+    path('owner/occupancy-heatmap/', occupancy_heatmap_api, name='occupancy_heatmap_api'),
+    path('owner/cohorts/', cohort_analytics_api, name='cohort_analytics_api'),
+    path('owner/revenue-projection/', revenue_projection_api, name='revenue_projection_api'),
+    path('owner/demand-forecast/', demand_forecast_api, name='demand_forecast_api'),
+    path('owner/price-suggestions/', price_suggestions_api, name='price_suggestions_api'),
+    path('owner/price-suggestions/accept/', accept_price_suggestions_api, name='accept_price_suggestions_api'),
+    path('owner/bulk-cancel/', bulk_cancel_bookings_api, name='bulk_cancel_bookings_api'),
     path('owner/notifications/', live_notifications_api, name='live_notifications_api'),
     
     # Enhanced Owner API endpoints
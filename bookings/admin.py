@@ -2,10 +2,17 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
+from django.db import transaction
 from django.db.models import Count, Sum
+from .coupons import release_uses
 from .models import Booking
+from .revenue import converted_sum, snapshot_exchange_rates
+from .rollups import refresh_daily_stats
 from accounts.models import User
+from playgrounds.currency import currency_symbol
+from playgrounds.exchange_rates import reporting_currency
 from playgrounds.models import Playground
+from playgrounds.signals import invalidate_bookings
 
 
 @admin.register(Booking)
@@ -308,25 +315,49 @@ class BookingAdmin(admin.ModelAdmin):
     # Custom actions
     def confirm_bookings(self, request, queryset):
         """Confirm selected bookings"""
-        updated = queryset.filter(status='pending').update(status='confirmed')
+        selected = queryset.filter(status='pending')
+        affected = list(selected.values_list('playground_id', 'booking_date').distinct())
+        snapshot_exchange_rates(selected)
+        updated = selected.update(status='confirmed')
+        invalidate_bookings(affected)
+        refresh_daily_stats(affected)
         self.message_user(request, f'{updated} bookings were confirmed.')
     confirm_bookings.short_description = "Confirm selected bookings"
     
     def cancel_bookings(self, request, queryset):
         """Cancel selected bookings"""
-        updated = queryset.exclude(status__in=['completed', 'cancelled']).update(status='cancelled')
+        with transaction.atomic():
+            ids = list(
+                queryset.exclude(status__in=['completed', 'cancelled']).select_for_update().values_list('id', flat=True)
+            )
+            selected = Booking.objects.filter(id__in=ids)
+            affected = list(selected.values_list('playground_id', 'booking_date').distinct())
+            release_uses(ids)
+            updated = selected.update(status='cancelled')
+        invalidate_bookings(affected)
+        refresh_daily_stats(affected)
         self.message_user(request, f'{updated} bookings were cancelled.')
     cancel_bookings.short_description = "Cancel selected bookings"
     
     def mark_as_completed(self, request, queryset):
         """Mark selected bookings as completed"""
-        updated = queryset.filter(status='confirmed').update(status='completed')
+        selected = queryset.filter(status='confirmed')
+        affected = list(selected.values_list('playground_id', 'booking_date').distinct())
+        snapshot_exchange_rates(selected)
+        updated = selected.update(status='completed')
+        invalidate_bookings(affected)
+        refresh_daily_stats(affected)
         self.message_user(request, f'{updated} bookings were marked as completed.')
     mark_as_completed.short_description = "Mark as completed"
     
     def mark_payment_as_paid(self, request, queryset):
         """Mark payment as paid for selected bookings"""
-        updated = queryset.filter(payment_status='pending').update(payment_status='paid')
+        selected = queryset.filter(payment_status='pending')
+        affected = list(selected.values_list('playground_id', 'booking_date').distinct())
+        snapshot_exchange_rates(selected)
+        updated = selected.update(payment_status='paid')
+        invalidate_bookings(affected)
+        refresh_daily_stats(affected)
         self.message_user(request, f'{updated} payments were marked as paid.')
     mark_payment_as_paid.short_description = "Mark payment as paid"
     
@@ -348,7 +379,7 @@ class BookingAdmin(admin.ModelAdmin):
         total_bookings = Booking.objects.count()
         total_revenue = Booking.objects.filter(
             payment_status='paid'
-        ).aggregate(Sum('final_amount'))['final_amount__sum'] or 0
+        ).aggregate(total=converted_sum())['total']
         
         pending_bookings = Booking.objects.filter(status='pending').count()
         confirmed_bookings = Booking.objects.filter(status='confirmed').count()
@@ -356,6 +387,7 @@ class BookingAdmin(admin.ModelAdmin):
         extra_context.update({
             'total_bookings': total_bookings,
             'total_revenue': total_revenue,
+            'revenue_currency_symbol': currency_symbol(reporting_currency()),
             'pending_bookings': pending_bookings,
             'confirmed_bookings': confirmed_bookings,
         })
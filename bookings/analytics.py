@@ -0,0 +1,161 @@
+"""
+Periodic refresh of the per-playground ``PlaygroundAnalytics`` rows.
+
+Booking times of every playground in the refresh are loaded once as arrays
+and binned into 7x24 demand histograms (hours booked per weekday and hour)
+together; customer and revenue figures come from grouped aggregates. The
+owner APIs read the stored rows instead of computing these per request.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Sum, Avg, F, Q
+from django.utils import timezone
+
+from playgrounds.models import Playground, PlaygroundAnalytics
+
+from .models import Booking
+from .occupancy import WEEKDAYS, hour_overlap
+from .rollups import PAID, KEPT
+
+
+DEFAULT_HISTORY_DAYS = 90
+TOP_HOURS = 3
+
+ANALYTICS_FIELDS = (
+    'total_bookings', 'total_revenue', 'monthly_revenue', 'average_booking_value',
+    'repeat_customer_rate', 'conversion_rate', 'peak_hours', 'popular_days', 'last_updated',
+)
+
+
+def demand_histograms(playground_ids, start_date, end_date):
+    """
+    Hours booked per (playground, weekday, hour) for kept bookings in the range.
+
+    Returns an array of shape (len(playground_ids), 7, 24), Monday first.
+    """
+    index = {playground_id: i for i, playground_id in enumerate(playground_ids)}
+    histograms = np.zeros((len(playground_ids), 7, 24))
+    rows = list(Booking.objects.filter(
+        KEPT,
+        playground_id__in=playground_ids,
+        booking_date__gte=start_date,
+        booking_date__lte=end_date,
+    ).values_list('playground_id', 'booking_date', 'start_time', 'end_time'))
+    if not rows:
+        return histograms
+
+    playgrounds = np.array([index[row[0]] for row in rows])
+    weekdays = np.array([row[1].weekday() for row in rows])
+    hours = hour_overlap(
+        [row[2].hour * 60 + row[2].minute for row in rows],
+        [row[3].hour * 60 + row[3].minute for row in rows],
+    )
+    np.add.at(histograms, (playgrounds, weekdays), hours)
+    return histograms
+
+
+def _peak_hours(histogram):
+    by_hour = histogram.sum(axis=0)
+    top = [int(hour) for hour in np.argsort(-by_hour, kind='stable')[:TOP_HOURS] if by_hour[hour] > 0]
+    return {
+        'by_hour': [round(value, 2) for value in by_hour.tolist()],
+        'by_weekday_hour': [[round(value, 2) for value in row] for row in histogram.tolist()],
+        'top': top,
+    }
+
+
+def _popular_days(histogram):
+    return {day: round(value, 2) for day, value in zip(WEEKDAYS, histogram.sum(axis=1).tolist())}
+
+
+def _percent(part, whole):
+    if not whole:
+        return Decimal('0')
+    return (Decimal(part) * 100 / Decimal(whole)).quantize(Decimal('0.01'))
+
+
+def refresh_playground_analytics(playground_ids=None, history_days=DEFAULT_HISTORY_DAYS):
+    """
+    Recompute ``PlaygroundAnalytics`` for the given playgrounds (default: all).
+
+    Demand histograms and the repeat-customer rate cover the last
+    ``history_days`` days; booking and revenue totals are all-time, monthly
+    revenue is the current month. The conversion rate compares views with the
+    bookings made since views started being counted. Returns the number of rows written.
+    """
+    playgrounds = Playground.objects.all()
+    if playground_ids is not None:
+        playgrounds = playgrounds.filter(id__in=playground_ids)
+    playground_ids = list(playgrounds.order_by('id').values_list('id', flat=True))
+    if not playground_ids:
+        return 0
+
+    now = timezone.now()
+    today = timezone.localdate(now)
+    history_start = today - timedelta(days=history_days - 1)
+    month_start = today.replace(day=1)
+    bookings = Booking.objects.filter(playground_id__in=playground_ids)
+
+    totals = {
+        row['playground_id']: row
+        for row in bookings.values('playground_id').annotate(
+            bookings=Count('id'),
+            revenue=Sum('final_amount', filter=PAID & KEPT),
+            monthly_revenue=Sum('final_amount', filter=PAID & KEPT & Q(booking_date__gte=month_start)),
+            average_value=Avg('final_amount', filter=KEPT),
+        ).order_by()
+    }
+
+    # Bookings made while total_views was being counted
+    viewed_bookings = dict(
+        bookings.filter(created_at__gte=F('playground__analytics__views_counted_since')).values(
+            'playground_id'
+        ).annotate(bookings=Count('id')).order_by().values_list('playground_id', 'bookings')
+    )
+
+    # Customers with kept bookings in the history window, and how many came back
+    customers = {}
+    for row in bookings.filter(KEPT, booking_date__gte=history_start).values(
+        'playground_id', 'user_id'
+    ).annotate(visits=Count('id')).order_by():
+        seen, repeat = customers.get(row['playground_id'], (0, 0))
+        customers[row['playground_id']] = (seen + 1, repeat + (row['visits'] > 1))
+
+    histograms = demand_histograms(playground_ids, history_start, today)
+    existing = {
+        row.playground_id: row
+        for row in PlaygroundAnalytics.objects.filter(playground_id__in=playground_ids)
+    }
+
+    to_create, to_update = [], []
+    for i, playground_id in enumerate(playground_ids):
+        analytics = existing.get(playground_id)
+        if analytics is None:
+            analytics = PlaygroundAnalytics(playground_id=playground_id)
+            to_create.append(analytics)
+        else:
+            to_update.append(analytics)
+
+        row = totals.get(playground_id, {})
+        seen, repeat = customers.get(playground_id, (0, 0))
+        analytics.total_bookings = row.get('bookings', 0)
+        analytics.total_revenue = row.get('revenue') or 0
+        analytics.monthly_revenue = row.get('monthly_revenue') or 0
+        analytics.average_booking_value = row.get('average_value') or 0
+        analytics.repeat_customer_rate = _percent(repeat, seen)
+        # Share of detail page views that turned into a booking
+        analytics.conversion_rate = min(
+            _percent(viewed_bookings.get(playground_id, 0), analytics.total_views), Decimal('100')
+        )
+        analytics.peak_hours = _peak_hours(histograms[i])
+        analytics.popular_days = _popular_days(histograms[i])
+        analytics.last_updated = now
+
+    with transaction.atomic():
+        PlaygroundAnalytics.objects.bulk_create(to_create)
+        PlaygroundAnalytics.objects.bulk_update(to_update, ANALYTICS_FIELDS)
+    return len(playground_ids)
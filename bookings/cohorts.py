@@ -0,0 +1,123 @@
+"""
+Customer cohorts and retention over bookings.
+
+Customers are bucketed by the month of their first kept booking at the given
+playgrounds; month-N retention is the share of a cohort that booked again N
+months later, and the repeat rate the share with more than one booking.
+Only bookings up to today count: future months have no cohorts yet.
+
+Bookings are streamed in id order as (user, month) pairs into compact integer
+arrays, so no model instances are built however long the history is.
+Results are cached per owner and invalidated with the playgrounds' booking
+cache tags.
+"""
+
+from array import array
+
+import numpy as np
+from django.utils import timezone
+
+from playground_booking.caching import tiered_cache
+from playgrounds.signals import playground_booking_tags
+
+from .models import Booking
+from .rollups import KEPT
+
+
+DEFAULT_MONTHS = 12
+CHUNK_SIZE = 5000
+CACHE_TIMEOUT = 900
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _percent(part, whole):
+    return round(float(part) * 100 / int(whole), 2) if whole else 0.0
+
+
+def cohort_analytics(playground_ids, months=DEFAULT_MONTHS):
+    """
+    Retention of the customer cohorts that started in the last ``months``
+    months at the given playgrounds.
+
+    Returns ``{'customers', 'repeat_customers', 'repeat_customer_rate',
+    'cohorts': [{'month', 'size', 'repeat_rate', 'retention'}]}`` where
+    ``retention[n]`` is the month-n retention percentage, or None for months
+    that haven't happened yet.
+    """
+    today = timezone.localdate()
+    users = array('q')
+    booked_months = array('q')
+    rows = Booking.objects.filter(
+        KEPT, playground_id__in=list(playground_ids), booking_date__lte=today
+    ).order_by('id').values_list('user_id', 'booking_date')
+    for user_id, booking_date in rows.iterator(chunk_size=CHUNK_SIZE):
+        users.append(user_id)
+        booked_months.append(_month_index(booking_date))
+
+    result = {'customers': 0, 'repeat_customers': 0, 'repeat_customer_rate': 0.0, 'cohorts': []}
+    if not users:
+        return result
+
+    users = np.frombuffer(users, dtype=np.int64)
+    booked_months = np.frombuffer(booked_months, dtype=np.int64)
+    _, user_index, bookings_per_user = np.unique(users, return_inverse=True, return_counts=True)
+
+    first_month = np.full(len(bookings_per_user), np.iinfo(np.int64).max)
+    np.minimum.at(first_month, user_index, booked_months)
+    repeat = bookings_per_user > 1
+
+    result['customers'] = int(len(bookings_per_user))
+    result['repeat_customers'] = int(repeat.sum())
+    result['repeat_customer_rate'] = _percent(result['repeat_customers'], result['customers'])
+
+    current_month = _month_index(today)
+    first_cohort = current_month - months + 1
+    in_window = first_month >= first_cohort
+
+    # Distinct (customer, months since first booking) pairs, within the window
+    offsets = booked_months - first_month[user_index]
+    keep = in_window[user_index] & (offsets < months)
+    active = np.unique(user_index[keep] * months + offsets[keep])
+    active_users, active_offsets = np.divmod(active, months)
+
+    cohort_slot = first_month - first_cohort
+    retained = np.zeros((months, months), dtype=np.int64)
+    np.add.at(retained, (cohort_slot[active_users], active_offsets), 1)
+    sizes = np.bincount(cohort_slot[in_window], minlength=months)
+    repeats = np.bincount(cohort_slot[in_window], weights=repeat[in_window], minlength=months)
+
+    for slot in range(months):
+        if not sizes[slot]:
+            continue
+        elapsed = months - 1 - slot
+        result['cohorts'].append({
+            'month': _month_label(first_cohort + slot),
+            'size': int(sizes[slot]),
+            'repeat_rate': _percent(repeats[slot], sizes[slot]),
+            'retention': [
+                _percent(retained[slot, n], sizes[slot]) if n <= elapsed else None
+                for n in range(months)
+            ],
+        })
+    return result
+
+
+def owner_cohort_analytics(owner, playground_id=None, months=DEFAULT_MONTHS):
+    """Cached ``cohort_analytics`` over an owner's playgrounds (or one of them)"""
+    playgrounds = owner.playgrounds.all()
+    if playground_id:
+        playgrounds = playgrounds.filter(id=playground_id)
+    playground_ids = list(playgrounds.order_by('id').values_list('id', flat=True))
+
+    tags = [tag for pid in playground_ids for tag in playground_booking_tags(pid)]
+    key = f"owner:{owner.id}:cohorts:{playground_id or 'all'}:{months}"
+    return tiered_cache.get_or_set(
+        key, lambda: cohort_analytics(playground_ids, months), timeout=CACHE_TIMEOUT, tags=tags
+    )
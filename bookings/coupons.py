@@ -0,0 +1,190 @@
+"""
+Coupon lookup and redemption.
+
+Coupon definitions are read through the tiered cache by code; ``used_count``
+is never cached. Redemption enforces the limits in the database rather than
+in Python:
+
+- the global limit with a conditional ``UPDATE ... SET used_count =
+  used_count + 1 WHERE used_count < max_uses``, which succeeds for at most
+  ``max_uses`` redemptions however many checkouts race for the last one;
+- the per-user limit by counting the user's redemptions after that UPDATE,
+  in the same transaction. The UPDATE holds the coupon row lock until
+  commit, so redemptions of one coupon are serialized and the count sees
+  every earlier one; going over the limit rolls the increment back.
+
+Cancelling a booking gives its coupon use back (``release_uses``): the
+global count goes down and the per-user count leaves cancelled bookings
+out. The booking keeps its discount, which is what the customer paid and
+what refunds are computed on.
+
+``manage.py coupon_load_test`` races many concurrent redemptions against one
+coupon and checks that neither limit is exceeded.
+"""
+
+from collections import Counter
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from playground_booking.caching import tiered_cache
+from playgrounds.signals import invalidate_bookings
+
+from .models import Booking, BookingCoupon, Coupon
+from .pricing import apply_discount
+from .rollups import refresh_daily_stats
+
+
+CACHE_TIMEOUT = 600
+
+
+def normalize_code(code):
+    return (code or '').strip().upper()
+
+
+def coupon_tags(code):
+    return [f"coupon:{normalize_code(code)}"]
+
+
+def _load(code):
+    coupon = Coupon.objects.filter(code__iexact=code).first()
+    if coupon is None:
+        return None
+    return {
+        'id': coupon.id,
+        'code': coupon.code,
+        'discount_type': coupon.discount_type,
+        'discount_value': coupon.discount_value,
+        'minimum_amount': coupon.minimum_amount,
+        'max_uses': coupon.max_uses,
+        'max_uses_per_user': coupon.max_uses_per_user,
+        'valid_from': coupon.valid_from,
+        'valid_until': coupon.valid_until,
+        'is_active': coupon.is_active,
+        'playground_ids': frozenset(coupon.applicable_playgrounds.values_list('id', flat=True)),
+        'user_ids': frozenset(coupon.applicable_users.values_list('id', flat=True)),
+    }
+
+
+def get_coupon(code):
+    """Cached coupon definition for ``code`` (case-insensitive), or None"""
+    code = normalize_code(code)
+    if not code:
+        return None
+    return tiered_cache.get_or_set(
+        f"coupon:definition:{code}", lambda: _load(code), timeout=CACHE_TIMEOUT, tags=coupon_tags(code)
+    )
+
+
+def discount_for(coupon, amount):
+    """Discount ``coupon`` (a definition from ``get_coupon``) gives on ``amount``"""
+    return apply_discount(amount, coupon['discount_type'], coupon['discount_value'])
+
+
+def check(code, user, playground_id, amount):
+    """
+    Validate a coupon for a checkout without redeeming it. Returns
+    ``(coupon, discount)``; raises ``ValidationError`` when it doesn't apply.
+    The usage limits are only checked for certain by ``redeem``.
+    """
+    coupon = get_coupon(code)
+    if coupon is None:
+        raise ValidationError('Invalid coupon code', code='not_found')
+    now = timezone.now()
+    if not coupon['is_active'] or not coupon['valid_from'] <= now <= coupon['valid_until']:
+        raise ValidationError('This coupon is not valid at the moment', code='expired')
+    if coupon['playground_ids'] and playground_id not in coupon['playground_ids']:
+        raise ValidationError('This coupon does not apply to this playground', code='not_applicable')
+    if coupon['user_ids'] and getattr(user, 'id', user) not in coupon['user_ids']:
+        raise ValidationError('This coupon is not available for your account', code='not_applicable')
+    if Decimal(str(amount)) < coupon['minimum_amount']:
+        raise ValidationError(
+            f"This coupon needs a booking of at least {coupon['minimum_amount']}", code='minimum_amount'
+        )
+    return coupon, discount_for(coupon, amount)
+
+
+def redeem(code, booking):
+    """
+    Apply a coupon to ``booking`` and count the use, atomically.
+
+    The discount is taken off the booking's ``final_amount``. Returns the
+    ``BookingCoupon``; raises ``ValidationError`` when the coupon doesn't
+    apply or a usage limit is reached.
+    """
+    coupon, discount = check(code, booking.user_id, booking.playground_id, booking.final_amount)
+    now = timezone.now()
+    with transaction.atomic():
+        taken = Coupon.objects.filter(
+            pk=coupon['id'], is_active=True, valid_from__lte=now, valid_until__gte=now,
+            used_count__lt=F('max_uses'),
+        ).update(used_count=F('used_count') + 1)
+        if not taken:
+            raise ValidationError('This coupon has been fully redeemed', code='exhausted')
+
+        # Counted under the coupon row lock taken by the UPDATE above
+        used_by_user = BookingCoupon.objects.filter(
+            coupon_id=coupon['id'], booking__user_id=booking.user_id
+        ).exclude(booking__status='cancelled').count()
+        if used_by_user >= coupon['max_uses_per_user']:
+            raise ValidationError('You have already used this coupon', code='user_limit')
+        if BookingCoupon.objects.filter(booking=booking).exists():
+            raise ValidationError('A coupon is already applied to this booking', code='already_applied')
+
+        usage = BookingCoupon.objects.create(booking=booking, coupon_id=coupon['id'], discount_amount=discount)
+        Booking.objects.filter(pk=booking.pk).update(
+            discount_amount=F('discount_amount') + discount,
+            final_amount=F('final_amount') - discount,
+        )
+        _bookings_changed(booking)
+    booking.refresh_from_db(fields=['discount_amount', 'final_amount'])
+    return usage
+
+
+def release(booking):
+    """Take a booking's coupon off it again and give the use back"""
+    with transaction.atomic():
+        usage = BookingCoupon.objects.select_for_update().filter(booking=booking).first()
+        if usage is None:
+            return None
+        # A cancelled booking's use was already given back by release_uses
+        if not Booking.objects.filter(pk=booking.pk, status='cancelled').exists():
+            Coupon.objects.filter(pk=usage.coupon_id, used_count__gt=0).update(used_count=F('used_count') - 1)
+        Booking.objects.filter(pk=booking.pk).update(
+            discount_amount=F('discount_amount') - usage.discount_amount,
+            final_amount=F('final_amount') + usage.discount_amount,
+        )
+        usage.delete()
+        _bookings_changed(booking)
+    booking.refresh_from_db(fields=['discount_amount', 'final_amount'])
+    return usage
+
+
+def release_uses(booking_ids):
+    """
+    Give back the coupon uses of bookings being cancelled, in bulk. Call it
+    once per booking, in the transaction that cancels it; the bookings keep
+    their discounts. Returns the number of uses given back.
+    """
+    uses = Counter(
+        BookingCoupon.objects.filter(booking_id__in=list(booking_ids)).values_list('coupon_id', flat=True)
+    )
+    if uses:
+        Coupon.objects.filter(pk__in=uses).update(used_count=Greatest(
+            F('used_count') - Case(
+                *[When(pk=coupon_id, then=Value(count)) for coupon_id, count in uses.items()],
+                default=Value(0), output_field=IntegerField(),
+            ),
+            Value(0),
+        ))
+    return sum(uses.values())
+
+
+def _bookings_changed(booking):
+    affected = [(booking.playground_id, booking.booking_date)]
+    transaction.on_commit(lambda: invalidate_bookings(affected))
+    transaction.on_commit(lambda: refresh_daily_stats(affected))
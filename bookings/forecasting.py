@@ -0,0 +1,185 @@
+"""
+Demand forecasts per (playground, weekday, hour).
+
+Booked hours of the last ``HISTORY_WEEKS`` weeks are binned into weekly 7x24
+histograms for a batch of playgrounds at once, shape (playgrounds, weeks, 168),
+and every hour-of-week series is smoothed together with damped-trend
+exponential smoothing (Holt), one vectorized step per week. Only the final
+level and trend grids are stored on ``PlaygroundAnalytics.demand_forecast``;
+the forecast ``h`` weeks ahead is derived from them on read:
+
+    forecast(h) = max(level + trend * (phi + phi**2 + ... + phi**h), 0)
+
+Playgrounds are processed in chunks of ``CHUNK_SIZE`` so memory stays bounded
+however many there are; each chunk is one streamed booking query and one
+bulk write.
+"""
+
+from array import array
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from playgrounds.models import Playground, PlaygroundAnalytics
+
+from .models import Booking
+from .occupancy import hour_overlap
+from .rollups import KEPT
+
+
+HISTORY_WEEKS = 12
+FORECAST_WEEKS = 4
+CHUNK_SIZE = 500
+STREAM_CHUNK_SIZE = 5000
+
+# Smoothing of the level, of the trend, and trend damping per week ahead
+ALPHA = 0.3
+BETA = 0.1
+PHI = 0.9
+
+
+def weekly_histograms(playground_ids, start_date, weeks):
+    """
+    Booked hours per (playground, week, hour of week) for kept bookings from
+    ``start_date`` on. Week ``w`` holds the seven days starting at
+    ``start_date + w weeks``; hours of the week are indexed
+    ``weekday * 24 + hour``, Monday first.
+    """
+    index = {playground_id: i for i, playground_id in enumerate(playground_ids)}
+    histograms = np.zeros((len(playground_ids) * weeks * 7, 24))
+
+    playgrounds, days, starts, ends = array('q'), array('q'), array('q'), array('q')
+    rows = Booking.objects.filter(
+        KEPT,
+        playground_id__in=playground_ids,
+        booking_date__gte=start_date,
+        booking_date__lt=start_date + timedelta(weeks=weeks),
+    ).order_by().values_list('playground_id', 'booking_date', 'start_time', 'end_time')
+    for playground_id, booking_date, start_time, end_time in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        playgrounds.append(index[playground_id])
+        days.append(booking_date.toordinal())
+        starts.append(start_time.hour * 60 + start_time.minute)
+        ends.append(end_time.hour * 60 + end_time.minute)
+
+    if playgrounds:
+        days = np.frombuffer(days, dtype=np.int64)
+        week, _ = np.divmod(days - start_date.toordinal(), 7)
+        # date(1, 1, 1) has ordinal 1 and was a Monday
+        weekday = (days - 1) % 7
+        cell = (np.frombuffer(playgrounds, dtype=np.int64) * weeks + week) * 7 + weekday
+        overlap = hour_overlap(starts, ends)
+        for hour in range(24):
+            histograms[:, hour] = np.bincount(cell, weights=overlap[:, hour], minlength=len(histograms))
+
+    return histograms.reshape(len(playground_ids), weeks, 7 * 24)
+
+
+def smooth(histograms, alpha=ALPHA, beta=BETA, phi=PHI):
+    """
+    Damped-trend exponential smoothing along the week axis.
+
+    Each playground's series start at its first week with any booking, so
+    playgrounds that are new within the history aren't dragged down by the
+    empty weeks before them. Returns (level, trend, has_history), the first
+    two of shape (playgrounds, 168).
+    """
+    playgrounds, weeks, cells = histograms.shape
+    booked = histograms.sum(axis=2) > 0
+    has_history = booked.any(axis=1)
+    first_week = np.where(has_history, booked.argmax(axis=1), weeks)
+
+    level = np.zeros((playgrounds, cells))
+    trend = np.zeros((playgrounds, cells))
+    for week in range(weeks):
+        observed = histograms[:, week]
+        starting = (first_week == week).reshape(-1, 1)
+        running = (first_week < week).reshape(-1, 1)
+        new_level = alpha * observed + (1 - alpha) * (level + phi * trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        level = np.where(starting, observed, np.where(running, new_level, level))
+        trend = np.where(running, new_trend, trend)
+    return level, trend, has_history
+
+
+def forecast_weeks(level, trend, weeks=FORECAST_WEEKS, phi=PHI):
+    """Forecast hours for each of the next ``weeks`` weeks, shape (..., weeks, 168)"""
+    level = np.asarray(level, dtype=float)
+    trend = np.asarray(trend, dtype=float)
+    damping = np.cumsum(phi ** np.arange(1, weeks + 1)).reshape(-1, 1)
+    return np.maximum(level[..., np.newaxis, :] + trend[..., np.newaxis, :] * damping, 0)
+
+
+def stored_forecast(demand_forecast, weeks=FORECAST_WEEKS):
+    """
+    Weekly forecasts from a stored ``demand_forecast`` value.
+
+    Returns a list of ``{'start_date', 'end_date', 'total', 'by_weekday_hour'}``
+    dicts (7x24 grids, Monday first), empty when nothing was forecast.
+    """
+    if not demand_forecast or 'level' not in demand_forecast:
+        return []
+    grids = forecast_weeks(demand_forecast['level'], demand_forecast['trend'], weeks,
+                           demand_forecast.get('phi', PHI))
+    start_date = date.fromisoformat(demand_forecast['start_date'])
+    return [
+        {
+            'start_date': (start_date + timedelta(weeks=week)).isoformat(),
+            'end_date': (start_date + timedelta(weeks=week, days=6)).isoformat(),
+            'total': round(float(grid.sum()), 2),
+            'by_weekday_hour': np.round(grid.reshape(7, 24), 2).tolist(),
+        }
+        for week, grid in enumerate(grids)
+    ]
+
+
+def _stored(level, trend, start_date, history_weeks):
+    return {
+        'start_date': start_date.isoformat(),
+        'history_weeks': history_weeks,
+        'phi': PHI,
+        'level': np.round(level, 3).tolist(),
+        'trend': np.round(trend, 3).tolist(),
+    }
+
+
+def refresh_demand_forecasts(playground_ids=None, history_weeks=HISTORY_WEEKS, chunk_size=CHUNK_SIZE):
+    """
+    Recompute ``PlaygroundAnalytics.demand_forecast`` for the given playgrounds
+    (default: all) from the ``history_weeks`` weeks up to yesterday. Forecasts
+    start today. Returns the number of playgrounds processed.
+    """
+    playgrounds = Playground.objects.all()
+    if playground_ids is not None:
+        playgrounds = playgrounds.filter(id__in=playground_ids)
+    playground_ids = list(playgrounds.order_by('id').values_list('id', flat=True))
+
+    today = timezone.localdate()
+    history_start = today - timedelta(weeks=history_weeks)
+
+    for offset in range(0, len(playground_ids), chunk_size):
+        chunk = playground_ids[offset:offset + chunk_size]
+        level, trend, has_history = smooth(weekly_histograms(chunk, history_start, history_weeks))
+
+        existing = {
+            row.playground_id: row
+            for row in PlaygroundAnalytics.objects.filter(playground_id__in=chunk).only('id', 'playground_id')
+        }
+        to_create, to_update = [], []
+        for i, playground_id in enumerate(chunk):
+            analytics = existing.get(playground_id)
+            if analytics is None:
+                analytics = PlaygroundAnalytics(playground_id=playground_id)
+                to_create.append(analytics)
+            else:
+                to_update.append(analytics)
+            analytics.demand_forecast = (
+                _stored(level[i], trend[i], today, history_weeks) if has_history[i] else {}
+            )
+
+        with transaction.atomic():
+            PlaygroundAnalytics.objects.bulk_create(to_create)
+            PlaygroundAnalytics.objects.bulk_update(to_update, ['demand_forecast'])
+
+    return len(playground_ids)
@@ -0,0 +1,36 @@
+"""
+Management command to rebuild the PlaygroundDailyStats rollup from bookings
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.rollups import backfill_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-playground daily booking/revenue rollup from bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First booking date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last booking date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--playground', type=int, action='append', dest='playgrounds',
+                            help='Only rebuild this playground id (repeatable)')
+
+    def _parse_date(self, value, name):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'--{name} must be a date in YYYY-MM-DD format')
+
+    def handle(self, *args, **options):
+        start_date = self._parse_date(options['start'], 'start')
+        end_date = self._parse_date(options['end'], 'end')
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        written = backfill_daily_stats(start_date, end_date, options['playgrounds'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} daily stats rows'))
@@ -0,0 +1,114 @@
+"""
+Management command racing concurrent coupon redemptions against one coupon
+to check that the usage limits hold under load
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from django.utils import timezone
+
+from accounts.models import User
+from bookings.coupons import redeem
+from bookings.models import Booking, BookingCoupon, Coupon
+from playgrounds.models import Playground
+
+
+class Command(BaseCommand):
+    help = (
+        'Redeem one throwaway coupon from many threads at once and verify that '
+        'max_uses and max_uses_per_user are never exceeded. Creates and removes '
+        'its own coupon, users and bookings; run it against a staging database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--playground', type=int, required=True, help='Playground to book for the test')
+        parser.add_argument('--max-uses', type=int, default=20)
+        parser.add_argument('--per-user', type=int, default=2, help='max_uses_per_user of the test coupon')
+        parser.add_argument('--users', type=int, default=30)
+        parser.add_argument('--attempts', type=int, default=200, help='Redemptions attempted in total')
+        parser.add_argument('--workers', type=int, default=32, help='Concurrent threads')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite serializes all writes; use PostgreSQL for a meaningful run'))
+        try:
+            playground = Playground.objects.get(pk=options['playground'])
+        except Playground.DoesNotExist:
+            raise CommandError('Playground not found')
+
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        now = timezone.now()
+        coupon = Coupon.objects.create(
+            code=f'LOADTEST{stamp}', description='Coupon load test', discount_type='fixed',
+            discount_value=Decimal('1'), max_uses=options['max_uses'], max_uses_per_user=options['per_user'],
+            valid_from=now - timedelta(minutes=1), valid_until=now + timedelta(hours=1),
+        )
+        users = [
+            User.objects.create_user(email=f'loadtest{stamp}-{i}@example.com', password=None)
+            for i in range(options['users'])
+        ]
+        # Far-future dates so the test bookings never collide with real ones
+        first_day = date(2099, 1, 1)
+        bookings = [
+            Booking.objects.create(
+                user=users[i % len(users)], playground=playground,
+                booking_date=first_day + timedelta(days=i // 24), start_time=time(i % 24),
+                end_time=time((i % 24 + 1) % 24), duration_hours=1, price_per_hour=10,
+                total_amount=10, final_amount=10, contact_phone='0',
+            )
+            for i in range(options['attempts'])
+        ]
+
+        def attempt(booking):
+            try:
+                redeem(coupon.code, booking)
+                return 'redeemed'
+            except ValidationError as e:
+                return e.code
+            except OperationalError:
+                # Lock timeouts (SQLite: "database is locked") roll the attempt back
+                return 'db_error'
+            finally:
+                close_old_connections()
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                outcomes = list(pool.map(attempt, bookings))
+
+            coupon.refresh_from_db()
+            usages = BookingCoupon.objects.filter(coupon=coupon)
+            per_user = {}
+            for user_id in usages.values_list('booking__user_id', flat=True):
+                per_user[user_id] = per_user.get(user_id, 0) + 1
+
+            summary = {outcome: outcomes.count(outcome) for outcome in set(outcomes)}
+            self.stdout.write(f'Outcomes: {summary}')
+            self.stdout.write(f'used_count={coupon.used_count}, redemptions={usages.count()}, '
+                              f'max per user={max(per_user.values(), default=0)}')
+
+            problems = []
+            if coupon.used_count > coupon.max_uses:
+                problems.append(f'used_count {coupon.used_count} exceeds max_uses {coupon.max_uses}')
+            if coupon.used_count != usages.count():
+                problems.append(f'used_count {coupon.used_count} != {usages.count()} redemptions')
+            # An attempt that failed on a database error may still have committed
+            redeemed, errors = summary.get('redeemed', 0), summary.get('db_error', 0)
+            if not redeemed <= usages.count() <= redeemed + errors:
+                problems.append('reported redemptions differ from stored ones')
+            if any(count > coupon.max_uses_per_user for count in per_user.values()):
+                problems.append('a user exceeded max_uses_per_user')
+            if problems:
+                raise CommandError('; '.join(problems))
+            if errors:
+                self.stdout.write(self.style.WARNING(f'{errors} attempts failed on database errors'))
+            self.stdout.write(self.style.SUCCESS('No over-redemption'))
+        finally:
+            Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            coupon.delete()
@@ -0,0 +1,28 @@
+"""
+Management command to recompute the per-playground demand forecasts
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.forecasting import refresh_demand_forecasts, HISTORY_WEEKS, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Forecast bookings per weekday and hour for the coming weeks from booking history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=HISTORY_WEEKS,
+                            help='Weeks of booking history to smooth over')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Playgrounds forecast per batch')
+        parser.add_argument('--playground', type=int, action='append', dest='playgrounds',
+                            help='Only forecast this playground id (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['weeks'] < 1:
+            raise CommandError('--weeks must be at least 1')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        written = refresh_demand_forecasts(options['playgrounds'], options['weeks'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Forecast demand for {written} playgrounds'))
@@ -0,0 +1,36 @@
+"""
+Management command to thumbnail and fingerprint payment receipts that
+haven't been processed (backfill, or uploads whose task was lost)
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from bookings.models import Booking
+from bookings.receipts import process_receipt
+
+
+class Command(BaseCommand):
+    help = 'Create receipt thumbnails and perceptual hashes for unprocessed payment receipts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reprocess every receipt')
+
+    def handle(self, *args, **options):
+        bookings = Booking.objects.exclude(Q(payment_receipt__isnull=True) | Q(payment_receipt=''))
+        if not options['all']:
+            bookings = bookings.filter(
+                Q(receipt_fingerprint__isnull=True) | ~Q(receipt_fingerprint__receipt_name=F('payment_receipt'))
+            )
+
+        processed = duplicates = 0
+        # Oldest first so the earlier receipt is the original and later copies get flagged
+        for booking_id in bookings.order_by('id').values_list('id', flat=True).iterator():
+            fingerprint = process_receipt(booking_id)
+            if fingerprint is None:
+                continue
+            processed += 1
+            duplicates += fingerprint.duplicate_of_id is not None
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {processed} receipts, {duplicates} suspected duplicates'
+        ))
@@ -0,0 +1,24 @@
+"""
+Management command to recompute PlaygroundAnalytics from booking history
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.analytics import refresh_playground_analytics, DEFAULT_HISTORY_DAYS
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-playground demand histograms, repeat-customer rate and revenue analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_HISTORY_DAYS,
+                            help='Days of booking history behind the demand histograms')
+        parser.add_argument('--playground', type=int, action='append', dest='playgrounds',
+                            help='Only refresh this playground id (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        written = refresh_playground_analytics(options['playgrounds'], options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed analytics for {written} playgrounds'))
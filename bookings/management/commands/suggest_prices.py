@@ -0,0 +1,28 @@
+"""
+Management command to recompute the per-playground price suggestions
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.price_advisor import refresh_price_suggestions, HISTORY_WEEKS, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Suggest price multipliers per weekday and hour from booking density and lead times'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=HISTORY_WEEKS,
+                            help='Weeks of booking history to measure demand over')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Playgrounds processed per batch')
+        parser.add_argument('--playground', type=int, action='append', dest='playgrounds',
+                            help='Only process this playground id (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['weeks'] < 1:
+            raise CommandError('--weeks must be at least 1')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        written = refresh_price_suggestions(options['playgrounds'], options['weeks'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Suggested prices for {written} playgrounds'))
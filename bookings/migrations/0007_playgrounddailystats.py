@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playgrounds', '0011_popularplayground'),
+        ('bookings', '0006_booking_verified_at_booking_verified_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaygroundDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings_total', models.PositiveIntegerField(default=0)),
+                ('bookings_pending', models.PositiveIntegerField(default=0)),
+                ('bookings_confirmed', models.PositiveIntegerField(default=0)),
+                ('bookings_completed', models.PositiveIntegerField(default=0)),
+                ('bookings_cancelled', models.PositiveIntegerField(default=0)),
+                ('bookings_no_show', models.PositiveIntegerField(default=0)),
+                ('gross_revenue', models.DecimalField(decimal_places=2, default=0, help_text='final_amount of paid bookings, any status', max_digits=12)),
+                ('net_revenue', models.DecimalField(decimal_places=2, default=0, help_text='final_amount of paid confirmed/completed bookings', max_digits=12)),
+                ('booked_value', models.DecimalField(decimal_places=2, default=0, help_text='final_amount of confirmed/completed bookings, paid or not', max_digits=12)),
+                ('refunded_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('players', models.PositiveIntegerField(default=0)),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('playground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='playgrounds.playground')),
+            ],
+            options={
+                'verbose_name_plural': 'Playground daily stats',
+                'ordering': ['date'],
+                'unique_together': {('playground', 'date')},
+            },
+        ),
+    ]
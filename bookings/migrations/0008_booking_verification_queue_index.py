@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_playgrounddailystats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['receipt_verified', 'created_at', 'id'], name='bookings_bo_receipt_e77390_idx'),
+        ),
+    ]
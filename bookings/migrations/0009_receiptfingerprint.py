@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_verification_queue_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('receipt_name', models.CharField(max_length=255)),
+                ('thumbnail', models.ImageField(blank=True, null=True, upload_to='payment_receipts/thumbnails/')),
+                ('average_hash', models.BigIntegerField(db_index=True)),
+                ('difference_hash', models.BigIntegerField(db_index=True)),
+                ('dhash_band0', models.PositiveIntegerField(db_index=True)),
+                ('dhash_band1', models.PositiveIntegerField(db_index=True)),
+                ('dhash_band2', models.PositiveIntegerField(db_index=True)),
+                ('dhash_band3', models.PositiveIntegerField(db_index=True)),
+                ('duplicate_distance', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='receipt_fingerprint', to='bookings.booking')),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicate_receipts', to='bookings.booking')),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:36
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_currency(apps, schema_editor):
+    """Existing bookings are in their playground's currency; their rates are left to the current ones"""
+    Booking = apps.get_model('bookings', 'Booking')
+    Playground = apps.get_model('playgrounds', 'Playground')
+    Booking.objects.filter(currency='').update(
+        currency=Subquery(Playground.objects.filter(pk=OuterRef('playground_id')).values('currency')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_receiptfingerprint'),
+        ('playgrounds', '0014_playgroundanalytics_price_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='currency',
+            field=models.CharField(blank=True, default='', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='exchange_rate',
+            field=models.DecimalField(blank=True, decimal_places=8, max_digits=18, null=True),
+        ),
+        migrations.RunPython(backfill_currency, migrations.RunPython.noop),
+    ]
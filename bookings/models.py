@@ -2,10 +2,15 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from accounts.models import User
+from playgrounds.exchange_rates import rate_to_reporting
 from playgrounds.models import Playground, TimeSlot
 import uuid
 
 
+# Bookings get their exchange rate snapshot once they reach one of these (or are paid)
+RATE_SNAPSHOT_STATUSES = ('confirmed', 'completed')
+
+
 def default_dict():
     return {}
 
@@ -42,6 +47,10 @@ class Booking(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     final_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # The playground's currency when booked, and its rate to the reporting
+    # currency when the booking was confirmed or paid (bookings.revenue)
+    currency = models.CharField(max_length=3, blank=True, default='')
+    exchange_rate = models.DecimalField(max_digits=18, decimal_places=8, null=True, blank=True)
     
     # Status
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
@@ -96,10 +105,26 @@ class Booking(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['playground', 'booking_date', 'start_time', 'end_time']
+        indexes = [
+            # Keyset pagination of the payment verification queue
+            models.Index(fields=['receipt_verified', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Booking {self.booking_id} - {self.playground.name} on {self.booking_date}"
     
+    def save(self, *args, **kwargs):
+        snapshot = []
+        if not self.currency and self.playground_id:
+            self.currency = self.playground.currency
+            snapshot.append('currency')
+        if self.exchange_rate is None and (self.status in RATE_SNAPSHOT_STATUSES or self.payment_status == 'paid'):
+            self.exchange_rate = rate_to_reporting(self.currency)
+            snapshot.append('exchange_rate')
+        if snapshot and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *snapshot}
+        super().save(*args, **kwargs)
+    
     @property
     def is_upcoming(self):
         from datetime import datetime
@@ -165,28 +190,9 @@ class Booking(models.Model):
         - 24-48 hours before: 50% refund
         - Less than 24 hours: No refund
         """
-        from datetime import datetime, timedelta
-        from decimal import Decimal
-        
-        # Make sure booking hasn't already passed
-        booking_datetime = datetime.combine(self.booking_date, self.start_time)
-        booking_datetime = timezone.make_aware(booking_datetime)
-        
-        if booking_datetime <= timezone.now():
-            return Decimal('0')  # No refund for past bookings
-        
-        hours_until_booking = (booking_datetime - timezone.now()).total_seconds() / 3600
+        from .refunds import refund_for, starts_at
         
-        # Refund policy based on hours until booking
-        if hours_until_booking >= 48:
-            # Full refund (100%)
-            return self.final_amount
-        elif hours_until_booking >= 24:
-            # Partial refund (50%)
-            return self.final_amount * Decimal('0.5')
-        else:
-            # No refund
-            return Decimal('0')
+        return refund_for(self.final_amount, starts_at(self.booking_date, self.start_time))
 
 
 class BookingPayment(models.Model):
@@ -297,3 +303,69 @@ class BookingCoupon(models.Model):
     
     def __str__(self):
         return f"Coupon {self.coupon.code} used for Booking {self.booking.booking_id}"
+
+
+class PlaygroundDailyStats(models.Model):
+    """
+    Per-playground, per-day rollup of bookings keyed by booking_date.
+    Maintained by bookings.rollups; rebuild with `manage.py backfill_daily_stats`.
+    """
+    playground = models.ForeignKey(Playground, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    
+    # Booking counts by status
+    bookings_total = models.PositiveIntegerField(default=0)
+    bookings_pending = models.PositiveIntegerField(default=0)
+    bookings_confirmed = models.PositiveIntegerField(default=0)
+    bookings_completed = models.PositiveIntegerField(default=0)
+    bookings_cancelled = models.PositiveIntegerField(default=0)
+    bookings_no_show = models.PositiveIntegerField(default=0)
+    
+    # Revenue
+    gross_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                        help_text="final_amount of paid bookings, any status")
+    net_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                      help_text="final_amount of paid confirmed/completed bookings")
+    booked_value = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                       help_text="final_amount of confirmed/completed bookings, paid or not")
+    refunded_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Usage (pending, confirmed and completed bookings)
+    players = models.PositiveIntegerField(default=0)
+    hours = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['playground', 'date']
+        ordering = ['date']
+        verbose_name_plural = "Playground daily stats"
+    
+    def __str__(self):
+        return f"{self.playground_id} - {self.date}: {self.bookings_total} bookings"
+
+
+class ReceiptFingerprint(models.Model):
+    """Thumbnail and perceptual hashes of a booking's payment receipt (bookings.receipts)"""
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='receipt_fingerprint')
+    receipt_name = models.CharField(max_length=255)  # The payment_receipt file these were computed from
+    thumbnail = models.ImageField(upload_to='payment_receipts/thumbnails/', blank=True, null=True)
+    
+    # 64-bit hashes stored signed; the difference hash is also split into four
+    # indexed 16-bit bands so near duplicates can be found by exact band matches
+    average_hash = models.BigIntegerField(db_index=True)
+    difference_hash = models.BigIntegerField(db_index=True)
+    dhash_band0 = models.PositiveIntegerField(db_index=True)
+    dhash_band1 = models.PositiveIntegerField(db_index=True)
+    dhash_band2 = models.PositiveIntegerField(db_index=True)
+    dhash_band3 = models.PositiveIntegerField(db_index=True)
+    
+    # Closest earlier receipt within the near-duplicate distance, if any
+    duplicate_of = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='duplicate_receipts')
+    duplicate_distance = models.PositiveSmallIntegerField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Receipt fingerprint for booking {self.booking_id}"
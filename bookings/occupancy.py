@@ -0,0 +1,202 @@
+"""
+Occupancy of playgrounds over a date range.
+
+Capacity is the bookable hours of each playground per weekday: its available
+``TimeSlot`` rows (times ``max_bookings``) or, for days without slots, the
+``operating_hours`` window. Booked hours come from confirmed and completed
+bookings, grouped by slot. Both are binned into an hour-resolution array of shape
+(playgrounds, days, 24) so occupancy can be read per playground, per day or
+per hour of the week (the owner heatmap) from the same data.
+
+Building the matrix takes a constant number of queries (slots, operating hours,
+bookings, plus one for the ids when given a queryset) however many
+playgrounds are passed.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.db.models import Count
+
+from playgrounds.models import Playground, TimeSlot
+
+from .models import Booking
+
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+HOURS = np.arange(24)
+
+BOOKED_STATUSES = ('confirmed', 'completed')
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    for fmt in ('%H:%M', '%H:%M:%S'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _operating_window(day_hours):
+    """(start, end) times from one ``operating_hours`` entry, or None if closed"""
+    if not isinstance(day_hours, dict):
+        return None
+    # Both stored layouts: {opening_time, closing_time, is_open} and {open, close, active}
+    if not day_hours.get('is_open', True) or not day_hours.get('active', True):
+        return None
+    start = _parse_time(day_hours.get('opening_time') or day_hours.get('open'))
+    end = _parse_time(day_hours.get('closing_time') or day_hours.get('close'))
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+def hour_overlap(starts, ends):
+    """
+    Hours of each [start, end) interval falling in each hour of the day.
+
+    ``starts``/``ends`` are minute offsets; an end at or before its start runs
+    to midnight. Returns an array of shape (len(starts), 24).
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 1)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 1)
+    ends = np.where(ends <= starts, 24 * 60, ends)
+    overlap = np.minimum(ends, (HOURS + 1) * 60) - np.maximum(starts, HOURS * 60)
+    return np.clip(overlap, 0, 60) / 60
+
+
+class OccupancyMatrix:
+    """Capacity and booked hours per (playground, day, hour)"""
+
+    def __init__(self, playground_ids, dates, capacity, booked):
+        self.playground_ids = list(playground_ids)
+        self.dates = list(dates)
+        self.capacity = capacity
+        # Bookings outside the bookable hours don't count beyond full
+        self.booked = np.minimum(booked, capacity)
+
+    @staticmethod
+    def _rate(booked, capacity):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(capacity > 0, booked / capacity * 100, 0.0)
+
+    def rate(self):
+        """Overall occupancy percentage"""
+        return float(self._rate(self.booked.sum(), self.capacity.sum()))
+
+    def by_playground(self):
+        """{playground_id: occupancy %}"""
+        rates = self._rate(self.booked.sum(axis=(1, 2)), self.capacity.sum(axis=(1, 2)))
+        return dict(zip(self.playground_ids, rates.tolist()))
+
+    def by_day(self):
+        """{date: occupancy %} across all playgrounds"""
+        rates = self._rate(self.booked.sum(axis=(0, 2)), self.capacity.sum(axis=(0, 2)))
+        return dict(zip(self.dates, rates.tolist()))
+
+    def hour_of_week(self):
+        """7x24 occupancy % (Monday first) across all playgrounds and weeks"""
+        weekday = np.array([day.weekday() for day in self.dates], dtype=int)
+        booked = np.zeros((7, 24))
+        capacity = np.zeros((7, 24))
+        np.add.at(booked, weekday, self.booked.sum(axis=0))
+        np.add.at(capacity, weekday, self.capacity.sum(axis=0))
+        return self._rate(booked, capacity)
+
+    def heatmap(self):
+        """``hour_of_week`` as JSON-ready rows labelled by weekday"""
+        return [
+            {'day': day, 'hours': [round(value, 2) for value in row]}
+            for day, row in zip(WEEKDAYS, self.hour_of_week().tolist())
+        ]
+
+
+def _weekly_capacity(playground_ids):
+    """Bookable hours per (playground, weekday, hour) from slots and operating hours"""
+    index = {playground_id: i for i, playground_id in enumerate(playground_ids)}
+    weekly = np.zeros((len(playground_ids), 7, 24))
+    has_slots = np.zeros((len(playground_ids), 7), dtype=bool)
+
+    slots = list(TimeSlot.objects.filter(
+        playground_id__in=playground_ids, is_available=True, day_of_week__in=WEEKDAYS
+    ).values_list('playground_id', 'day_of_week', 'start_time', 'end_time', 'max_bookings'))
+    if slots:
+        rows = np.array([index[slot[0]] for slot in slots])
+        days = np.array([WEEKDAYS.index(slot[1]) for slot in slots])
+        hours = hour_overlap([_minutes(slot[2]) for slot in slots], [_minutes(slot[3]) for slot in slots])
+        hours *= np.array([max(slot[4], 1) for slot in slots]).reshape(-1, 1)
+        np.add.at(weekly, (rows, days), hours)
+        has_slots[rows, days] = True
+
+    windows = {}
+    for playground_id, operating_hours in Playground.objects.filter(
+        id__in=playground_ids
+    ).values_list('id', 'operating_hours'):
+        if not isinstance(operating_hours, dict):
+            continue
+        for day, name in enumerate(WEEKDAYS):
+            window = _operating_window(operating_hours.get(name))
+            if window and not has_slots[index[playground_id], day]:
+                windows[(index[playground_id], day)] = window
+    if windows:
+        keys = list(windows)
+        hours = hour_overlap(
+            [_minutes(windows[key][0]) for key in keys],
+            [_minutes(windows[key][1]) for key in keys],
+        )
+        weekly[tuple(np.array(keys).T)] = hours
+
+    return weekly
+
+
+def occupancy_matrix(playgrounds, start_date, end_date):
+    """
+    Build the ``OccupancyMatrix`` for playgrounds (a queryset or ids) over
+    [start_date, end_date].
+    """
+    if hasattr(playgrounds, 'values_list'):
+        playground_ids = list(playgrounds.order_by().values_list('id', flat=True))
+    else:
+        playground_ids = [getattr(playground, 'id', playground) for playground in playgrounds]
+
+    dates = []
+    current = start_date
+    while current <= end_date:
+        dates.append(current)
+        current += timedelta(days=1)
+
+    if not playground_ids or not dates:
+        empty = np.zeros((len(playground_ids), len(dates), 24))
+        return OccupancyMatrix(playground_ids, dates, empty, empty)
+
+    weekly = _weekly_capacity(playground_ids)
+    capacity = weekly[:, [day.weekday() for day in dates], :]
+
+    booked = np.zeros_like(capacity)
+    bookings = list(Booking.objects.filter(
+        playground_id__in=playground_ids,
+        booking_date__gte=start_date,
+        booking_date__lte=end_date,
+        status__in=BOOKED_STATUSES,
+    ).values_list('playground_id', 'booking_date', 'start_time', 'end_time').annotate(
+        count=Count('id')
+    ).order_by())
+    if bookings:
+        index = {playground_id: i for i, playground_id in enumerate(playground_ids)}
+        rows = np.array([index[booking[0]] for booking in bookings])
+        days = np.array([(booking[1] - start_date).days for booking in bookings])
+        hours = hour_overlap(
+            [_minutes(booking[2]) for booking in bookings],
+            [_minutes(booking[3]) for booking in bookings],
+        )
+        hours *= np.array([booking[4] for booking in bookings]).reshape(-1, 1)
+        np.add.at(booked, (rows, days), hours)
+
+    return OccupancyMatrix(playground_ids, dates, capacity, booked)
@@ -0,0 +1,175 @@
+"""
+Per-playground performance metrics for an owner's dashboard and APIs.
+
+All of an owner's playgrounds are measured together: lifetime booking and
+revenue figures come from one query over ``Booking`` grouped by playground,
+date-windowed figures (today, this week, this month) from the
+``PlaygroundDailyStats`` rollup, occupancy from the occupancy engine. Money
+is in the owner's currency, or in the reporting currency for owners with
+playgrounds in several: bookings are converted in the query at their
+snapshot rates (``bookings.revenue``), the rollup's per-playground figures at
+current rates. The
+result is cached per owner and invalidated when a booking at one of the
+owner's playgrounds or one of the playgrounds themselves changes.
+"""
+
+import calendar
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Avg, Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from playground_booking.caching import tiered_cache
+from playgrounds.exchange_rates import convert, reporting_currency
+from playgrounds.models import Playground
+from playgrounds.signals import owner_tags, playground_booking_tags
+
+from .models import Booking, PlaygroundDailyStats
+from .occupancy import occupancy_matrix
+from .revenue import converted_sum, target_currency
+from .rollups import PAID, KEPT
+
+
+CACHE_TIMEOUT = 300
+
+TOTAL_FIELDS = (
+    'bookings_total', 'bookings_pending', 'bookings_confirmed', 'bookings_completed',
+    'bookings_cancelled', 'gross_revenue', 'net_revenue', 'completed_revenue', 'pending_value',
+    'paid_bookings', 'created_this_month', 'created_this_month_revenue', 'today_bookings', 'recent_bookings',
+    'today_revenue', 'week_revenue', 'month_revenue',
+)
+
+# Rollup figures in the playground's own currency
+WINDOW_MONEY_FIELDS = ('today_revenue', 'week_revenue', 'month_revenue')
+
+
+def _money(expression):
+    return Coalesce(expression, Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _booking_totals(playground_ids, month_start, currency):
+    """Lifetime figures per playground in ``currency``, one grouped query"""
+    created_this_month = Q(created_at__gte=month_start)
+    rows = Booking.objects.filter(playground_id__in=playground_ids).values('playground_id').annotate(
+        bookings_total=Count('id'),
+        bookings_pending=Count('id', filter=Q(status='pending')),
+        bookings_confirmed=Count('id', filter=Q(status='confirmed')),
+        bookings_completed=Count('id', filter=Q(status='completed')),
+        bookings_cancelled=Count('id', filter=Q(status='cancelled')),
+        gross_revenue=converted_sum(currency=currency, filter=PAID),
+        net_revenue=converted_sum(currency=currency, filter=PAID & KEPT),
+        completed_revenue=converted_sum(currency=currency, filter=PAID & Q(status='completed')),
+        pending_value=converted_sum(currency=currency, filter=Q(status='pending')),
+        paid_bookings=Count('id', filter=PAID & KEPT),
+        created_this_month=Count('id', filter=created_this_month),
+        created_this_month_revenue=converted_sum(currency=currency, filter=PAID & KEPT & created_this_month),
+        user_rating=Avg('user_rating'),
+    ).order_by()
+    return {row.pop('playground_id'): row for row in rows}
+
+
+def _window_totals(playground_ids, today):
+    """Today / week / month figures per playground from the daily rollup"""
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    recent_start = today - timedelta(days=7)
+    rows = PlaygroundDailyStats.objects.filter(
+        playground_id__in=playground_ids, date__gte=min(week_start, month_start, recent_start)
+    ).values('playground_id').annotate(
+        today_bookings=Coalesce(Sum('bookings_total', filter=Q(date=today)), 0),
+        recent_bookings=Coalesce(Sum('bookings_total', filter=Q(date__gte=recent_start)), 0),
+        today_revenue=_money(Sum('net_revenue', filter=Q(date=today))),
+        week_revenue=_money(Sum('net_revenue', filter=Q(date__gte=week_start))),
+        month_revenue=_money(Sum('net_revenue', filter=Q(date__gte=month_start))),
+    ).order_by()
+    return {row.pop('playground_id'): row for row in rows}
+
+
+def _sport_types(playground_ids):
+    names = {}
+    through = Playground.sport_types.through
+    for playground_id, name in through.objects.filter(
+        playground_id__in=playground_ids
+    ).values_list('playground_id', 'sporttype__name').order_by('sporttype__name'):
+        names.setdefault(playground_id, []).append(name)
+    return names
+
+
+def build_owner_metrics(owner_id):
+    """Compute the metrics for every playground of the owner (uncached)"""
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    month_end = month_start.replace(day=calendar.monthrange(today.year, today.month)[1])
+
+    playgrounds = list(Playground.objects.filter(owner_id=owner_id).order_by('-created_at').values(
+        'id', 'name', 'status', 'price_per_hour', 'is_featured', 'rating', 'review_count',
+        'created_at', 'city__name', 'currency',
+    ))
+    playground_ids = [playground['id'] for playground in playgrounds]
+    if not playground_ids:
+        return {'playgrounds': [], 'totals': {
+            **{field: 0 for field in TOTAL_FIELDS}, 'playgrounds': 0, 'active_playgrounds': 0,
+            'currency': reporting_currency(),
+        }}
+    currency = target_currency(playground['currency'] for playground in playgrounds)
+
+    month_start_at = timezone.make_aware(datetime.combine(month_start, time.min))
+    bookings = _booking_totals(playground_ids, month_start_at, currency)
+    windows = _window_totals(playground_ids, today)
+    sport_types = _sport_types(playground_ids)
+    occupancy = occupancy_matrix(playground_ids, month_start, month_end).by_playground()
+
+    rows = []
+    for playground in playgrounds:
+        playground_id = playground['id']
+        row = {
+            'id': playground_id,
+            'name': playground['name'],
+            'status': playground['status'],
+            'city': playground['city__name'] or '',
+            'price_per_hour': float(playground['price_per_hour'] or 0),
+            'is_featured': playground['is_featured'],
+            'rating': float(playground['rating'] or 0),
+            'review_count': playground['review_count'],
+            'created_at': playground['created_at'].isoformat(),
+            'sport_types': sport_types.get(playground_id, []),
+            'occupancy_rate': round(occupancy.get(playground_id, 0), 2),
+            'currency': currency,
+        }
+        window = windows.get(playground_id, {})
+        if playground['currency'] != currency:
+            window = {
+                field: (convert(value, playground['currency'], currency) or 0) if field in WINDOW_MONEY_FIELDS else value
+                for field, value in window.items()
+            }
+        stats = {**bookings.get(playground_id, {}), **window}
+        for field in TOTAL_FIELDS:
+            value = stats.get(field) or 0
+            row[field] = float(value) if isinstance(value, Decimal) else value
+        user_rating = stats.get('user_rating')
+        row['user_rating'] = round(float(user_rating), 1) if user_rating else 0
+        row['cancellation_rate'] = (
+            round(row['bookings_cancelled'] / row['bookings_total'] * 100, 2) if row['bookings_total'] else 0
+        )
+        rows.append(row)
+
+    totals = {field: sum(row[field] for row in rows) for field in TOTAL_FIELDS}
+    totals['playgrounds'] = len(rows)
+    totals['active_playgrounds'] = sum(1 for row in rows if row['status'] == 'active')
+    totals['currency'] = currency
+    return {'playgrounds': rows, 'totals': totals}
+
+
+def owner_metrics(owner):
+    """Cached ``build_owner_metrics``; rows and totals must be treated as read-only"""
+    owner_id = getattr(owner, 'id', owner)
+    playground_ids = list(Playground.objects.filter(owner_id=owner_id).values_list('id', flat=True))
+    tags = owner_tags(owner_id)
+    for playground_id in playground_ids:
+        tags += playground_booking_tags(playground_id)
+    return tiered_cache.get_or_set(
+        f"owner:{owner_id}:metrics:{timezone.localdate()}", lambda: build_owner_metrics(owner_id),
+        timeout=CACHE_TIMEOUT, tags=tags,
+    )
@@ -0,0 +1,260 @@
+"""
+Demand-based price suggestions per (playground, weekday, hour).
+
+For a batch of playgrounds at once, the last ``HISTORY_WEEKS`` weeks of kept
+bookings give two (playgrounds, 168) hour-of-week grids:
+
+- occupancy, the share of the playground's active weeks in which the hour
+  was booked (from ``forecasting.weekly_histograms``);
+- lead time, the mean hours between booking and start of the bookings
+  starting in that hour, relative to the playground's overall mean. Hours
+  that are booked well in advance sell out; last-minute hours don't.
+
+They are combined into a price multiplier per hour:
+
+    multiplier = (1 + ELASTICITY * (occupancy - TARGET_OCCUPANCY)) * lead_ratio ** LEAD_WEIGHT
+
+rounded to ``STEP`` and kept within ``MIN_MULTIPLIER``..``MAX_MULTIPLIER``.
+Hours that were never booked, and playgrounds with less than
+``MIN_HISTORY_WEEKS`` weeks of bookings, get no suggestion (1.0). The grids
+are stored on ``PlaygroundAnalytics.price_suggestions``; like the demand
+forecasts, playgrounds are processed in chunks of ``CHUNK_SIZE`` with a
+constant number of queries per chunk.
+
+``accept_suggestions`` applies the stored multipliers to playgrounds in bulk,
+either as ``custom_pricing['peak_windows']`` or folded into their
+``TimeSlot`` prices (see ``bookings.pricing``).
+"""
+
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from playgrounds.models import Playground, PlaygroundAnalytics, TimeSlot
+from playgrounds.signals import invalidate_playgrounds
+
+from .forecasting import weekly_histograms
+from .models import Booking
+from .occupancy import hour_overlap
+from .pricing import CENT, WEEKDAYS
+from .rollups import KEPT
+
+
+HISTORY_WEEKS = 12
+MIN_HISTORY_WEEKS = 4
+CHUNK_SIZE = 500
+STREAM_CHUNK_SIZE = 5000
+
+# Occupancy priced at the base rate, and how strongly prices follow occupancy
+TARGET_OCCUPANCY = 0.5
+ELASTICITY = 0.8
+# How strongly prices follow relative lead time, and the lead ratios considered
+LEAD_WEIGHT = 0.25
+LEAD_RATIO_RANGE = (0.5, 2.0)
+
+MIN_MULTIPLIER = 0.8
+MAX_MULTIPLIER = 1.5
+STEP = 0.05
+
+# Where accepted suggestions are written
+TARGETS = ('windows', 'time_slots')
+
+
+def lead_times(playground_ids, start_date, weeks):
+    """
+    Mean hours from booking to start per (playground, hour of week) for kept
+    bookings from ``start_date`` on, weighted by the share of each hour the
+    bookings cover, with that total weight: two arrays of shape
+    (playgrounds, 168).
+    """
+    index = {playground_id: i for i, playground_id in enumerate(playground_ids)}
+    days, starts, ends, leads = array('q'), array('q'), array('q'), array('d')
+    rows = Booking.objects.filter(
+        KEPT,
+        playground_id__in=playground_ids,
+        booking_date__gte=start_date,
+        booking_date__lt=start_date + timedelta(weeks=weeks),
+    ).order_by().values_list('playground_id', 'booking_date', 'start_time', 'end_time', 'created_at')
+    for playground_id, booking_date, start_time, end_time, created_at in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        created_at = timezone.localtime(created_at)
+        starts_at = booking_date.toordinal() * 24 + start_time.hour + start_time.minute / 60
+        booked_at = created_at.toordinal() * 24 + created_at.hour + created_at.minute / 60
+        days.append(index[playground_id] * 7 + booking_date.weekday())
+        starts.append(start_time.hour * 60 + start_time.minute)
+        ends.append(end_time.hour * 60 + end_time.minute)
+        leads.append(max(starts_at - booked_at, 0))
+
+    totals = np.zeros((len(playground_ids) * 7, 24))
+    weights = np.zeros((len(playground_ids) * 7, 24))
+    if days:
+        days = np.frombuffer(days, dtype=np.int64)
+        leads = np.frombuffer(leads, dtype=float)
+        overlap = hour_overlap(starts, ends)
+        for hour in range(24):
+            totals[:, hour] = np.bincount(days, weights=overlap[:, hour] * leads, minlength=len(totals))
+            weights[:, hour] = np.bincount(days, weights=overlap[:, hour], minlength=len(weights))
+
+    mean = np.divide(totals, weights, out=np.zeros_like(totals), where=weights > 0)
+    return mean.reshape(len(playground_ids), 7 * 24), weights.reshape(len(playground_ids), 7 * 24)
+
+
+def occupancy(histograms):
+    """
+    Share of each playground's active weeks, counted from its first week with
+    a booking, in which each hour of the week was booked. Returns
+    (occupancy, active_weeks), the first of shape (playgrounds, 168).
+    """
+    playgrounds, weeks, _ = histograms.shape
+    booked = histograms.sum(axis=2) > 0
+    first_week = np.where(booked.any(axis=1), booked.argmax(axis=1), weeks)
+    active = np.arange(weeks) >= first_week.reshape(-1, 1)
+    active_weeks = active.sum(axis=1)
+    booked_hours = (np.minimum(histograms, 1) * active[..., np.newaxis]).sum(axis=1)
+    share = booked_hours / np.maximum(active_weeks, 1).reshape(-1, 1)
+    return share, active_weeks
+
+
+def suggest_multipliers(share, active_weeks, lead_mean, lead_weight):
+    """Price multipliers per (playground, hour of week) from occupancy and lead times"""
+    demand = 1 + ELASTICITY * (share - TARGET_OCCUPANCY)
+
+    overall = np.divide(
+        (lead_mean * lead_weight).sum(axis=1), lead_weight.sum(axis=1),
+        out=np.zeros(len(lead_weight)), where=lead_weight.sum(axis=1) > 0,
+    ).reshape(-1, 1)
+    ratio = np.divide(lead_mean, overall, out=np.ones_like(lead_mean), where=(overall > 0) & (lead_weight > 0))
+    ratio = np.clip(ratio, *LEAD_RATIO_RANGE)
+
+    multipliers = np.clip(np.round(demand * ratio ** LEAD_WEIGHT / STEP) * STEP, MIN_MULTIPLIER, MAX_MULTIPLIER)
+    has_signal = (share > 0) & (active_weeks >= MIN_HISTORY_WEEKS).reshape(-1, 1)
+    return np.where(has_signal, multipliers, 1.0)
+
+
+def _stored(multipliers, share, today, history_weeks):
+    return {
+        'generated_on': today.isoformat(),
+        'history_weeks': history_weeks,
+        'multipliers': np.round(multipliers, 2).reshape(7, 24).tolist(),
+        'occupancy': np.round(share, 3).reshape(7, 24).tolist(),
+    }
+
+
+def refresh_price_suggestions(playground_ids=None, history_weeks=HISTORY_WEEKS, chunk_size=CHUNK_SIZE):
+    """
+    Recompute ``PlaygroundAnalytics.price_suggestions`` for the given
+    playgrounds (default: all) from the ``history_weeks`` weeks up to
+    yesterday. Returns the number of playgrounds processed.
+    """
+    playgrounds = Playground.objects.all()
+    if playground_ids is not None:
+        playgrounds = playgrounds.filter(id__in=playground_ids)
+    playground_ids = list(playgrounds.order_by('id').values_list('id', flat=True))
+
+    today = timezone.localdate()
+    history_start = today - timedelta(weeks=history_weeks)
+
+    for offset in range(0, len(playground_ids), chunk_size):
+        chunk = playground_ids[offset:offset + chunk_size]
+        share, active_weeks = occupancy(weekly_histograms(chunk, history_start, history_weeks))
+        multipliers = suggest_multipliers(share, active_weeks, *lead_times(chunk, history_start, history_weeks))
+
+        existing = {
+            row.playground_id: row
+            for row in PlaygroundAnalytics.objects.filter(playground_id__in=chunk).only('id', 'playground_id')
+        }
+        to_create, to_update = [], []
+        for i, playground_id in enumerate(chunk):
+            analytics = existing.get(playground_id)
+            if analytics is None:
+                analytics = PlaygroundAnalytics(playground_id=playground_id)
+                to_create.append(analytics)
+            else:
+                to_update.append(analytics)
+            analytics.price_suggestions = (
+                _stored(multipliers[i], share[i], today, history_weeks)
+                if active_weeks[i] >= MIN_HISTORY_WEEKS else {}
+            )
+
+        with transaction.atomic():
+            PlaygroundAnalytics.objects.bulk_create(to_create)
+            PlaygroundAnalytics.objects.bulk_update(to_update, ['price_suggestions'])
+
+    return len(playground_ids)
+
+
+def suggested_windows(price_suggestions):
+    """
+    Stored suggestions as ``custom_pricing['peak_windows']`` entries: one
+    window per run of hours of a weekday with the same multiplier other than 1.
+    """
+    windows = []
+    for weekday, hours in enumerate((price_suggestions or {}).get('multipliers') or ()):
+        start = 0
+        for hour in range(1, 25):
+            if hour < 24 and hours[hour] == hours[start]:
+                continue
+            if hours[start] != 1:
+                windows.append({
+                    'days': [WEEKDAYS[weekday]],
+                    'start': f'{start:02d}:00',
+                    'end': f'{hour % 24:02d}:00',
+                    'multiplier': f'{hours[start]:.2f}',
+                })
+            start = hour
+    return windows
+
+
+def _slot_price(base_rate, multipliers, slot):
+    """Price of a time slot at ``base_rate`` with the hourly multipliers of its weekday"""
+    hours = hour_overlap([slot.start_time.hour * 60 + slot.start_time.minute],
+                         [slot.end_time.hour * 60 + slot.end_time.minute])[0]
+    factor = float(np.dot(hours, multipliers[WEEKDAYS.index(slot.day_of_week)]))
+    return (base_rate * Decimal(str(factor))).quantize(CENT)
+
+
+def accept_suggestions(playgrounds, target='windows'):
+    """
+    Apply the stored price suggestions of ``playgrounds`` (a queryset).
+
+    The suggested multipliers replace the playgrounds' peak windows. With
+    ``target='time_slots'`` they are instead folded into the prices of the
+    playgrounds' weekly ``TimeSlot`` rows, at the base hourly rate, and the
+    peak windows are cleared so they aren't applied twice. Returns the ids
+    of the playgrounds updated; those without suggestions are skipped.
+    """
+    if target not in TARGETS:
+        raise ValueError(f'target must be one of {", ".join(TARGETS)}')
+
+    updated, slots = [], []
+    playgrounds = playgrounds.select_related('analytics').only(
+        'id', 'price_per_hour', 'custom_pricing', 'analytics__price_suggestions'
+    )
+    if target == 'time_slots':
+        playgrounds = playgrounds.prefetch_related('time_slots')
+    for playground in playgrounds:
+        suggestions = getattr(getattr(playground, 'analytics', None), 'price_suggestions', None)
+        if not suggestions or not suggestions.get('multipliers'):
+            continue
+        custom_pricing = dict(playground.custom_pricing or {})
+        if target == 'windows':
+            custom_pricing['peak_windows'] = suggested_windows(suggestions)
+        else:
+            custom_pricing.pop('peak_windows', None)
+            multipliers = np.asarray(suggestions['multipliers'], dtype=float)
+            for slot in playground.time_slots.all():
+                if slot.day_of_week in WEEKDAYS:
+                    slot.price = _slot_price(playground.price_per_hour, multipliers, slot)
+                    slots.append(slot)
+        playground.custom_pricing = custom_pricing
+        updated.append(playground)
+
+    with transaction.atomic():
+        Playground.objects.bulk_update(updated, ['custom_pricing'], batch_size=500)
+        TimeSlot.objects.bulk_update(slots, ['price'], batch_size=500)
+        updated_ids = [playground.id for playground in updated]
+        transaction.on_commit(lambda: invalidate_playgrounds(updated_ids))
+    return updated_ids
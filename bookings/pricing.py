@@ -0,0 +1,408 @@
+"""
+Pricing engine.
+
+Every price the site shows or charges comes from here. A playground's rules
+are compiled once into an immutable ``PricingRules``:
+
+- the base hourly rate (``price_per_hour``);
+- slot overrides: a ``TimeSlot`` with its own ``price`` charges that price
+  for its time range, pro rata per minute;
+- peak windows from ``custom_pricing['peak_windows']``, a list of
+  ``{"days": ["friday", ...], "start": "17:00", "end": "21:00",
+  "multiplier": "1.25"}`` (no ``days`` means every day), multiplying the
+  rate inside the window;
+- custom slots (active ``PlaygroundSlot`` rows), each at its own price and
+  only for its own weekday and times;
+- amenity fees, from the playground's own ``Amenity`` rows and its JSON list;
+- the prices of its active duration passes.
+
+Nothing else is priced: other playgrounds' amenities and passes, inactive
+passes and unknown custom slots are never looked up.
+
+The rate rules are folded into one sorted list of ``(start_minute,
+end_minute, hourly_rate)`` segments per weekday, so pricing an interval only
+walks the few segments it overlaps, and ``price_slots`` prices a whole day of
+slots against the same compiled rules. Compiled rules are memoized per
+playground and config version: ``playgrounds.signals`` bumps the version
+whenever the playground or one of its slots, passes or amenities changes.
+
+Coupons are applied on top by ``price`` through ``bookings.coupons``; pass
+prices by duration come from ``pass_price``. ``price`` raises
+``SelectionMismatch`` for a selection the playground doesn't offer.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+
+from playgrounds.models import PlaygroundSlot
+from playgrounds.snapshot import get_playground_snapshot
+from playgrounds.versioning import CONFIG, get_versions
+
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MINUTES_PER_DAY = 24 * 60
+CENT = Decimal('0.01')
+
+# Pass price as a multiple of the daily base price, by duration in days
+PASS_DURATION_MULTIPLIERS = {
+    1: Decimal('1.0'),
+    7: Decimal('6.5'),
+    30: Decimal('25.0'),
+    90: Decimal('70.0'),
+    365: Decimal('300.0'),
+}
+# Other durations get a flat bulk discount per day
+PASS_BULK_DAY_MULTIPLIER = Decimal('0.95')
+
+PASS_FEATURE_COSTS = {
+    'equipment': Decimal('5.0'),
+    'coaching': Decimal('15.0'),
+    'refreshments': Decimal('3.0'),
+    'video_analysis': Decimal('10.0'),
+    'first_aid': Decimal('2.0'),
+    'premium_location': Decimal('8.0'),
+}
+
+# Default longer-period rates derived from an hourly rate, in hours
+PERIOD_HOURS = {'daily': 8, 'weekly': 50, 'monthly': 200}
+
+DISCOUNT_TYPES = ('percentage', 'fixed')
+
+
+class SelectionMismatch(Exception):
+    """A selection names something the playground doesn't offer, or isn't the one that was quoted"""
+
+
+def parse_time(value):
+    """``HH:MM`` or ``H:MM AM/PM`` to a ``time``; raises ValueError"""
+    value = str(value).strip()
+    match = re.match(r'(\d{1,2}):(\d{2})\s*(AM|PM)$', value.upper())
+    if not match:
+        return datetime.strptime(value[:5], '%H:%M').time()
+    hours, minutes, period = int(match.group(1)), int(match.group(2)), match.group(3)
+    if period == 'AM' and hours == 12:
+        hours = 0
+    elif period == 'PM' and hours != 12:
+        hours += 12
+    return datetime.strptime(f'{hours:02d}:{minutes:02d}', '%H:%M').time()
+
+
+def _minute(value):
+    return value.hour * 60 + value.minute
+
+
+def _span(start, end):
+    """(start, end) minutes of a time range; an end at or before the start is the next day"""
+    start, end = _minute(start), _minute(end)
+    return start, end + MINUTES_PER_DAY if end <= start else end
+
+
+def _decimal(value, default=None):
+    try:
+        return Decimal(str(value)) if value is not None else default
+    except InvalidOperation:
+        return default
+
+
+def apply_discount(amount, discount_type, value):
+    """Discount of ``value`` (percent or a fixed amount) on ``amount``, never more than it"""
+    amount = Decimal(str(amount))
+    discount = amount * Decimal(str(value)) / 100 if discount_type == 'percentage' else Decimal(str(value))
+    return min(discount, amount).quantize(CENT)
+
+
+def window_multiplier(windows, weekday, minute):
+    """Product of the multipliers of the ``(weekday, start, end, multiplier)`` windows covering a minute"""
+    multiplier = Decimal('1')
+    for day, start, end, factor in windows:
+        for offset in (0, -MINUTES_PER_DAY):
+            # A window running past midnight covers the start of the next day too
+            if (day is None or (day + (1 if offset else 0)) % 7 == weekday) and start <= minute - offset < end:
+                multiplier *= factor
+                break
+    return multiplier
+
+
+def next_rate_change(windows, moment):
+    """First time after ``moment`` at which the multiplier of ``windows`` changes, or None"""
+    edges = sorted({edge % MINUTES_PER_DAY for _, start, end, _ in windows for edge in (start, end)})
+    current = window_multiplier(windows, moment.weekday(), _minute(moment))
+    for days in range(8):
+        day = moment.date() + timedelta(days=days)
+        for edge in edges:
+            candidate = datetime.combine(day, time(edge // 60, edge % 60), moment.tzinfo)
+            if candidate > moment and window_multiplier(windows, day.weekday(), edge) != current:
+                return candidate
+    return None
+
+
+def pass_price(base_price, duration_days, features=()):
+    """
+    Price of a pass lasting ``duration_days`` at ``base_price`` per day with
+    the given ``PASS_FEATURE_COSTS`` features: ``(multiplier, base_total,
+    feature_cost, total)``.
+    """
+    base_price = Decimal(str(base_price))
+    multiplier = PASS_DURATION_MULTIPLIERS.get(duration_days)
+    if multiplier is None:
+        multiplier = Decimal(str(duration_days)) * PASS_BULK_DAY_MULTIPLIER
+    base_total = base_price * multiplier
+    feature_cost = sum((PASS_FEATURE_COSTS.get(feature, Decimal('0')) for feature in features), Decimal('0'))
+    feature_cost *= multiplier
+    return multiplier, base_total, feature_cost, base_total + feature_cost
+
+
+def period_rates(hourly_rate):
+    """Default daily, weekly and monthly rates for an hourly rate"""
+    hourly_rate = Decimal(str(hourly_rate))
+    return {period: hourly_rate * hours for period, hours in PERIOD_HOURS.items()}
+
+
+def _peak_windows(custom_pricing):
+    """``custom_pricing['peak_windows']`` as ``(weekday or None, start, end, multiplier)``, skipping bad entries"""
+    windows = []
+    for window in (custom_pricing or {}).get('peak_windows') or ():
+        try:
+            start, end = _span(parse_time(window['start']), parse_time(window['end']))
+            multiplier = Decimal(str(window['multiplier']))
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            continue
+        days = [WEEKDAYS.index(day) for day in window.get('days') or () if day in WEEKDAYS]
+        for day in days or (None,):
+            windows.append((day, start, end, multiplier))
+    return tuple(windows)
+
+
+def _day_segments(weekday, base_rate, overrides, windows):
+    """Sorted, merged ``(start, end, hourly_rate)`` segments covering one weekday"""
+    edges = {0, MINUTES_PER_DAY}
+    for day, start, end, _ in overrides + windows:
+        for offset in (0, -MINUTES_PER_DAY):
+            edges.update(edge + offset for edge in (start, end) if 0 < edge + offset < MINUTES_PER_DAY)
+    edges = sorted(edges)
+
+    segments = []
+    for start, end in zip(edges, edges[1:]):
+        rate = base_rate
+        for day, slot_start, slot_end, slot_rate in overrides:
+            for offset, slot_day in ((0, day), (MINUTES_PER_DAY, (day + 1) % 7)):
+                if slot_day == weekday and slot_start <= start + offset < slot_end:
+                    rate = slot_rate
+        rate *= window_multiplier(windows, weekday, start)
+        if segments and segments[-1][2] == rate and segments[-1][1] == start:
+            segments[-1] = (segments[-1][0], end, rate)
+        else:
+            segments.append((start, end, rate))
+    return tuple(segments)
+
+
+@dataclass(frozen=True)
+class PricingRules:
+    """A playground's compiled pricing rules"""
+
+    playground_id: int
+    currency: str
+    base_rate: Decimal
+    # Per weekday (Monday first): ((start_minute, end_minute, hourly_rate), ...)
+    segments: Tuple[Tuple[Tuple[int, int, Decimal], ...], ...]
+    # id -> (weekday or None for every day, start_minute, end_minute, price)
+    custom_slots: Mapping[int, Tuple[Optional[int], int, int, Decimal]]
+    # id -> (name, price)
+    amenities: Mapping[int, Tuple[str, Decimal]]
+    # The JSON amenities list by index: (name, price or None when free)
+    json_amenities: Tuple[Tuple[str, Optional[Decimal]], ...]
+    passes: Mapping[int, Decimal]
+
+    def interval_price(self, weekday, start, end):
+        """Price of ``start``-``end`` on ``weekday`` (0 is Monday); past midnight runs into the next day"""
+        start_minute, end_minute = _span(start, end)
+        total = Decimal('0')
+        for offset, day in ((0, weekday), (MINUTES_PER_DAY, (weekday + 1) % 7)):
+            if end_minute <= offset:
+                break
+            for segment_start, segment_end, rate in self.segments[day]:
+                overlap = min(end_minute, segment_end + offset) - max(start_minute, segment_start + offset)
+                if overlap > 0:
+                    total += rate * overlap
+        return (total / 60).quantize(CENT)
+
+    def price_slots(self, day, slots):
+        """Prices of ``(start, end)`` time ranges on date ``day``, in order"""
+        weekday = day.weekday()
+        return [self.interval_price(weekday, start, end) for start, end in slots]
+
+    def amenity_lines(self, amenity_ids):
+        """
+        ``[(id, name, price)]`` of the selected amenities: numeric ids are
+        ``Amenity`` rows, generated ids like ``p_coaching_2`` point by index
+        into the JSON list. Ids that aren't this playground's are left out.
+        """
+        lines = []
+        for amenity_id in amenity_ids:
+            amenity_id = str(amenity_id).strip()
+            if amenity_id.isdigit():
+                if int(amenity_id) in self.amenities:
+                    lines.append((int(amenity_id), *self.amenities[int(amenity_id)]))
+                continue
+            try:
+                index = int(amenity_id.split('_')[2])
+            except (ValueError, IndexError):
+                continue
+            if 0 <= index < len(self.json_amenities):
+                name, price = self.json_amenities[index]
+                lines.append((amenity_id, name, price or Decimal('0')))
+        return lines
+
+    def pass_price(self, pass_id):
+        """Price of one of the playground's active duration passes, None if it has no such pass"""
+        try:
+            return self.passes.get(int(pass_id))
+        except (TypeError, ValueError):
+            return None
+
+    def custom_slot(self, slot_id):
+        """Price of one of the playground's custom slots, None if it has no such slot"""
+        try:
+            slot = self.custom_slots.get(int(slot_id))
+        except (TypeError, ValueError):
+            return None
+        return slot[3] if slot else None
+
+    def _custom_slot_price(self, selection, day):
+        """
+        ``(price, duration_hours)`` of the selection's custom slot. Its times
+        (``custom_slot_time`` and the booked ``start_time``-``end_time``) must
+        be the slot's own, on its weekday; raises ``SelectionMismatch``.
+        """
+        try:
+            weekday, start, end, price = self.custom_slots[int(selection['custom_slot_id'])]
+        except (KeyError, TypeError, ValueError):
+            raise SelectionMismatch('This custom slot is not offered at this playground')
+        custom_time = (selection.get('custom_slot_time') or '').split(' - ')
+        times = [custom_time] if len(custom_time) == 2 else []
+        if selection.get('start_time') and selection.get('end_time'):
+            times.append((selection['start_time'], selection['end_time']))
+        try:
+            spans = {_span(parse_time(slot_start), parse_time(slot_end)) for slot_start, slot_end in times}
+        except ValueError:
+            raise SelectionMismatch('The custom slot time is not valid')
+        if not spans or spans != {(start, end)} or weekday not in (None, day.weekday()):
+            raise SelectionMismatch('A custom slot can only be booked for its own day and times')
+        return price, (end - start) / 60
+
+    def price(self, selection, user=None):
+        """
+        Line items for a selection (see ``bookings.quotes.normalize_selection``):
+        ``base_price``, ``amenity_fees``, ``discount_amount``, ``subtotal``
+        and ``total_amount``, plus ``duration_hours``, ``slot_type``,
+        ``amenities`` lines and, when the selection names a coupon that
+        doesn't apply, ``coupon_error``. Raises ``SelectionMismatch`` for a
+        membership pass or custom slot the playground doesn't offer.
+        """
+        day = date.fromisoformat(selection['date']) if selection.get('date') else date.today()
+        base_price = Decimal('0.00')
+        duration = 0
+
+        # A custom slot is priced as a whole and takes priority over the hourly rates
+        if selection.get('custom_slot_id'):
+            base_price, duration = self._custom_slot_price(selection, day)
+        elif selection.get('start_time') and selection.get('end_time'):
+            start, end = parse_time(selection['start_time']), parse_time(selection['end_time'])
+            start_minute, end_minute = _span(start, end)
+            duration = (end_minute - start_minute) / 60
+            base_price = self.interval_price(day.weekday(), start, end)
+
+        if selection.get('membership_pass_id'):
+            pass_cost = self.pass_price(selection['membership_pass_id'])
+            if pass_cost is None:
+                raise SelectionMismatch('This membership pass is not offered at this playground')
+            base_price += pass_cost
+
+        amenities = self.amenity_lines(selection.get('amenity_ids') or ())
+        amenity_fees = sum((price for _, _, price in amenities), Decimal('0.00'))
+
+        discount_amount = Decimal('0.00')
+        coupon_error = None
+        if selection.get('coupon_code'):
+            from . import coupons
+            try:
+                _, discount_amount = coupons.check(
+                    selection['coupon_code'], user, self.playground_id, base_price + amenity_fees
+                )
+            except ValidationError as e:
+                coupon_error = e.messages[0]
+        subtotal = base_price - discount_amount
+        return {
+            'base_price': base_price,
+            'amenity_fees': amenity_fees,
+            'discount_amount': discount_amount,
+            'subtotal': subtotal,
+            'total_amount': subtotal + amenity_fees,
+            'duration_hours': duration,
+            'slot_type': 'custom' if selection.get('custom_slot_id') else 'regular',
+            'amenities': amenities,
+            'coupon_error': coupon_error,
+        }
+
+
+def compile_rules(playground, custom_slots=()):
+    """``PricingRules`` of a ``PlaygroundSnapshot`` and its active ``PlaygroundSlot`` rows"""
+    base_rate = Decimal(str(playground.price_per_hour))
+    custom_pricing = playground.custom_pricing or {}
+    overrides = []
+    for slot in playground.time_slots:
+        if slot.price_override is not None and slot.day_of_week in WEEKDAYS:
+            start, end = _span(slot.start_time, slot.end_time)
+            overrides.append((WEEKDAYS.index(slot.day_of_week), start, end, slot.price_override * 60 / (end - start)))
+    windows = _peak_windows(custom_pricing)
+
+    json_amenities = []
+    for amenity in playground.amenities if isinstance(playground.amenities, list) else ():
+        if isinstance(amenity, dict):
+            json_amenities.append((amenity.get('name', ''), _decimal(amenity.get('price'))))
+        else:
+            json_amenities.append((str(amenity), None))
+
+    return PricingRules(
+        playground_id=playground.id,
+        currency=playground.currency,
+        base_rate=base_rate,
+        segments=tuple(
+            _day_segments(weekday, base_rate, tuple(overrides), windows) for weekday in range(len(WEEKDAYS))
+        ),
+        custom_slots=MappingProxyType({
+            slot.id: (
+                WEEKDAYS.index(slot.day_of_week) if slot.day_of_week in WEEKDAYS else None,
+                *_span(slot.start_time, slot.end_time), slot.price,
+            )
+            for slot in custom_slots
+        }),
+        amenities=MappingProxyType({amenity.id: (amenity.name, amenity.price) for amenity in playground.db_amenities}),
+        json_amenities=tuple(json_amenities),
+        passes=MappingProxyType({
+            duration_pass.id: duration_pass.price
+            for duration_pass in playground.duration_passes if duration_pass.is_active
+        }),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compiled(playground_id, version):
+    playground = get_playground_snapshot(playground_id)
+    custom_slots = PlaygroundSlot.objects.filter(playground_id=playground_id, is_active=True).only(
+        'id', 'day_of_week', 'start_time', 'end_time', 'price'
+    )
+    return compile_rules(playground, custom_slots)
+
+
+def rules_for(playground_id):
+    """The playground's current ``PricingRules``; raises ``Playground.DoesNotExist``"""
+    version = get_versions(playground_id, [CONFIG])[CONFIG]
+    return _compiled(int(playground_id), version)
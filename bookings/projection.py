@@ -0,0 +1,186 @@
+"""
+Revenue projection over a playground's weekly slot grid.
+
+A ``SlotGrid`` holds bookable hours and the hourly price for every
+(weekday, hour) of the week, built from a playground's ``TimeSlot`` rows or
+from a list of generated slots. ``project`` multiplies it by occupancy (from
+booking history or an assumed rate) for every price/occupancy scenario at
+once and sums over the actual weekdays in the horizon:
+
+    grid = SlotGrid.for_playground(playground)
+    occupancy = historical_occupancy(playground)
+    result = project(grid, occupancy, price_multipliers=[0.9, 1, 1.1],
+                     occupancy_factors=[0.8, 1, 1.2], horizon_days=30)
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import product
+
+import numpy as np
+from django.utils import timezone
+
+from .occupancy import WEEKDAYS, hour_overlap, occupancy_matrix
+
+
+DEFAULT_OCCUPANCY = 0.6
+HISTORY_WEEKS = 12
+MAX_SCENARIO_VALUES = 20
+MAX_SCENARIO_VALUE = 10.0
+# Keeps multiplier ** -elasticity finite; a zero price has no demand curve
+MIN_PRICE_MULTIPLIER = 0.01
+MAX_ELASTICITY = 5.0
+
+
+@dataclass(frozen=True)
+class SlotGrid:
+    """Bookable hours and price per hour for each (weekday, hour), Monday first"""
+    hours: np.ndarray
+    prices: np.ndarray
+
+    @property
+    def weekly_hours(self):
+        return float(self.hours.sum())
+
+    @property
+    def weekly_capacity_value(self):
+        """Revenue of a fully booked week"""
+        return float((self.hours * self.prices).sum())
+
+    @classmethod
+    def from_slots(cls, slots):
+        """
+        Build from ``(weekday, start_minute, end_minute, price_per_hour, spots)``
+        tuples, weekday being 0 (Monday) to 6.
+        """
+        hours = np.zeros((7, 24))
+        value = np.zeros((7, 24))
+        if slots:
+            weekdays, starts, ends, prices, spots = (np.array(column, dtype=float) for column in zip(*slots))
+            overlap = hour_overlap(starts, ends) * spots.reshape(-1, 1)
+            weekdays = weekdays.astype(int)
+            np.add.at(hours, weekdays, overlap)
+            np.add.at(value, weekdays, overlap * prices.reshape(-1, 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prices = np.where(hours > 0, value / hours, 0.0)
+        return cls(hours=hours, prices=prices)
+
+    @classmethod
+    def for_playground(cls, playground):
+        """Grid from the playground's available time slots"""
+        default_price = float(playground.price_per_hour or 0)
+        slots = []
+        for day, start, end, price, spots in playground.time_slots.filter(
+            is_available=True, day_of_week__in=WEEKDAYS
+        ).values_list('day_of_week', 'start_time', 'end_time', 'price', 'max_bookings'):
+            slots.append((
+                WEEKDAYS.index(day), start.hour * 60 + start.minute, end.hour * 60 + end.minute,
+                float(price) if price is not None else default_price, max(spots, 1),
+            ))
+        return cls.from_slots(slots)
+
+    @classmethod
+    def from_generated_slots(cls, slots):
+        """Grid from slot dicts as produced by the time slot generator"""
+        rows = []
+        for slot in slots:
+            if slot.get('day_key') not in WEEKDAYS:
+                continue
+            start = datetime.strptime(slot['start_time'], '%H:%M')
+            end = datetime.strptime(slot['end_time'], '%H:%M')
+            minutes = ((end - start).seconds // 60) or 24 * 60
+            rows.append((
+                WEEKDAYS.index(slot['day_key']), start.hour * 60 + start.minute,
+                end.hour * 60 + end.minute, float(slot['price']) * 60 / minutes, 1,
+            ))
+        return cls.from_slots(rows)
+
+    @classmethod
+    def uniform(cls, price_per_hour, daily_hours, days=WEEKDAYS, opening_hour=8):
+        """Same hours and price every given day, for projections without a slot setup"""
+        return cls.from_slots([
+            (WEEKDAYS.index(day), opening_hour * 60, (opening_hour + daily_hours) * 60, price_per_hour, 1)
+            for day in days
+        ])
+
+
+def historical_occupancy(playground, weeks=HISTORY_WEEKS, default=DEFAULT_OCCUPANCY):
+    """
+    7x24 occupancy fractions from the last ``weeks`` weeks of bookings.
+
+    Without any bookings in that window every hour uses ``default``. Returns
+    the grid and whether history was found.
+    """
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(weeks=weeks) + timedelta(days=1)
+    matrix = occupancy_matrix([playground.id], start_date, end_date)
+    if not matrix.booked.any():
+        return np.full((7, 24), default), False
+    return matrix.hour_of_week() / 100, True
+
+
+def parse_number(value, default, minimum, maximum, name='value'):
+    """Parse a finite number between ``minimum`` and ``maximum`` from a query parameter"""
+    number = float(value) if value not in (None, '') else default
+    if not (math.isfinite(number) and minimum <= number <= maximum):
+        raise ValueError(f'{name} must be between {minimum:g} and {maximum:g}')
+    return number
+
+
+def parse_scenario_values(value, default, minimum=0.0, maximum=MAX_SCENARIO_VALUE):
+    """Parse a comma separated list of finite numbers between ``minimum`` and ``maximum`` from a query parameter"""
+    if not value:
+        return list(default)
+    values = [
+        parse_number(item, None, minimum, maximum, name='Scenario values') for item in value.split(',') if item.strip()
+    ]
+    if len(values) > MAX_SCENARIO_VALUES:
+        raise ValueError(f'At most {MAX_SCENARIO_VALUES} values per scenario list')
+    return values or list(default)
+
+
+def weekday_counts(start_date, horizon_days):
+    """How many times each weekday (Monday first) occurs in the horizon"""
+    counts = np.zeros(7)
+    first = start_date.weekday()
+    full_weeks, remainder = divmod(horizon_days, 7)
+    counts += full_weeks
+    counts[(first + np.arange(remainder)) % 7] += 1
+    return counts
+
+
+def project(grid, occupancy, price_multipliers=(1.0,), occupancy_factors=(1.0,),
+            horizon_days=30, start_date=None, elasticity=0.0):
+    """
+    Expected revenue over ``horizon_days`` for every combination of price
+    multiplier and occupancy factor.
+
+    ``occupancy`` is a 7x24 array of fractions or a single rate. With
+    ``elasticity`` e, occupancy also scales by ``multiplier ** -e`` so higher
+    prices book less. Returns a list of scenario dicts in input order.
+    """
+    start_date = start_date or timezone.localdate()
+    scenarios = list(product(price_multipliers, occupancy_factors))
+    multipliers = np.array([scenario[0] for scenario in scenarios], dtype=float).reshape(-1, 1, 1)
+    factors = np.array([scenario[1] for scenario in scenarios], dtype=float).reshape(-1, 1, 1)
+
+    base = np.broadcast_to(np.asarray(occupancy, dtype=float), (7, 24))
+    demand = np.clip(base * factors * multipliers ** -elasticity, 0, 1)
+
+    per_day = weekday_counts(start_date, horizon_days).reshape(1, 7, 1)
+    booked_hours = (grid.hours * demand * per_day).sum(axis=(1, 2))
+    revenue = (grid.hours * grid.prices * multipliers * demand * per_day).sum(axis=(1, 2))
+    capacity_hours = (grid.hours * per_day[0]).sum()
+
+    return [
+        {
+            'price_multiplier': float(multiplier),
+            'occupancy_factor': float(factor),
+            'revenue': float(total),
+            'daily_revenue': float(total) / horizon_days if horizon_days else 0.0,
+            'booked_hours': float(hours),
+            'occupancy_rate': float(hours / capacity_hours * 100) if capacity_hours else 0.0,
+        }
+        for (multiplier, factor), total, hours in zip(scenarios, revenue, booked_hours)
+    ]
@@ -0,0 +1,129 @@
+"""
+Signed price quotes for checkout.
+
+``calculate_price`` prices the selection once with the pricing engine
+(``bookings.pricing``) and returns the line items together with a quote token: the selection and the
+line items, signed with the ``SECRET_KEY`` and stamped with the time it was
+issued. ``create_booking_api`` checks that signature instead of pricing the
+booking again or trusting an amount sent by the client; the client can't
+change a quoted total without invalidating the token.
+
+A quote is honoured for ``QUOTE_TTL`` seconds and only for the playground,
+date and times it was issued for; one issued without a date was priced for
+today and is never honoured as is. Outside of that the booking is priced again
+from the quoted (signed) selection, so prices that changed in the meantime
+apply, but the client still can't alter what is charged. The booking gets
+the quoted amenities, membership pass and custom slot: a booking submitted
+with anything else is rejected, so nothing priced can be added after the
+quote was issued. A custom slot is only priced for its own day and times, so
+its flat price can't cover a longer booking. A coupon in the selection is
+quoted as a discount; the booking is created at the amount before it and the
+coupon is then redeemed onto it, which counts the use.
+"""
+
+import time as clock
+from decimal import Decimal
+
+from django.core import signing
+
+from .pricing import SelectionMismatch, parse_time, rules_for
+
+
+QUOTE_SALT = 'bookings.quotes'
+QUOTE_TTL = 15 * 60
+
+LINE_ITEMS = ('base_price', 'amenity_fees', 'discount_amount', 'subtotal', 'total_amount')
+# Selection fields that change the price besides the date and times
+PRICED_EXTRAS = ('membership_pass_id', 'custom_slot_id')
+
+
+def normalize_selection(start_time=None, end_time=None, amenity_ids='', membership_pass_id=None,
+                        custom_slot_id=None, custom_slot_time=None, booking_date=None, coupon_code=None):
+    """The priced selection in the canonical form quotes sign"""
+    if isinstance(amenity_ids, str):
+        amenity_ids = amenity_ids.split(',')
+    return {
+        'date': str(booking_date) if booking_date else None,
+        'start_time': parse_time(start_time).strftime('%H:%M') if start_time else None,
+        'end_time': parse_time(end_time).strftime('%H:%M') if end_time else None,
+        'amenity_ids': [str(amenity_id).strip() for amenity_id in amenity_ids or () if str(amenity_id).strip()],
+        'membership_pass_id': str(membership_pass_id) if membership_pass_id else None,
+        'custom_slot_id': str(custom_slot_id) if custom_slot_id else None,
+        'custom_slot_time': custom_slot_time or None,
+        'coupon_code': (coupon_code or '').strip().upper() or None,
+    }
+
+
+def price_breakdown(playground, selection, user=None):
+    """Line items for a normalized ``selection`` at ``playground``, from the pricing engine"""
+    return rules_for(playground.id).price(selection, user=user)
+
+
+def issue(playground, selection, breakdown):
+    """Signed token for a quote of ``breakdown`` on ``selection``"""
+    return signing.dumps({
+        'playground_id': playground.id,
+        'selection': selection,
+        'items': {item: str(breakdown[item]) for item in LINE_ITEMS},
+        'issued_at': int(clock.time()),
+    }, salt=QUOTE_SALT, compress=True)
+
+
+def read(token):
+    """The quote in ``token``, with amounts as Decimals; raises ``signing.BadSignature``"""
+    quote = signing.loads(token, salt=QUOTE_SALT)
+    quote['items'] = {item: Decimal(amount) for item, amount in quote['items'].items()}
+    return quote
+
+
+def is_current(quote, playground_id, booking_date, start_time, end_time):
+    """Whether ``quote`` is unexpired and was issued for this playground, date and times"""
+    selection = quote['selection']
+    return (
+        clock.time() - quote['issued_at'] <= QUOTE_TTL
+        and quote['playground_id'] == playground_id
+        and selection['date'] == str(booking_date)
+        and selection['start_time'] == start_time.strftime('%H:%M')
+        and selection['end_time'] == end_time.strftime('%H:%M')
+    )
+
+
+def matches(quoted, submitted):
+    """
+    Whether the ``submitted`` selection has the amenities of the ``quoted``
+    one and no other membership pass or custom slot (leaving them out is fine:
+    the booking gets the quoted ones)
+    """
+    return (
+        sorted(quoted['amenity_ids']) == sorted(submitted['amenity_ids'])
+        and all(submitted.get(field) in (None, quoted.get(field)) for field in PRICED_EXTRAS)
+    )
+
+
+def booking_price(playground, token, booking_date, start_time, end_time, submitted_selection=None, user=None):
+    """
+    Line items to charge for a booking, plus the priced ``selection`` and its
+    ``coupon_code``: the quote's when it is current, otherwise priced again
+    from the quoted selection on the booking's date and times
+    (``submitted_selection`` when there is no token). Raises
+    ``signing.BadSignature`` for a forged or corrupted token, and
+    ``SelectionMismatch`` when ``submitted_selection`` isn't what the token
+    quoted or names something the playground doesn't offer.
+    """
+    submitted_selection = submitted_selection or normalize_selection()
+    if token:
+        quote = read(token)
+        selection = dict(quote['selection'])
+        if not matches(selection, submitted_selection):
+            raise SelectionMismatch('The booking does not match the quoted selection')
+        if is_current(quote, playground.id, booking_date, start_time, end_time):
+            return dict(quote['items'], selection=selection, coupon_code=selection.get('coupon_code'))
+    else:
+        selection = dict(submitted_selection)
+    selection.update(
+        date=str(booking_date), start_time=start_time.strftime('%H:%M'), end_time=end_time.strftime('%H:%M')
+    )
+    breakdown = price_breakdown(playground, selection, user=user)
+    return dict(
+        {item: breakdown[item] for item in LINE_ITEMS}, selection=selection, coupon_code=selection.get('coupon_code')
+    )
@@ -0,0 +1,178 @@
+"""
+Payment receipt processing: thumbnails and duplicate detection.
+
+When a receipt is uploaded the booking is queued for ``process_receipt`` on
+a Celery worker, off the request thread. It writes a small WebP thumbnail for
+the admin pages and two 64-bit perceptual hashes of the image:
+
+- average hash: 8x8 grayscale pixels above the mean
+- difference hash: 9x8 grayscale, each pixel brighter than its left neighbour
+
+Re-saved, rescaled or recompressed copies of the same screenshot hash to the
+same or nearly the same difference hash. The hash is indexed whole for exact
+matches and in four 16-bit bands for near matches: two hashes within
+``NEAR_DUPLICATE_DISTANCE`` (< 4) differing bits always share a band, so the
+candidates come from indexed equality lookups and only those are compared.
+"""
+
+import io
+import logging
+import os
+
+import numpy as np
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import Booking, ReceiptFingerprint
+
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+BANDS = 4
+BAND_BITS = 64 // BANDS
+NEAR_DUPLICATE_DISTANCE = 3
+
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 75
+
+
+def _grayscale(image, width, height):
+    return np.asarray(image.convert('L').resize((width, height), Image.Resampling.LANCZOS), dtype=float)
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), 'big')
+
+
+def average_hash(image):
+    pixels = _grayscale(image, HASH_SIZE, HASH_SIZE)
+    return _bits_to_int(pixels > pixels.mean())
+
+
+def difference_hash(image):
+    pixels = _grayscale(image, HASH_SIZE + 1, HASH_SIZE)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def to_signed(value):
+    """Unsigned 64-bit hash to the signed value a BigIntegerField stores"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value):
+    return value & ((1 << 64) - 1)
+
+
+def hash_bands(value):
+    value = to_unsigned(value)
+    return [(value >> (BAND_BITS * band)) & ((1 << BAND_BITS) - 1) for band in range(BANDS)]
+
+
+def hamming_distance(a, b):
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+def find_duplicates(dhash, before=None, max_distance=NEAR_DUPLICATE_DISTANCE):
+    """
+    ``[(distance, booking_id)]`` of stored receipts within ``max_distance``,
+    closest first; only those of bookings created before the booking
+    ``before`` when given, so a receipt is never flagged as a copy of its copy.
+    """
+    query = Q()
+    for band, value in enumerate(hash_bands(dhash)):
+        query |= Q(**{f'dhash_band{band}': value})
+    candidates = ReceiptFingerprint.objects.filter(query)
+    if before is not None:
+        candidates = candidates.filter(
+            Q(booking__created_at__lt=before.created_at)
+            | Q(booking__created_at=before.created_at, booking_id__lt=before.id)
+        )
+    matches = []
+    for booking_id, stored in candidates.values_list('booking_id', 'difference_hash'):
+        distance = hamming_distance(dhash, stored)
+        if distance <= max_distance:
+            matches.append((distance, booking_id))
+    return sorted(matches)
+
+
+def _thumbnail(image):
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    if thumbnail.mode not in ('RGB', 'RGBA'):
+        thumbnail = thumbnail.convert('RGBA' if 'A' in thumbnail.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+    return ContentFile(buffer.getvalue())
+
+
+def process_receipt(booking_id):
+    """
+    Thumbnail and fingerprint the booking's current receipt. Returns the
+    ``ReceiptFingerprint``, or None without a readable receipt.
+    """
+    booking = Booking.objects.filter(id=booking_id).select_related('receipt_fingerprint').first()
+    if booking is None or not booking.payment_receipt:
+        return None
+    try:
+        with booking.payment_receipt.open('rb') as receipt:
+            image = Image.open(receipt)
+            image.load()
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Receipt of booking %s could not be read as an image", booking_id, exc_info=True)
+        return None
+    image = ImageOps.exif_transpose(image)
+
+    dhash = difference_hash(image)
+    duplicates = find_duplicates(dhash, before=booking)
+
+    fingerprint = getattr(booking, 'receipt_fingerprint', None) or ReceiptFingerprint(booking=booking)
+    if fingerprint.thumbnail:
+        fingerprint.thumbnail.delete(save=False)
+    fingerprint.receipt_name = booking.payment_receipt.name
+    fingerprint.average_hash = to_signed(average_hash(image))
+    fingerprint.difference_hash = to_signed(dhash)
+    for band, value in enumerate(hash_bands(dhash)):
+        setattr(fingerprint, f'dhash_band{band}', value)
+    fingerprint.duplicate_distance, fingerprint.duplicate_of_id = duplicates[0] if duplicates else (None, None)
+
+    name = os.path.splitext(os.path.basename(booking.payment_receipt.name))[0]
+    fingerprint.thumbnail.save(f'{name}.webp', _thumbnail(image), save=False)
+    fingerprint.save()
+    return fingerprint
+
+
+def enqueue(booking_id):
+    """Queue a booking's receipt for processing; a missed one is picked up by ``process_receipts``"""
+    from .tasks import process_payment_receipt
+    try:
+        process_payment_receipt.apply_async((booking_id,), retry=False)
+    except Exception:
+        logger.exception("Queueing receipt processing for booking %s failed", booking_id)
+
+
+def thumbnail_url(booking):
+    """The receipt's thumbnail URL, or the receipt itself until one exists"""
+    fingerprint = getattr(booking, 'receipt_fingerprint', None)
+    if fingerprint is not None and fingerprint.thumbnail and fingerprint.receipt_name == booking.payment_receipt.name:
+        return fingerprint.thumbnail.url
+    return booking.payment_receipt.url if booking.payment_receipt else None
+
+
+def suspected_duplicates(bookings):
+    """
+    ``{booking_id: [booking ids with a matching receipt]}`` for bookings
+    fetched with their ``receipt_fingerprint``, in one query: the receipt each
+    one was flagged as duplicating plus later receipts flagged as its copies.
+    """
+    matches = {booking.id: set() for booking in bookings}
+    for booking in bookings:
+        fingerprint = getattr(booking, 'receipt_fingerprint', None)
+        if fingerprint is not None and fingerprint.duplicate_of_id:
+            matches[booking.id].add(fingerprint.duplicate_of_id)
+    for booking_id, original_id in ReceiptFingerprint.objects.filter(
+        duplicate_of_id__in=list(matches)
+    ).values_list('booking_id', 'duplicate_of_id'):
+        matches[original_id].add(booking_id)
+    return {booking_id: sorted(ids) for booking_id, ids in matches.items()}
@@ -0,0 +1,160 @@
+"""
+Cancellation refunds.
+
+``refund_for`` is the refund policy, shared by ``Booking.calculate_refund_amount``
+and ``cancel_bookings``: the share of the amount paid that is refunded
+depends on how long before the start the booking is cancelled.
+
+``cancel_bookings`` cancels every upcoming booking of a playground in a date
+range at once (weather, maintenance): refunds are computed for all of them in
+one pass and the bookings, their history, the owner's earnings ledger, the
+availability inventory, their coupon uses and the customer notifications are
+written in bulk in one transaction.
+"""
+
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from earnings.ledger import debit_refunds
+from notifications.models import Notification
+from playgrounds.models import PlaygroundAvailability
+from playgrounds.signals import invalidate_bookings
+
+from .coupons import release_uses
+from .models import Booking, BookingHistory
+from .rollups import refresh_daily_stats
+
+
+# (hours before the start, share refunded), checked in order
+REFUND_TIERS = (
+    (48, Decimal('1')),
+    (24, Decimal('0.5')),
+)
+
+CANCELLABLE_STATUSES = ('pending', 'confirmed')
+# Payment states in which the customer has paid, verified or not
+REFUNDABLE_PAYMENT_STATUSES = ('paid', 'receipt_uploaded')
+
+
+def starts_at(booking_date, start_time):
+    return timezone.make_aware(datetime.combine(booking_date, start_time))
+
+
+def refund_for(amount, start, now=None):
+    """Refund due on ``amount`` for a booking starting at ``start`` cancelled at ``now``"""
+    now = now or timezone.now()
+    if start <= now:
+        return Decimal('0')
+    hours_until_booking = (start - now).total_seconds() / 3600
+    for hours, share in REFUND_TIERS:
+        if hours_until_booking >= hours:
+            return (amount * share).quantize(Decimal('0.01'))
+    return Decimal('0')
+
+
+def _upcoming(now):
+    local = timezone.localtime(now)
+    return Q(booking_date__gt=local.date()) | Q(booking_date=local.date(), start_time__gt=local.time())
+
+
+def _release_inventory(bookings):
+    """Give the cancelled bookings' spots back to the availability rows that track them"""
+    released = Counter((b.playground_id, b.booking_date, b.start_time, b.end_time) for b in bookings)
+    query = Q()
+    for playground_id, day, start_time, end_time in released:
+        query |= Q(playground_id=playground_id, date=day,
+                   time_slot__start_time=start_time, time_slot__end_time=end_time)
+    rows = PlaygroundAvailability.objects.filter(query).values_list(
+        'id', 'playground_id', 'date', 'time_slot__start_time', 'time_slot__end_time'
+    )
+    spots = {row[0]: released[row[1:]] for row in rows}
+    if spots:
+        PlaygroundAvailability.objects.filter(id__in=spots).update(available_spots=Least(
+            Case(*[When(id=row_id, then=F('available_spots') + count) for row_id, count in spots.items()],
+                 default=F('available_spots'), output_field=IntegerField()),
+            F('total_spots'),
+        ))
+    return len(spots)
+
+
+def cancel_bookings(playground, start_date, end_date, reason, cancelled_by=None, preview=False):
+    """
+    Cancel the playground's upcoming pending and confirmed bookings from
+    ``start_date`` to ``end_date`` inclusive. Paid ones, and ones with an
+    uploaded receipt, get a pending refund under the cancellation policy.
+
+    Returns ``(bookings, refunds)``: the cancelled bookings and a
+    ``{booking_id: refund_amount}`` map. With ``preview`` nothing is written.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        bookings = Booking.objects.filter(
+            _upcoming(now), playground=playground, status__in=CANCELLABLE_STATUSES,
+            booking_date__gte=start_date, booking_date__lte=end_date,
+        ).order_by('booking_date', 'start_time', 'id')
+        if not preview:
+            bookings = bookings.select_for_update()
+        bookings = list(bookings)
+
+        refunds = {
+            booking.id: (
+                refund_for(booking.final_amount, starts_at(booking.booking_date, booking.start_time), now)
+                if booking.payment_status in REFUNDABLE_PAYMENT_STATUSES else Decimal('0')
+            )
+            for booking in bookings
+        }
+        if preview or not bookings:
+            return bookings, refunds
+
+        release_uses([booking.id for booking in bookings])
+
+        history = []
+        notifications = []
+        for booking in bookings:
+            refund = refunds[booking.id]
+            history.append(BookingHistory(
+                booking=booking, changed_by=cancelled_by, change_type='cancelled',
+                old_status=booking.status, new_status='cancelled', notes=reason, created_at=now,
+            ))
+            message = (
+                f'Your booking at {playground.name} on {booking.booking_date:%Y-%m-%d} '
+                f'at {booking.start_time:%H:%M} has been cancelled by the playground: {reason}'
+            )
+            if refund:
+                message += f' A refund of {refund} will be processed.'
+            notifications.append(Notification(
+                recipient_id=booking.user_id,
+                title='Booking cancelled',
+                message=message,
+                notification_type='booking_cancelled',
+                priority='high',
+                booking=booking,
+                playground=playground,
+                created_at=now,
+            ))
+
+            booking.status = 'cancelled'
+            booking.cancelled_at = now
+            booking.cancellation_reason = reason
+            booking.refund_amount = refund
+            booking.refund_status = 'pending' if refund else 'not_applicable'
+            booking.updated_at = now
+
+        Booking.objects.bulk_update(bookings, [
+            'status', 'cancelled_at', 'cancellation_reason', 'refund_amount', 'refund_status', 'updated_at',
+        ], batch_size=500)
+        BookingHistory.objects.bulk_create(history, batch_size=500)
+        Notification.objects.bulk_create(notifications, batch_size=500)
+        debit_refunds({booking_id: amount for booking_id, amount in refunds.items() if amount}, cancelled_by)
+        _release_inventory(bookings)
+
+        affected = {(playground.id, booking.booking_date) for booking in bookings}
+        transaction.on_commit(lambda: invalidate_bookings(affected))
+        transaction.on_commit(lambda: refresh_daily_stats(affected))
+    return bookings, refunds
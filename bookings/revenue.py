@@ -0,0 +1,96 @@
+"""
+Revenue across currencies.
+
+Every booking is in its playground's currency (``Booking.currency``) and,
+once confirmed or paid, carries a snapshot of that currency's rate to the
+reporting currency (``Booking.exchange_rate``, see
+``playgrounds.exchange_rates``). Sums across bookings in different currencies
+convert each booking inside the query: with its snapshot rate, or the current
+rate of its currency for bookings that don't have one yet. Bookings already
+in the target currency are summed as they are, so single-currency totals are
+exact.
+
+``by_currency`` gives native and converted totals per currency in one
+grouped query.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from playgrounds.currency import CURRENCIES
+from playgrounds.exchange_rates import current_rates, rate_to_reporting, reporting_currency
+
+
+RATE_FIELD = DecimalField(max_digits=18, decimal_places=8)
+MONEY_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def target_currency(currencies):
+    """The one currency of ``currencies``, or the reporting currency when they are mixed or none"""
+    currencies = set(currencies)
+    return currencies.pop() if len(currencies) == 1 else reporting_currency()
+
+
+def booking_rate():
+    """The booking's rate to the reporting currency: its snapshot, else its currency's current rate"""
+    rates = current_rates()
+    return Coalesce(
+        F('exchange_rate'),
+        Case(
+            *[When(currency=code, then=Value(rates[code])) for code in CURRENCIES if code in rates],
+            default=Value(None),
+            output_field=RATE_FIELD,
+        ),
+        output_field=RATE_FIELD,
+    )
+
+
+def in_currency(field='final_amount', currency=None):
+    """
+    Expression: a booking's ``field`` converted to ``currency`` (default:
+    the reporting currency). NULL when its currency has no known rate.
+    """
+    currency = currency or reporting_currency()
+    target_rate = rate_to_reporting(currency)
+    if not target_rate:
+        raise ValueError(f'No exchange rate for {currency}')
+    # Multiplied by the inverse: SQLite casts both sides of a division to NUMERIC,
+    # which truncates whole amounts over whole rates (5.00 / 2 = 2)
+    per_target_unit = Value(1 / target_rate)
+    return Case(
+        When(currency=currency, then=F(field)),
+        default=ExpressionWrapper(F(field) * booking_rate() * per_target_unit, output_field=MONEY_FIELD),
+        output_field=MONEY_FIELD,
+    )
+
+
+def converted_sum(field='final_amount', currency=None, filter=None):
+    """``Sum`` of ``field`` over bookings in any currency, in ``currency``; 0 when there are none"""
+    return Coalesce(
+        Sum(in_currency(field, currency), filter=filter), Value(Decimal('0')), output_field=MONEY_FIELD
+    )
+
+
+def snapshot_exchange_rates(bookings):
+    """
+    Snapshot the current rate on bookings of a queryset that don't have one,
+    for code confirming or marking bookings paid with ``QuerySet.update()``
+    (``Booking.save`` does it otherwise). Returns the number updated.
+    """
+    return bookings.filter(exchange_rate__isnull=True).update(exchange_rate=booking_rate())
+
+
+def by_currency(bookings, field='final_amount', currency=None):
+    """
+    ``{booking currency: {'bookings', 'amount', 'converted'}}`` for a booking
+    queryset: the native total and the total converted to ``currency``
+    (default: the reporting currency), one grouped query.
+    """
+    rows = bookings.values('currency').annotate(
+        bookings=Count('id'),
+        amount=Sum(field),
+        converted=Sum(in_currency(field, currency)),
+    ).order_by('currency')
+    return {row.pop('currency'): row for row in rows}
@@ -0,0 +1,160 @@
+"""
+Maintenance and range reads for the PlaygroundDailyStats rollup.
+
+Rows are recomputed from the bookings of their (playground, date) rather than
+adjusted by deltas, so a refresh is idempotent and always converges. Booking
+signals schedule the refresh with ``transaction.on_commit``; the refresh locks
+the stats row first so concurrent refreshes of the same day serialize and the
+last one reads every committed booking.
+
+Code that changes bookings with ``QuerySet.update()`` bypasses the signals and
+must call ``refresh_daily_stats`` with the affected (playground_id, date) pairs.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum, Value, DecimalField
+from django.db.models.functions import Coalesce
+
+from .models import Booking, PlaygroundDailyStats
+
+
+PAID = Q(payment_status='paid')
+KEPT = Q(status__in=['confirmed', 'completed'])
+ACTIVE = Q(status__in=['pending', 'confirmed', 'completed'])
+
+STAT_FIELDS = (
+    'bookings_total', 'bookings_pending', 'bookings_confirmed', 'bookings_completed',
+    'bookings_cancelled', 'bookings_no_show', 'gross_revenue', 'net_revenue',
+    'booked_value', 'refunded_amount', 'players', 'hours',
+)
+
+
+def _money(expression):
+    return Coalesce(expression, Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _aggregates():
+    """Rollup columns as conditional aggregates over Booking"""
+    return {
+        'bookings_total': Count('id'),
+        'bookings_pending': Count('id', filter=Q(status='pending')),
+        'bookings_confirmed': Count('id', filter=Q(status='confirmed')),
+        'bookings_completed': Count('id', filter=Q(status='completed')),
+        'bookings_cancelled': Count('id', filter=Q(status='cancelled')),
+        'bookings_no_show': Count('id', filter=Q(status='no_show')),
+        'gross_revenue': _money(Sum('final_amount', filter=PAID)),
+        'net_revenue': _money(Sum('final_amount', filter=PAID & KEPT)),
+        'booked_value': _money(Sum('final_amount', filter=KEPT)),
+        'refunded_amount': _money(Sum('refund_amount')),
+        'players': Coalesce(Sum('number_of_players', filter=ACTIVE), 0),
+        'hours': _money(Sum('duration_hours', filter=ACTIVE)),
+    }
+
+
+def refresh_daily_stats(playground_dates):
+    """Recompute the rollup rows for (playground_id, date) pairs"""
+    for playground_id, day in set(playground_dates):
+        if playground_id is None or day is None:
+            continue
+        with transaction.atomic():
+            stats, _ = PlaygroundDailyStats.objects.select_for_update().get_or_create(
+                playground_id=playground_id, date=day
+            )
+            totals = Booking.objects.filter(
+                playground_id=playground_id, booking_date=day
+            ).aggregate(**_aggregates())
+            if not totals['bookings_total']:
+                stats.delete()
+                continue
+            for field in STAT_FIELDS:
+                setattr(stats, field, totals[field])
+            stats.save()
+
+
+def schedule_refresh(playground_dates):
+    """Refresh the rollup once the current transaction commits"""
+    playground_dates = set(playground_dates)
+    if playground_dates:
+        transaction.on_commit(lambda: refresh_daily_stats(playground_dates))
+
+
+def backfill_daily_stats(start_date=None, end_date=None, playground_ids=None, batch_size=1000):
+    """
+    Rebuild the rollup from bookings with one grouped query.
+
+    Rows in the range that no longer have bookings are removed. Returns the
+    number of rows written.
+    """
+    bookings = Booking.objects.all()
+    stale = PlaygroundDailyStats.objects.all()
+    if start_date:
+        bookings = bookings.filter(booking_date__gte=start_date)
+        stale = stale.filter(date__gte=start_date)
+    if end_date:
+        bookings = bookings.filter(booking_date__lte=end_date)
+        stale = stale.filter(date__lte=end_date)
+    if playground_ids:
+        bookings = bookings.filter(playground_id__in=playground_ids)
+        stale = stale.filter(playground_id__in=playground_ids)
+
+    rows = [
+        PlaygroundDailyStats(
+            playground_id=row['playground_id'],
+            date=row['booking_date'],
+            **{field: row[field] for field in STAT_FIELDS},
+        )
+        for row in bookings.order_by().values('playground_id', 'booking_date').annotate(**_aggregates())
+    ]
+
+    with transaction.atomic():
+        stale.delete()
+        PlaygroundDailyStats.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def daily_stats(playgrounds, start_date, end_date):
+    """
+    Summed rollup rows per day for the given playgrounds, one range query.
+
+    Returns ``{date: {field: value}}`` with an entry for every day in the
+    range (zeros where there were no bookings).
+    """
+    rows = PlaygroundDailyStats.objects.filter(
+        playground__in=playgrounds, date__gte=start_date, date__lte=end_date
+    ).values('date').annotate(**{field: Sum(field) for field in STAT_FIELDS}).order_by('date')
+    by_date = {row.pop('date'): row for row in rows}
+
+    days = {}
+    current = start_date
+    while current <= end_date:
+        days[current] = by_date.get(current) or _empty_row()
+        current += timedelta(days=1)
+    return days
+
+
+def monthly_stats(playgrounds, year):
+    """Summed rollup rows per month (1-12) of a year, one range query"""
+    months = defaultdict(_empty_row)
+    rows = PlaygroundDailyStats.objects.filter(
+        playground__in=playgrounds, date__year=year
+    ).values('date__month').annotate(**{field: Sum(field) for field in STAT_FIELDS})
+    for row in rows:
+        months[row.pop('date__month')] = row
+    return {month: months[month] for month in range(1, 13)}
+
+
+def _empty_row():
+    return {field: 0 for field in STAT_FIELDS}
+
+
+def sum_stats(rows):
+    """Add up rollup rows (e.g. the values of ``daily_stats``)"""
+    total = _empty_row()
+    for row in rows:
+        for field in STAT_FIELDS:
+            total[field] += row[field] or 0
+    return total
@@ -0,0 +1,78 @@
+"""
+Signal handlers keeping the PlaygroundDailyStats rollup in sync with bookings,
+giving coupon uses back when a booking is cancelled, queueing newly uploaded
+payment receipts for processing and dropping cached coupon definitions when a
+coupon changes
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_init, m2m_changed
+from django.dispatch import receiver
+
+from playground_booking.caching import tiered_cache
+
+from . import receipts
+from .coupons import coupon_tags, release_uses
+from .models import Booking, Coupon
+from .rollups import schedule_refresh
+
+
+@receiver(post_init, sender=Booking)
+def remember_rollup_key(sender, instance, **kwargs):
+    # A reschedule or playground change moves the booking between rollup rows
+    instance._rollup_key = (instance.__dict__.get('playground_id'), instance.__dict__.get('booking_date'))
+    receipt = instance.__dict__.get('payment_receipt')
+    instance._receipt_name = getattr(receipt, 'name', receipt) or ''
+    instance._original_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    current_key = (instance.playground_id, instance.booking_date)
+    schedule_refresh({current_key, getattr(instance, '_rollup_key', current_key)})
+    instance._rollup_key = current_key
+
+
+@receiver(post_save, sender=Booking)
+def booking_cancelled(sender, instance, created, **kwargs):
+    # Bulk cancellations bypass save() and call release_uses themselves
+    if instance.status == 'cancelled' and not created and getattr(instance, '_original_status', None) != 'cancelled':
+        release_uses([instance.pk])
+    instance._original_status = instance.status
+
+
+@receiver(post_save, sender=Booking)
+def receipt_uploaded(sender, instance, **kwargs):
+    name = instance.payment_receipt.name or ''
+    if name and name != getattr(instance, '_receipt_name', ''):
+        booking_id = instance.pk
+        transaction.on_commit(lambda: receipts.enqueue(booking_id))
+    instance._receipt_name = name
+
+
+@receiver(post_init, sender=Coupon)
+def remember_coupon_code(sender, instance, **kwargs):
+    instance._cached_code = instance.__dict__.get('code')
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def coupon_changed(sender, instance, **kwargs):
+    tags = coupon_tags(instance.code)
+    if getattr(instance, '_cached_code', None):
+        tags += coupon_tags(instance._cached_code)
+    tiered_cache.invalidate(tags)
+    instance._cached_code = instance.code
+
+
+@receiver(m2m_changed, sender=Coupon.applicable_playgrounds.through)
+@receiver(m2m_changed, sender=Coupon.applicable_users.through)
+def coupon_targets_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        tiered_cache.invalidate(coupon_tags(instance.code))
+    elif pk_set:
+        codes = Coupon.objects.filter(pk__in=pk_set).values_list('code', flat=True)
+        tiered_cache.invalidate([tag for code in codes for tag in coupon_tags(code)])
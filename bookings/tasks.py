@@ -0,0 +1,35 @@
+"""
+Booking tasks (periodic ones are scheduled in CELERY_BEAT_SCHEDULE in settings)
+"""
+
+from celery import shared_task
+
+from .analytics import refresh_playground_analytics as _refresh_playground_analytics
+from .forecasting import refresh_demand_forecasts as _refresh_demand_forecasts
+from .price_advisor import refresh_price_suggestions as _refresh_price_suggestions
+from .receipts import process_receipt
+
+
+@shared_task
+def refresh_playground_analytics():
+    """Recompute PlaygroundAnalytics for every playground"""
+    return _refresh_playground_analytics()
+
+
+@shared_task
+def refresh_demand_forecasts():
+    """Recompute the per-playground demand forecasts"""
+    return _refresh_demand_forecasts()
+
+
+@shared_task
+def refresh_price_suggestions():
+    """Recompute the per-playground demand-based price suggestions"""
+    return _refresh_price_suggestions()
+
+
+@shared_task
+def process_payment_receipt(booking_id):
+    """Thumbnail and fingerprint an uploaded payment receipt"""
+    fingerprint = process_receipt(booking_id)
+    return fingerprint.duplicate_of_id if fingerprint else None
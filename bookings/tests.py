@@ -1,3 +1,726 @@
-from django.test import TestCase
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+import numpy as np
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from api.enhanced_owner_api import revenue_projection_api
+from earnings.ledger import credit_booking
+from earnings.models import EarningsRecord
+from playground_booking.caching import tiered_cache
+from playgrounds.models import (
+    Amenity, City, Country, DurationPass, Playground, PlaygroundAnalytics, PlaygroundSlot, State, TimeSlot
+)
+
+from . import quotes
+from .analytics import refresh_playground_analytics
+from .cohorts import cohort_analytics
+from .coupons import redeem
+from .forecasting import forecast_weeks, refresh_demand_forecasts, smooth, stored_forecast, weekly_histograms
+from .models import Booking, BookingCoupon, Coupon
+from .occupancy import hour_overlap, occupancy_matrix
+from .price_advisor import accept_suggestions, suggest_multipliers
+from .pricing import SelectionMismatch, rules_for
+from .projection import parse_scenario_values
+from .refunds import cancel_bookings
+from .revenue import by_currency, converted_sum, snapshot_exchange_rates, target_currency
+from .verification import AWAITING_VERIFICATION, bulk_decide
+from .views import calculate_price, create_booking_api
+
+
+def make_playground(**fields):
+    owner = User.objects.create_user(email=f'owner{User.objects.count()}@example.com', password='x', user_type='owner')
+    country, _ = Country.objects.get_or_create(name='Country', code='CC')
+    state, _ = State.objects.get_or_create(name='State', country=country)
+    city, _ = City.objects.get_or_create(name='City', state=state)
+    fields = {'price_per_hour': 100, 'capacity': 10, 'address': 'Address', 'status': 'active', **fields}
+    return Playground.objects.create(name='Playground', owner=owner, city=city, **fields)
+
+
+def make_booking(user, playground, start_hour=9, days_ahead=5, **fields):
+    fields = {
+        'final_amount': 100, 'total_amount': 100, 'price_per_hour': 100, 'duration_hours': 1,
+        'status': 'confirmed', 'payment_status': 'paid', **fields,
+    }
+    return Booking.objects.create(
+        user=user, playground=playground, booking_date=timezone.localdate() + timedelta(days=days_ahead),
+        start_time=time(start_hour), end_time=time(start_hour + 1), number_of_players=2, **fields,
+    )
+
+
+def make_coupon(code='TEN', **fields):
+    now = timezone.now()
+    fields = {'max_uses': 5, 'max_uses_per_user': 1, **fields}
+    return Coupon.objects.create(
+        code=code, description='Coupon', discount_type='fixed', discount_value=10,
+        valid_from=now - timedelta(days=1), valid_until=now + timedelta(days=1), **fields,
+    )
+
+
+def quote_issued_at(quote):
+    return quotes.read(quote['quote'])['issued_at']
+
+
+class CacheIsolationMixin:
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        tiered_cache.clear_local()
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite serializes writes; the race needs a database with row locks')
+class CouponConcurrencyTests(CacheIsolationMixin, TransactionTestCase):
+    """Many checkouts racing for one coupon never exceed its limits"""
+
+    def test_concurrent_redemptions_respect_limits(self):
+        playground = make_playground()
+        users = [User.objects.create_user(email=f'user{i}@example.com', password='x') for i in range(10)]
+        bookings = [
+            make_booking(users[i % len(users)], playground, start_hour=i % 20, days_ahead=1 + i // 20)
+            for i in range(60)
+        ]
+        coupon = make_coupon(max_uses=15, max_uses_per_user=2)
+
+        def attempt(booking):
+            try:
+                redeem(coupon.code, booking)
+                return 'redeemed'
+            except ValidationError as e:
+                return e.code
+            except OperationalError:
+                return 'db_error'
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            outcomes = list(pool.map(attempt, bookings))
+
+        coupon.refresh_from_db()
+        usages = BookingCoupon.objects.filter(coupon=coupon)
+        self.assertNotIn('db_error', outcomes)
+        self.assertEqual(outcomes.count('redeemed'), 15)
+        self.assertEqual(coupon.used_count, 15)
+        self.assertEqual(usages.count(), 15)
+        for user in users:
+            self.assertLessEqual(usages.filter(booking__user=user).count(), 2)
+
+
+class CouponRedemptionTests(CacheIsolationMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.playground = make_playground()
+        self.user = User.objects.create_user(email='user@example.com', password='x')
+        self.other = User.objects.create_user(email='other@example.com', password='x')
+
+    def test_redeem_discounts_the_booking_and_counts_the_use(self):
+        coupon = make_coupon()
+        booking = make_booking(self.user, self.playground)
+        redeem('ten', booking)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+        self.assertEqual(booking.final_amount, Decimal('90.00'))
+        self.assertEqual(booking.discount_amount, Decimal('10.00'))
+
+    def test_global_limit(self):
+        coupon = make_coupon(max_uses=1)
+        redeem('TEN', make_booking(self.user, self.playground))
+        with self.assertRaises(ValidationError) as raised:
+            redeem('TEN', make_booking(self.other, self.playground, start_hour=10))
+        self.assertEqual(raised.exception.code, 'exhausted')
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+
+    def test_per_user_limit_rolls_the_use_back(self):
+        coupon = make_coupon(max_uses=5, max_uses_per_user=1)
+        redeem('TEN', make_booking(self.user, self.playground))
+        with self.assertRaises(ValidationError) as raised:
+            redeem('TEN', make_booking(self.user, self.playground, start_hour=10))
+        self.assertEqual(raised.exception.code, 'user_limit')
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+
+    def test_cancelling_gives_the_use_back(self):
+        coupon = make_coupon(max_uses=1, max_uses_per_user=1)
+        booking = make_booking(self.user, self.playground)
+        redeem('TEN', booking)
+        booking.cancel_booking('Changed plans')
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 0)
+        # The cancelled booking keeps what was paid for it
+        booking.refresh_from_db()
+        self.assertEqual(booking.final_amount, Decimal('90.00'))
+        redeem('TEN', make_booking(self.user, self.playground, start_hour=10))
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+
+
+class QuoteTests(CacheIsolationMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.playground = make_playground(amenities=[{'name': 'Coach', 'price': '30'}])
+        self.duration_pass = DurationPass.objects.create(
+            playground=self.playground, name='Week', duration_type='weekly', duration_days=7, price=500
+        )
+        self.user = User.objects.create_user(email='user@example.com', password='x')
+        self.day = str(timezone.localdate() + timedelta(days=5))
+        self.amenities = [{'id': 'p_coach_0', 'name': 'Coach'}]
+
+    def quote(self, **params):
+        request = RequestFactory().get('/', {
+            'playground_id': self.playground.id, 'date': self.day, 'start_time': '09:00', 'end_time': '11:00',
+            **params,
+        })
+        request.user = self.user
+        return json.loads(calculate_price(request).content)
+
+    def book(self, start_time='09:00', end_time='11:00', **fields):
+        body = {
+            'playground_id': self.playground.id, 'booking_date': self.day, 'start_time': start_time,
+            'end_time': end_time, 'number_of_players': 2, 'payment_method': 'cash_on_delivery',
+            'total_amount': 1, **fields,
+        }
+        request = RequestFactory().post('/', data=json.dumps(body), content_type='application/json')
+        request.user = self.user
+        response = create_booking_api(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_quoted_amount_is_charged(self):
+        quote = self.quote(amenity_ids='p_coach_0')
+        self.assertEqual(quote['total_amount'], 230.0)
+        status, body = self.book(price_quote=quote['quote'], selected_amenities=self.amenities)
+        self.assertEqual(status, 200)
+        self.assertEqual(Booking.objects.get(id=body['booking_id']).final_amount, Decimal('230.00'))
+
+    def test_tampered_quote_is_rejected(self):
+        quote = self.quote()
+        status, _ = self.book(price_quote=quote['quote'][:-2] + 'xx')
+        self.assertEqual(status, 400)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_extras_added_after_the_quote_are_rejected(self):
+        quote = self.quote()
+        status, _ = self.book(price_quote=quote['quote'], membership_pass_id=self.duration_pass.id)
+        self.assertEqual(status, 400)
+        status, _ = self.book(price_quote=quote['quote'], selected_amenities=self.amenities)
+        self.assertEqual(status, 400)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_expired_quote_is_priced_again_from_its_selection(self):
+        quote = self.quote(amenity_ids='p_coach_0')
+        self.playground.price_per_hour = 150
+        self.playground.save()
+        cache.clear()
+        tiered_cache.clear_local()
+        with mock.patch('bookings.quotes.clock.time', return_value=quote_issued_at(quote) + quotes.QUOTE_TTL + 1):
+            status, body = self.book(price_quote=quote['quote'], selected_amenities=self.amenities)
+        self.assertEqual(status, 200)
+        self.assertEqual(Booking.objects.get(id=body['booking_id']).final_amount, Decimal('330.00'))
+
+
+    def test_quote_without_a_date_is_priced_again_for_the_booking_date(self):
+        weekday = date.fromisoformat(self.day).strftime('%A').lower()
+        self.playground.custom_pricing = {
+            'peak_windows': [{'days': [weekday], 'start': '08:00', 'end': '12:00', 'multiplier': '2'}]
+        }
+        self.playground.save()
+        cache.clear()
+        tiered_cache.clear_local()
+        # Priced for today, which is never the booking's weekday here
+        quote = self.quote(date='')
+        self.assertEqual(quote['total_amount'], 200.0)
+        status, body = self.book(price_quote=quote['quote'])
+        self.assertEqual(status, 200)
+        self.assertEqual(Booking.objects.get(id=body['booking_id']).final_amount, Decimal('400.00'))
+
+    def test_custom_slot_only_covers_its_own_times(self):
+        weekday = date.fromisoformat(self.day).strftime('%A').lower()
+        slot = PlaygroundSlot.objects.create(
+            playground=self.playground, start_time=time(9), end_time=time(11), price=25, day_of_week=weekday
+        )
+        # An unknown slot id, or a real one stretched over a longer booking, is not priced at the slot's price
+        for custom_slot_id, custom_time in ((999999, '08:00 - 09:00'), (slot.id, '09:00 AM - 11:00 AM')):
+            quote = self.quote(
+                start_time='08:00', end_time='22:00', custom_slot_id=custom_slot_id, custom_slot_time=custom_time
+            )
+            self.assertFalse(quote['success'])
+            status, _ = self.book(
+                start_time='08:00', end_time='22:00', custom_slot_id=custom_slot_id,
+                custom_slot_actual_time=custom_time,
+            )
+            self.assertEqual(status, 400)
+        self.assertFalse(Booking.objects.exists())
+
+        quote = self.quote(custom_slot_id=slot.id, custom_slot_time='09:00 AM - 11:00 AM')
+        self.assertEqual(quote['total_amount'], 25.0)
+        status, body = self.book(
+            price_quote=quote['quote'], booking_type='custom_slot', custom_slot_id=slot.id,
+            custom_slot_actual_time='09:00 AM - 11:00 AM',
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(Booking.objects.get(id=body['booking_id']).final_amount, Decimal('25.00'))
+
+class PricingTests(CacheIsolationMixin, TestCase):
+    MONDAY = date(2030, 1, 7)
+
+    def setUp(self):
+        super().setUp()
+        self.playground = make_playground(
+            amenities=[{'name': 'Coach', 'price': '30'}, 'Parking'],
+            custom_pricing={'peak_windows': [
+                {'days': ['monday'], 'start': '17:00', 'end': '21:00', 'multiplier': '1.5'},
+                # No days: every day, running past midnight
+                {'start': '23:00', 'end': '01:00', 'multiplier': '2'},
+            ]},
+        )
+        TimeSlot.objects.create(
+            playground=self.playground, day_of_week='monday', start_time=time(9), end_time=time(10), price=60
+        )
+        self.lights = Amenity.objects.create(name='Lights', amenity_type='paid', price=20)
+        self.playground.playground_amenities.add(self.lights)
+        self.other_amenity = Amenity.objects.create(name='Sauna', amenity_type='paid', price=50)
+        self.duration_pass = DurationPass.objects.create(
+            playground=self.playground, name='Week', duration_type='weekly', duration_days=7, price=500
+        )
+        self.inactive_pass = DurationPass.objects.create(
+            playground=self.playground, name='Old', duration_type='weekly', duration_days=7, price=300,
+            is_active=False,
+        )
+        self.other_pass = DurationPass.objects.create(
+            playground=make_playground(), name='Elsewhere', duration_type='weekly', duration_days=7, price=400
+        )
+        self.custom_slot = PlaygroundSlot.objects.create(
+            playground=self.playground, start_time=time(18), end_time=time(20), price=120, day_of_week='monday'
+        )
+        self.rules = rules_for(self.playground.id)
+
+    def price(self, **selection):
+        return self.rules.price({'date': str(self.MONDAY), **selection})
+
+    def test_segments_fold_slot_overrides_and_peak_windows(self):
+        monday, tuesday = 0, 1
+        # 08-09 base, 09-10 the slot's own price, 10-11 base
+        self.assertEqual(self.rules.interval_price(monday, time(8), time(11)), Decimal('260.00'))
+        # Half base, half in the Monday peak window
+        self.assertEqual(self.rules.interval_price(monday, time(16), time(18)), Decimal('250.00'))
+        self.assertEqual(self.rules.interval_price(tuesday, time(16), time(18)), Decimal('200.00'))
+        # The late window runs into Tuesday morning
+        self.assertEqual(self.rules.interval_price(monday, time(22), time(0, 30)), Decimal('400.00'))
+        self.assertEqual(
+            self.rules.price_slots(self.MONDAY, [(time(9), time(10)), (time(17), time(18))]),
+            [Decimal('60.00'), Decimal('150.00')],
+        )
+
+    def test_selection_is_priced_without_queries(self):
+        with self.assertNumQueries(0):
+            breakdown = self.price(
+                start_time='09:00', end_time='11:00', membership_pass_id=str(self.duration_pass.id),
+                amenity_ids=[str(self.lights.id), str(self.other_amenity.id), 'p_coach_0', 'p_parking_1', 'p_x_9'],
+            )
+        self.assertEqual(breakdown['base_price'], Decimal('660.00'))
+        # Another playground's amenity and an unknown JSON index are left out
+        self.assertEqual([line[0] for line in breakdown['amenities']], [self.lights.id, 'p_coach_0', 'p_parking_1'])
+        self.assertEqual(breakdown['amenity_fees'], Decimal('50.00'))
+        self.assertEqual(breakdown['total_amount'], Decimal('710.00'))
+
+    def test_only_the_playgrounds_active_passes_are_priced(self):
+        for duration_pass in (self.inactive_pass, self.other_pass):
+            with self.assertRaises(SelectionMismatch):
+                self.price(start_time='09:00', end_time='10:00', membership_pass_id=str(duration_pass.id))
+        self.assertIsNone(self.rules.pass_price(self.other_pass.id))
+
+    def test_custom_slot_is_priced_for_its_own_day_and_times(self):
+        breakdown = self.price(
+            start_time='18:00', end_time='20:00', custom_slot_id=str(self.custom_slot.id),
+            custom_slot_time='06:00 PM - 08:00 PM',
+        )
+        self.assertEqual((breakdown['base_price'], breakdown['duration_hours']), (Decimal('120'), 2.0))
+        self.assertEqual(breakdown['slot_type'], 'custom')
+        for selection in (
+            {'date': str(self.MONDAY + timedelta(days=1)), 'custom_slot_time': '18:00 - 20:00'},
+            {'custom_slot_time': '18:00 - 21:00'},
+            {'start_time': '17:00', 'end_time': '20:00', 'custom_slot_time': '18:00 - 20:00'},
+        ):
+            with self.assertRaises(SelectionMismatch):
+                self.price(**{'custom_slot_id': str(self.custom_slot.id), **selection})
+        with self.assertRaises(SelectionMismatch):
+            self.price(custom_slot_id='999999', custom_slot_time='18:00 - 20:00')
+
+class BulkCancellationTests(CacheIsolationMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.playground = make_playground()
+        self.user = User.objects.create_user(email='user@example.com', password='x')
+        self.day = timezone.localdate() + timedelta(days=5)
+
+    def test_paid_and_receipt_bookings_get_pending_refunds(self):
+        paid = make_booking(self.user, self.playground, start_hour=9)
+        receipt = make_booking(self.user, self.playground, start_hour=10, payment_status='receipt_uploaded')
+        unpaid = make_booking(self.user, self.playground, start_hour=11, status='pending', payment_status='pending')
+        credit_booking(paid)
+
+        bookings, refunds = cancel_bookings(self.playground, self.day, self.day, 'Flooded')
+
+        self.assertEqual(len(bookings), 3)
+        self.assertEqual(refunds, {paid.id: Decimal('100.00'), receipt.id: Decimal('100.00'), unpaid.id: Decimal('0')})
+        rows = {b.id: b for b in Booking.objects.all()}
+        self.assertEqual({b.status for b in rows.values()}, {'cancelled'})
+        self.assertEqual(rows[paid.id].refund_status, 'pending')
+        self.assertEqual(rows[receipt.id].refund_status, 'pending')
+        self.assertEqual(rows[unpaid.id].refund_status, 'not_applicable')
+        self.assertIsNone(rows[paid.id].refunded_at)
+        # Only the credited booking is reversed in the owner's ledger
+        refund = EarningsRecord.objects.get(record_type='refund')
+        self.assertEqual(refund.booking_id, paid.id)
+        self.assertEqual(refund.gross_amount, Decimal('-100.00'))
+
+    def test_preview_writes_nothing(self):
+        booking = make_booking(self.user, self.playground)
+        bookings, refunds = cancel_bookings(self.playground, self.day, self.day, 'Flooded', preview=True)
+        self.assertEqual([b.id for b in bookings], [booking.id])
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'confirmed')
+
+    def test_cancelled_bookings_leave_the_verification_queue(self):
+        admin = User.objects.create_user(email='admin@example.com', password='x', user_type='admin')
+        booking = make_booking(
+            self.user, self.playground, payment_status='receipt_uploaded', payment_receipt='payment_receipts/r.png'
+        )
+        self.assertTrue(Booking.objects.filter(AWAITING_VERIFICATION, id=booking.id).exists())
+        cancel_bookings(self.playground, self.day, self.day, 'Flooded')
+        self.assertEqual(bulk_decide([booking.id], 'verify', admin), [])
+        booking.refresh_from_db()
+        self.assertEqual(booking.payment_status, 'receipt_uploaded')
+
+
+class CohortTests(CacheIsolationMixin, TestCase):
+    def test_cohorts_ignore_future_bookings(self):
+        playground = make_playground()
+        user = User.objects.create_user(email='user@example.com', password='x')
+        newcomer = User.objects.create_user(email='newcomer@example.com', password='x')
+        make_booking(user, playground, days_ahead=-1)
+        make_booking(user, playground, start_hour=10, days_ahead=40)
+        make_booking(newcomer, playground, days_ahead=40)
+
+        result = cohort_analytics([playground.id], months=12)
+
+        self.assertEqual(result['customers'], 1)
+        self.assertEqual(result['repeat_customers'], 0)
+        self.assertEqual(len(result['cohorts']), 1)
+        self.assertEqual(result['cohorts'][0]['size'], 1)
+        self.assertEqual(result['cohorts'][0]['retention'][0], 100.0)
+
+
+class AnalyticsTests(CacheIsolationMixin, TestCase):
+    def test_conversion_rate_only_counts_bookings_made_while_views_were_counted(self):
+        playground = make_playground()
+        user = User.objects.create_user(email='user@example.com', password='x')
+        for hour in range(9, 12):
+            make_booking(user, playground, start_hour=hour, created_at=timezone.now() - timedelta(days=30))
+        PlaygroundAnalytics.objects.create(
+            playground=playground, total_views=4, views_counted_since=timezone.now() - timedelta(days=1)
+        )
+        make_booking(user, playground, start_hour=14)
+
+        refresh_playground_analytics([playground.id])
+
+        analytics = PlaygroundAnalytics.objects.get(playground=playground)
+        self.assertEqual(analytics.total_bookings, 4)
+        self.assertEqual(analytics.conversion_rate, Decimal('25.00'))
+
+
+class ProjectionTests(CacheIsolationMixin, TestCase):
+    def test_scenario_values_must_be_finite_and_in_range(self):
+        self.assertEqual(parse_scenario_values('0.9, 1,1.1', [1.0]), [0.9, 1.0, 1.1])
+        for value in ('nan', 'inf', '-1', '11', '1,abc'):
+            with self.assertRaises(ValueError):
+                parse_scenario_values(value, [1.0])
+        with self.assertRaises(ValueError):
+            parse_scenario_values('0', [1.0], minimum=0.01)
+
+    def test_api_never_returns_non_finite_numbers(self):
+        playground = make_playground()
+
+        def project(**params):
+            request = RequestFactory().get('/', {'playground_id': playground.id, **params})
+            request.user = playground.owner
+            return revenue_projection_api(request)
+
+        for params in (
+            {'price_multipliers': '0', 'elasticity': '1'}, {'elasticity': 'nan'}, {'elasticity': 'inf'},
+            {'elasticity': '100'}, {'occupancy_factors': 'nan'},
+        ):
+            self.assertEqual(project(**params).status_code, 400, params)
+
+        def reject(constant):
+            raise ValueError(constant)
+
+        response = project(price_multipliers='0.01,1', elasticity='5')
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content, parse_constant=reject)
+        self.assertEqual(len(body['scenarios']), 2)
+
+
+class OccupancyTests(CacheIsolationMixin, TestCase):
+    MONDAY = date(2030, 1, 7)
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='player@example.com', password='x')
+        # Monday has two courts from 09 to 11; Tuesday falls back to its opening hours
+        self.playground = make_playground(operating_hours={
+            'monday': {'opening_time': '06:00', 'closing_time': '22:00', 'is_open': True},
+            'tuesday': {'open': '08:00', 'close': '10:00', 'active': True},
+            'wednesday': {'opening_time': '08:00', 'closing_time': '10:00', 'is_open': False},
+        })
+        TimeSlot.objects.create(
+            playground=self.playground, day_of_week='monday', start_time=time(9), end_time=time(11), max_bookings=2
+        )
+
+    def book(self, day, start_hour, **fields):
+        days_ahead = (day - timezone.localdate()).days
+        return make_booking(self.user, self.playground, start_hour=start_hour, days_ahead=days_ahead, **fields)
+
+    def test_hour_overlap_splits_intervals_across_hours(self):
+        overlap = hour_overlap([9 * 60 + 30, 23 * 60], [11 * 60, 0])
+        self.assertEqual(overlap[0, 9:12].tolist(), [0.5, 1.0, 0.0])
+        # An end at midnight runs to the end of the day
+        self.assertEqual(overlap[1, 23], 1.0)
+        self.assertEqual(overlap.sum(axis=1).tolist(), [1.5, 1.0])
+
+    def test_capacity_comes_from_slots_then_operating_hours(self):
+        matrix = occupancy_matrix([self.playground.id], self.MONDAY, self.MONDAY + timedelta(days=2))
+        self.assertEqual(matrix.capacity.sum(axis=(0, 2)).tolist(), [4.0, 2.0, 0.0])
+        self.assertEqual(matrix.capacity[0, 0, 9:11].tolist(), [2.0, 2.0])
+
+    def test_only_kept_bookings_within_capacity_count(self):
+        self.book(self.MONDAY, 9)
+        self.book(self.MONDAY, 10, status='completed')
+        # Outside the bookable hours
+        self.book(self.MONDAY, 15)
+        self.book(self.MONDAY + timedelta(days=1), 8, status='completed')
+        self.book(self.MONDAY + timedelta(days=1), 9, status='cancelled')
+
+        with self.assertNumQueries(3):
+            matrix = occupancy_matrix([self.playground.id], self.MONDAY, self.MONDAY + timedelta(days=2))
+
+        self.assertEqual(matrix.by_day(), {
+            self.MONDAY: 50.0, self.MONDAY + timedelta(days=1): 50.0, self.MONDAY + timedelta(days=2): 0.0,
+        })
+        self.assertEqual(matrix.rate(), 50.0)
+        self.assertEqual(matrix.by_playground(), {self.playground.id: 50.0})
+        heatmap = matrix.heatmap()
+        self.assertEqual(heatmap[0]['day'], 'monday')
+        self.assertEqual(heatmap[0]['hours'][9:11], [50.0, 50.0])
+        self.assertEqual(heatmap[1]['hours'][8:10], [100.0, 0.0])
+
+    def test_no_playgrounds_is_empty(self):
+        matrix = occupancy_matrix(Playground.objects.none(), self.MONDAY, self.MONDAY)
+        self.assertEqual((matrix.rate(), matrix.by_playground()), (0.0, {}))
+
+
+class ForecastTests(CacheIsolationMixin, TestCase):
+    MONDAY = date(2030, 1, 7)
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='player@example.com', password='x')
+        self.playground = make_playground()
+
+    def book(self, day, start_hour, **fields):
+        days_ahead = (day - timezone.localdate()).days
+        return make_booking(self.user, self.playground, start_hour=start_hour, days_ahead=days_ahead, **fields)
+
+    def test_histograms_bin_kept_bookings_by_week_and_hour_of_week(self):
+        self.book(self.MONDAY, 9)
+        self.book(self.MONDAY + timedelta(days=8), 18, status='completed')
+        self.book(self.MONDAY + timedelta(days=8), 19, status='cancelled')
+        # After the last week
+        self.book(self.MONDAY + timedelta(weeks=2), 9)
+        other = make_playground()
+
+        histograms = weekly_histograms([other.id, self.playground.id], self.MONDAY, 2)
+
+        self.assertEqual(histograms.shape, (2, 2, 168))
+        self.assertEqual(histograms[0].sum(), 0)
+        self.assertEqual(histograms[1, 0, 9], 1.0)
+        self.assertEqual(histograms[1, 1, 24 + 18], 1.0)
+        self.assertEqual(histograms[1].sum(), 2.0)
+
+    def test_series_start_at_the_first_booked_week(self):
+        histograms = np.zeros((3, 4, 168))
+        histograms[0, :, 0] = 2
+        # New two weeks ago
+        histograms[1, 2:, 0] = 3
+
+        level, trend, has_history = smooth(histograms)
+
+        self.assertEqual(has_history.tolist(), [True, True, False])
+        np.testing.assert_allclose(level[:, 0], [2, 3, 0])
+        np.testing.assert_allclose(trend[:, 0], [0, 0, 0], atol=1e-9)
+
+    def test_damped_forecast_never_goes_negative(self):
+        forecast = forecast_weeks([10.0], [-10.0], weeks=2)
+        self.assertEqual(forecast.shape, (2, 1))
+        self.assertAlmostEqual(forecast[0, 0], 1.0)
+        self.assertEqual(forecast[1, 0], 0.0)
+
+    def test_refresh_stores_forecasts_starting_today(self):
+        today = timezone.localdate()
+        for week in range(1, 5):
+            make_booking(self.user, self.playground, start_hour=9, days_ahead=-7 * week)
+        quiet = make_playground()
+
+        self.assertEqual(refresh_demand_forecasts([self.playground.id, quiet.id]), 2)
+
+        stored = PlaygroundAnalytics.objects.get(playground=self.playground).demand_forecast
+        forecast = stored_forecast(stored, weeks=2)
+        self.assertEqual([week['start_date'] for week in forecast], [
+            today.isoformat(), (today + timedelta(weeks=1)).isoformat(),
+        ])
+        self.assertEqual([week['total'] for week in forecast], [1.0, 1.0])
+        self.assertEqual(forecast[0]['by_weekday_hour'][today.weekday()][9], 1.0)
+        self.assertEqual(PlaygroundAnalytics.objects.get(playground=quiet).demand_forecast, {})
+        self.assertEqual(stored_forecast({}), [])
+
+
+class PriceAdvisorTests(CacheIsolationMixin, TestCase):
+    def test_multipliers_follow_occupancy_and_relative_lead_time(self):
+        share = np.zeros((3, 168))
+        share[:2, :4] = [1.0, 0.5, 0.375, 0.0]
+        share[2, :3] = [1.0, 0.5, 0.5]
+        lead_mean, lead_weight = np.zeros((3, 168)), np.zeros((3, 168))
+        lead_mean[:2, :3], lead_weight[:2, :3] = 10, 1
+        # Booked 40 hours ahead against 10 and 20 for the others
+        lead_mean[2, :3], lead_weight[2, :3] = [40, 20, 10], 1
+
+        multipliers = suggest_multipliers(share, np.array([4, 3, 4]), lead_mean, lead_weight)
+
+        # Never booked, or too little history: no suggestion
+        np.testing.assert_allclose(multipliers[0, :4], [1.4, 1.0, 0.9, 1.0])
+        np.testing.assert_allclose(multipliers[1], 1.0)
+        # Lead ratios 40/23.3, 20/23.3 and 10/23.3 (clipped to 0.5); the first capped at the maximum
+        np.testing.assert_allclose(multipliers[2, :3], [1.5, 0.95, 0.85])
+        np.testing.assert_allclose(multipliers[:, 4:], 1.0)
+
+    def suggest(self, playground, multipliers):
+        PlaygroundAnalytics.objects.update_or_create(
+            playground=playground, defaults={'price_suggestions': {'multipliers': multipliers}}
+        )
+
+    def test_accepted_suggestions_replace_peak_windows(self):
+        playground = make_playground(custom_pricing={
+            'weekend_multiplier': '1.2', 'peak_windows': [{'start': '06:00', 'end': '08:00', 'multiplier': '2'}],
+        })
+        unchanged = make_playground(custom_pricing={'peak_windows': [{'start': '06:00', 'end': '08:00'}]})
+        grid = [[1.0] * 24 for _ in range(7)]
+        grid[0][17:19] = [1.5, 1.5]
+        grid[6][23] = 0.9
+        self.suggest(playground, grid)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(accept_suggestions(Playground.objects.all()), [playground.id])
+
+        playground.refresh_from_db()
+        self.assertEqual(playground.custom_pricing, {'weekend_multiplier': '1.2', 'peak_windows': [
+            {'days': ['monday'], 'start': '17:00', 'end': '19:00', 'multiplier': '1.50'},
+            {'days': ['sunday'], 'start': '23:00', 'end': '00:00', 'multiplier': '0.90'},
+        ]})
+        unchanged.refresh_from_db()
+        self.assertEqual(unchanged.custom_pricing, {'peak_windows': [{'start': '06:00', 'end': '08:00'}]})
+        # Prices already cached for the playground see the new windows
+        self.assertEqual(rules_for(playground.id).interval_price(0, time(16), time(18)), Decimal('250.00'))
+
+    def test_accepted_suggestions_can_be_folded_into_time_slots(self):
+        playground = make_playground(custom_pricing={'peak_windows': [{'start': '17:00', 'end': '19:00'}]})
+        slot = TimeSlot.objects.create(
+            playground=playground, day_of_week='monday', start_time=time(16), end_time=time(18)
+        )
+        grid = [[1.0] * 24 for _ in range(7)]
+        grid[0][17] = 1.5
+        self.suggest(playground, grid)
+
+        accept_suggestions(Playground.objects.filter(id=playground.id), target='time_slots')
+
+        slot.refresh_from_db()
+        self.assertEqual(slot.price, Decimal('250.00'))
+        playground.refresh_from_db()
+        self.assertNotIn('peak_windows', playground.custom_pricing)
+        with self.assertRaises(ValueError):
+            accept_suggestions(Playground.objects.all(), target='prices')
+
+
+@override_settings(REPORTING_CURRENCY='USD')
+class RevenueTests(CacheIsolationMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_rates(EUR='1.10', BDT='0.01')
+        self.user = User.objects.create_user(email='player@example.com', password='x')
+
+    def set_rates(self, **rates):
+        cache.set('exchange_rates:USD', {'USD': Decimal('1'), **{code: Decimal(rate) for code, rate in rates.items()}})
+
+    def total(self, currency=None):
+        return Booking.objects.aggregate(total=converted_sum(currency=currency))['total']
+
+    def test_confirming_a_booking_snapshots_its_currency_rate(self):
+        booking = make_booking(
+            self.user, make_playground(currency='EUR'), status='pending', payment_status='pending'
+        )
+        self.assertEqual((booking.currency, booking.exchange_rate), ('EUR', None))
+
+        booking.status = 'confirmed'
+        booking.save(update_fields=['status'])
+        booking.refresh_from_db()
+        self.assertEqual(booking.exchange_rate, Decimal('1.10'))
+
+        self.set_rates(EUR='2')
+        booking.status = 'completed'
+        booking.save()
+        booking.refresh_from_db()
+        self.assertEqual(booking.exchange_rate, Decimal('1.10'))
+
+    def test_mixed_currencies_are_summed_with_snapshot_or_current_rates(self):
+        make_booking(self.user, make_playground(currency='EUR'), final_amount=100)
+        make_booking(self.user, make_playground(currency='BDT'), final_amount=1000,
+                     status='pending', payment_status='pending')
+        make_booking(self.user, make_playground(currency='USD'), final_amount=5)
+        # The EUR booking keeps its snapshot; the pending BDT one converts at today's rate
+        self.set_rates(EUR='2', BDT='0.02')
+
+        self.assertEqual(self.total(), Decimal('135.00'))
+        # 100 EUR as they are, 20 USD and 5 USD at 2 USD per EUR
+        self.assertEqual(self.total('EUR'), Decimal('112.50'))
+
+        totals = by_currency(Booking.objects.all())
+        self.assertEqual(list(totals), ['BDT', 'EUR', 'USD'])
+        self.assertEqual(totals['EUR']['bookings'], 1)
+        self.assertEqual((totals['BDT']['amount'], totals['BDT']['converted']), (Decimal('1000'), Decimal('20.00')))
+        self.assertEqual((totals['EUR']['amount'], totals['EUR']['converted']), (Decimal('100'), Decimal('110.00')))
+
+    def test_bulk_updates_snapshot_only_missing_rates(self):
+        pending = make_booking(self.user, make_playground(currency='BDT'), status='pending', payment_status='pending')
+        confirmed = make_booking(self.user, make_playground(currency='EUR'))
+        self.set_rates(EUR='2', BDT='0.02')
+
+        self.assertEqual(snapshot_exchange_rates(Booking.objects.all()), 1)
+
+        pending.refresh_from_db()
+        confirmed.refresh_from_db()
+        self.assertEqual((pending.exchange_rate, confirmed.exchange_rate), (Decimal('0.02'), Decimal('1.10')))
+
+    def test_totals_stay_in_a_single_currency(self):
+        self.assertEqual(target_currency(['EUR', 'EUR']), 'EUR')
+        self.assertEqual(target_currency(['EUR', 'BDT']), 'USD')
+        self.assertEqual(target_currency([]), 'USD')
+        self.assertEqual(self.total(), Decimal('0'))
+        with self.assertRaises(ValueError):
+            self.total('XXX')
@@ -18,6 +18,7 @@ urlpatterns = [
     path('cancel/<uuid:booking_id>/', views.cancel_booking, name='cancel_booking'),
     path('reschedule/<uuid:booking_id>/', views.reschedule_booking, name='reschedule_booking'),
     path('upload-receipt/<uuid:booking_id>/', views.upload_payment_receipt, name='upload_receipt'),
+    path('apply-coupon/<uuid:booking_id>/', views.apply_coupon, name='apply_coupon'),
     
     # Booking actions (Integer ID-based for compatibility)
     path('cancel-id/<int:booking_id>/', views.cancel_booking_by_id, name='cancel_booking_by_id'),
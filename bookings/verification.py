@@ -0,0 +1,181 @@
+"""
+Admin payment-receipt verification queue.
+
+The queue is every booking with an uploaded receipt that hasn't been verified
+or rejected yet, oldest booking first, read page by page with a keyset cursor
+on (created_at, id) so deep pages cost the same as the first one. Bulk
+decisions update all selected bookings in one transaction with bulk-created
+``BookingHistory`` rows and customer notifications; earnings for verified
+bookings are posted to the owners' ledger by a Celery task once the
+transaction commits.
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notifications.models import Notification
+from playgrounds.signals import invalidate_bookings
+
+from . import receipts
+from .models import Booking, BookingHistory
+from .revenue import snapshot_exchange_rates
+from .rollups import refresh_daily_stats
+
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BULK = 500
+
+# Receipts waiting for a decision; rejected ones are 'failed' until re-uploaded.
+# Cancelled bookings leave the queue: their payment is refunded, not verified.
+AWAITING_VERIFICATION = (
+    Q(payment_receipt__isnull=False) & ~Q(payment_receipt='')
+    & Q(receipt_verified=False) & ~Q(payment_status__in=('paid', 'failed', 'refunded'))
+    & ~Q(status='cancelled')
+)
+
+DECISIONS = {
+    'verify': {
+        'payment_status': 'paid',
+        'change_type': 'payment_verified',
+        'notification_type': 'payment_received',
+        'title': 'Payment verified',
+        'message': 'Your payment for {playground} on {date} has been verified.',
+    },
+    'reject': {
+        'payment_status': 'failed',
+        'change_type': 'payment_rejected',
+        'notification_type': 'payment_failed',
+        'title': 'Payment receipt rejected',
+        'message': 'Your payment receipt for {playground} on {date} could not be verified. Please upload a new one.',
+    },
+}
+
+
+def encode_cursor(booking):
+    value = json.dumps([booking.created_at.isoformat(), booking.id])
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; raises ValueError for malformed ones"""
+    try:
+        created_at, booking_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(booking_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def verification_queue(cursor=None, limit=PAGE_SIZE, playground_id=None):
+    """
+    One page of the queue after ``cursor``: ``(bookings, next_cursor)``, the
+    latter None on the last page.
+    """
+    bookings = Booking.objects.filter(AWAITING_VERIFICATION).select_related(
+        'user', 'playground', 'playground__owner', 'playground__city', 'receipt_fingerprint'
+    )
+    if playground_id:
+        bookings = bookings.filter(playground_id=playground_id)
+    if cursor:
+        created_at, booking_id = decode_cursor(cursor)
+        bookings = bookings.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=booking_id))
+
+    page = list(bookings.order_by('created_at', 'id')[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def queue_item(booking, duplicates=()):
+    return {
+        'id': booking.id,
+        'booking_id': str(booking.booking_id)[:8],
+        'user': booking.user.get_full_name() or booking.user.email,
+        'user_email': booking.user.email,
+        'playground': booking.playground.name,
+        'playground_id': booking.playground_id,
+        'owner': booking.playground.owner.email,
+        'city': booking.playground.city.name if booking.playground.city else '',
+        'date': booking.booking_date.strftime('%Y-%m-%d'),
+        'start_time': booking.start_time.strftime('%H:%M'),
+        'amount': float(booking.final_amount),
+        'payment_method': booking.payment_method or '',
+        'payment_reference': booking.payment_reference or '',
+        'created_at': booking.created_at.isoformat(),
+        'receipt_url': booking.payment_receipt.url if booking.payment_receipt else None,
+        'thumbnail_url': receipts.thumbnail_url(booking),
+        'suspected_duplicates': list(duplicates),
+    }
+
+
+def _enqueue_earnings(booking_ids):
+    from earnings.tasks import credit_booking_earnings
+    try:
+        credit_booking_earnings.delay(booking_ids)
+    except Exception:
+        # No broker available: post them in-process rather than lose them
+        logger.exception("Queueing earnings for %d bookings failed, posting inline", len(booking_ids))
+        credit_booking_earnings(booking_ids)
+
+
+def bulk_decide(booking_ids, action, admin, notes=''):
+    """
+    Verify or reject the receipts of the given bookings still in the queue.
+
+    Returns the ids that were updated; bookings already decided are skipped.
+    """
+    decision = DECISIONS[action]
+    now = timezone.now()
+    with transaction.atomic():
+        bookings = list(
+            Booking.objects.select_for_update(of=('self',)).filter(AWAITING_VERIFICATION, id__in=booking_ids)
+            .select_related('playground').order_by('id')
+        )
+        if not bookings:
+            return []
+        ids = [booking.id for booking in bookings]
+
+        Booking.objects.filter(id__in=ids).update(
+            payment_status=decision['payment_status'],
+            receipt_verified=action == 'verify',
+            verified_by=admin if action == 'verify' else None,
+            verified_at=now if action == 'verify' else None,
+        )
+        if action == 'verify':
+            snapshot_exchange_rates(Booking.objects.filter(id__in=ids))
+        BookingHistory.objects.bulk_create([
+            BookingHistory(
+                booking=booking, changed_by=admin, change_type=decision['change_type'],
+                old_status=booking.payment_status, new_status=decision['payment_status'],
+                notes=notes, created_at=now,
+            )
+            for booking in bookings
+        ])
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=booking.user_id,
+                title=decision['title'],
+                message=decision['message'].format(
+                    playground=booking.playground.name, date=booking.booking_date.strftime('%Y-%m-%d')
+                ),
+                notification_type=decision['notification_type'],
+                booking=booking,
+                playground_id=booking.playground_id,
+                created_at=now,
+            )
+            for booking in bookings
+        ])
+
+        affected = {(booking.playground_id, booking.booking_date) for booking in bookings}
+        transaction.on_commit(lambda: invalidate_bookings(affected))
+        transaction.on_commit(lambda: refresh_daily_stats(affected))
+        if action == 'verify':
+            transaction.on_commit(lambda: _enqueue_earnings(ids))
+    return ids
@@ -6,16 +6,22 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.contrib import messages
+from django.core import signing
+from django.core.exceptions import ValidationError
 from django.db.models import Q, Count, Sum, Avg
 from django.views.generic import TemplateView
 from datetime import datetime, date, timedelta
 import json
 import uuid
-import re
 from decimal import Decimal
 
 from .models import Booking
+from . import quotes
+from .pricing import rules_for
+from .coupons import redeem as redeem_coupon
 from playgrounds.models import Playground, TimeSlot
+from playgrounds.currency import currency_symbol as get_currency_symbol
+from playgrounds.snapshot import get_playground_snapshot, get_playground_snapshot_or_404
 from accounts.models import User
 from payments.models import PaymentMethod, PlaygroundPaymentConfig, PlaygroundPaymentMethod
 
@@ -314,25 +320,9 @@ def booking_detail(request, booking_id):
     # Get currency symbol from playground's currency
     from django.conf import settings
     
-    # Currency mapping for symbols
-    currency_symbols = {
-        'BDT': '৳',
-        'USD': '$',
-        'EUR': '€',
-        'GBP': '£',
-        'INR': '₹',
-        'JPY': '¥',
-        'CNY': '¥',
-        'AUD': 'A$',
-        'CAD': 'C$',
-        'CHF': 'CHF',
-        'MYR': 'RM',
-        'SGD': 'S$',
-    }
-    
     # Get playground's currency or fallback to settings
     playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-    currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+    currency_symbol = get_currency_symbol(playground_currency)
     
     print(f"💰 DEBUG booking_detail: Playground currency: {playground_currency}")
     print(f"💰 DEBUG booking_detail: Currency symbol: {currency_symbol}")
@@ -375,25 +365,9 @@ def booking_detail_by_id(request, booking_id):
     from io import BytesIO
     import base64
     
-    # Currency mapping for symbols
-    currency_symbols = {
-        'BDT': '৳',
-        'USD': '$',
-        'EUR': '€',
-        'GBP': '£',
-        'INR': '₹',
-        'JPY': '¥',
-        'CNY': '¥',
-        'AUD': 'A$',
-        'CAD': 'C$',
-        'CHF': 'CHF',
-        'MYR': 'RM',
-        'SGD': 'S$',
-    }
-    
     # Get playground's currency or fallback to settings
     playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-    playground_currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+    playground_currency_symbol = get_currency_symbol(playground_currency)
     
     # Generate QR Code for booking verification
     # QR contains: booking_id, verification URL
@@ -640,8 +614,12 @@ def get_available_slots(request, playground_id):
         
         available_slots = []
         current_time = timezone.now().time()
+        time_slots = list(time_slots)
+        prices = rules_for(playground.id).price_slots(
+            date_obj, [(slot.start_time, slot.end_time) for slot in time_slots]
+        )
         
-        for slot in time_slots:
+        for slot, price in zip(time_slots, prices):
             # Check if slot is already booked
             existing_bookings = Booking.objects.filter(
                 playground=playground,
@@ -665,7 +643,7 @@ def get_available_slots(request, playground_id):
                 'id': slot.id,
                 'start_time': slot.start_time.strftime('%H:%M'),
                 'end_time': slot.end_time.strftime('%H:%M'),
-                'price': float(slot.get_effective_price()),
+                'price': float(price),
                 'is_available': is_available,
                 'booked_count': existing_bookings,
                 'max_bookings': slot.max_bookings,
@@ -690,6 +668,31 @@ def get_available_slots(request, playground_id):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+@login_required
+@require_http_methods(["POST"])
+def apply_coupon(request, booking_id):
+    """
+    Apply a coupon code to one of the user's pending bookings
+    """
+    booking = get_object_or_404(Booking, booking_id=booking_id, user=request.user)
+    if booking.status != 'pending' or booking.payment_status == 'paid':
+        return JsonResponse({'success': False, 'error': 'Coupons can only be applied before payment'}, status=400)
+    
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
+        usage = redeem_coupon(data.get('code', ''), booking)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': e.messages[0], 'code': e.code}, status=400)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'discount_amount': float(usage.discount_amount),
+        'final_amount': float(booking.final_amount),
+    })
+
+
 @login_required
 @csrf_exempt
 def upload_payment_receipt(request, booking_id):
@@ -794,38 +797,32 @@ def get_payment_page(request, playground_id):
     API endpoint to get payment page data with dynamic payment methods
     """
     try:
-        playground = get_object_or_404(Playground, id=playground_id)
+        playground = get_playground_snapshot_or_404(playground_id)
         
         # Get payment configuration for this playground
-        try:
-            payment_config = PlaygroundPaymentConfig.objects.get(playground=playground)
-        except PlaygroundPaymentConfig.DoesNotExist:
+        payment_config = playground.payment_config
+        if payment_config is None:
             # Create default payment config if none exists
-            payment_config = PlaygroundPaymentConfig.objects.create(
-                playground=playground,
+            PlaygroundPaymentConfig.objects.create(
+                playground_id=playground.id,
                 bank_name="Default Bank",
                 account_name=playground.name,
                 account_number="1234567890"
             )
+            playground = get_playground_snapshot(playground.id)
+            payment_config = playground.payment_config
         
         # Get active payment methods for this playground
         payment_methods = []
-        playground_methods = PlaygroundPaymentMethod.objects.filter(
-            playground_config=payment_config,
-            is_enabled=True,
-            payment_method__is_active=True
-        ).select_related('payment_method')
-        
-        for pm in playground_methods:
-            method = pm.payment_method
+        for method in payment_config.methods:
             payment_methods.append({
                 'id': method.method_type,
                 'name': method.name,
                 'icon': get_payment_icon(method.method_type),
-                'instructions': pm.custom_instructions or method.instructions,
+                'instructions': method.instructions,
                 'requires_receipt': method.requires_receipt,
                 'is_instant': method.is_instant,
-                'processing_fee': float(pm.processing_fee_percentage)
+                'processing_fee': float(method.processing_fee_percentage)
             })
         
         # If no payment methods configured, add default ones
@@ -913,207 +910,48 @@ def get_time_slots(request):
 
 @csrf_exempt
 def calculate_price(request):
-    """Calculate booking price dynamically with amenities, membership passes, and custom slots"""
-    
-    # Import required models at function start to avoid scope issues
-    from playgrounds.models import Amenity
-    
-    try:
-        from playgrounds.models import DurationPass as MembershipPass
-    except ImportError:
-        MembershipPass = None  # Handle case where model doesn't exist
-    
+    """
+    Calculate booking price dynamically with amenities, membership passes, and custom slots.
+    The response carries a signed quote that create_booking_api charges.
+    """
     try:
         playground_id = request.GET.get('playground_id')
-        start_time = request.GET.get('start_time')
-        end_time = request.GET.get('end_time')
-        date_param = request.GET.get('date')
-        
-        # NEW: Get additional parameters for comprehensive calculation
-        amenity_ids = request.GET.get('amenity_ids', '')
-        membership_pass_id = request.GET.get('membership_pass_id')
-        custom_slot_id = request.GET.get('custom_slot_id')
-        custom_slot_time = request.GET.get('custom_slot_time')
-        booking_types = request.GET.get('booking_types', '')
-        
         if not playground_id:
             return JsonResponse({'success': False, 'error': 'Playground ID required'})
         
-        playground = get_object_or_404(Playground, id=playground_id)
-        
-        # Helper function to convert time format
-        def convert_time_format(time_str):
-            """Convert time string to 24-hour format if it contains AM/PM"""
-            time_str = time_str.strip()
-            
-            # If already in 24-hour format, return as is
-            if not any(x in time_str.upper() for x in ['AM', 'PM']):
-                return time_str
-            
-            # Parse 12-hour format
-            match = re.match(r'(\d{1,2}):(\d{2})\s*(AM|PM)', time_str.upper())
-            if not match:
-                return time_str  # Return original if parsing fails
-            
-            hours, minutes, period = match.groups()
-            hours = int(hours)
-            
-            if period == 'AM' and hours == 12:
-                hours = 0
-            elif period == 'PM' and hours != 12:
-                hours += 12
-            
-            return f"{hours:02d}:{minutes}"
-
-        # Initialize calculations
-        base_price = Decimal('0.00')
-        amenity_fees = Decimal('0.00')
-        total_duration = 0
-        
-        # ✅ CRITICAL FIX: Handle custom slot pricing FIRST (takes priority)
-        if custom_slot_id and custom_slot_time:
-            print(f"🔍 Processing custom slot: ID={custom_slot_id}, Time={custom_slot_time}")
-            
-            # Custom slots are not DB records - use hardcoded pricing for now
-            # TODO: Make this configurable in playground settings
-            base_price = Decimal('25.00')  # Custom slot price
-            print(f"✅ Custom slot pricing applied: RM {base_price}")
-            
-            # Parse duration from custom slot time if available
-            if ' - ' in custom_slot_time:
-                time_parts = custom_slot_time.split(' - ')
-                if len(time_parts) == 2:
-                    start_time = convert_time_format(time_parts[0])
-                    end_time = convert_time_format(time_parts[1])
-                    
-                    start_dt = datetime.strptime(start_time, '%H:%M').time()
-                    end_dt = datetime.strptime(end_time, '%H:%M').time()
-                    
-                    start_datetime = datetime.combine(date.today(), start_dt)
-                    end_datetime = datetime.combine(date.today(), end_dt)
-                    
-                    if end_datetime <= start_datetime:
-                        end_datetime += timedelta(days=1)
-                    
-                    total_duration = (end_datetime - start_datetime).total_seconds() / 3600
-        
-        # Calculate base price based on time slots (ONLY if not custom slot)
-        if not custom_slot_id and start_time and end_time:
-            # Convert time formats
-            start_time = convert_time_format(start_time)
-            end_time = convert_time_format(end_time)
-            
-            # Calculate duration
-            start_dt = datetime.strptime(start_time, '%H:%M').time()
-            end_dt = datetime.strptime(end_time, '%H:%M').time()
-            
-            start_datetime = datetime.combine(date.today(), start_dt)
-            end_datetime = datetime.combine(date.today(), end_dt)
-            
-            if end_datetime <= start_datetime:
-                end_datetime += timedelta(days=1)
-            
-            total_duration = (end_datetime - start_datetime).total_seconds() / 3600
-            
-            # Calculate base price using playground's rate
-            price_per_hour = playground.price_per_hour
-            base_price = price_per_hour * Decimal(str(total_duration))
-            print(f"✅ Regular slot calculation: Duration={total_duration}h, Rate={price_per_hour}, Price={base_price}")
-        
-        # Handle membership pass pricing
-        if membership_pass_id and MembershipPass:
-            try:
-                membership_pass = MembershipPass.objects.get(id=membership_pass_id)
-                # For membership passes, we might have different pricing logic
-                # For now, add the pass price to the base calculation
-                base_price += membership_pass.price
-                print(f"✅ Membership pass added: ID={membership_pass_id}, Price={membership_pass.price}")
-            except MembershipPass.DoesNotExist:
-                print(f"❌ Membership pass not found: ID={membership_pass_id}")
-            except Exception as e:
-                print(f"❌ Error processing membership pass: {e}")
-        
-        # Calculate amenity fees with simplified approach for JSON amenities
-        if amenity_ids:
-            amenity_id_list = []
-            json_amenity_fees = Decimal('0.00')
-            
-            # Get playground amenities (JSON data) for fallback
-            playground_amenities = []
-            try:
-                if hasattr(playground, 'amenities') and playground.amenities:
-                    playground_amenities = playground.amenities if isinstance(playground.amenities, list) else []
-            except:
-                pass
-            
-            for id_str in amenity_ids.split(','):
-                id_str = id_str.strip()
-                if id_str:
-                    try:
-                        # Try to convert to integer for DB amenities
-                        amenity_id = int(id_str)
-                        amenity_id_list.append(amenity_id)
-                    except ValueError:
-                        # Handle generated IDs for JSON amenities (like 'p_professionalcoaching_0')
-                        print(f"Processing JSON amenity ID: {id_str}")
-                        
-                        # Extract info from generated ID - simplified approach
-                        if '_' in id_str:
-                            parts = id_str.split('_')
-                            if len(parts) >= 3:
-                                try:
-                                    index = int(parts[2])
-                                    # Get amenity by index from playground amenities
-                                    if 0 <= index < len(playground_amenities):
-                                        amenity = playground_amenities[index]
-                                        amenity_price_str = amenity.get('price')
-                                        
-                                        # Handle both None (free) and string prices
-                                        if amenity_price_str is not None:
-                                            try:
-                                                amenity_price = float(amenity_price_str)
-                                                json_amenity_fees += Decimal(str(amenity_price))
-                                                print(f"✅ Found JSON amenity by index {index}: {amenity.get('name')} - RM {amenity_price}")
-                                            except (ValueError, TypeError):
-                                                print(f"⚠️ Invalid price format for amenity {index}: {amenity_price_str}")
-                                        else:
-                                            print(f"🆓 Free amenity {index}: {amenity.get('name')} - RM 0")
-                                except (ValueError, IndexError) as e:
-                                    print(f"❌ Could not process amenity ID: {id_str} - Error: {e}")
-                                    continue
-            
-            # Get DB amenities if any
-            if amenity_id_list:
-                amenities = Amenity.objects.filter(id__in=amenity_id_list)
-                db_amenity_fees = sum(amenity.price for amenity in amenities)
-                amenity_fees = db_amenity_fees + json_amenity_fees
-                print(f"DB amenity fees: {db_amenity_fees}, JSON amenity fees: {json_amenity_fees}")
-            else:
-                amenity_fees = json_amenity_fees
-                
-            print(f"Total calculated amenity fees: {amenity_fees} for IDs: {amenity_ids}")
-        
-        # Calculate final totals
-        discount_amount = Decimal('0.00')  # Can add discount logic here
-        subtotal = base_price - discount_amount
-        total_with_amenities = subtotal + amenity_fees
+        playground = get_playground_snapshot_or_404(playground_id)
+        selection = quotes.normalize_selection(
+            start_time=request.GET.get('start_time'),
+            end_time=request.GET.get('end_time'),
+            amenity_ids=request.GET.get('amenity_ids', ''),
+            membership_pass_id=request.GET.get('membership_pass_id'),
+            custom_slot_id=request.GET.get('custom_slot_id'),
+            custom_slot_time=request.GET.get('custom_slot_time'),
+            booking_date=request.GET.get('date'),
+            coupon_code=request.GET.get('coupon_code'),
+        )
+        user = request.user if request.user.is_authenticated else None
+        breakdown = quotes.price_breakdown(playground, selection, user=user)
         
         return JsonResponse({
             'success': True,
-            'subtotal': float(subtotal),  # ✅ Match frontend expectations
-            'total_amount': float(total_with_amenities),  # ✅ Match frontend expectations
-            'amenity_fees': float(amenity_fees), 
-            'discount_amount': float(discount_amount),
-            'duration': total_duration,  # ✅ Add duration field that frontend expects
-            'duration_hours': total_duration,
+            'subtotal': float(breakdown['subtotal']),  # ✅ Match frontend expectations
+            'total_amount': float(breakdown['total_amount']),  # ✅ Match frontend expectations
+            'amenity_fees': float(breakdown['amenity_fees']), 
+            'discount_amount': float(breakdown['discount_amount']),
+            'duration': breakdown['duration_hours'],  # ✅ Add duration field that frontend expects
+            'duration_hours': breakdown['duration_hours'],
             'price_per_hour': float(playground.price_per_hour),
             'currency': playground.currency,
-            'slot_type': 'custom' if custom_slot_id else 'regular',  # ✅ Add slot type
+            'slot_type': breakdown['slot_type'],  # ✅ Add slot type
             'breakdown': {
-                'subtotal': float(subtotal),
-                'amenities': float(amenity_fees),
-                'total': float(total_with_amenities)
-            }
+                'subtotal': float(breakdown['subtotal']),
+                'amenities': float(breakdown['amenity_fees']),
+                'total': float(breakdown['total_amount'])
+            },
+            'coupon_error': breakdown['coupon_error'],
+            'quote': quotes.issue(playground, selection, breakdown),
+            'quote_expires_in': quotes.QUOTE_TTL,
         })
         
     except Exception as e:
@@ -1231,25 +1069,9 @@ def reschedule_booking(request, booking_id):
             # Get currency symbol from playground's currency
             from django.conf import settings
             
-            # Currency mapping for symbols
-            currency_symbols = {
-                'BDT': '৳',
-                'USD': '$',
-                'EUR': '€',
-                'GBP': '£',
-                'INR': '₹',
-                'JPY': '¥',
-                'CNY': '¥',
-                'AUD': 'A$',
-                'CAD': 'C$',
-                'CHF': 'CHF',
-                'MYR': 'RM',
-                'SGD': 'S$',
-            }
-            
             # Get playground's currency or fallback to settings
             playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-            currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+            currency_symbol = get_currency_symbol(playground_currency)
             
             print(f"💰 DEBUG: Playground currency: {playground_currency}")
             print(f"💰 DEBUG: Currency symbol: {currency_symbol}")
@@ -1275,25 +1097,9 @@ def reschedule_booking(request, booking_id):
     # Get currency symbol from playground's currency
     from django.conf import settings
     
-    # Currency mapping for symbols
-    currency_symbols = {
-        'BDT': '৳',
-        'USD': '$',
-        'EUR': '€',
-        'GBP': '£',
-        'INR': '₹',
-        'JPY': '¥',
-        'CNY': '¥',
-        'AUD': 'A$',
-        'CAD': 'C$',
-        'CHF': 'CHF',
-        'MYR': 'RM',
-        'SGD': 'S$',
-    }
-    
     # Get playground's currency or fallback to settings
     playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-    currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+    currency_symbol = get_currency_symbol(playground_currency)
     
     context = {
         'booking': booking,
@@ -1366,25 +1172,9 @@ def reschedule_booking_by_id(request, booking_id):
             # Get currency symbol from playground's currency
             from django.conf import settings
             
-            # Currency mapping for symbols
-            currency_symbols = {
-                'BDT': '৳',
-                'USD': '$',
-                'EUR': '€',
-                'GBP': '£',
-                'INR': '₹',
-                'JPY': '¥',
-                'CNY': '¥',
-                'AUD': 'A$',
-                'CAD': 'C$',
-                'CHF': 'CHF',
-                'MYR': 'RM',
-                'SGD': 'S$',
-            }
-            
             # Get playground's currency or fallback to settings
             playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-            currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+            currency_symbol = get_currency_symbol(playground_currency)
             
             return JsonResponse({
                 'success': True,
@@ -1404,25 +1194,9 @@ def reschedule_booking_by_id(request, booking_id):
     # Get currency symbol from playground's currency
     from django.conf import settings
     
-    # Currency mapping for symbols
-    currency_symbols = {
-        'BDT': '৳',
-        'USD': '$',
-        'EUR': '€',
-        'GBP': '£',
-        'INR': '₹',
-        'JPY': '¥',
-        'CNY': '¥',
-        'AUD': 'A$',
-        'CAD': 'C$',
-        'CHF': 'CHF',
-        'MYR': 'RM',
-        'SGD': 'S$',
-    }
-    
     # Get playground's currency or fallback to settings
     playground_currency = booking.playground.currency if hasattr(booking.playground, 'currency') else getattr(settings, 'CURRENCY', 'BDT')
-    currency_symbol = currency_symbols.get(playground_currency, playground_currency + ' ')
+    currency_symbol = get_currency_symbol(playground_currency)
     
     context = {
         'booking': booking,
@@ -1511,7 +1285,6 @@ def create_booking_api(request):
         start_time = data.get('start_time')
         end_time = data.get('end_time')
         number_of_players = data.get('number_of_players')
-        total_amount = data.get('total_amount')
         payment_method = data.get('payment_method')
         
         # Get booking type information for proper storage
@@ -1520,14 +1293,13 @@ def create_booking_api(request):
         membership_pass_id = data.get('membership_pass_id')
         
         # Validate required fields
-        if not all([playground_id, booking_date, start_time, end_time, number_of_players, total_amount, payment_method]):
+        if not all([playground_id, booking_date, start_time, end_time, number_of_players, payment_method]):
             missing_fields = []
             if not playground_id: missing_fields.append('playground_id')
             if not booking_date: missing_fields.append('booking_date')
             if not start_time: missing_fields.append('start_time')
             if not end_time: missing_fields.append('end_time')
             if not number_of_players: missing_fields.append('number_of_players')
-            if not total_amount: missing_fields.append('total_amount')
             if not payment_method: missing_fields.append('payment_method')
             
             return JsonResponse({
@@ -1536,7 +1308,7 @@ def create_booking_api(request):
             }, status=400)
         
         # Get playground
-        playground = get_object_or_404(Playground, id=playground_id)
+        playground = get_playground_snapshot_or_404(playground_id)
         
         # Parse date and time
         booking_date_obj = datetime.strptime(booking_date, '%Y-%m-%d').date()
@@ -1545,7 +1317,7 @@ def create_booking_api(request):
         
         # Check for conflicts
         conflicts = Booking.objects.filter(
-            playground=playground,
+            playground_id=playground.id,
             booking_date=booking_date_obj,
             status__in=['confirmed', 'pending'],
             start_time__lt=end_time_obj,
@@ -1597,6 +1369,37 @@ def create_booking_api(request):
         print(f"🎯 DEBUG: Final selected_amenities to save: {selected_amenities}")
         print(f"🎯 DEBUG: Number of amenities: {len(selected_amenities) if isinstance(selected_amenities, list) else 0}")
         
+        # Charge the signed quote from calculate_price, never an amount sent by the client
+        try:
+            price = quotes.booking_price(
+                playground, data.get('price_quote'), booking_date_obj, start_time_obj, end_time_obj,
+                submitted_selection=quotes.normalize_selection(
+                    amenity_ids=[
+                        amenity.get('id') if isinstance(amenity, dict) else amenity
+                        for amenity in (selected_amenities if isinstance(selected_amenities, list) else [])
+                    ],
+                    membership_pass_id=membership_pass_id,
+                    custom_slot_id=custom_slot_id,
+                    custom_slot_time=data.get('custom_slot_actual_time'),
+                ),
+                user=request.user,
+            )
+        except signing.BadSignature:
+            return JsonResponse({
+                'success': False,
+                'error': 'Invalid price quote. Please refresh the price and try again.'
+            }, status=400)
+        except quotes.SelectionMismatch:
+            return JsonResponse({
+                'success': False,
+                'error': 'Your selection changed since it was priced. Please refresh the price and try again.'
+            }, status=400)
+        # A quoted coupon is redeemed onto the booking below, which takes the discount off
+        total_amount = price['total_amount'] + price['discount_amount']
+        # The booking gets the pass and custom slot that were priced
+        membership_pass_id = price['selection']['membership_pass_id']
+        custom_slot_id = price['selection']['custom_slot_id']
+        
         # Prepare structured booking information
         booking_info = {
             'booking_type': booking_type,
@@ -1630,14 +1433,14 @@ def create_booking_api(request):
         # Create booking
         booking = Booking.objects.create(
             user=request.user,
-            playground=playground,
+            playground_id=playground.id,
             booking_date=booking_date_obj,
             start_time=start_time_obj,
             end_time=end_time_obj,
             duration_hours=duration_hours,
             number_of_players=int(number_of_players),
-            total_amount=Decimal(str(total_amount)),
-            final_amount=Decimal(str(total_amount)),
+            total_amount=total_amount,
+            final_amount=total_amount,
             price_per_hour=playground.price_per_hour,
             payment_method=payment_method,
             special_requests=special_requests_text,
@@ -1645,6 +1448,13 @@ def create_booking_api(request):
             payment_status='pending'
         )
         
+        coupon_error = None
+        if price['coupon_code']:
+            try:
+                redeem_coupon(price['coupon_code'], booking)
+            except ValidationError as e:
+                coupon_error = e.messages[0]
+        
         # Handle receipt upload for bank transfers
         if request.FILES.get('receipt'):
             booking.payment_receipt = request.FILES['receipt']
@@ -1675,7 +1485,9 @@ def create_booking_api(request):
                 'date': booking_date,
                 'start_time': start_time,
                 'end_time': end_time,
-                'amount': float(total_amount),
+                'amount': float(booking.final_amount),
+                'discount_amount': float(booking.discount_amount),
+                'coupon_error': coupon_error,
                 'status': booking.status,
                 'payment_status': booking.payment_status,
                 'duration_hours': duration_hours,
@@ -0,0 +1,414 @@
+"""
+Owner earnings ledger.
+
+``EarningsRecord`` rows are the append-only ledger: every booking credit,
+refund, adjustment and payout is one row, never updated. ``OwnerEarnings``
+keeps the running balances as counters that are only ever moved with ``F()``
+increments in the same transaction as the ledger row, so concurrent postings
+for one owner can't lose each other and balance reads are a single row.
+
+At the start of each month ``close_month`` writes an ``EarningsSnapshot`` per
+owner and rolls the ``current_month_*`` counters into ``previous_month_*``.
+A balance can always be recomputed as the owner's latest snapshot plus the
+ledger tail after it, which is what ``reconcile`` checks the counters against.
+
+Month figures count records by the month they were posted in. Payouts reduce
+``total_earnings`` (the balance) but are not part of a month's earnings.
+"""
+
+import calendar
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DateField, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import EarningsRecord, EarningsSnapshot, OwnerEarnings
+
+
+IMPROVEMENT_FUND_RATE = Decimal('0.02')
+
+EARNING = ~Q(record_type='payout')
+BOOKING = Q(record_type='booking')
+
+COUNTER_FIELDS = (
+    'total_earnings', 'total_bookings', 'total_platform_fees', 'improvement_fund_balance',
+    'current_month_earnings', 'current_month_bookings',
+)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(period):
+    return period + timedelta(days=calendar.monthrange(period.year, period.month)[1])
+
+
+def _start_of(period):
+    return timezone.make_aware(datetime.combine(period, time.min))
+
+
+def _cents(amount):
+    return Decimal(str(amount)).quantize(Decimal('0.01'))
+
+
+def _money(expression):
+    return Coalesce(expression, Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _sums(prefix=''):
+    """Aggregates of ledger rows into counter values"""
+    return {
+        f'{prefix}earnings': _money(Sum('net_amount')),
+        f'{prefix}month_earnings': _money(Sum('net_amount', filter=EARNING)),
+        f'{prefix}bookings': Count('id', filter=BOOKING),
+        f'{prefix}platform_fees': _money(Sum('platform_fee')),
+        f'{prefix}improvement_fund': _money(Sum('improvement_fund_contribution')),
+    }
+
+
+def _earnings_row(owner):
+    earnings, _ = OwnerEarnings.objects.get_or_create(
+        owner=owner, defaults={'current_period': month_start(timezone.localdate())}
+    )
+    return earnings
+
+
+def post(owner, record_type, gross_amount, net_amount, platform_fee=Decimal('0'),
+         improvement_fund_contribution=Decimal('0'), **fields):
+    """
+    Append one ledger row and move the owner's counters by it, atomically.
+
+    Extra ``fields`` (booking, payout_request, description, processed_by) go
+    on the record. Returns the ``EarningsRecord``.
+    """
+    now = timezone.now()
+    period = month_start(timezone.localdate(now))
+    with transaction.atomic():
+        earnings = _earnings_row(owner)
+        record = EarningsRecord.objects.create(
+            owner=owner,
+            record_type=record_type,
+            gross_amount=gross_amount,
+            platform_fee=platform_fee,
+            net_amount=net_amount,
+            improvement_fund_contribution=improvement_fund_contribution,
+            created_at=now,
+            **fields,
+        )
+        counters = {
+            'total_earnings': F('total_earnings') + net_amount,
+            'total_platform_fees': F('total_platform_fees') + platform_fee,
+            'improvement_fund_balance': F('improvement_fund_balance') + improvement_fund_contribution,
+        }
+        # Rows from before the ledger have no period yet: they start this one
+        in_period = Q(current_period=period) | Q(current_period__isnull=True)
+        counters['current_period'] = Coalesce(F('current_period'), Value(period), output_field=DateField())
+        if record_type != 'payout':
+            counters['current_month_earnings'] = Case(
+                When(in_period, then=F('current_month_earnings') + net_amount),
+                default=F('current_month_earnings'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        if record_type == 'booking':
+            counters['total_bookings'] = F('total_bookings') + 1
+            counters['current_month_bookings'] = Case(
+                When(in_period, then=F('current_month_bookings') + 1),
+                default=F('current_month_bookings'),
+                output_field=IntegerField(),
+            )
+        OwnerEarnings.objects.filter(pk=earnings.pk).update(**counters)
+    return record
+
+
+def credit_booking(booking, owner=None):
+    """
+    Credit a booking's earnings to its playground owner. A booking is only
+    credited once; returns the record, or None if it already was.
+    """
+    owner = owner or booking.playground.owner
+    earnings = _earnings_row(owner)
+    gross_amount = _cents(booking.final_amount)
+    platform_fee = _cents(gross_amount * Decimal(str(earnings.platform_fee_percentage)) / 100)
+    net_amount = gross_amount - platform_fee
+    try:
+        with transaction.atomic():
+            return post(
+                owner, 'booking',
+                gross_amount=gross_amount,
+                net_amount=net_amount,
+                platform_fee=platform_fee,
+                improvement_fund_contribution=_cents(net_amount * IMPROVEMENT_FUND_RATE),
+                booking=booking,
+            )
+    except IntegrityError:
+        if EarningsRecord.objects.filter(booking=booking, record_type='booking').exists():
+            return None
+        raise
+
+
+def record_payout(payout, processed_by=None):
+    """Deduct a processed payout from the owner's balance"""
+    return post(
+        payout.owner, 'payout',
+        gross_amount=payout.requested_amount,
+        net_amount=-payout.requested_amount,
+        payout_request=payout,
+        description=f'Payout #{payout.pk}',
+        processed_by=processed_by,
+    )
+
+
+def debit_refunds(refunds, processed_by=None):
+    """
+    Reverse the credited earnings of refunded bookings, in bulk.
+
+    ``refunds`` maps booking ids to refunded amounts. Each booking's credit
+    is reversed in proportion to the share of it refunded, as one 'refund'
+    record; bookings never credited, or already refunded, are skipped. Must
+    run inside a transaction. Returns the records created.
+    """
+    now = timezone.now()
+    period = month_start(timezone.localdate(now))
+    credits = list(
+        EarningsRecord.objects.filter(booking_id__in=list(refunds), record_type='booking', gross_amount__gt=0)
+        .exclude(booking__earnings_records__record_type='refund')
+    )
+    if not credits:
+        return []
+    owner_ids = sorted({credit.owner_id for credit in credits})
+    # Locked in id order, like payout settlement, so the two can't deadlock
+    list(OwnerEarnings.objects.select_for_update().filter(owner_id__in=owner_ids).order_by('owner_id'))
+
+    records, totals = [], {}
+    for credit in credits:
+        share = min(Decimal(str(refunds[credit.booking_id])) / credit.gross_amount, Decimal('1'))
+        record = EarningsRecord(
+            owner_id=credit.owner_id,
+            booking_id=credit.booking_id,
+            record_type='refund',
+            gross_amount=-_cents(credit.gross_amount * share),
+            platform_fee=-_cents(credit.platform_fee * share),
+            net_amount=-_cents(credit.net_amount * share),
+            improvement_fund_contribution=-_cents(credit.improvement_fund_contribution * share),
+            description=f'Refund of booking #{credit.booking_id}',
+            processed_by=processed_by,
+            created_at=now,
+        )
+        records.append(record)
+        owner = totals.setdefault(credit.owner_id, dict.fromkeys(
+            ('total_earnings', 'total_platform_fees', 'improvement_fund_balance'), Decimal('0')
+        ))
+        owner['total_earnings'] += record.net_amount
+        owner['total_platform_fees'] += record.platform_fee
+        owner['improvement_fund_balance'] += record.improvement_fund_contribution
+    EarningsRecord.objects.bulk_create(records, batch_size=500)
+
+    money = DecimalField(max_digits=12, decimal_places=2)
+    counters = {
+        field: Case(
+            *[When(owner_id=owner_id, then=F(field) + amounts[field]) for owner_id, amounts in totals.items()],
+            default=F(field), output_field=money,
+        )
+        for field in ('total_earnings', 'total_platform_fees', 'improvement_fund_balance')
+    }
+    in_period = Q(current_period=period) | Q(current_period__isnull=True)
+    counters['current_month_earnings'] = Case(
+        *[
+            When(in_period, owner_id=owner_id, then=F('current_month_earnings') + amounts['total_earnings'])
+            for owner_id, amounts in totals.items()
+        ],
+        default=F('current_month_earnings'), output_field=money,
+    )
+    counters['current_period'] = Coalesce(F('current_period'), Value(period), output_field=DateField())
+    OwnerEarnings.objects.filter(owner_id__in=totals).update(**counters)
+    return records
+
+
+def ledger_balances(owner_ids=None):
+    """
+    Counter values recomputed from each owner's latest snapshot plus the ledger
+    tail after it: ``{owner_id: {field: value}}`` for ``COUNTER_FIELDS``.
+    """
+    earnings = OwnerEarnings.objects.all()
+    if owner_ids is not None:
+        earnings = earnings.filter(owner_id__in=owner_ids)
+    owners = dict(earnings.values_list('owner_id', 'current_period'))
+
+    latest = EarningsSnapshot.objects.filter(owner_id=OuterRef('owner_id')).order_by('-period')
+    snapshots = {}
+    for snapshot in EarningsSnapshot.objects.filter(
+        owner_id__in=owners, period=Subquery(latest.values('period')[:1])
+    ):
+        snapshots[snapshot.owner_id] = snapshot
+
+    tail = EarningsRecord.objects.filter(owner_id__in=owners).annotate(
+        snapshot_closed_at=Subquery(latest.values('closed_at')[:1])
+    ).filter(
+        Q(snapshot_closed_at__isnull=True) | Q(created_at__gte=F('snapshot_closed_at'))
+    ).values('owner_id').annotate(**_sums()).order_by()
+    tails = {row.pop('owner_id'): row for row in tail}
+
+    current = {}
+    for period in set(owners.values()):
+        if period is None:
+            continue
+        for row in EarningsRecord.objects.filter(
+            owner_id__in=[owner_id for owner_id, current_period in owners.items() if current_period == period],
+            created_at__gte=_start_of(period),
+            created_at__lt=_start_of(next_month(period)),
+        ).values('owner_id').annotate(**_sums()).order_by():
+            current[row['owner_id']] = row
+
+    balances = {}
+    for owner_id in owners:
+        snapshot = snapshots.get(owner_id)
+        rows = tails.get(owner_id, {})
+        month = current.get(owner_id, {})
+        balances[owner_id] = {
+            'total_earnings': (snapshot.total_earnings if snapshot else 0) + rows.get('earnings', 0),
+            'total_bookings': (snapshot.total_bookings if snapshot else 0) + rows.get('bookings', 0),
+            'total_platform_fees': (snapshot.total_platform_fees if snapshot else 0) + rows.get('platform_fees', 0),
+            'improvement_fund_balance': (
+                (snapshot.improvement_fund_balance if snapshot else 0) + rows.get('improvement_fund', 0)
+            ),
+            'current_month_earnings': month.get('month_earnings', 0),
+            'current_month_bookings': month.get('bookings', 0),
+        }
+    return balances
+
+
+def close_month(period=None):
+    """
+    Snapshot every owner's balances at the end of ``period`` (default: last
+    month) and, when that's last month, roll the month counters over.
+    Already closed owners are skipped. Returns the number of snapshots written.
+    """
+    this_month = month_start(timezone.localdate())
+    period = month_start(period) if period else month_start(this_month - timedelta(days=1))
+    opened_at, closed_at = _start_of(period), _start_of(next_month(period))
+    previous_period = month_start(period - timedelta(days=1))
+
+    done = set(EarningsSnapshot.objects.filter(period=period).values_list('owner_id', flat=True))
+    owners = (
+        set(OwnerEarnings.objects.values_list('owner_id', flat=True))
+        | set(EarningsRecord.objects.filter(created_at__lt=closed_at).values_list('owner_id', flat=True).distinct())
+    ) - done
+
+    month = {
+        row.pop('owner_id'): row
+        for row in EarningsRecord.objects.filter(
+            owner_id__in=owners, created_at__gte=opened_at, created_at__lt=closed_at
+        ).values('owner_id').annotate(**_sums()).order_by()
+    }
+    opening = {
+        snapshot.owner_id: {
+            'earnings': snapshot.total_earnings,
+            'bookings': snapshot.total_bookings,
+            'platform_fees': snapshot.total_platform_fees,
+            'improvement_fund': snapshot.improvement_fund_balance,
+        }
+        for snapshot in EarningsSnapshot.objects.filter(owner_id__in=owners, period=previous_period)
+    }
+    # Owners without last month's snapshot start from the whole ledger before this month
+    missing = owners - set(opening)
+    if missing:
+        for row in EarningsRecord.objects.filter(
+            owner_id__in=missing, created_at__lt=opened_at
+        ).values('owner_id').annotate(**_sums()).order_by():
+            opening[row.pop('owner_id')] = row
+
+    snapshots = []
+    for owner_id in owners:
+        start = opening.get(owner_id, {})
+        rows = month.get(owner_id, {})
+        snapshots.append(EarningsSnapshot(
+            owner_id=owner_id,
+            period=period,
+            closed_at=closed_at,
+            month_earnings=rows.get('month_earnings', 0),
+            month_bookings=rows.get('bookings', 0),
+            month_platform_fees=rows.get('platform_fees', 0),
+            total_earnings=start.get('earnings', 0) + rows.get('earnings', 0),
+            total_bookings=start.get('bookings', 0) + rows.get('bookings', 0),
+            total_platform_fees=start.get('platform_fees', 0) + rows.get('platform_fees', 0),
+            improvement_fund_balance=start.get('improvement_fund', 0) + rows.get('improvement_fund', 0),
+        ))
+    EarningsSnapshot.objects.bulk_create(snapshots, batch_size=500, ignore_conflicts=True)
+
+    if next_month(period) == this_month:
+        roll_month_counters(this_month)
+    return len(snapshots)
+
+
+def roll_month_counters(period):
+    """
+    Start ``period`` on every ``OwnerEarnings`` row still on an earlier month:
+    the closed month's snapshot becomes ``previous_month_*`` and the month
+    counters restart from what is already posted in ``period``.
+    """
+    previous_period = month_start(period - timedelta(days=1))
+    with transaction.atomic():
+        # Locked so no posting lands between summing the new month and writing it
+        rows = list(
+            OwnerEarnings.objects.select_for_update()
+            .filter(Q(current_period__lt=period) | Q(current_period__isnull=True))
+        )
+        owner_ids = [row.owner_id for row in rows]
+        closed = {
+            snapshot.owner_id: snapshot
+            for snapshot in EarningsSnapshot.objects.filter(owner_id__in=owner_ids, period=previous_period)
+        }
+        posted = {
+            row.pop('owner_id'): row
+            for row in EarningsRecord.objects.filter(
+                owner_id__in=owner_ids, created_at__gte=_start_of(period)
+            ).values('owner_id').annotate(**_sums()).order_by()
+        }
+        for row in rows:
+            snapshot = closed.get(row.owner_id)
+            month = posted.get(row.owner_id, {})
+            row.previous_month_earnings = snapshot.month_earnings if snapshot else 0
+            row.previous_month_bookings = snapshot.month_bookings if snapshot else 0
+            row.current_month_earnings = month.get('month_earnings', 0)
+            row.current_month_bookings = month.get('bookings', 0)
+            row.current_period = period
+        OwnerEarnings.objects.bulk_update(rows, [
+            'previous_month_earnings', 'previous_month_bookings',
+            'current_month_earnings', 'current_month_bookings', 'current_period',
+        ], batch_size=500)
+    return len(rows)
+
+
+def reconcile(owner_ids=None, fix=False):
+    """
+    Compare ``OwnerEarnings`` counters with snapshot + ledger tail.
+
+    Returns ``[(owner_id, field, stored, expected)]`` for every difference;
+    with ``fix`` the counters are set to the ledger values.
+    """
+    mismatches = []
+    with transaction.atomic():
+        earnings = OwnerEarnings.objects.select_for_update()
+        if owner_ids is not None:
+            earnings = earnings.filter(owner_id__in=owner_ids)
+        rows = list(earnings)
+        balances = ledger_balances([row.owner_id for row in rows])
+
+        to_fix = []
+        for row in rows:
+            expected = balances[row.owner_id]
+            changed = False
+            for field in COUNTER_FIELDS:
+                if getattr(row, field) != expected[field]:
+                    mismatches.append((row.owner_id, field, getattr(row, field), expected[field]))
+                    setattr(row, field, expected[field])
+                    changed = True
+            if changed:
+                to_fix.append(row)
+        if fix and to_fix:
+            OwnerEarnings.objects.bulk_update(to_fix, COUNTER_FIELDS, batch_size=500)
+    return mismatches
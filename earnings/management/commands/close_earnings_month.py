@@ -0,0 +1,27 @@
+"""
+Management command to snapshot owner earnings at the end of a month
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from earnings.ledger import close_month
+
+
+class Command(BaseCommand):
+    help = 'Write month-end earnings snapshots and roll the current month counters over'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to close as YYYY-MM (default: last month)')
+
+    def handle(self, *args, **options):
+        period = None
+        if options['month']:
+            try:
+                period = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must be YYYY-MM')
+
+        written = close_month(period)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} earnings snapshots'))
@@ -0,0 +1,36 @@
+"""
+Management command to settle approved payout requests in one batch
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from earnings.payouts import resume_unfinished_batches, run_payout_batch, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Debit approved payout requests from owner balances and write the settlement files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reference', help='Batch reference; rerun with the same one to resume a failed run')
+        parser.add_argument('--limit', type=int, help='Settle at most this many requests')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Owners settled per transaction')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        batches = []
+        if not options['reference']:
+            # Batches left processing by a run that died hold claimed requests
+            batches += resume_unfinished_batches(chunk_size=options['chunk_size'])
+        batches.append(
+            run_payout_batch(options['reference'], limit=options['limit'], chunk_size=options['chunk_size'])
+        )
+        for batch in batches:
+            self.stdout.write(self.style.SUCCESS(
+                f'Batch {batch.reference}: {batch.processed_count} processed ({batch.total_amount}), '
+                f'{batch.failed_count} failed'
+            ))
+            for method, path in batch.settlement_files.items():
+                self.stdout.write(f'  {method}: {path}')
@@ -0,0 +1,29 @@
+"""
+Management command to check owner earnings counters against the ledger
+"""
+
+from django.core.management.base import BaseCommand
+
+from earnings.ledger import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Compare OwnerEarnings balances with the latest snapshot plus the earnings ledger tail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, action='append', dest='owners',
+                            help='Only reconcile this owner id (repeatable)')
+        parser.add_argument('--fix', action='store_true',
+                            help='Overwrite mismatching counters with the ledger values')
+
+    def handle(self, *args, **options):
+        mismatches = reconcile(options['owners'], fix=options['fix'])
+        for owner_id, field, stored, expected in mismatches:
+            self.stdout.write(f'owner {owner_id}: {field} is {stored}, ledger says {expected}')
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Earnings balances match the ledger'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(mismatches)} counters'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(mismatches)} counters differ; rerun with --fix to correct them'))
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_playgrounddailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('earnings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EarningsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('closed_at', models.DateTimeField()),
+                ('month_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('month_bookings', models.PositiveIntegerField(default=0)),
+                ('month_platform_fees', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_bookings', models.PositiveIntegerField(default=0)),
+                ('total_platform_fees', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('improvement_fund_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-period'],
+            },
+        ),
+        migrations.AddField(
+            model_name='earningsrecord',
+            name='payout_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='earnings_records', to='earnings.payoutrequest'),
+        ),
+        migrations.AddField(
+            model_name='ownerearnings',
+            name='current_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='earningsrecord',
+            name='booking',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='earnings_records', to='bookings.booking'),
+        ),
+        migrations.AlterField(
+            model_name='earningsrecord',
+            name='record_type',
+            field=models.CharField(choices=[('booking', 'Booking Revenue'), ('adjustment', 'Manual Adjustment'), ('refund', 'Refund'), ('bonus', 'Performance Bonus'), ('penalty', 'Penalty'), ('payout', 'Payout')], default='booking', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='earningsrecord',
+            index=models.Index(fields=['owner', 'created_at'], name='earnings_ea_owner_i_ca2585_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='earningsrecord',
+            constraint=models.UniqueConstraint(condition=models.Q(('booking__isnull', False)), fields=('booking', 'record_type'), name='unique_earnings_record_per_booking'),
+        ),
+        migrations.AddField(
+            model_name='earningssnapshot',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_snapshots', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='earningssnapshot',
+            unique_together={('owner', 'period')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('earnings', '0003_payout_batch'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='earningsrecord',
+            constraint=models.UniqueConstraint(condition=models.Q(('payout_request__isnull', False)), fields=('payout_request', 'record_type'), name='unique_earnings_record_per_payout'),
+        ),
+    ]
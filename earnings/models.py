@@ -30,6 +30,8 @@ class OwnerEarnings(models.Model):
     # Previous month for comparison
     previous_month_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     previous_month_bookings = models.PositiveIntegerField(default=0)
+    # First day of the month the current_month_* counters cover
+    current_period = models.DateField(null=True, blank=True)
     
     # Platform fees and commissions
     total_platform_fees = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -70,36 +72,9 @@ class OwnerEarnings(models.Model):
         return (booking_amount * self.platform_fee_percentage) / 100
     
     def add_booking_earnings(self, booking):
-        """Add earnings from a new booking"""
-        platform_fee = self.calculate_platform_fee(booking.final_amount)
-        net_amount = booking.final_amount - platform_fee
-        
-        # Update totals
-        self.total_earnings += net_amount
-        self.total_bookings += 1
-        self.total_platform_fees += platform_fee
-        
-        # Update current month
-        from datetime import date
-        if booking.booking_date.month == date.today().month:
-            self.current_month_earnings += net_amount
-            self.current_month_bookings += 1
-        
-        # Add to improvement fund (2% of net earnings)
-        improvement_contribution = net_amount * Decimal('0.02')
-        self.improvement_fund_balance += improvement_contribution
-        
-        self.save()
-        
-        # Create earnings record
-        EarningsRecord.objects.create(
-            owner=self.owner,
-            booking=booking,
-            gross_amount=booking.final_amount,
-            platform_fee=platform_fee,
-            net_amount=net_amount,
-            improvement_fund_contribution=improvement_contribution
-        )
+        """Add earnings from a new booking (see earnings.ledger.credit_booking)"""
+        from .ledger import credit_booking
+        return credit_booking(booking, owner=self.owner)
 
 
 class EarningsRecord(models.Model):
@@ -110,10 +85,12 @@ class EarningsRecord(models.Model):
         ('refund', 'Refund'),
         ('bonus', 'Performance Bonus'),
         ('penalty', 'Penalty'),
+        ('payout', 'Payout'),
     )
     
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='earnings_records')
-    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, null=True, blank=True)
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name='earnings_records')
+    payout_request = models.ForeignKey('PayoutRequest', on_delete=models.SET_NULL, null=True, blank=True, related_name='earnings_records')
     
     record_type = models.CharField(max_length=20, choices=RECORD_TYPES, default='booking')
     description = models.CharField(max_length=200, blank=True)
@@ -130,11 +107,53 @@ class EarningsRecord(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'created_at']),
+        ]
+        constraints = [
+            # A booking is credited (or refunded) at most once
+            models.UniqueConstraint(
+                fields=['booking', 'record_type'], condition=Q(booking__isnull=False),
+                name='unique_earnings_record_per_booking',
+            ),
+            # A payout request is debited at most once
+            models.UniqueConstraint(
+                fields=['payout_request', 'record_type'], condition=Q(payout_request__isnull=False),
+                name='unique_earnings_record_per_payout',
+            ),
+        ]
     
     def __str__(self):
         return f"Earnings Record - {self.owner.username} - ${self.net_amount}"
 
 
+class EarningsSnapshot(models.Model):
+    """Owner balances at the close of a month, the base for ledger-tail sums"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='earnings_snapshots')
+    period = models.DateField()  # First day of the closed month
+    closed_at = models.DateTimeField()  # Records created before this are included
+    
+    # The month's own figures
+    month_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    month_bookings = models.PositiveIntegerField(default=0)
+    month_platform_fees = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Running totals at closed_at
+    total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_bookings = models.PositiveIntegerField(default=0)
+    total_platform_fees = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    improvement_fund_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        unique_together = ['owner', 'period']
+        ordering = ['-period']
+    
+    def __str__(self):
+        return f"Earnings Snapshot - {self.owner.email} - {self.period:%Y-%m}"
+
+
 class PayoutRequest(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -145,6 +164,7 @@ class PayoutRequest(models.Model):
     )
     
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payout_requests')
+    batch = models.ForeignKey('PayoutBatch', on_delete=models.SET_NULL, null=True, blank=True, related_name='requests')
     requested_amount = models.DecimalField(max_digits=10, decimal_places=2)
     available_balance = models.DecimalField(max_digits=10, decimal_places=2)
     
@@ -180,21 +200,56 @@ class PayoutRequest(models.Model):
         self.save()
     
     def process(self, processed_by_user, transaction_ref=None):
-        """Mark payout as processed"""
-        self.status = 'processed'
-        self.processed_by = processed_by_user
-        self.processed_at = timezone.now()
-        if transaction_ref:
-            self.transaction_reference = transaction_ref
-        self.save()
+        """
+        Mark an approved payout as processed and deduct it from the owner's
+        earnings. The request is claimed with a conditional update, so a
+        stale instance or a concurrent payout batch can't post it twice.
+        Returns whether this call processed it.
+        """
+        from django.db import transaction
+        from .ledger import record_payout
         
-        # Deduct from owner's earnings
-        try:
-            earnings = self.owner.earnings
-            earnings.total_earnings -= self.requested_amount
-            earnings.save()
-        except OwnerEarnings.DoesNotExist:
-            pass
+        now = timezone.now()
+        fields = {'status': 'processed', 'processed_by': processed_by_user, 'processed_at': now}
+        if transaction_ref:
+            fields['transaction_reference'] = transaction_ref
+        with transaction.atomic():
+            # The owner's counters are locked first, in the same order as batch settlement
+            list(OwnerEarnings.objects.select_for_update().filter(owner_id=self.owner_id))
+            claimed = PayoutRequest.objects.filter(pk=self.pk, status='approved').update(**fields)
+            if claimed:
+                record_payout(self, processed_by=processed_by_user)
+        if claimed:
+            for field, value in fields.items():
+                setattr(self, field, value)
+        return bool(claimed)
+
+
+class PayoutBatch(models.Model):
+    """A settlement run over approved payout requests (see earnings.payouts)"""
+    STATUS_CHOICES = (
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+    )
+    
+    reference = models.CharField(max_length=50, unique=True)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='processing')
+    
+    # Totals once completed
+    processed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    settlement_files = models.JSONField(default=default_dict, blank=True)  # payment method -> file path
+    
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='payout_batches')
+    created_at = models.DateTimeField(default=timezone.now)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Payout Batch {self.reference} - {self.status}"
 
 
 class ImprovementFund(models.Model):
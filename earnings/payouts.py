@@ -0,0 +1,201 @@
+"""
+Batch settlement of approved payout requests.
+
+``run_payout_batch`` claims every approved request not yet in a batch, then
+settles them in chunks of owners. For each chunk it locks the owners'
+``OwnerEarnings`` rows, reads their ledger balances in one grouped query,
+debits the requests that fit the balance (oldest approval first) with one
+bulk insert of ledger rows and one counter UPDATE, and marks the requests
+processed or failed in bulk, all in one transaction. Settlement files, one CSV
+per payment method, are written from the processed requests at the end.
+
+A batch is identified by its reference: running it again resumes the
+requests it still holds as approved and is a no-op once it completed. A run
+without a reference first finishes every batch still processing, so requests
+claimed by a run that died are settled by the next one rather than left in
+a batch nobody resumes.
+"""
+
+import csv
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, When
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import EarningsRecord, OwnerEarnings, PayoutBatch, PayoutRequest
+
+
+CHUNK_SIZE = 500
+SETTLEMENT_DIR = 'payouts'
+
+SETTLEMENT_COLUMNS = (
+    'batch_reference', 'payout_id', 'owner_email', 'account_holder_name', 'bank_name',
+    'account_number', 'mobile_banking_number', 'amount',
+)
+
+
+def _chunks(items, size):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def _claim(batch, limit=None):
+    """Move approved requests without a batch into ``batch``; returns how many"""
+    with transaction.atomic():
+        ids = PayoutRequest.objects.select_for_update(skip_locked=True).filter(
+            status='approved', batch__isnull=True
+        ).order_by('approved_at', 'id').values_list('id', flat=True)
+        if limit:
+            ids = ids[:limit]
+        return PayoutRequest.objects.filter(id__in=list(ids)).update(batch=batch)
+
+
+def _settle(batch, owner_ids, processed_by=None):
+    """Debit and mark the batch's approved requests for ``owner_ids``, atomically"""
+    now = timezone.now()
+    with transaction.atomic():
+        # Locked in id order so concurrent postings and batches can't deadlock
+        list(OwnerEarnings.objects.select_for_update().filter(owner_id__in=owner_ids).order_by('owner_id'))
+        balances = dict(
+            EarningsRecord.objects.filter(owner_id__in=owner_ids).values('owner_id').annotate(
+                balance=Sum('net_amount')
+            ).order_by().values_list('owner_id', 'balance')
+        )
+        requests = batch.requests.filter(status='approved', owner_id__in=owner_ids).order_by(
+            'owner_id', 'approved_at', 'id'
+        )
+
+        processed, failed, debits, records = [], [], {}, []
+        for payout in requests:
+            amount = payout.requested_amount
+            balance = balances.get(payout.owner_id) or 0
+            if amount <= 0 or amount > balance:
+                failed.append(payout.id)
+                continue
+            balances[payout.owner_id] = balance - amount
+            debits[payout.owner_id] = debits.get(payout.owner_id, 0) + amount
+            processed.append(payout.id)
+            records.append(EarningsRecord(
+                owner_id=payout.owner_id,
+                record_type='payout',
+                gross_amount=amount,
+                net_amount=-amount,
+                payout_request_id=payout.id,
+                description=f'Payout #{payout.id} ({batch.reference})',
+                processed_by=processed_by,
+                created_at=now,
+            ))
+
+        EarningsRecord.objects.bulk_create(records)
+        if debits:
+            OwnerEarnings.objects.filter(owner_id__in=debits).update(total_earnings=Case(
+                *[When(owner_id=owner_id, then=F('total_earnings') - amount) for owner_id, amount in debits.items()],
+                default=F('total_earnings'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ))
+        PayoutRequest.objects.filter(id__in=processed, status='approved').update(
+            status='processed', processed_by=processed_by, processed_at=now,
+            transaction_reference=batch.reference,
+        )
+        PayoutRequest.objects.filter(id__in=failed, status='approved').update(
+            status='failed', admin_notes=f'Insufficient balance in payout batch {batch.reference}',
+        )
+    return len(processed), len(failed)
+
+
+# Settlement column -> OwnerEarnings field used when the request doesn't carry it
+ACCOUNT_FIELDS = {
+    'account_holder_name': 'account_holder_name',
+    'bank_name': 'bank_name',
+    'account_number': 'bank_account_number',
+    'mobile_banking_number': 'mobile_banking_number',
+}
+
+
+def _account(payout):
+    details = payout.account_details or {}
+    earnings = getattr(payout.owner, 'earnings', None)
+    return {
+        column: details.get(column) or getattr(earnings, field, None) or ''
+        for column, field in ACCOUNT_FIELDS.items()
+    }
+
+
+def write_settlement_files(batch):
+    """One CSV per payment method of the batch's processed requests; returns {method: path}"""
+    writers = {}
+    payouts = batch.requests.filter(status='processed').select_related(
+        'owner', 'owner__earnings'
+    ).order_by('payment_method', 'id')
+    for payout in payouts.iterator(chunk_size=CHUNK_SIZE):
+        if payout.payment_method not in writers:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(SETTLEMENT_COLUMNS)
+            writers[payout.payment_method] = (buffer, writer)
+        account = _account(payout)
+        writers[payout.payment_method][1].writerow([
+            batch.reference, payout.id, payout.owner.email, account['account_holder_name'],
+            account['bank_name'], account['account_number'], account['mobile_banking_number'],
+            f'{payout.requested_amount:.2f}',
+        ])
+
+    files = {}
+    for method, (buffer, _) in writers.items():
+        path = f'{SETTLEMENT_DIR}/{slugify(batch.reference)}/{slugify(method) or "other"}.csv'
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        files[method] = default_storage.save(path, ContentFile(buffer.getvalue().encode('utf-8')))
+    return files
+
+
+def resume_unfinished_batches(processed_by=None, chunk_size=CHUNK_SIZE):
+    """Finish the batches still processing, oldest first; returns them"""
+    references = PayoutBatch.objects.filter(status='processing').order_by('created_at', 'id').values_list(
+        'reference', flat=True
+    )
+    return [
+        run_payout_batch(reference, processed_by, chunk_size=chunk_size)
+        for reference in list(references)
+    ]
+
+
+def run_payout_batch(reference=None, processed_by=None, limit=None, chunk_size=CHUNK_SIZE):
+    """
+    Settle approved payout requests under batch ``reference`` (default: a new
+    timestamped one, after finishing unfinished batches). Returns the
+    ``PayoutBatch``.
+    """
+    if reference is None:
+        resume_unfinished_batches(processed_by, chunk_size)
+        reference = timezone.localtime().strftime('PB%Y%m%d%H%M%S%f')
+    batch, created = PayoutBatch.objects.get_or_create(reference=reference, defaults={'created_by': processed_by})
+    if batch.status == 'completed':
+        return batch
+
+    # A retried batch only finishes the requests it already holds
+    if created:
+        _claim(batch, limit)
+    owner_ids = sorted(set(
+        batch.requests.filter(status='approved').values_list('owner_id', flat=True)
+    ))
+    for owner_ids_chunk in _chunks(owner_ids, chunk_size):
+        _settle(batch, owner_ids_chunk, processed_by)
+
+    totals = batch.requests.aggregate(
+        processed=Count('id', filter=Q(status='processed')),
+        failed=Count('id', filter=Q(status='failed')),
+        amount=Sum('requested_amount', filter=Q(status='processed')),
+    )
+    batch.settlement_files = write_settlement_files(batch)
+    batch.processed_count = totals['processed']
+    batch.failed_count = totals['failed']
+    batch.total_amount = totals['amount'] or 0
+    batch.status = 'completed'
+    batch.completed_at = timezone.now()
+    batch.save()
+    return batch
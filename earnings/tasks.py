@@ -0,0 +1,34 @@
+"""
+Earnings tasks (periodic ones are scheduled in CELERY_BEAT_SCHEDULE in settings)
+"""
+
+from celery import shared_task
+
+from bookings.models import Booking
+
+from .ledger import close_month, credit_booking
+from .payouts import run_payout_batch
+
+
+@shared_task
+def close_earnings_month():
+    """Snapshot owner balances for last month and roll the month counters over"""
+    return close_month()
+
+
+@shared_task
+def process_payouts(reference=None):
+    """
+    Settle approved payout requests; retries with the same reference resume
+    the batch, and a run without one first finishes batches left unfinished
+    """
+    return run_payout_batch(reference).reference
+
+
+@shared_task
+def credit_booking_earnings(booking_ids):
+    """Credit verified bookings to their owners' ledgers; bookings already credited are skipped"""
+    credited = 0
+    for booking in Booking.objects.filter(id__in=booking_ids).select_related('playground__owner'):
+        credited += credit_booking(booking) is not None
+    return credited
@@ -1,3 +1,125 @@
-from django.test import TestCase
+import tempfile
+from datetime import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from bookings.models import Booking
+from playgrounds.models import City, Country, Playground, State
+
+from . import ledger, payouts
+from .models import EarningsRecord, OwnerEarnings, PayoutBatch, PayoutRequest
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        # Payout batches write settlement files
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.owner = User.objects.create_user(email='owner@example.com', password='x', user_type='owner')
+        customer = User.objects.create_user(email='customer@example.com', password='x')
+        country = Country.objects.create(name='Country', code='CC')
+        state = State.objects.create(name='State', country=country)
+        city = City.objects.create(name='City', state=state)
+        playground = Playground.objects.create(
+            name='Playground', owner=self.owner, city=city, price_per_hour=100, capacity=10,
+            address='Address', status='active',
+        )
+        self.bookings = [
+            Booking.objects.create(
+                user=customer, playground=playground, booking_date=timezone.localdate(),
+                start_time=time(9 + i), end_time=time(10 + i), duration_hours=1, number_of_players=2,
+                price_per_hour=1000, total_amount=1000, final_amount=1000, status='confirmed', payment_status='paid',
+            )
+            for i in range(2)
+        ]
+
+    def earnings(self):
+        return OwnerEarnings.objects.get(owner=self.owner)
+
+    def payout(self, amount, status='approved'):
+        return PayoutRequest.objects.create(
+            owner=self.owner, requested_amount=amount, available_balance=0, payment_method='bank_transfer',
+            status=status,
+        )
+
+    def test_booking_is_credited_once(self):
+        self.assertIsNotNone(ledger.credit_booking(self.bookings[0]))
+        self.assertIsNone(ledger.credit_booking(self.bookings[0]))
+        earnings = self.earnings()
+        # 10% platform fee
+        self.assertEqual(earnings.total_earnings, Decimal('900.00'))
+        self.assertEqual(earnings.total_bookings, 1)
+        self.assertEqual(earnings.current_month_earnings, Decimal('900.00'))
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_rows_from_before_the_ledger_start_the_current_month(self):
+        OwnerEarnings.objects.create(owner=self.owner)
+        ledger.credit_booking(self.bookings[0])
+        earnings = self.earnings()
+        self.assertEqual(earnings.current_period, ledger.month_start(timezone.localdate()))
+        self.assertEqual(earnings.current_month_earnings, Decimal('900.00'))
+        self.assertEqual(earnings.current_month_bookings, 1)
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_payout_is_debited_once(self):
+        ledger.credit_booking(self.bookings[0])
+        payout = self.payout(100)
+        stale = PayoutRequest.objects.get(pk=payout.pk)
+        self.assertTrue(payout.process(self.owner))
+        self.assertFalse(stale.process(self.owner))
+        self.assertEqual(payouts.run_payout_batch('BATCH1').processed_count, 0)
+        self.assertEqual(EarningsRecord.objects.filter(record_type='payout').count(), 1)
+        self.assertEqual(self.earnings().total_earnings, Decimal('800.00'))
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_unapproved_payout_is_not_processed(self):
+        ledger.credit_booking(self.bookings[0])
+        self.assertFalse(self.payout(100, status='pending').process(self.owner))
+        self.assertEqual(self.earnings().total_earnings, Decimal('900.00'))
+
+    def test_batch_settles_what_the_balance_covers(self):
+        ledger.credit_booking(self.bookings[0])
+        first, second = self.payout(600), self.payout(600)
+        batch = payouts.run_payout_batch('BATCH1')
+        self.assertEqual((batch.processed_count, batch.failed_count), (1, 1))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('processed', 'failed'))
+        self.assertEqual(self.earnings().total_earnings, Decimal('300.00'))
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_requests_claimed_by_a_crashed_run_are_settled_by_the_next_one(self):
+        ledger.credit_booking(self.bookings[0])
+        payout = self.payout(100)
+        with mock.patch('earnings.payouts._settle', side_effect=RuntimeError('worker lost')):
+            with self.assertRaises(RuntimeError):
+                payouts.run_payout_batch()
+        crashed = PayoutBatch.objects.get()
+        payout.refresh_from_db()
+        self.assertEqual((payout.status, payout.batch_id), ('approved', crashed.id))
+
+        later = self.payout(200)
+        batch = payouts.run_payout_batch()
+
+        crashed.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.processed_count), ('completed', 1))
+        self.assertEqual((batch.processed_count, batch.failed_count), (1, 0))
+        payout.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((payout.status, later.status), ('processed', 'processed'))
+        self.assertEqual(self.earnings().total_earnings, Decimal('600.00'))
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_refund_reverses_the_credit_in_proportion(self):
+        ledger.credit_booking(self.bookings[0])
+        ledger.debit_refunds({self.bookings[0].id: Decimal('500')})
+        ledger.debit_refunds({self.bookings[0].id: Decimal('500')})
+        refund = EarningsRecord.objects.get(record_type='refund')
+        self.assertEqual(refund.net_amount, Decimal('-450.00'))
+        self.assertEqual(self.earnings().total_earnings, Decimal('450.00'))
+        self.assertEqual(ledger.reconcile(), [])
@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration
+
+    gunicorn playground_booking.wsgi:application
+
+Gunicorn picks this file up automatically from the working directory.
+Set WARM_CACHES_ON_START=1 to prebuild hot cache entries once the master is
+ready to serve (see ``python manage.py warm_caches``).
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from decouple import config
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    """Warm the shared cache in a child process so the master never blocks or opens DB connections"""
+    # Read through decouple so the values can live in .env like the Django settings
+    if not config('WARM_CACHES_ON_START', default=False, cast=bool):
+        return
+
+    command = [
+        sys.executable, str(BASE_DIR / 'manage.py'), 'warm_caches',
+        '--timeout', str(config('WARM_CACHES_TIMEOUT', default=60, cast=float)),
+        '--top', str(config('WARM_CACHES_TOP', default=20, cast=int)),
+    ]
+    server.log.info("Warming caches: %s", ' '.join(command[1:]))
+    subprocess.Popen(command, cwd=BASE_DIR)
+
+
+def worker_exit(server, worker):
+    """Write buffered counters before the worker goes away"""
+    from playground_booking.counters import flush_all
+    flush_all()
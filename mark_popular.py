@@ -5,6 +5,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'playground_booking.settings')
 django.setup()
 
 from playgrounds.models import Playground
+from playgrounds.currency import format_price
 
 # Mark top 5 playgrounds as popular
 print("=" * 80)
@@ -35,15 +36,9 @@ for i, p in enumerate(popular, 1):
     country = p.city.state.country if (p.city and p.city.state and p.city.state.country) else None
     currency = country.get_currency() if country else 'N/A'
     
-    symbols = {
-        'USD': '$', 'EUR': '€', 'GBP': '£', 'MYR': 'RM', 'SGD': 'S$',
-        'INR': '₹', 'BDT': '৳', 'AUD': 'A$', 'CAD': 'C$'
-    }
-    symbol = symbols.get(currency, currency)
-    
     print(f"\n{i}. {p.name}")
     print(f"   Location: {p.city.name if p.city else 'N/A'}, {country.name if country else 'N/A'}")
-    print(f"   Price: {symbol}{p.price_per_hour}/hour")
+    print(f"   Price: {format_price(p.price_per_hour, currency)}/hour")
     print(f"   Rating: {p.rating if p.rating else 'Not rated'}")
 
 print("\n✅ These playgrounds will now appear on the homepage!")
@@ -0,0 +1,213 @@
+"""
+Two-level cache for hot read APIs.
+
+A small per-process LRU sits in front of the shared Django cache (LocMemCache
+in development, Redis in production). Entries can carry tags, and
+``invalidate(tags=[...])`` drops every entry carrying one of those tags:
+
+    from playground_booking.caching import tiered_cache
+
+    data = tiered_cache.get_or_set(
+        f"playground:public:{playground_id}", build_payload,
+        timeout=300, tags=[f"playground:{playground_id}"],
+    )
+    tiered_cache.invalidate(tags=[f"playground:{playground_id}"])
+
+Tags are versioned in the shared cache, so invalidation is visible to every
+worker on its next shared-cache read. Local copies in other processes are
+trusted for at most ``LOCAL_TIMEOUT`` seconds, which bounds their staleness.
+Cached values are shared between requests and must be treated as read-only.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+_MISSING = object()
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'tiered',
+    'LOCAL_MAX_ENTRIES': 2048,
+    'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+    'LOCAL_TIMEOUT': 30,
+    'DEFAULT_TIMEOUT': 300,
+}
+
+
+class TwoLevelCache:
+    """Per-process LRU with TTL and size bounds in front of a shared cache"""
+
+    def __init__(self, cache_alias=None, key_prefix=None, local_max_entries=None,
+                 local_max_bytes=None, local_timeout=None, default_timeout=None):
+        options = {**DEFAULTS, **getattr(settings, 'TWO_LEVEL_CACHE', {})}
+        self.cache_alias = cache_alias or options['CACHE_ALIAS']
+        self.key_prefix = key_prefix or options['KEY_PREFIX']
+        self.local_max_entries = local_max_entries or options['LOCAL_MAX_ENTRIES']
+        self.local_max_bytes = local_max_bytes or options['LOCAL_MAX_BYTES']
+        self.local_timeout = local_timeout if local_timeout is not None else options['LOCAL_TIMEOUT']
+        self.default_timeout = default_timeout or options['DEFAULT_TIMEOUT']
+
+        # key -> (value, expires_at, tag_versions, size)
+        self._local = OrderedDict()
+        self._local_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    # Keys
+
+    def _entry_key(self, key):
+        return f"{self.key_prefix}:entry:{key}"
+
+    def _tag_key(self, tag):
+        return f"{self.key_prefix}:tag:{tag}"
+
+    # Public API
+
+    def get(self, key, default=None, tags=()):
+        value, _ = self._lookup(key, tags)
+        return default if value is _MISSING else value
+
+    def get_or_set(self, key, builder, timeout=None, tags=()):
+        """Return the cached value for `key`, calling `builder()` on a miss"""
+        value, tag_versions = self._lookup(key, tags)
+        if value is not _MISSING:
+            return value
+
+        # Tag versions were read before building, so an invalidation that
+        # races with the build leaves the stored entry already stale.
+        value = builder()
+        self._store(key, value, timeout, tag_versions)
+        return value
+
+    def set(self, key, value, timeout=None, tags=()):
+        self._store(key, value, timeout, self._tag_versions(tags))
+
+    def delete(self, key):
+        with self._lock:
+            self._discard_local(key)
+        self.shared.delete(self._entry_key(key))
+
+    def invalidate(self, tags):
+        """Invalidate every entry carrying any of the given tags"""
+        tags = set(tags)
+        if not tags:
+            return
+        token = time.time_ns()
+        self.shared.set_many({self._tag_key(tag): token for tag in tags}, None)
+        with self._lock:
+            stale = [
+                key for key, entry in self._local.items()
+                if tags.intersection(entry[2])
+            ]
+            for key in stale:
+                self._discard_local(key)
+            self._stats['invalidations'] += 1
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+            self._local_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters for this process plus the local tier's footprint"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+            stats['local_bytes'] = self._local_bytes
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    # Internals
+
+    def _lookup(self, key, tags):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._local.move_to_end(key)
+                    self._stats['local_hits'] += 1
+                    return entry[0], entry[2]
+                self._discard_local(key)
+
+        entry_key = self._entry_key(key)
+        tag_keys = {self._tag_key(tag): tag for tag in tags}
+        found = self.shared.get_many([entry_key, *tag_keys])
+        tag_versions = self._seed_tags(tag_keys, found)
+
+        cached = found.get(entry_key)
+        if cached is not None:
+            stored_versions, payload = cached
+            if stored_versions == tag_versions:
+                value = pickle.loads(payload)
+                self._store_local(key, value, tag_versions, len(payload))
+                with self._lock:
+                    self._stats['shared_hits'] += 1
+                return value, tag_versions
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return _MISSING, tag_versions
+
+    def _tag_versions(self, tags):
+        tag_keys = {self._tag_key(tag): tag for tag in tags}
+        if not tag_keys:
+            return {}
+        return self._seed_tags(tag_keys, self.shared.get_many(list(tag_keys)))
+
+    def _seed_tags(self, tag_keys, found):
+        missing = [key for key in tag_keys if key not in found]
+        if missing:
+            # add() keeps whichever token another worker may have seeded first
+            for key in missing:
+                self.shared.add(key, time.time_ns(), None)
+            found = {**found, **self.shared.get_many(missing)}
+        return {tag: found.get(key) for key, tag in tag_keys.items()}
+
+    def _store(self, key, value, timeout, tag_versions):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        timeout = self.default_timeout if timeout is None else timeout
+        self.shared.set(self._entry_key(key), (tag_versions, payload), timeout)
+        self._store_local(key, value, tag_versions, len(payload), min(timeout, self.local_timeout))
+        with self._lock:
+            self._stats['sets'] += 1
+
+    def _store_local(self, key, value, tag_versions, size, ttl=None):
+        ttl = self.local_timeout if ttl is None else ttl
+        if ttl <= 0 or size > self.local_max_bytes:
+            return
+        with self._lock:
+            self._discard_local(key)
+            self._local[key] = (value, time.monotonic() + ttl, tag_versions, size)
+            self._local_bytes += size
+            while self._local and (len(self._local) > self.local_max_entries
+                                   or self._local_bytes > self.local_max_bytes):
+                _, evicted = self._local.popitem(last=False)
+                self._local_bytes -= evicted[3]
+                self._stats['evictions'] += 1
+
+    def _discard_local(self, key):
+        entry = self._local.pop(key, None)
+        if entry is not None:
+            self._local_bytes -= entry[3]
+
+
+tiered_cache = TwoLevelCache()
@@ -0,0 +1,18 @@
+"""
+Celery application
+
+    celery -A playground_booking worker -B
+
+Tasks are discovered from each installed app's ``tasks`` module.
+"""
+
+import os
+
+from celery import Celery
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'playground_booking.settings')
+
+app = Celery('playground_booking')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
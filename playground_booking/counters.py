@@ -0,0 +1,191 @@
+"""
+Write-behind counters for hot increment paths.
+
+Increments are buffered in process memory and written in a few batched
+UPDATEs (one per distinct increment amount) instead of one row update per
+hit, so page views don't take row locks on the read path:
+
+    from playground_booking.counters import BufferedCounter
+
+    playground_views = BufferedCounter(
+        'playground_views', 'playgrounds.PlaygroundAnalytics', 'total_views',
+        key_field='playground_id', create_missing=True,
+    )
+    playground_views.incr(playground.id)
+
+A buffer is flushed by the request that finds it older than
+``FLUSH_INTERVAL`` seconds or holding ``MAX_PENDING`` increments, and on
+process exit (``atexit`` and the gunicorn ``worker_exit`` hook). A crashed
+process loses at most what it buffered since its last flush.
+
+With ``create_missing`` only keys whose parent row exists get a row, so an
+increment for a row deleted meanwhile is dropped instead of failing the whole
+flush. A flush that fails anyway keeps its increments for at most
+``MAX_RETRIES`` more attempts, then drops them.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FLUSH_INTERVAL': 30,
+    'MAX_PENDING': 1000,
+    'MAX_RETRIES': 3,
+}
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class BufferedCounter:
+    """Buffered ``field += n`` increments for rows of one model, keyed by ``key_field``"""
+
+    def __init__(self, name, model, field, key_field='pk', create_missing=False,
+                 flush_interval=None, max_pending=None, max_retries=None):
+        options = {**DEFAULTS, **getattr(settings, 'BUFFERED_COUNTERS', {})}
+        self.name = name
+        self.model_label = model
+        self.field = field
+        self.key_field = key_field
+        self.create_missing = create_missing
+        self.flush_interval = flush_interval if flush_interval is not None else options['FLUSH_INTERVAL']
+        self.max_pending = max_pending or options['MAX_PENDING']
+        self.max_retries = max_retries if max_retries is not None else options['MAX_RETRIES']
+
+        self._pending = Counter()
+        self._pending_total = 0
+        self._last_flush = time.monotonic()
+        # Consecutive failed flushes
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._stats = {'increments': 0, 'flushes': 0, 'rows_written': 0, 'errors': 0, 'dropped': 0}
+
+        with _registry_lock:
+            _registry[name] = self
+
+    @property
+    def model(self):
+        if isinstance(self.model_label, str):
+            return apps.get_model(self.model_label)
+        return self.model_label
+
+    def incr(self, key, amount=1):
+        """Buffer ``amount`` for the row with ``key_field == key``"""
+        if key is None or not amount:
+            return
+        with self._lock:
+            self._pending[key] += amount
+            self._pending_total += amount
+            self._stats['increments'] += amount
+            due = (
+                self._pending_total >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def pending(self, key):
+        """Increments buffered in this process and not yet written for ``key``"""
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def flush(self):
+        """Write buffered increments to the database; returns the number of rows updated"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            written = self._write(pending)
+        except Exception:
+            logger.exception("Flushing counter %s failed", self.name)
+            with self._lock:
+                self._stats['errors'] += 1
+                self._failures += 1
+                if self._failures > self.max_retries:
+                    # Don't retry a failing batch on every hit forever
+                    self._failures = 0
+                    self._stats['dropped'] += sum(pending.values())
+                    logger.error("Dropped %d increments of counter %s", sum(pending.values()), self.name)
+                else:
+                    # Keep the increments for the next flush
+                    self._pending.update(pending)
+                    self._pending_total += sum(pending.values())
+            return 0
+
+        with self._lock:
+            self._failures = 0
+            self._stats['flushes'] += 1
+            self._stats['rows_written'] += written
+        return written
+
+    def _write(self, pending):
+        model = self.model
+        by_amount = defaultdict(list)
+        for key, amount in pending.items():
+            by_amount[amount].append(key)
+
+        with transaction.atomic():
+            if self.create_missing:
+                model.objects.bulk_create(
+                    [model(**{self.key_field: key}) for key in self._parented(pending)], ignore_conflicts=True
+                )
+            written = 0
+            for amount, keys in by_amount.items():
+                written += model.objects.filter(**{f"{self.key_field}__in": keys}).update(
+                    **{self.field: F(self.field) + amount}
+                )
+        return written
+
+    def _parented(self, keys):
+        """The ``keys`` a row can be created for: those whose parent row exists when the key is a foreign key"""
+        field = self.model._meta.get_field(self.key_field)
+        if not field.is_relation:
+            return list(keys)
+        existing = set(field.related_model.objects.filter(pk__in=list(keys)).values_list('pk', flat=True))
+        missing = [key for key in keys if key not in existing]
+        if missing:
+            logger.warning("Counter %s has no parent rows for %d keys; dropping them", self.name, len(missing))
+        return [key for key in keys if key in existing]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending_keys'] = len(self._pending)
+            stats['pending_increments'] = self._pending_total
+        return stats
+
+
+def get_counter(name):
+    return _registry[name]
+
+
+def flush_all():
+    """Flush every registered counter (process shutdown, tests, management commands)"""
+    with _registry_lock:
+        counters = list(_registry.values())
+    return {counter.name: counter.flush() for counter in counters}
+
+
+def _flush_at_exit():
+    try:
+        flush_all()
+    except Exception:
+        logger.exception("Flushing counters at exit failed")
+
+
+atexit.register(_flush_at_exit)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 from decouple import config, Csv
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,6 +25,8 @@ MAPBOX_ACCESS_TOKEN = config('MAPBOX_ACCESS_TOKEN', default='')
 # Business Configuration
 CURRENCY = config('CURRENCY', default='USD')
 CURRENCY_SYMBOL = config('CURRENCY_SYMBOL', default='$')
+# Currency platform-wide revenue is reported in (playgrounds.exchange_rates)
+REPORTING_CURRENCY = config('REPORTING_CURRENCY', default=CURRENCY)
 TIMEZONE = config('TIMEZONE', default='UTC')
 BUSINESS_NAME = config('BUSINESS_NAME', default='PlayGround Booking')
 
@@ -364,6 +367,71 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379'
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'generate-platform-analytics': {
+        'task': 'adminpanel.tasks.generate_platform_analytics',
+        'schedule': crontab(minute=10),
+    },
+    'refresh-playground-analytics': {
+        'task': 'bookings.tasks.refresh_playground_analytics',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'refresh-demand-forecasts': {
+        'task': 'bookings.tasks.refresh_demand_forecasts',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'refresh-price-suggestions': {
+        'task': 'bookings.tasks.refresh_price_suggestions',
+        'schedule': crontab(hour=4, minute=30),
+    },
+    'refresh-exchange-rates': {
+        'task': 'playgrounds.tasks.refresh_exchange_rates',
+        'schedule': crontab(minute=0),
+    },
+    'close-earnings-month': {
+        'task': 'earnings.tasks.close_earnings_month',
+        'schedule': crontab(day_of_month=1, hour=0, minute=15),
+    },
+}
+
+# Cache Configuration
+# Version tokens and cached API data must be shared by every worker process,
+# so production should point CACHE_REDIS_URL at Redis. Local development
+# falls back to the in-process LocMemCache.
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'playground_booking',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'playground-booking',
+        }
+    }
+
+# Per-process LRU in front of CACHES['default'] (playground_booking.caching)
+TWO_LEVEL_CACHE = {
+    'LOCAL_MAX_ENTRIES': config('TWO_LEVEL_CACHE_MAX_ENTRIES', default=2048, cast=int),
+    'LOCAL_MAX_BYTES': config('TWO_LEVEL_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int),
+    'LOCAL_TIMEOUT': config('TWO_LEVEL_CACHE_LOCAL_TIMEOUT', default=30, cast=int),
+}
+
+# Write-behind counters (playground_booking/counters.py): buffered increments
+# are written at most every FLUSH_INTERVAL seconds or MAX_PENDING increments;
+# a failed write is retried MAX_RETRIES times before its increments are dropped
+BUFFERED_COUNTERS = {
+    'FLUSH_INTERVAL': config('BUFFERED_COUNTERS_FLUSH_INTERVAL', default=30, cast=int),
+    'MAX_PENDING': config('BUFFERED_COUNTERS_MAX_PENDING', default=1000, cast=int),
+    'MAX_RETRIES': config('BUFFERED_COUNTERS_MAX_RETRIES', default=3, cast=int),
+}
 
 
 # Static files (CSS, JavaScript, Images)
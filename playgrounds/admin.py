@@ -7,6 +7,8 @@ from django.shortcuts import render, redirect
 from django.http import HttpResponseRedirect
 from .models import (Country, State, City, SportType, Playground, 
                      PlaygroundImage, TimeSlot, Review)
+from .currency import CURRENCIES, currency_for_country
+from .signals import invalidate_playgrounds
 
 
 @admin.register(Country)
@@ -19,14 +21,10 @@ class CountryAdmin(admin.ModelAdmin):
     
     def get_currency_display(self, obj):
         """Display currency with symbol"""
-        currency_symbols = {
-            'USD': '$ (USD)', 'EUR': '€ (EUR)', 'GBP': '£ (GBP)', 
-            'MYR': 'RM (MYR)', 'SGD': 'S$ (SGD)', 'INR': '₹ (INR)', 
-            'BDT': '৳ (BDT)', 'AUD': 'A$ (AUD)', 'CAD': 'C$ (CAD)', 
-            'JPY': '¥ (JPY)', 'CNY': '¥ (CNY)', 'THB': '฿ (THB)'
-        }
         currency = obj.get_currency()
-        return currency_symbols.get(currency, currency)
+        if currency in CURRENCIES:
+            return f"{CURRENCIES[currency].symbol} ({currency})"
+        return currency
     get_currency_display.short_description = 'Currency'
 
 
@@ -79,14 +77,10 @@ class PlaygroundAdmin(admin.ModelAdmin):
     
     def get_currency_display(self, obj):
         """Display currency based on country"""
-        currency_map = {
-            'US': 'USD ($)', 'GB': 'GBP (£)', 'MY': 'MYR (RM)', 'SG': 'SGD (S$)',
-            'IN': 'INR (₹)', 'BD': 'BDT (৳)', 'AU': 'AUD (A$)', 'CA': 'CAD (C$)',
-            'JP': 'JPY (¥)', 'CN': 'CNY (¥)', 'AE': 'AED (د.إ)', 'TH': 'THB (฿)'
-        }
         if obj.city and obj.city.state and obj.city.state.country:
-            code = obj.city.state.country.code
-            return currency_map.get(code, obj.currency)
+            code = currency_for_country(obj.city.state.country.code, default=None)
+            if code:
+                return f"{code} ({CURRENCIES[code].symbol})"
         return obj.currency
     get_currency_display.short_description = 'Currency'
     
@@ -128,7 +122,9 @@ class PlaygroundAdmin(admin.ModelAdmin):
         """Mark selected playgrounds as popular (will appear on homepage)"""
         # Only mark active playgrounds
         active_queryset = queryset.filter(status='active')
+        playground_ids = list(active_queryset.values_list('id', flat=True))
         updated = active_queryset.update(is_popular=True)
+        invalidate_playgrounds(playground_ids)
         
         if updated > 0:
             self.message_user(
@@ -148,7 +144,9 @@ class PlaygroundAdmin(admin.ModelAdmin):
     
     def unmark_as_popular(self, request, queryset):
         """Remove popular status from selected playgrounds"""
+        playground_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_popular=False)
+        invalidate_playgrounds(playground_ids)
         self.message_user(
             request, 
             f'❌ {updated} playground(s) removed from popular section. They will no longer appear on homepage.',
@@ -347,10 +345,12 @@ class ReviewAdmin(admin.ModelAdmin):
     
     def approve_reviews(self, request, queryset):
         queryset.update(is_approved=True)
+        invalidate_playgrounds(queryset.values_list('playground_id', flat=True))
         self.message_user(request, f"{queryset.count()} reviews approved.")
     
     def feature_reviews(self, request, queryset):
         queryset.update(is_featured=True)
+        invalidate_playgrounds(queryset.values_list('playground_id', flat=True))
         self.message_user(request, f"{queryset.count()} reviews featured.")
     
     approve_reviews.short_description = "Approve selected reviews"
@@ -393,6 +393,7 @@ class PopularPlaygroundAdmin(admin.ModelAdmin):
                     id__in=playground_ids,
                     status='active'
                 ).update(is_popular=True)
+                invalidate_playgrounds(playground_ids)
                 
                 self.message_user(
                     request,
@@ -476,14 +477,9 @@ class PopularPlaygroundAdmin(admin.ModelAdmin):
     
     def get_currency_display(self, obj):
         """Display currency based on country"""
-        currency_symbols = {
-            'USD': '$', 'EUR': '€', 'GBP': '£', 'MYR': 'RM', 'SGD': 'S$',
-            'INR': '₹', 'BDT': '৳', 'AUD': 'A$', 'CAD': 'C$', 'JPY': '¥',
-            'CNY': '¥', 'AED': 'د.إ', 'THB': '฿'
-        }
         if obj.city and obj.city.state and obj.city.state.country:
             currency_code = obj.city.state.country.get_currency()
-            symbol = currency_symbols.get(currency_code, currency_code)
+            symbol = CURRENCIES[currency_code].symbol if currency_code in CURRENCIES else currency_code
             return format_html(
                 '<span style="font-weight: 600;">{}</span>',
                 symbol
@@ -533,7 +529,9 @@ class PopularPlaygroundAdmin(admin.ModelAdmin):
     # Admin actions
     def remove_from_popular(self, request, queryset):
         """Remove selected playgrounds from popular section"""
+        playground_ids = list(queryset.values_list('id', flat=True))
         updated = queryset.update(is_popular=False)
+        invalidate_playgrounds(playground_ids)
         self.message_user(
             request,
             f'{updated} playground(s) removed from popular section. They will no longer appear on the homepage.',
@@ -17,6 +17,8 @@ from .models import (
     PlaygroundImage, PlaygroundVideo, PlaygroundAvailability,
     PlaygroundType, Amenity
 )
+from .currency import CURRENCIES
+from bookings.pricing import DISCOUNT_TYPES, period_rates
 
 class CountriesAPIView(View):
     """API to get all active countries"""
@@ -240,13 +242,8 @@ class CurrencyAPIView(View):
             'thousands_separator': ',',
             'decimal_separator': '.',
             'supported_currencies': [
-                {'code': 'USD', 'symbol': '$', 'name': 'US Dollar'},
-                {'code': 'EUR', 'symbol': '€', 'name': 'Euro'},
-                {'code': 'GBP', 'symbol': '£', 'name': 'British Pound'},
-                {'code': 'BDT', 'symbol': '৳', 'name': 'Bangladeshi Taka'},
-                {'code': 'INR', 'symbol': '₹', 'name': 'Indian Rupee'},
-                {'code': 'CAD', 'symbol': 'C$', 'name': 'Canadian Dollar'},
-                {'code': 'AUD', 'symbol': 'A$', 'name': 'Australian Dollar'},
+                {'code': code, 'symbol': CURRENCIES[code].symbol, 'name': CURRENCIES[code].name}
+                for code in ('USD', 'EUR', 'GBP', 'BDT', 'INR', 'CAD', 'AUD')
             ]
         }
         return JsonResponse(currency_data)
@@ -1262,12 +1259,13 @@ class PricingCalculatorAPIView(View):
             capacity = int(data.get('capacity', 10))
             
             # Calculate smart defaults if any price is missing
+            default_rates = period_rates(hourly_price)
             if hourly_price and not daily_price:
-                daily_price = hourly_price * 8  # 8 hours = 1 day
+                daily_price = default_rates['daily']
             if hourly_price and not weekly_price:
-                weekly_price = hourly_price * 50  # 50 hours = 1 week (7 days * ~7 hours)
+                weekly_price = default_rates['weekly']
             if hourly_price and not monthly_price:
-                monthly_price = hourly_price * 200  # 200 hours = 1 month
+                monthly_price = default_rates['monthly']
                 
             # Calculate utilization rates for each period
             utilization_rates = {
@@ -1357,9 +1355,9 @@ class PricingCalculatorAPIView(View):
                     'booking_distribution': booking_distribution,
                     'recommendations': recommendations,
                     'smart_defaults': {
-                        'daily_suggested': float(hourly_price * 8 * 0.8) if hourly_price else 0,
-                        'weekly_suggested': float(hourly_price * 50 * 0.75) if hourly_price else 0,
-                        'monthly_suggested': float(hourly_price * 200 * 0.7) if hourly_price else 0
+                        'daily_suggested': float(default_rates['daily'] * Decimal('0.8')),
+                        'weekly_suggested': float(default_rates['weekly'] * Decimal('0.75')),
+                        'monthly_suggested': float(default_rates['monthly'] * Decimal('0.7'))
                     }
                 }
             })
@@ -1394,7 +1392,7 @@ class CustomOfferAPIView(View):
             conditions = data.get('conditions', {})
             
             # Validate offer data
-            if offer_type not in ['percentage', 'fixed', 'package']:
+            if offer_type not in DISCOUNT_TYPES + ('package',):
                 return JsonResponse({
                     'success': False,
                     'error': 'Invalid offer type. Must be percentage, fixed, or package.'
@@ -0,0 +1,12 @@
+"""
+Buffered hot counters for playgrounds (see playground_booking.counters)
+"""
+
+from playground_booking.counters import BufferedCounter
+
+
+# PlaygroundAnalytics.total_views, counted on public detail page hits
+playground_views = BufferedCounter(
+    'playground_views', 'playgrounds.PlaygroundAnalytics', 'total_views',
+    key_field='playground_id', create_missing=True,
+)
@@ -0,0 +1,203 @@
+"""
+Central currency registry for the playground booking system.
+
+Every currency symbol, name, flag and decimal rule used by the site lives here.
+The registry is built once at import time and is read-only afterwards, so
+views can format prices in tight loops without rebuilding lookup tables.
+"""
+
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+DEFAULT_CURRENCY = 'USD'
+
+
+def _flag(region):
+    """Build a flag emoji from a two-letter region code (e.g. 'BD' -> 🇧🇩)"""
+    return ''.join(chr(0x1F1E6 + ord(letter) - ord('A')) for letter in region)
+
+
+class Currency(NamedTuple):
+    code: str
+    symbol: str
+    name: str
+    flag: str
+    decimal_places: int
+    countries: tuple
+    template: str
+
+    def format(self, amount):
+        """Format an amount with this currency's symbol, grouping and decimals"""
+        return self.template.format(_to_number(amount))
+
+    def as_dict(self):
+        """Serializable representation used by the currency APIs"""
+        return {
+            'code': self.code,
+            'symbol': self.symbol,
+            'name': self.name,
+            'flag': self.flag,
+            'decimal_places': self.decimal_places,
+        }
+
+
+def _to_number(amount):
+    if amount is None:
+        return 0
+    if isinstance(amount, (int, float, Decimal)):
+        return amount
+    try:
+        return Decimal(str(amount))
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+# (code, symbol, name, flag region, decimal places, ISO countries using it)
+_CURRENCY_ROWS = (
+    ('USD', '$', 'US Dollar', 'US', 2, ('US', 'EC', 'SV', 'PA', 'PR')),
+    ('EUR', '€', 'Euro', 'EU', 2, ('DE', 'FR', 'IT', 'ES', 'NL', 'BE', 'AT', 'PT', 'IE', 'FI', 'EE', 'LV',
+                                   'LT', 'LU', 'SK', 'SI', 'MT', 'CY', 'GR', 'HR')),
+    ('GBP', '£', 'British Pound', 'GB', 2, ('GB',)),
+    ('CAD', 'C$', 'Canadian Dollar', 'CA', 2, ('CA',)),
+    ('AUD', 'A$', 'Australian Dollar', 'AU', 2, ('AU',)),
+    ('NZD', 'NZ$', 'New Zealand Dollar', 'NZ', 2, ('NZ',)),
+    ('JPY', '¥', 'Japanese Yen', 'JP', 0, ('JP',)),
+    ('CNY', '¥', 'Chinese Yuan', 'CN', 2, ('CN',)),
+    ('HKD', 'HK$', 'Hong Kong Dollar', 'HK', 2, ('HK',)),
+    ('TWD', 'NT$', 'New Taiwan Dollar', 'TW', 2, ('TW',)),
+    ('KRW', '₩', 'South Korean Won', 'KR', 0, ('KR',)),
+    ('INR', '₹', 'Indian Rupee', 'IN', 2, ('IN',)),
+    ('BDT', '৳', 'Bangladeshi Taka', 'BD', 2, ('BD',)),
+    ('PKR', '₨', 'Pakistani Rupee', 'PK', 2, ('PK',)),
+    ('LKR', '₨', 'Sri Lankan Rupee', 'LK', 2, ('LK',)),
+    ('NPR', '₨', 'Nepalese Rupee', 'NP', 2, ('NP',)),
+    ('BTN', 'Nu.', 'Bhutanese Ngultrum', 'BT', 2, ('BT',)),
+    ('MVR', 'Rf', 'Maldivian Rufiyaa', 'MV', 2, ('MV',)),
+    ('AFN', '؋', 'Afghan Afghani', 'AF', 2, ('AF',)),
+    ('MYR', 'RM', 'Malaysian Ringgit', 'MY', 2, ('MY',)),
+    ('SGD', 'S$', 'Singapore Dollar', 'SG', 2, ('SG',)),
+    ('THB', '฿', 'Thai Baht', 'TH', 2, ('TH',)),
+    ('IDR', 'Rp', 'Indonesian Rupiah', 'ID', 0, ('ID',)),
+    ('PHP', '₱', 'Philippine Peso', 'PH', 2, ('PH',)),
+    ('VND', '₫', 'Vietnamese Dong', 'VN', 0, ('VN',)),
+    ('CHF', 'CHF', 'Swiss Franc', 'CH', 2, ('CH', 'LI')),
+    ('SEK', 'kr', 'Swedish Krona', 'SE', 2, ('SE',)),
+    ('NOK', 'kr', 'Norwegian Krone', 'NO', 2, ('NO',)),
+    ('DKK', 'kr', 'Danish Krone', 'DK', 2, ('DK',)),
+    ('PLN', 'zł', 'Polish Złoty', 'PL', 2, ('PL',)),
+    ('CZK', 'Kč', 'Czech Koruna', 'CZ', 2, ('CZ',)),
+    ('HUF', 'Ft', 'Hungarian Forint', 'HU', 2, ('HU',)),
+    ('RON', 'lei', 'Romanian Leu', 'RO', 2, ('RO',)),
+    ('BGN', 'лв', 'Bulgarian Lev', 'BG', 2, ('BG',)),
+    ('RSD', 'дин', 'Serbian Dinar', 'RS', 2, ('RS',)),
+    ('BAM', 'KM', 'Bosnia and Herzegovina Convertible Mark', 'BA', 2, ('BA',)),
+    ('MKD', 'ден', 'Macedonian Denar', 'MK', 2, ('MK',)),
+    ('ALL', 'L', 'Albanian Lek', 'AL', 2, ('AL',)),
+    ('RUB', '₽', 'Russian Ruble', 'RU', 2, ('RU',)),
+    ('TRY', '₺', 'Turkish Lira', 'TR', 2, ('TR',)),
+    ('GEL', '₾', 'Georgian Lari', 'GE', 2, ('GE',)),
+    ('AMD', '֏', 'Armenian Dram', 'AM', 2, ('AM',)),
+    ('AZN', '₼', 'Azerbaijani Manat', 'AZ', 2, ('AZ',)),
+    ('KZT', '₸', 'Kazakhstani Tenge', 'KZ', 2, ('KZ',)),
+    ('UZS', 'лв', 'Uzbekistani Som', 'UZ', 2, ('UZ',)),
+    ('TJS', 'SM', 'Tajikistani Somoni', 'TJ', 2, ('TJ',)),
+    ('KGS', 'лв', 'Kyrgyzstani Som', 'KG', 2, ('KG',)),
+    ('TMT', 'T', 'Turkmenistani Manat', 'TM', 2, ('TM',)),
+    ('ZAR', 'R', 'South African Rand', 'ZA', 2, ('ZA',)),
+    ('EGP', 'E£', 'Egyptian Pound', 'EG', 2, ('EG',)),
+    ('AED', 'د.إ', 'UAE Dirham', 'AE', 2, ('AE',)),
+    ('SAR', '﷼', 'Saudi Riyal', 'SA', 2, ('SA',)),
+    ('QAR', '﷼', 'Qatari Riyal', 'QA', 2, ('QA',)),
+    ('OMR', '﷼', 'Omani Rial', 'OM', 3, ('OM',)),
+    ('KWD', 'د.ك', 'Kuwaiti Dinar', 'KW', 3, ('KW',)),
+    ('BHD', '.د.ب', 'Bahraini Dinar', 'BH', 3, ('BH',)),
+    ('JOD', 'د.ا', 'Jordanian Dinar', 'JO', 3, ('JO',)),
+    ('LBP', 'ل.ل', 'Lebanese Pound', 'LB', 2, ('LB',)),
+    ('ILS', '₪', 'Israeli Shekel', 'IL', 2, ('IL',)),
+    ('IRR', '﷼', 'Iranian Rial', 'IR', 2, ('IR',)),
+    ('IQD', 'ع.د', 'Iraqi Dinar', 'IQ', 3, ('IQ',)),
+    ('BRL', 'R$', 'Brazilian Real', 'BR', 2, ('BR',)),
+    ('MXN', '$', 'Mexican Peso', 'MX', 2, ('MX',)),
+    ('ARS', '$', 'Argentine Peso', 'AR', 2, ('AR',)),
+    ('CLP', '$', 'Chilean Peso', 'CL', 0, ('CL',)),
+    ('COP', '$', 'Colombian Peso', 'CO', 2, ('CO',)),
+    ('PEN', 'S/', 'Peruvian Sol', 'PE', 2, ('PE',)),
+    ('UYU', '$U', 'Uruguayan Peso', 'UY', 2, ('UY',)),
+)
+
+CURRENCIES = MappingProxyType({
+    code: Currency(
+        code=code,
+        symbol=symbol,
+        name=name,
+        flag=_flag(region),
+        decimal_places=decimal_places,
+        countries=countries,
+        template=f"{symbol}{{:,.{decimal_places}f}}",
+    )
+    for code, symbol, name, region, decimal_places, countries in _CURRENCY_ROWS
+})
+
+# ISO country code -> currency code, derived from the registry above
+_COUNTRY_CURRENCIES = MappingProxyType({
+    country: currency.code
+    for currency in CURRENCIES.values()
+    for country in currency.countries
+})
+
+# Lowercase country names (and common aliases) -> ISO country code
+_COUNTRY_NAMES = MappingProxyType({
+    'united states': 'US', 'usa': 'US', 'america': 'US',
+    'united kingdom': 'GB', 'uk': 'GB', 'britain': 'GB', 'england': 'GB',
+    'canada': 'CA', 'australia': 'AU', 'new zealand': 'NZ',
+    'japan': 'JP', 'china': 'CN', 'hong kong': 'HK', 'taiwan': 'TW',
+    'south korea': 'KR', 'korea': 'KR',
+    'india': 'IN', 'bangladesh': 'BD', 'pakistan': 'PK', 'sri lanka': 'LK', 'nepal': 'NP',
+    'malaysia': 'MY', 'singapore': 'SG', 'thailand': 'TH', 'indonesia': 'ID',
+    'philippines': 'PH', 'vietnam': 'VN',
+    'switzerland': 'CH', 'sweden': 'SE', 'norway': 'NO', 'denmark': 'DK', 'poland': 'PL',
+    'germany': 'DE', 'france': 'FR', 'italy': 'IT', 'spain': 'ES', 'netherlands': 'NL',
+    'belgium': 'BE', 'austria': 'AT', 'portugal': 'PT', 'ireland': 'IE', 'finland': 'FI',
+    'greece': 'GR', 'euro': 'DE',
+    'russia': 'RU', 'turkey': 'TR', 'egypt': 'EG', 'south africa': 'ZA',
+    'united arab emirates': 'AE', 'uae': 'AE', 'saudi arabia': 'SA', 'qatar': 'QA',
+    'kuwait': 'KW', 'oman': 'OM', 'bahrain': 'BH', 'jordan': 'JO', 'israel': 'IL',
+    'brazil': 'BR', 'mexico': 'MX', 'argentina': 'AR', 'chile': 'CL', 'colombia': 'CO', 'peru': 'PE',
+})
+
+
+def get_currency(code, default=DEFAULT_CURRENCY):
+    """Return the registry entry for a currency code, falling back to `default`"""
+    currency = CURRENCIES.get((code or '').upper())
+    if currency is None and default:
+        currency = CURRENCIES[default]
+    return currency
+
+
+def currency_symbol(code):
+    """Symbol for a currency code; unknown codes render as the code itself"""
+    currency = CURRENCIES.get((code or '').upper())
+    return currency.symbol if currency else f"{code} "
+
+
+def format_price(amount, code):
+    """Format an amount in the given currency (e.g. 1500 BDT -> '৳1,500.00')"""
+    currency = CURRENCIES.get((code or '').upper())
+    if currency is None:
+        return f"{code} {_to_number(amount):,.2f}"
+    return currency.template.format(_to_number(amount))
+
+
+def currency_for_country(country_code=None, country_name=None, default=DEFAULT_CURRENCY):
+    """Resolve a currency code from an ISO country code and/or a country name"""
+    if country_code:
+        currency_code = _COUNTRY_CURRENCIES.get(country_code.upper())
+        if currency_code:
+            return currency_code
+    if country_name:
+        region = _COUNTRY_NAMES.get(country_name.lower().strip())
+        if region:
+            return _COUNTRY_CURRENCIES[region]
+    return default
@@ -0,0 +1,124 @@
+"""
+Exchange rates to the platform reporting currency (``settings.REPORTING_CURRENCY``).
+
+A rate is the amount of reporting currency one unit of a currency is worth.
+``refresh_exchange_rates`` (a periodic task) fetches current rates and keeps
+them in the cache; until it has run, or when the rate service is down,
+``FALLBACK_RATES`` are used. Bookings snapshot the rate of their currency
+when they are confirmed (``Booking.exchange_rate``) so revenue reports don't
+move with the market; ``bookings.revenue`` converts with those snapshots.
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+RATES_URL = 'https://api.exchangerate-api.com/v4/latest/{currency}'
+RATES_TIMEOUT = 10
+CACHE_TIMEOUT = 2 * 24 * 60 * 60
+RATE_PLACES = Decimal('0.00000001')
+
+# Approximate US dollars per unit, used when no fetched rates are cached
+FALLBACK_RATES = {
+    'USD': Decimal('1'),
+    'EUR': Decimal('1.08'),
+    'GBP': Decimal('1.27'),
+    'CAD': Decimal('0.73'),
+    'AUD': Decimal('0.66'),
+    'NZD': Decimal('0.61'),
+    'JPY': Decimal('0.0067'),
+    'CNY': Decimal('0.14'),
+    'HKD': Decimal('0.128'),
+    'INR': Decimal('0.012'),
+    'BDT': Decimal('0.0083'),
+    'PKR': Decimal('0.0036'),
+    'LKR': Decimal('0.0033'),
+    'NPR': Decimal('0.0075'),
+    'MYR': Decimal('0.22'),
+    'SGD': Decimal('0.74'),
+    'THB': Decimal('0.028'),
+    'IDR': Decimal('0.000063'),
+    'PHP': Decimal('0.018'),
+    'CHF': Decimal('1.12'),
+    'SEK': Decimal('0.095'),
+    'NOK': Decimal('0.094'),
+    'DKK': Decimal('0.145'),
+    'AED': Decimal('0.2723'),
+    'SAR': Decimal('0.2667'),
+    'QAR': Decimal('0.2747'),
+    'KWD': Decimal('3.25'),
+    'ZAR': Decimal('0.054'),
+    'BRL': Decimal('0.19'),
+    'MXN': Decimal('0.055'),
+}
+
+
+def reporting_currency():
+    return settings.REPORTING_CURRENCY
+
+
+def _cache_key(currency):
+    return f"exchange_rates:{currency}"
+
+
+def _fallback_rates(currency):
+    base = FALLBACK_RATES.get(currency)
+    if base is None:
+        return {}
+    return {code: (rate / base).quantize(RATE_PLACES) for code, rate in FALLBACK_RATES.items()}
+
+
+def current_rates():
+    """``{currency: rate to the reporting currency}`` from the last refresh, or the fallback rates"""
+    currency = reporting_currency()
+    return cache.get(_cache_key(currency)) or _fallback_rates(currency)
+
+
+def rate_to_reporting(code):
+    """Current rate of ``code`` to the reporting currency, or None when it is unknown"""
+    code = (code or '').upper()
+    if code == reporting_currency():
+        return Decimal('1')
+    return current_rates().get(code)
+
+
+def convert(amount, from_code, to_code=None):
+    """``amount`` in ``from_code`` converted to ``to_code`` (default: the reporting currency) at current rates"""
+    to_code = to_code or reporting_currency()
+    if (from_code or '').upper() == to_code.upper():
+        return amount
+    from_rate, to_rate = rate_to_reporting(from_code), rate_to_reporting(to_code)
+    if from_rate is None or not to_rate:
+        return None
+    return Decimal(str(amount)) * from_rate / to_rate
+
+
+def refresh_exchange_rates():
+    """Fetch current rates to the reporting currency into the cache; returns how many were stored"""
+    currency = reporting_currency()
+    try:
+        response = requests.get(RATES_URL.format(currency=currency), timeout=RATES_TIMEOUT)
+        response.raise_for_status()
+        quoted = response.json()['rates']
+    except (requests.RequestException, ValueError, KeyError):
+        logger.warning("Exchange rate refresh failed, keeping the previous rates", exc_info=True)
+        return 0
+
+    rates = {}
+    for code, per_reporting_unit in quoted.items():
+        # The service quotes units of each currency per unit of the reporting currency
+        try:
+            per_reporting_unit = Decimal(str(per_reporting_unit))
+        except InvalidOperation:
+            continue
+        if per_reporting_unit > 0:
+            rates[code] = (1 / per_reporting_unit).quantize(RATE_PLACES)
+    rates[currency] = Decimal('1')
+    cache.set(_cache_key(currency), rates, CACHE_TIMEOUT)
+    return len(rates)
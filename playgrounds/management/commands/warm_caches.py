@@ -0,0 +1,57 @@
+"""
+Management command to prebuild hot cache entries after a deploy
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from playgrounds.warmup import (
+    warm_caches, DEFAULT_TOP_PLAYGROUNDS, DEFAULT_WORKERS, DEFAULT_TIMEOUT
+)
+
+
+class Command(BaseCommand):
+    help = 'Prebuild homepage, reference data and top playground cache entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=DEFAULT_TOP_PLAYGROUNDS,
+                            help='Number of top playgrounds whose snapshots are built')
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                            help='Size of the build thread pool')
+        parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                            help='Overall deadline in seconds')
+        parser.add_argument('--fail-on-error', action='store_true',
+                            help='Exit non-zero if any entry failed or timed out')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        started = time.perf_counter()
+        results = warm_caches(
+            top_playgrounds=options['top'],
+            workers=options['workers'],
+            timeout=options['timeout'],
+        )
+        elapsed = time.perf_counter() - started
+
+        # Slowest first, so expensive caches stand out
+        results.sort(key=lambda r: float('inf') if r.seconds is None else r.seconds, reverse=True)
+        width = max((len(r.name) for r in results), default=0)
+        for result in results:
+            seconds = 'timeout' if result.seconds is None else f"{result.seconds * 1000:8.1f} ms"
+            line = f"{result.name.ljust(width)}  {seconds}"
+            if result.ok:
+                self.stdout.write(line)
+            else:
+                self.stdout.write(self.style.ERROR(f"{line}  {result.error}"))
+
+        failed = [r for r in results if not r.ok]
+        summary = f"Warmed {len(results) - len(failed)}/{len(results)} cache entries in {elapsed:.2f}s"
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+            if options['fail_on_error']:
+                raise CommandError(f"{len(failed)} cache entries failed to warm")
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
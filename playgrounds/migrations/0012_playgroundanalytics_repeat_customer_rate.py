@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playgrounds', '0011_popularplayground'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playgroundanalytics',
+            name='repeat_customer_rate',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+    ]
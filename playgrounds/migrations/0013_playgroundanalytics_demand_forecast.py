@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:08
+
+from django.db import migrations, models
+import playgrounds.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playgrounds', '0012_playgroundanalytics_repeat_customer_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playgroundanalytics',
+            name='demand_forecast',
+            field=models.JSONField(blank=True, default=playgrounds.models.default_dict, null=True),
+        ),
+    ]
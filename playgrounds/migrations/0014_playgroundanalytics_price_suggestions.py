@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:31
+
+from django.db import migrations, models
+import playgrounds.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playgrounds', '0013_playgroundanalytics_demand_forecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playgroundanalytics',
+            name='price_suggestions',
+            field=models.JSONField(blank=True, default=playgrounds.models.default_dict, null=True),
+        ),
+    ]
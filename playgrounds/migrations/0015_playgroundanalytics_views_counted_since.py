@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playgrounds', '0014_playgroundanalytics_price_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playgroundanalytics',
+            name='views_counted_since',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
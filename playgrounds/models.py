@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from accounts.models import User
+from .currency import currency_for_country
 
 
 def default_list():
@@ -30,43 +31,8 @@ class Country(models.Model):
     
     def get_currency(self):
         """Get currency code for this country"""
-        # Map by ISO country code
-        currency_map = {
-            'US': 'USD', 'GB': 'GBP', 'MY': 'MYR', 'SG': 'SGD',
-            'IN': 'INR', 'BD': 'BDT', 'AU': 'AUD', 'CA': 'CAD',
-            'JP': 'JPY', 'CN': 'CNY', 'AE': 'AED', 'SA': 'SAR',
-            'TH': 'THB', 'ID': 'IDR', 'PH': 'PHP', 'VN': 'VND',
-            'KR': 'KRW', 'TW': 'TWD', 'HK': 'HKD', 'NZ': 'NZD'
-        }
-        
-        # Also map by country name (lowercase)
-        name_currency_map = {
-            'usa': 'USD', 'united states': 'USD', 'america': 'USD',
-            'malaysia': 'MYR', 'singapore': 'SGD', 'india': 'INR',
-            'bangladesh': 'BDT', 'australia': 'AUD', 'canada': 'CAD',
-            'japan': 'JPY', 'china': 'CNY', 'uae': 'AED', 
-            'united arab emirates': 'AED', 'saudi arabia': 'SAR',
-            'thailand': 'THB', 'indonesia': 'IDR', 'philippines': 'PHP',
-            'vietnam': 'VND', 'south korea': 'KRW', 'korea': 'KRW',
-            'taiwan': 'TWD', 'hong kong': 'HKD', 'new zealand': 'NZD',
-            'united kingdom': 'GBP', 'uk': 'GBP', 'england': 'GBP',
-            'pakistan': 'PKR', 'turkey': 'TRY', 'egypt': 'EGP',
-            'brazil': 'BRL', 'mexico': 'MXN', 'russia': 'RUB'
-        }
-        
-        # First check by code
-        if self.code and len(self.code) == 2:
-            result = currency_map.get(self.code.upper())
-            if result:
-                return result
-        
-        # Then check by name
-        name_lower = self.name.lower().strip()
-        if name_lower in name_currency_map:
-            return name_currency_map[name_lower]
-        
-        # Fallback to stored currency_code
-        return self.currency_code or 'USD'
+        code = self.code if self.code and len(self.code) == 2 else None
+        return currency_for_country(code, self.name, default=self.currency_code or 'USD')
 
 
 class State(models.Model):
@@ -327,8 +293,11 @@ class TimeSlot(models.Model):
         return (end - start).total_seconds() / 3600
     
     def get_effective_price(self):
-        """Get the effective price for this slot"""
-        return self.price if self.price else self.playground.price_per_hour
+        """Get the effective price for this slot, from the playground's pricing rules"""
+        from bookings.pricing import WEEKDAYS, rules_for
+        
+        weekday = WEEKDAYS.index(self.day_of_week) if self.day_of_week in WEEKDAYS else 0
+        return rules_for(self.playground_id).interval_price(weekday, self.start_time, self.end_time)
 
 
 class Review(models.Model):
@@ -409,6 +378,8 @@ class PlaygroundAnalytics(models.Model):
     """Model for tracking playground analytics"""
     playground = models.OneToOneField(Playground, on_delete=models.CASCADE, related_name='analytics')
     total_views = models.PositiveIntegerField(default=0)
+    # Start of the window total_views covers; conversion_rate only counts bookings made since
+    views_counted_since = models.DateTimeField(default=timezone.now)
     total_bookings = models.PositiveIntegerField(default=0)
     total_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     monthly_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -416,6 +387,11 @@ class PlaygroundAnalytics(models.Model):
     peak_hours = models.JSONField(default=default_dict, blank=True, null=True)
     popular_days = models.JSONField(default=default_dict, blank=True, null=True)
     conversion_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    repeat_customer_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    # Level/trend grids from bookings.forecasting, see stored_forecast()
+    demand_forecast = models.JSONField(default=default_dict, blank=True, null=True)
+    # Price multiplier and occupancy grids from bookings.price_advisor
+    price_suggestions = models.JSONField(default=default_dict, blank=True, null=True)
     
     last_updated = models.DateTimeField(auto_now=True)
     
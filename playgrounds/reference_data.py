@@ -0,0 +1,74 @@
+"""
+Cached reference data (locations, sport types, playground types) for form and filter APIs
+"""
+
+from playground_booking.caching import tiered_cache
+
+from .models import Country, State, City, SportType, PlaygroundType
+
+
+LOCATIONS_TAG = 'reference:locations'
+SPORTS_TAG = 'reference:sports'
+PLAYGROUND_TYPES_TAG = 'reference:playground_types'
+
+REFERENCE_TIMEOUT = 60 * 60
+
+
+def active_countries():
+    """Active countries as [{'id', 'name', 'code'}] ordered by name"""
+    return tiered_cache.get_or_set(
+        'reference:countries',
+        lambda: list(Country.objects.filter(is_active=True).order_by('name').values('id', 'name', 'code')),
+        timeout=REFERENCE_TIMEOUT,
+        tags=[LOCATIONS_TAG],
+    )
+
+
+def active_states(country_id):
+    """Active states of a country as [{'id', 'name'}] ordered by name"""
+    country_id = int(country_id)
+    return tiered_cache.get_or_set(
+        f'reference:states:{country_id}',
+        lambda: list(State.objects.filter(
+            country_id=country_id, is_active=True
+        ).order_by('name').values('id', 'name')),
+        timeout=REFERENCE_TIMEOUT,
+        tags=[LOCATIONS_TAG],
+    )
+
+
+def active_cities(state_id):
+    """Active cities of a state as [{'id', 'name', 'latitude', 'longitude'}] ordered by name"""
+    state_id = int(state_id)
+    return tiered_cache.get_or_set(
+        f'reference:cities:{state_id}',
+        lambda: list(City.objects.filter(
+            state_id=state_id, is_active=True
+        ).order_by('name').values('id', 'name', 'latitude', 'longitude')),
+        timeout=REFERENCE_TIMEOUT,
+        tags=[LOCATIONS_TAG],
+    )
+
+
+def active_sport_types():
+    """Active sport types as [{'id', 'name', 'icon', 'description'}] ordered by name"""
+    return tiered_cache.get_or_set(
+        'reference:sport_types',
+        lambda: list(SportType.objects.filter(is_active=True).order_by('name').values(
+            'id', 'name', 'icon', 'description'
+        )),
+        timeout=REFERENCE_TIMEOUT,
+        tags=[SPORTS_TAG],
+    )
+
+
+def active_playground_types():
+    """Active playground types as [{'id', 'name', 'description', 'icon'}] ordered by name"""
+    return tiered_cache.get_or_set(
+        'reference:playground_types',
+        lambda: list(PlaygroundType.objects.filter(is_active=True).order_by('name').values(
+            'id', 'name', 'description', 'icon'
+        )),
+        timeout=REFERENCE_TIMEOUT,
+        tags=[PLAYGROUND_TYPES_TAG],
+    )
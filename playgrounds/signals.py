@@ -0,0 +1,161 @@
+"""
+Signal handlers keeping playground version tokens and cached payloads in sync with the database.
+
+Invalidations run once the transaction commits: bumping a version while the
+change is still uncommitted would let a concurrent reader rebuild the cached
+payload from the old rows and store it under the new version.
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, post_init, m2m_changed
+from django.dispatch import receiver
+
+from playground_booking.caching import tiered_cache
+
+from .models import (
+    Playground, TimeSlot, PlaygroundSlot, DurationPass, PlaygroundImage, Review,
+    Country, State, City, SportType, PlaygroundType, Amenity
+)
+from .reference_data import LOCATIONS_TAG, SPORTS_TAG, PLAYGROUND_TYPES_TAG
+from .snapshot import PAYMENT_METHODS_TAG
+from .versioning import bump_playground_version, bump_booking_version, bump_booking_versions
+
+
+def playground_tags(playground_id):
+    """Cache tags covering everything derived from a playground's configuration"""
+    return [f"playground:{playground_id}", 'playgrounds:popular']
+
+
+def playground_booking_tags(playground_id):
+    """Cache tags covering everything derived from a playground's bookings"""
+    return [f"playground:{playground_id}:bookings"]
+
+
+def owner_tags(owner_id):
+    """Cache tags covering an owner's set of playgrounds"""
+    return [f"owner:{owner_id}:playgrounds"]
+
+
+def invalidate_playground(playground_id):
+    bump_playground_version(playground_id)
+    tiered_cache.invalidate(playground_tags(playground_id))
+
+
+def invalidate_playgrounds(playground_ids):
+    """Invalidate playground caches after a queryset .update() that bypassed signals"""
+    for playground_id in set(playground_ids):
+        invalidate_playground(playground_id)
+
+
+def invalidate_bookings(playground_dates):
+    """Invalidate booking-derived caches after a queryset .update() that bypassed signals"""
+    playground_dates = list(playground_dates)
+    bump_booking_versions(playground_dates)
+    tags = set()
+    for playground_id, _ in playground_dates:
+        tags.update(playground_booking_tags(playground_id))
+    tiered_cache.invalidate(tags)
+
+
+@receiver(post_save, sender=Playground)
+@receiver(post_delete, sender=Playground)
+def playground_changed(sender, instance, **kwargs):
+    playground_id, owner_id = instance.pk, instance.owner_id
+    transaction.on_commit(lambda: invalidate_playground(playground_id))
+    transaction.on_commit(lambda: tiered_cache.invalidate(owner_tags(owner_id)))
+
+
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(post_save, sender=PlaygroundSlot)
+@receiver(post_delete, sender=PlaygroundSlot)
+@receiver(post_save, sender=DurationPass)
+@receiver(post_delete, sender=DurationPass)
+@receiver(post_save, sender=PlaygroundImage)
+@receiver(post_delete, sender=PlaygroundImage)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def playground_child_changed(sender, instance, **kwargs):
+    playground_id = instance.playground_id
+    transaction.on_commit(lambda: invalidate_playground(playground_id))
+
+
+@receiver(m2m_changed, sender=Playground.sport_types.through)
+@receiver(m2m_changed, sender=Playground.playground_amenities.through)
+def playground_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    playground_ids = [instance.pk] if not reverse else list(pk_set or ())
+    transaction.on_commit(lambda: invalidate_playgrounds(playground_ids))
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(pre_delete, sender=Amenity)
+def amenity_changed(sender, instance, **kwargs):
+    # pre_delete: the m2m rows are gone (without m2m_changed) by post_delete
+    playground_ids = list(instance.playgrounds.values_list('id', flat=True))
+    transaction.on_commit(lambda: invalidate_playgrounds(playground_ids))
+
+
+@receiver(post_save, sender='payments.PlaygroundPaymentConfig')
+@receiver(post_delete, sender='payments.PlaygroundPaymentConfig')
+def payment_config_changed(sender, instance, **kwargs):
+    playground_id = instance.playground_id
+    transaction.on_commit(lambda: invalidate_playground(playground_id))
+
+
+@receiver(post_save, sender='payments.PlaygroundPaymentMethod')
+@receiver(post_delete, sender='payments.PlaygroundPaymentMethod')
+def playground_payment_method_changed(sender, instance, **kwargs):
+    # Only the one playground's snapshot lists this method; its config still
+    # exists here when the method goes with it in a cascade
+    config_model = apps.get_model('payments', 'PlaygroundPaymentConfig')
+    playground_ids = list(
+        config_model.objects.filter(pk=instance.playground_config_id).values_list('playground_id', flat=True)
+    )
+    transaction.on_commit(lambda: invalidate_playgrounds(playground_ids))
+
+
+@receiver(post_save, sender='payments.PaymentMethod')
+@receiver(post_delete, sender='payments.PaymentMethod')
+def payment_method_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: tiered_cache.invalidate([PAYMENT_METHODS_TAG]))
+
+
+@receiver(post_init, sender='bookings.Booking')
+def remember_booking_date(sender, instance, **kwargs):
+    # Rescheduling moves a booking between dates; both dates must be invalidated
+    instance._original_booking_date = instance.__dict__.get('booking_date')
+
+
+@receiver(post_save, sender='bookings.Booking')
+@receiver(post_delete, sender='bookings.Booking')
+def booking_changed(sender, instance, **kwargs):
+    playground_id, booking_date = instance.playground_id, instance.booking_date
+    original_date = getattr(instance, '_original_booking_date', None)
+    transaction.on_commit(lambda: bump_booking_version(playground_id, booking_date, original_date))
+    transaction.on_commit(lambda: tiered_cache.invalidate(playground_booking_tags(playground_id)))
+    instance._original_booking_date = booking_date
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def location_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: tiered_cache.invalidate([LOCATIONS_TAG]))
+
+
+@receiver(post_save, sender=SportType)
+@receiver(post_delete, sender=SportType)
+def sport_type_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: tiered_cache.invalidate([SPORTS_TAG]))
+
+
+@receiver(post_save, sender=PlaygroundType)
+@receiver(post_delete, sender=PlaygroundType)
+def playground_type_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: tiered_cache.invalidate([PLAYGROUND_TYPES_TAG]))
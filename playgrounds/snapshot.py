@@ -0,0 +1,371 @@
+"""
+Read-through cached playground snapshots for the booking path.
+
+``get_playground_snapshot(playground_id)`` returns an immutable
+``PlaygroundSnapshot`` holding the playground row together with its location,
+owner, sport types, images, amenities, time slots, duration passes and payment
+configuration. A miss is built with one prefetching query and stored in the
+two-level cache under the ``playground:<id>`` tag, which the handlers in
+``playgrounds.signals`` invalidate on save/delete of the playground or any of
+those related rows.
+
+JSON columns are kept as serialized text; their properties return a fresh copy
+on every access so callers can never mutate the shared snapshot.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import NamedTuple, Optional, Tuple
+
+from django.db.models import Prefetch
+from django.http import Http404
+
+from playground_booking.caching import tiered_cache
+
+from .models import Playground, TimeSlot
+from .reference_data import LOCATIONS_TAG, SPORTS_TAG
+
+
+SNAPSHOT_TIMEOUT = 60 * 60
+
+# Global rows embedded in every snapshot that has a payment configuration
+PAYMENT_METHODS_TAG = 'payments:methods'
+
+
+class SportTypeInfo(NamedTuple):
+    id: int
+    name: str
+    icon: str
+    description: str
+
+
+class ImageInfo(NamedTuple):
+    id: int
+    url: str
+    caption: str
+    is_primary: bool
+
+
+class AmenityInfo(NamedTuple):
+    id: int
+    name: str
+    description: str
+    icon: str
+    amenity_type: str
+    price: Decimal
+
+
+class TimeSlotInfo(NamedTuple):
+    id: int
+    day_of_week: str
+    day_display: str
+    start_time: time
+    end_time: time
+    price: Decimal
+    is_available: bool
+    max_bookings: int
+    # The slot's own price, None when it uses the playground's rate
+    price_override: Optional[Decimal] = None
+
+    @property
+    def duration_hours(self):
+        start = datetime.combine(date.today(), self.start_time)
+        end = datetime.combine(date.today(), self.end_time)
+        if end < start:  # Handle overnight slots
+            end += timedelta(days=1)
+        return (end - start).total_seconds() / 3600
+
+
+class DurationPassInfo(NamedTuple):
+    id: int
+    name: str
+    duration_type: str
+    duration_days: int
+    price: Decimal
+    currency: str
+    is_active: bool
+
+
+class PaymentMethodInfo(NamedTuple):
+    method_type: str
+    name: str
+    instructions: str
+    requires_receipt: bool
+    is_instant: bool
+    processing_fee_percentage: Decimal
+
+
+class PaymentConfigInfo(NamedTuple):
+    id: int
+    bank_name: str
+    account_name: str
+    account_number: str
+    routing_number: str
+    mobile_banking_number: str
+    mobile_banking_type: str
+    auto_approve_payments: bool
+    payment_deadline_hours: int
+    methods: Tuple[PaymentMethodInfo, ...]
+
+
+@dataclass(frozen=True)
+class PlaygroundSnapshot:
+    """Immutable, cache-friendly view of a playground and its configuration"""
+
+    id: int
+    name: str
+    description: str
+    status: str
+    playground_type: str
+    capacity: int
+    size: str
+    address: str
+    latitude: Optional[Decimal]
+    longitude: Optional[Decimal]
+
+    price_per_hour: Decimal
+    price_per_day: Optional[Decimal]
+    currency: str
+    country_currency: str
+
+    owner_id: int
+    owner_username: str
+    owner_first_name: str
+    owner_last_name: str
+
+    city_id: int
+    city_name: str
+    state_name: str
+    country_name: str
+    country_code: str
+
+    phone_number: str
+    whatsapp_number: str
+    google_maps_url: str
+    main_image_url: Optional[str]
+    qr_code_image_url: Optional[str]
+
+    rules: str
+    cancellation_policy: str
+    refund_policy: str
+    auto_approval: bool
+    live_availability: bool
+    instant_booking: bool
+    advance_booking_days: int
+
+    is_popular: bool
+    is_featured: bool
+    rating: Decimal
+    review_count: int
+    total_bookings: int
+    created_at: datetime
+    updated_at: datetime
+
+    sport_types: Tuple[SportTypeInfo, ...]
+    images: Tuple[ImageInfo, ...]
+    db_amenities: Tuple[AmenityInfo, ...]
+    time_slots: Tuple[TimeSlotInfo, ...]
+    duration_passes: Tuple[DurationPassInfo, ...]
+    payment_config: Optional[PaymentConfigInfo]
+
+    custom_pricing_json: str
+    operating_hours_json: str
+    amenities_json: str
+    payment_methods_json: str
+    bank_details_json: str
+
+    @property
+    def custom_pricing(self):
+        return json.loads(self.custom_pricing_json)
+
+    @property
+    def operating_hours(self):
+        return json.loads(self.operating_hours_json)
+
+    @property
+    def amenities(self):
+        """The playground's free-form JSON amenities list"""
+        return json.loads(self.amenities_json)
+
+    @property
+    def payment_methods(self):
+        return json.loads(self.payment_methods_json)
+
+    @property
+    def bank_details(self):
+        return json.loads(self.bank_details_json)
+
+    def slots_for_day(self, day_of_week, available_only=True):
+        """Time slots of a weekday (``'monday'`` ...) ordered by start time"""
+        return [
+            slot for slot in self.time_slots
+            if slot.day_of_week == day_of_week and (slot.is_available or not available_only)
+        ]
+
+    def get_duration_pass(self, pass_id):
+        pass_id = int(pass_id)
+        for duration_pass in self.duration_passes:
+            if duration_pass.id == pass_id:
+                return duration_pass
+        return None
+
+    def get_amenity(self, amenity_id):
+        amenity_id = int(amenity_id)
+        for amenity in self.db_amenities:
+            if amenity.id == amenity_id:
+                return amenity
+        return None
+
+
+def _dump_json(value, empty):
+    return json.dumps(value if value is not None else empty, default=str)
+
+
+def _file_url(field):
+    return field.url if field else None
+
+
+def _build_snapshot(playground_id):
+    playground = Playground.objects.select_related(
+        'owner', 'city__state__country', 'payment_config'
+    ).prefetch_related(
+        'sport_types',
+        'images',
+        'playground_amenities',
+        'duration_passes',
+        Prefetch('time_slots', queryset=TimeSlot.objects.order_by('start_time')),
+        'payment_config__playgroundpaymentmethod_set__payment_method',
+    ).get(id=playground_id)
+
+    city = playground.city
+    country = city.state.country
+
+    payment_config = getattr(playground, 'payment_config', None)
+    payment_config_info = None
+    if payment_config is not None:
+        payment_config_info = PaymentConfigInfo(
+            id=payment_config.id,
+            bank_name=payment_config.bank_name,
+            account_name=payment_config.account_name,
+            account_number=payment_config.account_number,
+            routing_number=payment_config.routing_number,
+            mobile_banking_number=payment_config.mobile_banking_number,
+            mobile_banking_type=payment_config.mobile_banking_type,
+            auto_approve_payments=payment_config.auto_approve_payments,
+            payment_deadline_hours=payment_config.payment_deadline_hours,
+            methods=tuple(
+                PaymentMethodInfo(
+                    method_type=pm.payment_method.method_type,
+                    name=pm.payment_method.name,
+                    instructions=pm.custom_instructions or pm.payment_method.instructions,
+                    requires_receipt=pm.payment_method.requires_receipt,
+                    is_instant=pm.payment_method.is_instant,
+                    processing_fee_percentage=pm.processing_fee_percentage,
+                )
+                for pm in payment_config.playgroundpaymentmethod_set.all()
+                if pm.is_enabled and pm.payment_method.is_active
+            ),
+        )
+
+    return PlaygroundSnapshot(
+        id=playground.id,
+        name=playground.name,
+        description=playground.description or '',
+        status=playground.status,
+        playground_type=playground.playground_type or '',
+        capacity=playground.capacity or 0,
+        size=playground.size or '',
+        address=playground.address or '',
+        latitude=playground.latitude,
+        longitude=playground.longitude,
+        price_per_hour=playground.price_per_hour,
+        price_per_day=playground.price_per_day,
+        currency=playground.currency,
+        country_currency=country.get_currency(),
+        owner_id=playground.owner_id,
+        owner_username=playground.owner.username,
+        owner_first_name=playground.owner.first_name or '',
+        owner_last_name=playground.owner.last_name or '',
+        city_id=city.id,
+        city_name=city.name,
+        state_name=city.state.name,
+        country_name=country.name,
+        country_code=country.code,
+        phone_number=playground.phone_number or '',
+        whatsapp_number=playground.whatsapp_number or '',
+        google_maps_url=playground.google_maps_url or '',
+        main_image_url=_file_url(playground.main_image),
+        qr_code_image_url=_file_url(playground.qr_code_image),
+        rules=playground.rules,
+        cancellation_policy=playground.cancellation_policy,
+        refund_policy=playground.refund_policy,
+        auto_approval=playground.auto_approval,
+        live_availability=playground.live_availability,
+        instant_booking=playground.instant_booking,
+        advance_booking_days=playground.advance_booking_days,
+        is_popular=playground.is_popular,
+        is_featured=playground.is_featured,
+        rating=playground.rating,
+        review_count=playground.review_count,
+        total_bookings=playground.total_bookings,
+        created_at=playground.created_at,
+        updated_at=playground.updated_at,
+        sport_types=tuple(
+            SportTypeInfo(sport.id, sport.name, sport.icon, sport.description or '')
+            for sport in playground.sport_types.all()
+        ),
+        images=tuple(
+            ImageInfo(img.id, img.image.url, img.caption or '', img.is_primary)
+            for img in playground.images.all()
+        ),
+        db_amenities=tuple(
+            AmenityInfo(a.id, a.name, a.description, a.icon, a.amenity_type, a.price)
+            for a in playground.playground_amenities.all()
+        ),
+        time_slots=tuple(
+            TimeSlotInfo(
+                id=slot.id,
+                day_of_week=slot.day_of_week,
+                day_display=slot.get_day_of_week_display(),
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                price=slot.price if slot.price else playground.price_per_hour,
+                is_available=slot.is_available,
+                max_bookings=slot.max_bookings,
+                price_override=slot.price,
+            )
+            for slot in playground.time_slots.all()
+        ),
+        duration_passes=tuple(
+            DurationPassInfo(
+                p.id, p.name, p.duration_type, p.duration_days, p.price, p.currency, p.is_active
+            )
+            for p in playground.duration_passes.all()
+        ),
+        payment_config=payment_config_info,
+        custom_pricing_json=_dump_json(playground.custom_pricing, {}),
+        operating_hours_json=_dump_json(playground.operating_hours, {}),
+        amenities_json=_dump_json(playground.amenities, []),
+        payment_methods_json=_dump_json(playground.payment_methods, {}),
+        bank_details_json=_dump_json(playground.bank_details, {}),
+    )
+
+
+def get_playground_snapshot(playground_id):
+    """Return the cached snapshot, raising Playground.DoesNotExist if there is none"""
+    playground_id = int(playground_id)
+    return tiered_cache.get_or_set(
+        f"playground:snapshot:{playground_id}",
+        lambda: _build_snapshot(playground_id),
+        timeout=SNAPSHOT_TIMEOUT,
+        tags=[f"playground:{playground_id}", LOCATIONS_TAG, SPORTS_TAG, PAYMENT_METHODS_TAG],
+    )
+
+
+def get_playground_snapshot_or_404(playground_id):
+    try:
+        return get_playground_snapshot(playground_id)
+    except (Playground.DoesNotExist, ValueError, TypeError):
+        raise Http404('No Playground matches the given query.')
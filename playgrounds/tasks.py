@@ -0,0 +1,13 @@
+"""
+Playground tasks (periodic ones are scheduled in CELERY_BEAT_SCHEDULE in settings)
+"""
+
+from celery import shared_task
+
+from .exchange_rates import refresh_exchange_rates as _refresh_exchange_rates
+
+
+@shared_task
+def refresh_exchange_rates():
+    """Fetch current exchange rates to the reporting currency"""
+    return _refresh_exchange_rates()
@@ -1,3 +1,115 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from playground_booking import counters
+from playground_booking.caching import TwoLevelCache, tiered_cache
+from playground_booking.counters import BufferedCounter
+
+from .models import City, Country, Playground, PlaygroundAnalytics, State
+from .signals import playground_tags
+
+
+def make_playground(**fields):
+    owner = User.objects.create_user(email=f'owner{User.objects.count()}@example.com', password='x', user_type='owner')
+    country, _ = Country.objects.get_or_create(name='Country', code='CC')
+    state, _ = State.objects.get_or_create(name='State', country=country)
+    city, _ = City.objects.get_or_create(name='City', state=state)
+    fields = {'price_per_hour': 100, 'capacity': 10, 'address': 'Address', 'status': 'active', **fields}
+    return Playground.objects.create(name='Playground', owner=owner, city=city, **fields)
+
+
+class BufferedCounterTests(TestCase):
+    def counter(self, **options):
+        counter = BufferedCounter(
+            'test_views', 'playgrounds.PlaygroundAnalytics', 'total_views', key_field='playground_id',
+            create_missing=True, flush_interval=3600, max_pending=10 ** 6, **options,
+        )
+        self.addCleanup(counters._registry.pop, 'test_views', None)
+        return counter
+
+    def test_key_without_a_parent_row_is_dropped_alone(self):
+        counter = self.counter()
+        playground = make_playground()
+        counter.incr(playground.id, 2)
+        # A playground deleted before the flush
+        counter.incr(999999)
+        with self.assertLogs('playground_booking.counters', 'WARNING'):
+            self.assertEqual(counter.flush(), 1)
+        self.assertEqual(PlaygroundAnalytics.objects.get(playground=playground).total_views, 2)
+        self.assertEqual(counter.stats()['errors'], 0)
+        self.assertEqual(counter.pending(999999), 0)
+
+    def test_failing_flush_is_retried_a_limited_number_of_times(self):
+        counter = self.counter(max_retries=2)
+        counter.incr(1, 5)
+        with mock.patch.object(counter, '_write', side_effect=RuntimeError('database down')), \
+                self.assertLogs('playground_booking.counters', 'ERROR'):
+            for _ in range(2):
+                counter.flush()
+                self.assertEqual(counter.pending(1), 5)
+            counter.flush()
+        self.assertEqual(counter.pending(1), 0)
+        self.assertEqual(counter.stats()['dropped'], 5)
+        self.assertEqual(counter.stats()['errors'], 3)
+
+
+class TwoLevelCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tiered_cache.clear_local()
+
+    def test_local_tier_evicts_least_recently_used_entries(self):
+        tiers = TwoLevelCache(key_prefix='test', local_max_entries=2)
+        tiers.set('a', 1)
+        tiers.set('b', 2)
+        tiers.get('a')
+        tiers.set('c', 3)
+        self.assertEqual(tiers.stats()['evictions'], 1)
+        # 'b' was least recently used: it is only in the shared tier now
+        self.assertEqual([tiers.get(key) for key in ('a', 'c', 'b')], [1, 3, 2])
+        stats = tiers.stats()
+        self.assertEqual((stats['local_hits'], stats['shared_hits']), (3, 1))
+
+    def test_local_tier_is_bounded_by_size(self):
+        tiers = TwoLevelCache(key_prefix='test', local_max_bytes=100)
+        tiers.set('large', 'x' * 1000)
+        self.assertEqual(tiers.stats()['local_entries'], 0)
+        self.assertEqual(tiers.get('large'), 'x' * 1000)
+
+    def test_invalidating_a_tag_drops_its_entries_in_every_process(self):
+        tiers, other_process = TwoLevelCache(key_prefix='test'), TwoLevelCache(key_prefix='test')
+        tiers.set('tagged', 1, tags=['t'])
+        tiers.set('other', 2, tags=['u'])
+        self.assertEqual(other_process.get('tagged', tags=['t']), 1)
+
+        tiers.invalidate(['t'])
+
+        self.assertIsNone(tiers.get('tagged', tags=['t']))
+        self.assertEqual(tiers.get('other', tags=['u']), 2)
+        # Another process trusts its local copy for LOCAL_TIMEOUT, then sees the invalidation
+        self.assertEqual(other_process.get('tagged', tags=['t']), 1)
+        other_process.clear_local()
+        self.assertIsNone(other_process.get('tagged', tags=['t']))
+
+    def test_invalidation_during_a_build_leaves_the_entry_stale(self):
+        tiers = TwoLevelCache(key_prefix='test')
+
+        def build():
+            tiers.invalidate(['t'])
+            return 'old'
+
+        self.assertEqual(tiers.get_or_set('key', build, tags=['t']), 'old')
+        tiers.clear_local()
+        self.assertEqual(tiers.get_or_set('key', lambda: 'new', tags=['t']), 'new')
+
+    def test_playground_caches_are_invalidated_once_the_change_commits(self):
+        playground = make_playground()
+        tiered_cache.set('snapshot', 'old', tags=playground_tags(playground.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            playground.name = 'Renamed'
+            playground.save()
+            self.assertEqual(tiered_cache.get('snapshot', tags=playground_tags(playground.id)), 'old')
+        self.assertIsNone(tiered_cache.get('snapshot', tags=playground_tags(playground.id)))
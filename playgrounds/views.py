@@ -9,7 +9,9 @@ from datetime import datetime, timedelta
 import json
 from django.conf import settings
 from .models import Playground, SportType, Country, State, City, PlaygroundImage
-from api.currency_api import DynamicCurrencyAPI
+from .currency import get_currency, currency_for_country
+from .versioning import playground_condition, CONFIG
+from .counters import playground_views
 
 # Create your views here.
 
@@ -71,21 +73,20 @@ class PlaygroundListView(ListView):
         context['countries'] = Country.objects.filter(is_active=True)
         
         # Add currency information for each playground
-        currency_api = DynamicCurrencyAPI()
         playgrounds_with_currency = []
         
         for playground in context['playgrounds']:
             # Get currency based on playground's country
             country_name = playground.city.state.country.name.lower()
             currency_code = self._get_currency_code_for_country(country_name)
-            currency_data = currency_api.CURRENCY_DATABASE.get(currency_code, currency_api.CURRENCY_DATABASE['USD'])
+            currency_data = get_currency(currency_code)
             
             # Add currency info to playground object
             playground.currency = {
-                'code': currency_code,
-                'symbol': currency_data['symbol'],
-                'name': currency_data['name'],
-                'decimal_places': currency_data['decimal_places']
+                'code': currency_data.code,
+                'symbol': currency_data.symbol,
+                'name': currency_data.name,
+                'decimal_places': currency_data.decimal_places
             }
             playgrounds_with_currency.append(playground)
         
@@ -127,52 +128,7 @@ class PlaygroundListView(ListView):
     
     def _get_currency_code_for_country(self, country_name):
         """Map country names to currency codes"""
-        country_currency_map = {
-            'malaysia': 'MYR',
-            'singapore': 'SGD', 
-            'indonesia': 'IDR',
-            'thailand': 'THB',
-            'united states': 'USD',
-            'usa': 'USD',
-            'united kingdom': 'GBP',
-            'uk': 'GBP',
-            'britain': 'GBP',
-            'england': 'GBP',
-            'canada': 'CAD',
-            'australia': 'AUD',
-            'india': 'INR',
-            'bangladesh': 'BDT',
-            'china': 'CNY',
-            'japan': 'JPY',
-            'south korea': 'KRW',
-            'korea': 'KRW',
-            'pakistan': 'PKR',
-            'philippines': 'PHP',
-            'vietnam': 'VND',
-            'brazil': 'BRL',
-            'mexico': 'MXN',
-            'russia': 'RUB',
-            'turkey': 'TRY',
-            'egypt': 'EGP',
-            'south africa': 'ZAR',
-            'switzerland': 'CHF',
-            'sweden': 'SEK',
-            'norway': 'NOK',
-            'denmark': 'DKK',
-            'euro': 'EUR',
-            'germany': 'EUR',
-            'france': 'EUR',
-            'italy': 'EUR',
-            'spain': 'EUR',
-            'netherlands': 'EUR',
-            'belgium': 'EUR',
-            'austria': 'EUR',
-            'portugal': 'EUR',
-            'ireland': 'EUR',
-            'finland': 'EUR',
-            'greece': 'EUR'
-        }
-        return country_currency_map.get(country_name, 'USD')
+        return currency_for_country(country_name=country_name)
 
 class PlaygroundSearchView(TemplateView):
     template_name = 'playground/search.html'
@@ -194,6 +150,7 @@ class PlaygroundDetailView(TemplateView):
             
             context['playground'] = playground
             context['today'] = timezone.now().date()
+            playground_views.incr(playground.id)
             context['google_maps_api_key'] = settings.GOOGLE_MAPS_API_KEY
             
             # Add JavaScript-safe playground data
@@ -795,6 +752,7 @@ def load_slots_by_date(request):
         'error': 'Method not allowed'
     })
 
+@playground_condition(CONFIG)
 def load_membership_passes(request):
     """Load membership passes for a playground from database"""
     if request.method == 'GET':
@@ -914,6 +872,7 @@ def load_custom_slots(request):
         'error': 'Method not allowed'
     })
 
+@playground_condition(CONFIG)
 def load_amenities(request):
     """Load amenities for a playground from real data"""
     if request.method == 'GET':
@@ -0,0 +1,129 @@
+"""
+Cache warm-up for deploys and worker restarts.
+
+``warm_caches()`` prebuilds the entries the homepage, reference-data APIs and
+the most visited playground pages read first, so a fresh deploy does not send
+all of those misses to the database at once. Entries are built on a thread
+pool under an overall deadline; each result reports how long its entry took.
+The pool's threads are daemons, so a build stuck past the deadline does not
+keep the process alive once the caller is done.
+"""
+
+import queue
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from django.db import close_old_connections, connection
+
+from .models import Playground
+from .reference_data import (
+    active_countries, active_states, active_sport_types, active_playground_types
+)
+from .snapshot import get_playground_snapshot
+
+
+DEFAULT_TOP_PLAYGROUNDS = 20
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 60
+
+# Limits requested by the homepage and dashboard widgets
+POPULAR_LIMITS = (8,)
+
+
+class WarmResult(NamedTuple):
+    name: str
+    seconds: Optional[float]
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.seconds is not None and self.error is None
+
+
+def _popular(limit):
+    # Imported lazily: api.home_api_enhanced pulls in the whole API module graph
+    from api.home_api_enhanced import popular_playgrounds
+    return popular_playgrounds(limit)
+
+
+def warm_targets(top_playgrounds=DEFAULT_TOP_PLAYGROUNDS):
+    """Return [(name, callable)] for every entry the warm-up should build"""
+    targets = [
+        ('reference:countries', active_countries),
+        ('reference:sport_types', active_sport_types),
+        ('reference:playground_types', active_playground_types),
+    ]
+    targets += [
+        (f"playgrounds:popular:{limit}", lambda limit=limit: _popular(limit))
+        for limit in POPULAR_LIMITS
+    ]
+    targets += [
+        (f"reference:states:{country['id']}", lambda country_id=country['id']: active_states(country_id))
+        for country in active_countries()
+    ]
+
+    top_ids = Playground.objects.filter(status='active').order_by(
+        '-is_popular', '-total_bookings', '-rating'
+    ).values_list('id', flat=True)[:top_playgrounds]
+    targets += [
+        (f"playground:snapshot:{playground_id}", lambda playground_id=playground_id: get_playground_snapshot(playground_id))
+        for playground_id in top_ids
+    ]
+    return targets
+
+
+def _timed(name, builder):
+    close_old_connections()
+    started = time.perf_counter()
+    try:
+        builder()
+    except Exception as e:
+        return WarmResult(name, time.perf_counter() - started, f"{e.__class__.__name__}: {e}")
+    finally:
+        # Worker threads each hold their own connection; don't leak them
+        connection.close()
+    return WarmResult(name, time.perf_counter() - started)
+
+
+def warm_caches(top_playgrounds=DEFAULT_TOP_PLAYGROUNDS, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Build all warm-up targets in parallel, giving up after ``timeout`` seconds.
+
+    Returns a list of ``WarmResult``; entries still running at the deadline
+    have ``seconds=None`` and a ``'timed out'`` error.
+    """
+    targets = warm_targets(top_playgrounds)
+    pending = queue.SimpleQueue()
+    for index, (name, builder) in enumerate(targets):
+        pending.put((index, name, builder))
+    finished = {}
+    lock = threading.Lock()
+    # Set when everything is built or the deadline passed; workers stop picking up targets
+    stop = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            try:
+                index, name, builder = pending.get_nowait()
+            except queue.Empty:
+                return
+            result = _timed(name, builder)
+            with lock:
+                finished[index] = result
+                if len(finished) == len(targets):
+                    stop.set()
+
+    # Daemon threads, unlike ThreadPoolExecutor's, aren't joined at interpreter
+    # exit: a build hanging past the deadline can't hold the process open
+    for number in range(min(workers, len(targets))):
+        threading.Thread(target=work, name=f'warm-caches_{number}', daemon=True).start()
+    if targets:
+        stop.wait(timeout)
+    stop.set()
+
+    with lock:
+        return [
+            finished.get(index) or WarmResult(name, None, 'timed out')
+            for index, (name, _) in enumerate(targets)
+        ]